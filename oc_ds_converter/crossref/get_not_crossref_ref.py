@@ -15,12 +15,15 @@
 # SOFTWARE.
 
 
+from __future__ import annotations
+
 import os
 from argparse import ArgumentParser
 from functools import partial
 from multiprocessing import cpu_count
 from sys import platform
 from typing import List, Tuple
+from urllib.parse import quote
 
 from pebble import ProcessFuture, ProcessPool
 from tqdm import tqdm
@@ -31,6 +34,7 @@ from oc_ds_converter.lib.file_manager import (call_api, chunks, get_csv_data,
 from oc_ds_converter.lib.jsonmanager import get_all_files, load_json
 from oc_ds_converter.metadata_manager import MetadataManager
 from oc_ds_converter.oc_idmanager import DOIManager
+from oc_ds_converter.oc_idmanager.prefix_ra_index import PrefixRAIndex
 
 
 def extract_dois_from_dump(crossref_json_dir:str, output_dir:str, max_workers:int) -> None:
@@ -81,7 +85,7 @@ def task_done(output_dir:str, filename:str, pbar:tqdm, task_output:ProcessFuture
     write_csv(path=os.path.join(ref_dir, filename), datalist=ref_dois)
     pbar.update()
 
-def generate_set_of_crossref_dois(crossref_dois_dir:str) -> set:
+def generate_set_of_crossref_dois(crossref_dois_dir:str, ra_index:PrefixRAIndex=None) -> set:
     print('[INFO] Storing Crossref DOIs in memory')
     files = os.listdir(crossref_dois_dir)
     pbar = tqdm(total=len(files))
@@ -90,6 +94,9 @@ def generate_set_of_crossref_dois(crossref_dois_dir:str) -> set:
         crossref_dois.update(CSVManager.load_csv_column_as_set(os.path.join(crossref_dois_dir, file), 'id'))
         pbar.update()
     pbar.close()
+    if ra_index is not None:
+        # the prefixes of the DOIs of the dump are assigned by Crossref
+        ra_index.add_dois(crossref_dois, 'crossref')
     return crossref_dois
 
 def get_ref_dois_not_in_crossref(crossref_dois:set, ref_dir:str) -> set:
@@ -116,7 +123,26 @@ def store_dois_not_in_crossref(ref_not_in_crossref:set, output_dir:str) -> None:
         write_csv(path, datalist)
         counter += len(chunk)
 
-def extract_metadata(output_dir:str, orcid_doi_filepath:str):
+def get_prefix_ra_index(output_dir:str) -> PrefixRAIndex:
+    return PrefixRAIndex(os.path.join(output_dir, 'prefix_ra.csv'))
+
+def get_metadata_from_ra(doi:str, registration_agency:str|None, doi_manager:DOIManager, orcid_doi_filepath:str) -> dict|None:
+    '''
+    It returns the metadata of a DOI from the API of the registration agency of its prefix, without asking
+    doi.org for the agency of the DOI, or None if the agency has no API or the DOI was not found.
+    '''
+    api_registration_agency = getattr(doi_manager, f'_api_{registration_agency}', None) if registration_agency else None
+    if not api_registration_agency:
+        return None
+    r_format = 'xml' if registration_agency == 'medra' else 'json'
+    api_response = call_api(url=api_registration_agency + quote(doi), headers=doi_manager._headers, r_format=r_format)
+    if not api_response:
+        return None
+    metadata_manager = MetadataManager(metadata_provider = registration_agency, api_response = api_response, orcid_doi_filepath = orcid_doi_filepath)
+    return metadata_manager.extract_metadata()
+
+def extract_metadata(output_dir:str, orcid_doi_filepath:str, ra_index:PrefixRAIndex=None):
+    ra_index = ra_index if ra_index is not None else get_prefix_ra_index(output_dir)
     dois_not_in_crossref_dir = os.path.join(output_dir, 'dois_not_in_crossref')
     base_output_dir = os.path.join(dois_not_in_crossref_dir, 'metadata_extracted')
     processed_dois = {
@@ -126,11 +152,15 @@ def extract_metadata(output_dir:str, orcid_doi_filepath:str):
     print(len(processed_dois))
     for filename in os.listdir(dois_not_in_crossref_dir):
         dois = CSVManager.load_csv_column_as_set(os.path.join(dois_not_in_crossref_dir, filename), 'id').difference(processed_dois)
+        # the agencies of the prefixes are known locally or requested in batches, not once per DOI
+        registration_agencies = ra_index.resolve(dois)
         for doi in dois:
             doi_manager = DOIManager()
-            api_response = call_api(url=f'{doi_manager._api_unknown}{doi}', headers=doi_manager._headers)
-            metadata_manager = MetadataManager(metadata_provider = "unknown", api_response = api_response, orcid_doi_filepath = orcid_doi_filepath)
-            metadata: dict = metadata_manager.extract_metadata()
+            metadata = get_metadata_from_ra(doi, registration_agencies[doi], doi_manager, orcid_doi_filepath)
+            if metadata is None:
+                api_response = call_api(url=f'{doi_manager._api_unknown}{doi}', headers=doi_manager._headers)
+                metadata_manager = MetadataManager(metadata_provider = "unknown", api_response = api_response, orcid_doi_filepath = orcid_doi_filepath)
+                metadata: dict = metadata_manager.extract_metadata()
             if not metadata.get('id'):
                 metadata['id'] = doi
             registration_agency = metadata['ra']
@@ -152,13 +182,15 @@ if __name__ == '__main__': # pragma: no cover
     arg_parser.add_argument('-or', '--orcid', dest='orcid_doi_filepath', required=False, help='DOI-ORCID index filepath, to enrich data')
     arg_parser.add_argument('-m', '--max_workers', dest='max_workers', required=False, default=cpu_count(), type=int, help='Max workers')
     arg_parser.add_argument('-w', '--wanted', dest='wanted_dois_filepath', required=False, default=None, help='A CSV filepath containing what DOI to process, not mandatory')
+    arg_parser.add_argument('-ra', '--ra_index', dest='ra_index_filepath', required=False, default=None, help='The CSV file mapping the DOI prefixes to their registration agencies, shared by the runs. By default, prefix_ra.csv in the output directory')
     args = arg_parser.parse_args()
+    ra_index = PrefixRAIndex(args.ra_index_filepath) if args.ra_index_filepath else get_prefix_ra_index(args.output_dir)
     if not os.path.exists(os.path.join(args.output_dir, 'dois_not_in_crossref')):
         extract_dois_from_dump(args.crossref_json_dir, args.output_dir, args.max_workers)
-        crossref_dois = generate_set_of_crossref_dois(os.path.join(args.output_dir, 'crossref'))
+        crossref_dois = generate_set_of_crossref_dois(os.path.join(args.output_dir, 'crossref'), ra_index)
         ref_not_in_crossref = get_ref_dois_not_in_crossref(crossref_dois, os.path.join(args.output_dir, 'reference'))
         wanted_dois = CSVManager.load_csv_column_as_set(args.wanted_dois_filepath, 'id') if args.wanted_dois_filepath else None
         if wanted_dois:
             ref_not_in_crossref = ref_not_in_crossref.intersection(wanted_dois)
         store_dois_not_in_crossref(ref_not_in_crossref, args.output_dir)
-    extract_metadata(args.output_dir, args.orcid_doi_filepath)
\ No newline at end of file
+    extract_metadata(args.output_dir, args.orcid_doi_filepath, ra_index)
\ No newline at end of file
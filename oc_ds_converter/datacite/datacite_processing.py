@@ -10,12 +10,14 @@ from bs4 import BeautifulSoup
 from oc_ds_converter.oc_idmanager.doi import DOIManager
 from oc_ds_converter.oc_idmanager.orcid import ORCIDManager
 from oc_ds_converter.lib.master_of_regex import *
+from oc_ds_converter.lib.orcid_set import get_orcid_set
+from oc_ds_converter.lib.prefetch_index import PrefetchIndex
 from oc_ds_converter.oc_idmanager.oc_data_storage.storage_manager import StorageManager
-from oc_ds_converter.oc_idmanager.oc_data_storage.in_memory_manager import InMemoryStorageManager
+from oc_ds_converter.oc_idmanager.oc_data_storage.overlay_manager import OverlayStorageManager
 from oc_ds_converter.oc_idmanager.oc_data_storage.sqlite_manager import SqliteStorageManager
 from oc_ds_converter.oc_idmanager.issn import ISSNManager
 from oc_ds_converter.oc_idmanager.isbn import ISBNManager
-from oc_ds_converter.datasource.redis import RedisDataSource
+from oc_ds_converter.datasource.snapshot import get_meta_data_source
 from oc_ds_converter.preprocessing.datacite import DatacitePreProcessing
 from oc_ds_converter.ra_processor import RaProcessor
 from typing import Dict, List, Tuple, Optional, Type, Callable
@@ -33,7 +35,7 @@ class DataciteProcessing(RaProcessor):
         else:
             self.storage_manager = storage_manager
 
-        self.temporary_manager = InMemoryStorageManager('../memory.json')
+        self.temporary_manager = OverlayStorageManager(self.storage_manager)
 
         self.needed_info = ["relationType", "relatedIdentifierType", "relatedIdentifier"]
         self.filter = ["references", "isreferencedby", "cites", "iscitedby"]
@@ -151,19 +153,21 @@ class DataciteProcessing(RaProcessor):
     # self.preprocessor.split_input()
 
         self.doi_m = DOIManager(storage_manager=self.storage_manager)
-        self.orcid_m = ORCIDManager(storage_manager=self.storage_manager)
+        # the ORCIDs of the ORCID public data file, if set in the configuration file, are not checked through the API
+        self.orcid_set = get_orcid_set()
+        self.orcid_m = ORCIDManager(storage_manager=self.storage_manager, orcid_set=self.orcid_set)
         self.issn_m = ISSNManager()
         self.isbn_m = ISBNManager()
         self.venue_id_man_dict = {"issn": self.issn_m, "isbn": self.isbn_m}
         # Temporary storage managers : all data must be stored in tmp storage manager and passed all together to the
-        # main storage_manager  only once the full file is processed. Checks must be done both on tmp and in
-        # storage_manager, so that in case the process breaks while processing a file which does not complete (so
-        # without writing the final file) all the data concerning the ids are not stored. Otherwise, the ids saved in
-        # a storage_manager db would be considered to have been processed and thus would be ignored by the process
-        # and lost.
+        # main storage_manager  only once the full file is processed. The tmp storage manager is an in-RAM overlay
+        # of storage_manager, so checks done on tmp also look in storage_manager. In case the process breaks while
+        # processing a file which does not complete (so without writing the final file) all the data concerning the
+        # ids are not stored. Otherwise, the ids saved in a storage_manager db would be considered to have been
+        # processed and thus would be ignored by the process and lost.
 
         self.tmp_doi_m = DOIManager(storage_manager=self.temporary_manager)
-        self.tmp_orcid_m = ORCIDManager(storage_manager=self.temporary_manager)
+        self.tmp_orcid_m = ORCIDManager(storage_manager=self.temporary_manager, orcid_set=self.orcid_set)
         self.venue_tmp_id_man_dict = {"issn": self.issn_m, "isbn": self.isbn_m}
 
         if testing:
@@ -171,11 +175,10 @@ class DataciteProcessing(RaProcessor):
             self.RA_redis = fakeredis.FakeStrictRedis()
 
         else:
-            self.BR_redis = RedisDataSource("DB-META-BR")
-            self.RA_redis = RedisDataSource("DB-META-RA")
+            self.BR_redis = get_meta_data_source("DB-META-BR")
+            self.RA_redis = get_meta_data_source("DB-META-RA")
 
-        self._redis_values_ra = []
-        self._redis_values_br = []
+        self.prefetch_index = PrefetchIndex()
 
         if not publishers_filepath_dc:
             self.publishers_filepath = None
@@ -197,33 +200,24 @@ class DataciteProcessing(RaProcessor):
                 self.publishers_mapping = pfp
     #added
     def update_redis_values(self, br, ra):
-        self._redis_values_br = br
-        self._redis_values_ra = ra
+        self.prefetch_index.update(br, ra)
 
     #added
     def validated_as(self, id_dict):
         # Check if the validity was already retrieved and thus
-        # a) if it is now saved either in the in-memory database, which only concerns data validated
+        # a) if it is now saved either in the in-memory overlay, which only concerns data validated
         # during the current file processing;
         # b) or if it is now saved in the storage_manager database, which only concerns data validated
         # during the previous files processing.
-        # In memory db is checked first because the dimension is smaller and the check is faster and
-        # Because we assume that it is more likely to find the same ids in close positions, e.g.: same
-        # citing id in several citations with different cited ids.
+        # The overlay looks in the storage_manager database only for the ids it does not contain.
 
         schema = id_dict["schema"].strip().lower()
         id = id_dict["identifier"]
 
         if schema != "orcid":
-            validity_value = self.tmp_doi_m.validated_as_id(id)
-            if validity_value is None:
-                validity_value = self.doi_m.validated_as_id(id)
-            return validity_value
+            return self.tmp_doi_m.validated_as_id(id)
         else:
-            validity_value = self.tmp_orcid_m.validated_as_id(id)
-            if validity_value is None:
-                validity_value = self.orcid_m.validated_as_id(id)
-            return validity_value
+            return self.tmp_orcid_m.validated_as_id(id)
 
     #added(probably unuseful)
 
@@ -440,7 +434,7 @@ class DataciteProcessing(RaProcessor):
         norm_id = norm_id_dict.get("id")
         schema = norm_id_dict.get("schema")
         if schema == "doi":
-            if norm_id in self._redis_values_br:
+            if self.prefetch_index.has_br(norm_id):
                 self.tmp_doi_m.storage_manager.set_value(norm_id, True) #In questo modo l'id presente in redis viene inserito anche nello storage e risulta già
                 # preso in considerazione negli step successivi
                 valid_id_list.append(norm_id)
@@ -449,7 +443,7 @@ class DataciteProcessing(RaProcessor):
                 # preso in considerazione negli step successivi
                 valid_id_list.append(norm_id)
         elif schema == "orcid":
-            if norm_id in self._redis_values_ra:
+            if self.prefetch_index.has_ra(norm_id):
                 self.tmp_orcid_m.storage_manager.set_value(norm_id, True) #In questo modo l'id presente in redis viene inserito anche nello storage e risulta già
                 # preso in considerazione negli step successivi
                 valid_id_list.append(norm_id)
@@ -736,10 +730,7 @@ class DataciteProcessing(RaProcessor):
 
     # added
     def memory_to_storage(self):
-        kv_in_memory = self.temporary_manager.get_validity_list_of_tuples()
-        if kv_in_memory:
-            self.storage_manager.set_multi_value(kv_in_memory)
-        self.temporary_manager.delete_storage()
+        self.temporary_manager.commit()
 
     # added (division in first and second iteration)
     def extract_all_ids(self, citation, is_first_iteration: bool):
@@ -17,46 +17,69 @@ import configparser
 import json
 import os
 from os.path import join
+from typing import Dict, Iterator, List, Tuple
 
 import redis
+from redis.connection import HIREDIS_AVAILABLE, HiredisParser, PythonParser
 
 from oc_ds_converter.datasource.datasource import DataSource
 
+DEFAULT_BATCH_SIZE = 10000
+
+# the database section of the configuration file of each service
+service_sections = {
+    "DB-META-RA": "database 0",
+    "DB-META-BR": "database 1",
+    "PROCESS-DB": "database 2"
+}
+
+# the connection pools, shared by all the data sources of a process connecting to the same database
+_connection_pools: Dict[Tuple, redis.ConnectionPool] = dict()
+
+
+def get_connection_pool(host: str = '127.0.0.1', port: int = 6379, db: int = 0, unix_socket_path: str = None,
+                        use_hiredis: bool = True) -> redis.ConnectionPool:
+    """
+    This function returns the connection pool of a redis database, creating it the first time it is
+    requested, so that all the data sources of a process connecting to the same database share their
+    connections. If unix_socket_path is provided, the connections use the Unix socket instead of host and
+    port. Replies are parsed by hiredis if it is installed, unless use_hiredis is False.
+    """
+    use_hiredis = use_hiredis and HIREDIS_AVAILABLE
+    key = (host, port, int(db), unix_socket_path, use_hiredis)
+    pool = _connection_pools.get(key)
+    if pool is None:
+        parser_class = HiredisParser if use_hiredis else PythonParser
+        if unix_socket_path:
+            pool = redis.ConnectionPool(connection_class=redis.UnixDomainSocketConnection, path=unix_socket_path,
+                                        db=int(db), decode_responses=True, parser_class=parser_class)
+        else:
+            pool = redis.ConnectionPool(host=host, port=port, db=int(db), decode_responses=True,
+                                        parser_class=parser_class)
+        _connection_pools[key] = pool
+    return pool
+
+def chunks(items: list, size: int) -> Iterator[list]:
+    for i in range(0, len(items), size):
+        yield items[i:i + size]
+
 
 class RedisDataSource(DataSource):
     def __init__(self, service, config_filepath: str = 'config.ini'):
         super().__init__(service)
+        if service not in service_sections:
+            raise ValueError
         config = configparser.ConfigParser(allow_no_value=True)
         cur_path = os.path.dirname(os.path.abspath(__file__))
         conf_file = config_filepath if config_filepath != 'config.ini' else join(cur_path, config_filepath)
         config.read(conf_file)
-        if service == "DB-META-RA":
-            self._r =  redis.Redis(
-                            host='127.0.0.1',
-                            port=int(config.get('redis', 'port')),
-                            db=(config.get('database 0', 'db')),
-                            password=None,
-                            decode_responses=True
-                        )
-        elif service == "DB-META-BR":
-            self._r = redis.Redis(
-                    host='127.0.0.1',
-                    port=int(config.get('redis', 'port')),
-                    db=(config.get('database 1', 'db')),
-                    password=None,
-                    decode_responses=True
-                )
-        elif service == "PROCESS-DB":
-            self._r =  redis.Redis(
-                            host='127.0.0.1',
-                            port=int(config.get('redis', 'port')),
-                            db=(config.get('database 2', 'db')),
-                            password=None,
-                            decode_responses=True
-                        )
-
-        else:
-            raise ValueError
+        self.batch_size = config.getint('redis', 'batch_size', fallback=DEFAULT_BATCH_SIZE)
+        self._r = redis.Redis(connection_pool=get_connection_pool(
+            host=config.get('redis', 'host', fallback='127.0.0.1'),
+            port=config.getint('redis', 'port', fallback=6379),
+            db=config.get(service_sections[service], 'db'),
+            unix_socket_path=config.get('redis', 'unix_socket_path', fallback=None) or None,
+            use_hiredis=config.getboolean('redis', 'hiredis', fallback=True)))
 
     def get(self, resource_id):
         redis_data = self._r.get(resource_id)
@@ -70,7 +93,7 @@ class RedisDataSource(DataSource):
 
     def mget(self, resources_id):
         if resources_id:
-            return [x if x and isinstance(x, (int,str,bool)) else json.loads(x) if x and isinstance(x, bytes) else None for x in self._r.mget(resources_id)]
+            return [x if x and isinstance(x, (int,str,bool)) else json.loads(x) if x and isinstance(x, bytes) else None for x in self._mget(resources_id)]
         else:
             return[]
         # return {
@@ -78,6 +101,17 @@ class RedisDataSource(DataSource):
         #     for i, v in enumerate(self._r.mget(resources_id))
         # }
 
+    def _mget(self, resources_id) -> List:
+        # a request with hundreds of thousands of keys would block redis: the keys are split
+        # into batches, sent together through a pipeline
+        resources_id = list(resources_id)
+        if len(resources_id) <= self.batch_size:
+            return self._r.mget(resources_id)
+        pipe = self._r.pipeline(transaction=False)
+        for batch in chunks(resources_id, self.batch_size):
+            pipe.mget(batch)
+        return [value for values in pipe.execute() for value in values]
+
     def flushall(self):
         self._r.flushall()
 
@@ -92,4 +126,10 @@ class RedisDataSource(DataSource):
 
     def mset(self, resources):
         if resources:
-            return self._r.mset({k: v for k, v in resources.items()})
\ No newline at end of file
+            items = list(resources.items())
+            if len(items) <= self.batch_size:
+                return self._r.mset(dict(items))
+            pipe = self._r.pipeline(transaction=False)
+            for batch in chunks(items, self.batch_size):
+                pipe.mset(dict(batch))
+            return all(pipe.execute())
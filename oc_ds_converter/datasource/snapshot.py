@@ -0,0 +1,281 @@
+#!python
+# Copyright (c) 2026 The OpenCitations Index Authors.
+#
+# Permission to use, copy, modify, and/or distribute this software for any purpose
+# with or without fee is hereby granted, provided that the above copyright notice
+# and this permission notice appear in all copies.
+#
+# THE SOFTWARE IS PROVIDED "AS IS" AND THE AUTHOR DISCLAIMS ALL WARRANTIES WITH
+# REGARD TO THIS SOFTWARE INCLUDING ALL IMPLIED WARRANTIES OF MERCHANTABILITY AND
+# FITNESS. IN NO EVENT SHALL THE AUTHOR BE LIABLE FOR ANY SPECIAL, DIRECT, INDIRECT,
+# OR CONSEQUENTIAL DAMAGES OR ANY DAMAGES WHATSOEVER RESULTING FROM LOSS OF USE,
+# DATA OR PROFITS, WHETHER IN AN ACTION OF CONTRACT, NEGLIGENCE OR OTHER TORTIOUS
+# ACTION, ARISING OUT OF OR IN CONNECTION WITH THE USE OR PERFORMANCE OF THIS
+# SOFTWARE.
+
+import configparser
+import heapq
+import mmap
+import os
+import shutil
+import struct
+import sys
+import tempfile
+from array import array
+from hashlib import blake2b
+from os.path import join
+from typing import Iterable, Iterator
+
+from oc_ds_converter.datasource.datasource import DataSource
+
+SNAPSHOT_MAGIC = b'OCSNAP01'
+HEADER = struct.Struct('>8sQ')
+DIGEST = struct.Struct('>Q')
+DIGEST_SIZE = DIGEST.size
+
+
+def id_digest(resource_id: str) -> int:
+    """
+    It returns the 8-byte blake2b digest of an ID as an unsigned integer. With 64-bit digests, the
+    probability that an ID absent from the snapshot collides with one of the n IDs it contains is about n/2^64.
+    """
+    return int.from_bytes(blake2b(str(resource_id).encode('utf-8'), digest_size=DIGEST_SIZE).digest(), 'big')
+
+
+def write_snapshot(ids: Iterable[str], filepath: str) -> int:
+    """
+    This function saves the digests of the IDs in a snapshot file: a header, made of a magic string and the
+    number of digests, followed by the sorted and deduplicated digests, as 8-byte big-endian unsigned integers.
+    The file is replaced atomically.
+
+    :params ids: the IDs to be saved
+    :type ids: Iterable[str]
+    :params filepath: the path of the snapshot file
+    :type filepath: str
+    :returns: int -- the number of distinct digests saved
+    """
+    return write_digests(sorted({id_digest(id) for id in ids}), filepath)
+
+def write_digests(digests: Iterable[int], filepath: str, buffer_size: int = 1 << 16) -> int:
+    """
+    This function saves sorted digests in a snapshot file, skipping the repeated ones, without holding them
+    in memory, e.g. to merge the digests of several snapshots. The file is replaced atomically.
+
+    :params digests: the digests to be saved, sorted
+    :type digests: Iterable[int]
+    :params filepath: the path of the snapshot file
+    :type filepath: str
+    :returns: int -- the number of distinct digests saved
+    """
+    os.makedirs(os.path.dirname(os.path.abspath(filepath)), exist_ok=True)
+    tmp_filepath = filepath + '.tmp'
+    saved = 0
+    previous = None
+    with open(tmp_filepath, 'wb') as f:
+        # the number of digests is written once they are all saved
+        f.write(HEADER.pack(SNAPSHOT_MAGIC, 0))
+        buffer = array('Q')
+        if buffer.itemsize != DIGEST_SIZE:
+            raise ValueError('unsigned 64-bit integers are not supported on this platform')
+        for digest in digests:
+            if digest == previous:
+                continue
+            if previous is not None and digest < previous:
+                raise ValueError('the digests of a snapshot must be sorted')
+            buffer.append(digest)
+            previous = digest
+            saved += 1
+            if len(buffer) >= buffer_size:
+                _write_buffer(buffer, f)
+                buffer = array('Q')
+        _write_buffer(buffer, f)
+        f.seek(0)
+        f.write(HEADER.pack(SNAPSHOT_MAGIC, saved))
+    os.replace(tmp_filepath, filepath)
+    return saved
+
+def _write_buffer(buffer: array, f) -> None:
+    if sys.byteorder == 'little':
+        buffer.byteswap()
+    buffer.tofile(f)
+
+def merge_snapshots(filepaths: Iterable[str], filepath: str) -> int:
+    """
+    This function merges several snapshot files in a new one, without loading their digests in memory.
+
+    :params filepaths: the paths of the snapshot files to be merged
+    :type filepaths: Iterable[str]
+    :params filepath: the path of the new snapshot file
+    :type filepath: str
+    :returns: int -- the number of distinct digests saved
+    """
+    snapshots = [SnapshotDataSource(None, snapshot_filepath) for snapshot_filepath in filepaths]
+    try:
+        return write_digests(heapq.merge(*[snapshot.digests() for snapshot in snapshots]), filepath)
+    finally:
+        for snapshot in snapshots:
+            snapshot.close()
+
+def write_large_snapshot(ids: Iterable[str], filepath: str, chunk_size: int = 5000000) -> int:
+    """
+    This function saves the digests of IDs in a snapshot file like ``write_snapshot``, but the digests are
+    sorted in chunks of chunk_size IDs, saved in temporary snapshots and merged, so that the memory used
+    does not depend on the number of IDs, e.g. the ones of the ORCID public data file or of PubMed.
+
+    :params ids: the IDs to be saved
+    :type ids: Iterable[str]
+    :params filepath: the path of the snapshot file
+    :type filepath: str
+    :params chunk_size: the number of IDs sorted in memory at once
+    :type chunk_size: int
+    :returns: int -- the number of distinct digests saved
+    """
+    os.makedirs(os.path.dirname(os.path.abspath(filepath)), exist_ok=True)
+    tmp_dir = tempfile.mkdtemp(dir=os.path.dirname(os.path.abspath(filepath)))
+    try:
+        chunk_filepaths = list()
+        chunk = list()
+        for id in ids:
+            chunk.append(id)
+            if len(chunk) >= chunk_size:
+                chunk_filepaths.append(join(tmp_dir, f'{len(chunk_filepaths)}.snapshot'))
+                write_snapshot(chunk, chunk_filepaths[-1])
+                chunk = list()
+        if not chunk_filepaths:
+            return write_snapshot(chunk, filepath)
+        if chunk:
+            chunk_filepaths.append(join(tmp_dir, f'{len(chunk_filepaths)}.snapshot'))
+            write_snapshot(chunk, chunk_filepaths[-1])
+        return merge_snapshots(chunk_filepaths, filepath)
+    finally:
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+
+def export_snapshot(data_source, filepath: str, match: str = '*', chunk_size: int = 5000000) -> int:
+    """
+    This function saves in a snapshot file the keys of a redis data source (e.g. a RedisDataSource of
+    DB-META-BR or DB-META-RA) matching a pattern, scanning them without blocking the server. The keys are
+    saved through ``write_large_snapshot``, so that the memory used does not depend on the size of the database.
+
+    :params data_source: a data source providing scan_iter (e.g. RedisDataSource)
+    :params filepath: the path of the snapshot file
+    :type filepath: str
+    :params match: the pattern of the keys to be saved
+    :type match: str
+    :params chunk_size: the number of keys sorted in memory at once
+    :type chunk_size: int
+    :returns: int -- the number of distinct digests saved
+    """
+    return write_large_snapshot((key.decode('utf-8') if isinstance(key, bytes) else key
+                                 for key in data_source.scan_iter(match=match)), filepath, chunk_size)
+
+
+class SnapshotDataSource(DataSource):
+    """
+    A read-only data source answering the membership queries of the META redis databases (DB-META-BR and
+    DB-META-RA) from a local snapshot file created by ``write_snapshot``, so that the processes do not need
+    a redis server. The file is memory-mapped and searched with a binary search, so that it is shared by the
+    processes through the page cache and not loaded in memory. The values returned for the IDs found are 1,
+    as the existence of an ID is the only information used.
+    """
+    def __init__(self, service, snapshot_filepath: str):
+        super().__init__(service)
+        self.snapshot_filepath = snapshot_filepath
+        self._file = open(snapshot_filepath, 'rb')
+        self._mmap = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, self.size = HEADER.unpack_from(self._mmap, 0) if len(self._mmap) >= HEADER.size else (None, 0)
+        if magic != SNAPSHOT_MAGIC or len(self._mmap) != HEADER.size + self.size * DIGEST_SIZE:
+            self.close()
+            raise ValueError(f'{snapshot_filepath} is not a valid snapshot file')
+
+    def _digest_at(self, index: int) -> int:
+        return DIGEST.unpack_from(self._mmap, HEADER.size + index * DIGEST_SIZE)[0]
+
+    def __contains__(self, resource_id) -> bool:
+        digest = id_digest(resource_id)
+        low, high = 0, self.size
+        while low < high:
+            middle = (low + high) // 2
+            if self._digest_at(middle) < digest:
+                low = middle + 1
+            else:
+                high = middle
+        return low < self.size and self._digest_at(low) == digest
+
+    def __len__(self) -> int:
+        return self.size
+
+    def digests(self) -> Iterator[int]:
+        for index in range(self.size):
+            yield self._digest_at(index)
+
+    def get(self, resource_id):
+        return 1 if resource_id in self else None
+
+    def mget(self, resources_id):
+        return [1 if resource_id in self else None for resource_id in resources_id]
+
+    def set(self, resource_id, value):
+        raise NotImplementedError('a snapshot is read-only')
+
+    def mset(self, resources):
+        raise NotImplementedError('a snapshot is read-only')
+
+    def close(self) -> None:
+        self._mmap.close()
+        self._file.close()
+
+
+class FilteredDataSource(DataSource):
+    """
+    A data source querying another one (e.g. a RedisDataSource of DB-META-BR) only for the IDs which a Bloom
+    filter, built from a snapshot of the same database, reports as possibly present: the other IDs are not
+    found without a round trip to the server. The IDs set are added to the filter.
+    """
+    def __init__(self, data_source: DataSource, bloom_filter):
+        super().__init__(data_source._service)
+        self.data_source = data_source
+        self.bloom_filter = bloom_filter
+
+    def get(self, resource_id):
+        return self.data_source.get(resource_id) if resource_id in self.bloom_filter else None
+
+    def mget(self, resources_id):
+        resources_id = list(resources_id)
+        candidates = [i for i, resource_id in enumerate(resources_id) if resource_id in self.bloom_filter]
+        values = [None] * len(resources_id)
+        if candidates:
+            for i, value in zip(candidates, self.data_source.mget([resources_id[i] for i in candidates])):
+                values[i] = value
+        return values
+
+    def set(self, resource_id, value):
+        self.bloom_filter.add(resource_id)
+        return self.data_source.set(resource_id, value)
+
+    def mset(self, resources):
+        for resource_id in resources:
+            self.bloom_filter.add(resource_id)
+        return self.data_source.mset(resources)
+
+
+def get_meta_data_source(service: str, config_filepath: str = 'config.ini') -> DataSource:
+    """
+    This function returns the data source of a META database ("DB-META-BR" or "DB-META-RA"): the local snapshot
+    set for the service in the [snapshot] section of the configuration file ("br" or "ra"), if any, or the
+    redis database otherwise. If a Bloom filter of the database is set as well ("br_filter" or "ra_filter"),
+    the data source is queried only for the IDs the filter reports as possibly present.
+    """
+    from oc_ds_converter.datasource.redis import RedisDataSource
+    config = configparser.ConfigParser(allow_no_value=True)
+    cur_path = os.path.dirname(os.path.abspath(__file__))
+    conf_file = config_filepath if config_filepath != 'config.ini' else join(cur_path, config_filepath)
+    config.read(conf_file)
+    option = {'DB-META-BR': 'br', 'DB-META-RA': 'ra'}.get(service)
+    snapshot_filepath = config.get('snapshot', option, fallback=None) if option else None
+    data_source = SnapshotDataSource(service, snapshot_filepath) if snapshot_filepath else \
+        RedisDataSource(service, config_filepath)
+    filter_filepath = config.get('snapshot', f'{option}_filter', fallback=None) if option else None
+    if filter_filepath:
+        from oc_ds_converter.lib.bloom_filter import BloomFilter
+        return FilteredDataSource(data_source, BloomFilter.open(filter_filepath))
+    return data_source
@@ -35,10 +35,11 @@ from pathlib import Path
 from typing import Optional
 
 import fakeredis
-from oc_ds_converter.datasource.redis import RedisDataSource
+from oc_ds_converter.datasource.snapshot import get_meta_data_source
 from oc_ds_converter.ra_processor import RaProcessor
+from oc_ds_converter.lib.prefetch_index import PrefetchIndex
 from oc_ds_converter.oc_idmanager.oc_data_storage.storage_manager import StorageManager
-from oc_ds_converter.oc_idmanager.oc_data_storage.in_memory_manager import InMemoryStorageManager
+from oc_ds_converter.oc_idmanager.oc_data_storage.overlay_manager import OverlayStorageManager
 from oc_ds_converter.oc_idmanager.oc_data_storage.sqlite_manager import SqliteStorageManager
 
 warnings.filterwarnings("ignore", category=UserWarning, module='bs4')
@@ -56,7 +57,7 @@ class JalcProcessing(RaProcessor):
         else:
             self.storage_manager = storage_manager
 
-        self.temporary_manager = InMemoryStorageManager('../memory.json')
+        self.temporary_manager = OverlayStorageManager(self.storage_manager)
 
         self.doi_m = DOIManager(storage_manager=self.storage_manager)
         self.issn_m = ISSNManager()
@@ -65,11 +66,11 @@ class JalcProcessing(RaProcessor):
         self.venue_id_man_dict = {"issn":self.issn_m, "jid":self.jid_m}
 
         '''Temporary storage managers : all data must be stored in tmp storage manager and passed all together to the
-        main storage_manager only once a full file is processed. Checks must be done both on tmp and in
-        storage_manager, so that in case the process breaks while processing a file which does not complete (so
-        without writing the final file) all the data concerning the ids are not stored. Otherwise, the ids saved in
-        a storage_manager db would be considered to have been processed and thus would be ignored by the process
-        and lost.'''
+        main storage_manager only once a full file is processed. The tmp storage manager is an in-RAM overlay of
+        storage_manager, so checks done on tmp also look in storage_manager. In case the process breaks while
+        processing a file which does not complete (so without writing the final file) all the data concerning the
+        ids are not stored. Otherwise, the ids saved in a storage_manager db would be considered to have been
+        processed and thus would be ignored by the process and lost.'''
 
         self.tmp_doi_m = DOIManager(storage_manager=self.temporary_manager)
         self.tmp_jid_m = JIDManager(storage_manager=self.temporary_manager)
@@ -81,9 +82,9 @@ class JalcProcessing(RaProcessor):
             self.BR_redis = fakeredis.FakeStrictRedis()
 
         else:
-            self.BR_redis = RedisDataSource("DB-META-BR")
+            self.BR_redis = get_meta_data_source("DB-META-BR")
 
-        self._redis_values_br = []
+        self.prefetch_index = PrefetchIndex()
 
         if not publishers_filepath_jalc:
             self.publishers_filepath = None
@@ -105,22 +106,17 @@ class JalcProcessing(RaProcessor):
                 self.publishers_mapping = pfp
 
     def update_redis_values(self, br):
-        self._redis_values_br = br
+        self.prefetch_index.update(br)
 
     def validated_as(self, id):
         """Check if the validity was already retrieved and thus
-        a) if it is now saved either in the in-memory database, which only concerns data validated
+        a) if it is now saved either in the in-memory overlay, which only concerns data validated
          during the current file processing;
         b) or if it is now saved in the storage_manager database, which only concerns data validated
         during the previous files processing.
-        In memory db is checked first because the dimension is smaller and the check is faster and
-        because we assume that it is more likely to find the same ids in close positions, e.g.: same
-        citing id in several citations with different cited ids.
+        The overlay looks in the storage_manager database only for the ids it does not contain.
         In conclusion, if the id is found with this method, it means that this has been found in the dump we are processing"""
-        validity_value = self.tmp_doi_m.validated_as_id(id)
-        if validity_value is None:
-            validity_value = self.doi_m.validated_as_id(id)
-        return validity_value
+        return self.tmp_doi_m.validated_as_id(id)
 
 
     def get_id_manager(self, schema_or_id, id_man_dict):
@@ -307,7 +303,7 @@ class JalcProcessing(RaProcessor):
         a second attempt is made by using the specific id-schema API"""
 
         valid_id_list = []
-        if norm_id in self._redis_values_br:
+        if self.prefetch_index.has_br(norm_id):
             self.tmp_doi_m.storage_manager.set_value(norm_id, True)
             valid_id_list.append(norm_id)
         # if the id is not in redis db, validate it before appending
@@ -316,9 +312,7 @@ class JalcProcessing(RaProcessor):
         return valid_id_list
 
     def memory_to_storage(self):
-        kv_in_memory = self.temporary_manager.get_validity_list_of_tuples()
-        self.storage_manager.set_multi_value(kv_in_memory)
-        self.temporary_manager.delete_storage()
+        self.temporary_manager.commit()
 
     def extract_all_ids(self, citation, is_first_iteration: bool):
         """Given an entity dictionary, this method extracts all the DOIs.
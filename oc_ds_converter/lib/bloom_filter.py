@@ -0,0 +1,179 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+# Copyright (c) 2026 The OpenCitations Index Authors.
+#
+# Permission to use, copy, modify, and/or distribute this software for any purpose
+# with or without fee is hereby granted, provided that the above copyright notice
+# and this permission notice appear in all copies.
+#
+# THE SOFTWARE IS PROVIDED "AS IS" AND THE AUTHOR DISCLAIMS ALL WARRANTIES WITH
+# REGARD TO THIS SOFTWARE INCLUDING ALL IMPLIED WARRANTIES OF MERCHANTABILITY AND
+# FITNESS. IN NO EVENT SHALL THE AUTHOR BE LIABLE FOR ANY SPECIAL, DIRECT, INDIRECT,
+# OR CONSEQUENTIAL DAMAGES OR ANY DAMAGES WHATSOEVER RESULTING FROM LOSS OF USE,
+# DATA OR PROFITS, WHETHER IN AN ACTION OF CONTRACT, NEGLIGENCE OR OTHER TORTIOUS
+# ACTION, ARISING OUT OF OR IN CONNECTION WITH THE USE OR PERFORMANCE OF THIS
+# SOFTWARE.
+
+
+from __future__ import annotations
+
+import math
+import mmap
+import os
+import struct
+import threading
+from pathlib import Path
+from typing import Iterable
+
+from filelock import FileLock
+
+from oc_ds_converter.datasource.snapshot import id_digest
+
+BLOOM_MAGIC = b'OCBLOOM1'
+# magic, number of bits, number of hash functions, capacity
+BLOOM_HEADER = struct.Struct('>8sQQQ')
+MASK_64 = (1 << 64) - 1
+
+
+class BloomFilter(object):
+    '''
+    This class answers whether an ID is "definitely not present" in a set of IDs, or "possibly present"
+    with a false positive probability set at creation, using a few bits per ID. The bit positions of an ID
+    are derived from its 8-byte digest, the same used by the snapshots of META, so that a filter can be
+    built either from the IDs or from the digests of a snapshot. A filter saved in a file is memory-mapped
+    in shared mode: the IDs added by a process are seen by all the processes using the same file, and they
+    are saved by the operating system. Since the bits are set byte by byte, the writes are serialised by
+    a lock file saved beside the filter (a thread lock for a filter in memory): a bit lost by two concurrent
+    writes of the same byte would make the filter report a stored ID as not stored.
+
+    :params bits: the number of bits
+    :type bits: int
+    :params hashes: the number of bit positions of each ID
+    :type hashes: int
+    :params capacity: the number of IDs the filter was sized for
+    :type capacity: int
+    :params filepath: the file where the filter is saved, if any
+    :type filepath: str|None
+    '''
+    def __init__(self, bits:int, hashes:int, capacity:int, filepath:str|None=None):
+        self.bits = bits
+        self.hashes = hashes
+        self.capacity = capacity
+        self.filepath = filepath
+        self.count = 0
+        if filepath:
+            with open(filepath, 'r+b') as f:
+                self._mmap = mmap.mmap(f.fileno(), 0)
+            self._array = memoryview(self._mmap)[BLOOM_HEADER.size:]
+            self._lock = FileLock(filepath + '.lock')
+        else:
+            self._mmap = None
+            self._array = bytearray((bits + 7) // 8)
+            self._lock = threading.Lock()
+
+    @staticmethod
+    def parameters(capacity:int, error_rate:float) -> tuple:
+        '''
+        It returns the number of bits and of hash functions of a filter for the given capacity and false
+        positive probability.
+        '''
+        capacity = max(int(capacity), 1)
+        bits = max(int(math.ceil(-capacity * math.log(error_rate) / (math.log(2) ** 2))), 8)
+        hashes = max(int(round(bits / capacity * math.log(2))), 1)
+        return bits, hashes
+
+    @classmethod
+    def create(cls, capacity:int, error_rate:float=0.01, filepath:str|None=None, ids:Iterable[str]=(),
+               digests:Iterable[int]=()) -> BloomFilter:
+        '''
+        It creates a filter, either in memory or saved in a file (replaced atomically), and adds to it
+        the IDs and the digests provided.
+
+        :params capacity: the number of IDs expected
+        :type capacity: int
+        :params error_rate: the false positive probability with capacity IDs
+        :type error_rate: float
+        :params filepath: the file where the filter is saved, if any
+        :type filepath: str|None
+        :params ids: the IDs to be added
+        :type ids: Iterable[str]
+        :params digests: the digests of the IDs to be added, e.g. from a snapshot of META
+        :type digests: Iterable[int]
+        :returns: BloomFilter -- the filter
+        '''
+        bits, hashes = cls.parameters(capacity, error_rate)
+        bloom_filter = cls(bits, hashes, capacity)
+        bloom_filter.update(ids)
+        bloom_filter.update_digests(digests)
+        if not filepath:
+            return bloom_filter
+        Path(os.path.abspath(os.path.join(filepath, os.pardir))).mkdir(parents=True, exist_ok=True)
+        tmp_filepath = f'{filepath}.{os.getpid()}.tmp'
+        with open(tmp_filepath, 'wb') as f:
+            f.write(BLOOM_HEADER.pack(BLOOM_MAGIC, bits, hashes, capacity))
+            f.write(bloom_filter._array)
+        os.replace(tmp_filepath, filepath)
+        return cls.open(filepath)
+
+    @classmethod
+    def open(cls, filepath:str) -> BloomFilter:
+        '''
+        It opens a filter saved in a file by ``create``.
+        '''
+        with open(filepath, 'rb') as f:
+            magic, bits, hashes, capacity = BLOOM_HEADER.unpack(f.read(BLOOM_HEADER.size))
+        if magic != BLOOM_MAGIC or os.path.getsize(filepath) != BLOOM_HEADER.size + (bits + 7) // 8:
+            raise ValueError(f'{filepath} is not a valid bloom filter')
+        return cls(bits, hashes, capacity, filepath)
+
+    def _positions(self, digest:int) -> Iterable[int]:
+        # double hashing: the second hash is a mix of the digest, odd so that it is never 0
+        step = (((digest ^ (digest >> 31)) * 0xBF58476D1CE4E5B9) & MASK_64) | 1
+        for i in range(self.hashes):
+            yield (digest + i * step) % self.bits
+
+    def _set_bits(self, digest:int) -> None:
+        array = self._array
+        new = False
+        for position in self._positions(digest):
+            byte, bit = position >> 3, 1 << (position & 7)
+            if not array[byte] & bit:
+                array[byte] |= bit
+                new = True
+        if new:
+            self.count += 1
+
+    def add_digest(self, digest:int) -> None:
+        with self._lock:
+            self._set_bits(digest)
+
+    def update_digests(self, digests:Iterable[int]) -> None:
+        '''
+        It adds several digests, taking the lock once.
+        '''
+        with self._lock:
+            for digest in digests:
+                self._set_bits(digest)
+
+    def add(self, id:str) -> None:
+        self.add_digest(id_digest(id))
+
+    def update(self, ids:Iterable[str]) -> None:
+        self.update_digests(id_digest(id) for id in ids)
+
+    def __contains__(self, id:str) -> bool:
+        array = self._array
+        for position in self._positions(id_digest(id)):
+            if not array[position >> 3] & (1 << (position & 7)):
+                return False
+        return True
+
+    def flush(self) -> None:
+        if self._mmap is not None:
+            self._mmap.flush()
+
+    def close(self) -> None:
+        if self._mmap is not None:
+            self._array.release()
+            self._mmap.close()
+            self._mmap = None
@@ -0,0 +1,136 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+# Copyright (c) 2026 The OpenCitations Index Authors.
+#
+# Permission to use, copy, modify, and/or distribute this software for any purpose
+# with or without fee is hereby granted, provided that the above copyright notice
+# and this permission notice appear in all copies.
+#
+# THE SOFTWARE IS PROVIDED "AS IS" AND THE AUTHOR DISCLAIMS ALL WARRANTIES WITH
+# REGARD TO THIS SOFTWARE INCLUDING ALL IMPLIED WARRANTIES OF MERCHANTABILITY AND
+# FITNESS. IN NO EVENT SHALL THE AUTHOR BE LIABLE FOR ANY SPECIAL, DIRECT, INDIRECT,
+# OR CONSEQUENTIAL DAMAGES OR ANY DAMAGES WHATSOEVER RESULTING FROM LOSS OF USE,
+# DATA OR PROFITS, WHETHER IN AN ACTION OF CONTRACT, NEGLIGENCE OR OTHER TORTIOUS
+# ACTION, ARISING OUT OF OR IN CONNECTION WITH THE USE OR PERFORMANCE OF THIS
+# SOFTWARE.
+
+
+from __future__ import annotations
+
+import configparser
+import os
+from typing import Dict, Iterable, List
+
+from oc_ds_converter import datasource
+from oc_ds_converter.datasource.snapshot import SnapshotDataSource, merge_snapshots, write_snapshot
+
+# the extension of the files with the DOIs of the records of an input, saved in the first iteration
+DOIS_EXTENSION = '.dois'
+
+
+class IDOracle(object):
+    '''
+    This class answers whether an ID is known to exist because it is in a local copy of the data of its
+    registration agency, so that it does not need to be checked through the API. The IDs are kept as digests
+    in one or more snapshot files (the format of the snapshots of META), which are memory-mapped and shared
+    by the processes. The IDs found and not found are counted.
+
+    :params filepaths: the snapshot files with the digests of the IDs
+    :type filepaths: Iterable[str]
+    '''
+    def __init__(self, filepaths:Iterable[str]):
+        self.snapshots = [SnapshotDataSource('ID-ORACLE', filepath) for filepath in filepaths]
+        self.hits = 0
+        self.misses = 0
+
+    def __contains__(self, id:str) -> bool:
+        '''
+        It returns True if the ID, normalised with the prefix of its schema (e.g. "doi:10.1007/abc"), is known.
+        '''
+        for snapshot in self.snapshots:
+            if id in snapshot:
+                self.hits += 1
+                return True
+        self.misses += 1
+        return False
+
+    def __len__(self) -> int:
+        return sum(len(snapshot) for snapshot in self.snapshots)
+
+    def stats(self) -> Dict[str, int]:
+        return {'hits': self.hits, 'misses': self.misses}
+
+    def close(self) -> None:
+        for snapshot in self.snapshots:
+            snapshot.close()
+        self.snapshots = list()
+
+
+class DOIOracle(IDOracle):
+    '''
+    This class answers whether a DOI has a record in the dumps of Crossref, DataCite, JaLC, etc. available
+    locally: such a DOI exists by definition, so that it does not need to be checked through the API.
+    '''
+
+
+def get_doi_oracle_config(config_filepath:str|None=None) -> dict:
+    '''
+    This function reads the [doi_oracle] section of the configuration file of the data sources: the snapshot
+    files of the DOI oracle ("filepaths", comma-separated) and the directory where the first iteration saves
+    the DOIs of the records of each input ("dois_dir"), to be merged in an oracle by ``build_doi_oracle``.
+    '''
+    config = configparser.ConfigParser(allow_no_value=True)
+    config.read(config_filepath if config_filepath else os.path.join(os.path.dirname(datasource.__file__), 'config.ini'))
+    filepaths = config.get('doi_oracle', 'filepaths', fallback='') or ''
+    return {
+        'filepaths': [filepath.strip() for filepath in filepaths.split(',') if filepath.strip()],
+        'dois_dir': config.get('doi_oracle', 'dois_dir', fallback='') or None
+    }
+
+def get_doi_oracle(config_filepath:str|None=None) -> DOIOracle|None:
+    '''
+    This function returns the DOI oracle set in the configuration file of the data sources, if any.
+    '''
+    filepaths = get_doi_oracle_config(config_filepath)['filepaths']
+    return DOIOracle(filepaths) if filepaths else None
+
+def save_dois(dois:Iterable[str], filepath:str) -> int:
+    '''
+    This function saves the digests of DOIs, normalised with their prefix, in a snapshot file.
+
+    :params dois: the DOIs
+    :type dois: Iterable[str]
+    :params filepath: the path of the file
+    :type filepath: str
+    :returns: int -- the number of distinct DOIs saved
+    '''
+    return write_snapshot((doi for doi in dois if doi), filepath)
+
+def get_dois_filepaths(paths:Iterable[str]) -> List[str]:
+    '''
+    This function returns the snapshot files in paths, either files or directories with files
+    of the DOIs of the inputs (".dois") saved by the first iteration.
+    '''
+    filepaths = list()
+    for path in paths:
+        if os.path.isdir(path):
+            for dirpath, _, filenames in os.walk(path):
+                filepaths.extend(os.path.join(dirpath, filename) for filename in sorted(filenames)
+                                 if filename.endswith(DOIS_EXTENSION))
+        else:
+            filepaths.append(path)
+    return filepaths
+
+def build_doi_oracle(paths:Iterable[str], filepath:str) -> int:
+    '''
+    This function merges the DOIs saved by the first iterations of one or more runs, e.g. on the Crossref,
+    DataCite and JaLC dumps, and possibly other oracles, in a single oracle, to be set in the [doi_oracle]
+    section of the configuration file. The digests are merged without being loaded in memory.
+
+    :params paths: the snapshot files, or the directories with the ".dois" files, to be merged
+    :type paths: Iterable[str]
+    :params filepath: the path of the oracle
+    :type filepath: str
+    :returns: int -- the number of distinct DOIs in the oracle
+    '''
+    return merge_snapshots(get_dois_filepaths(paths), filepath)
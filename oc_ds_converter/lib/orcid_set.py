@@ -0,0 +1,88 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+# Copyright (c) 2026 The OpenCitations Index Authors.
+#
+# Permission to use, copy, modify, and/or distribute this software for any purpose
+# with or without fee is hereby granted, provided that the above copyright notice
+# and this permission notice appear in all copies.
+#
+# THE SOFTWARE IS PROVIDED "AS IS" AND THE AUTHOR DISCLAIMS ALL WARRANTIES WITH
+# REGARD TO THIS SOFTWARE INCLUDING ALL IMPLIED WARRANTIES OF MERCHANTABILITY AND
+# FITNESS. IN NO EVENT SHALL THE AUTHOR BE LIABLE FOR ANY SPECIAL, DIRECT, INDIRECT,
+# OR CONSEQUENTIAL DAMAGES OR ANY DAMAGES WHATSOEVER RESULTING FROM LOSS OF USE,
+# DATA OR PROFITS, WHETHER IN AN ACTION OF CONTRACT, NEGLIGENCE OR OTHER TORTIOUS
+# ACTION, ARISING OUT OF OR IN CONNECTION WITH THE USE OR PERFORMANCE OF THIS
+# SOFTWARE.
+
+
+from __future__ import annotations
+
+import configparser
+import os
+import re
+import tarfile
+from typing import Iterable, Iterator
+
+from oc_ds_converter import datasource
+from oc_ds_converter.datasource.snapshot import write_large_snapshot
+from oc_ds_converter.lib.doi_oracle import IDOracle
+
+# the summary of an ORCID record is saved in a file named after the ORCID, e.g. "0000-0003-0530-4305.xml"
+orcid_filename_regex = re.compile(r"(\d{4}-\d{4}-\d{4}-\d{3}[\dX])\.(?:xml|json)$")
+
+
+def read_orcids(paths:Iterable[str]) -> Iterator[str]:
+    '''
+    This function streams the ORCIDs, normalised with their prefix, of the records of the ORCID public data
+    file: either its summaries archives (e.g. "ORCID_2023_10_summaries.tar.gz"), read sequentially without
+    being extracted, or the directories where they were extracted. The ORCIDs are taken from the names of
+    the files of the records, which are not parsed.
+
+    :params paths: the archives and directories of the summaries
+    :type paths: Iterable[str]
+    :returns: Iterator[str] -- the ORCIDs, e.g. "orcid:0000-0003-0530-4305"
+    '''
+    for path in paths:
+        for name in _read_filenames(path):
+            found = orcid_filename_regex.search(name)
+            if found:
+                yield 'orcid:' + found.group(1)
+
+def _read_filenames(path:str) -> Iterator[str]:
+    if os.path.isdir(path):
+        for _, _, filenames in os.walk(path):
+            yield from filenames
+        return
+    # the archive is read as a stream, since its members are not accessed by name
+    with tarfile.open(path, 'r|*') as archive:
+        for member in archive:
+            if member.isfile():
+                yield member.name
+
+def create_orcid_set(paths:Iterable[str], filepath:str, chunk_size:int=5000000) -> int:
+    '''
+    This function saves the ORCIDs of the ORCID public data file in a compact ORCID set, i.e. a snapshot file
+    of their digests, to be set in the [orcid_set] section of the configuration file of the data sources. The
+    digests are sorted in chunks of chunk_size ORCIDs, so that the memory used does not depend on the number
+    of ORCIDs.
+
+    :params paths: the archives and directories of the summaries of the ORCID public data file
+    :type paths: Iterable[str]
+    :params filepath: the path of the ORCID set
+    :type filepath: str
+    :params chunk_size: the number of ORCIDs sorted in memory at once
+    :type chunk_size: int
+    :returns: int -- the number of ORCIDs saved
+    '''
+    return write_large_snapshot(read_orcids(paths), filepath, chunk_size)
+
+def get_orcid_set(config_filepath:str|None=None) -> IDOracle|None:
+    '''
+    This function returns the ORCID set ("filepath" in the [orcid_set] section of the configuration file of
+    the data sources) created by ``create_orcid_set``, if any, so that the ORCIDs it contains are not checked
+    through the API.
+    '''
+    config = configparser.ConfigParser(allow_no_value=True)
+    config.read(config_filepath if config_filepath else os.path.join(os.path.dirname(datasource.__file__), 'config.ini'))
+    filepath = config.get('orcid_set', 'filepath', fallback='') or None
+    return IDOracle([filepath]) if filepath else None
@@ -0,0 +1,618 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+# Copyright (c) 2026 The OpenCitations Index Authors.
+#
+# Permission to use, copy, modify, and/or distribute this software for any purpose
+# with or without fee is hereby granted, provided that the above copyright notice
+# and this permission notice appear in all copies.
+#
+# THE SOFTWARE IS PROVIDED "AS IS" AND THE AUTHOR DISCLAIMS ALL WARRANTIES WITH
+# REGARD TO THIS SOFTWARE INCLUDING ALL IMPLIED WARRANTIES OF MERCHANTABILITY AND
+# FITNESS. IN NO EVENT SHALL THE AUTHOR BE LIABLE FOR ANY SPECIAL, DIRECT, INDIRECT,
+# OR CONSEQUENTIAL DAMAGES OR ANY DAMAGES WHATSOEVER RESULTING FROM LOSS OF USE,
+# DATA OR PROFITS, WHETHER IN AN ACTION OF CONTRACT, NEGLIGENCE OR OTHER TORTIOUS
+# ACTION, ARISING OUT OF OR IN CONNECTION WITH THE USE OR PERFORMANCE OF THIS
+# SOFTWARE.
+
+
+from __future__ import annotations
+
+import configparser
+import csv
+import gzip
+import json
+import os
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from queue import Queue
+from threading import Thread
+from typing import Callable, Dict, Iterable, Iterator, List, Tuple
+
+from filelock import FileLock
+from tqdm import tqdm
+
+from oc_ds_converter import datasource
+from oc_ds_converter.lib.doi_oracle import (DOIS_EXTENSION, DOIOracle, get_doi_oracle,
+                                            get_doi_oracle_config, save_dois)
+from oc_ds_converter.lib.file_manager import pathoo
+from oc_ds_converter.lib.threaded_validator import get_shared_threaded_validator, validate_ids
+from oc_ds_converter.lib.validation_broker import get_validation_broker
+from oc_ds_converter.lib.validation_queue import ValidationQueue, get_validation_queue
+from oc_ds_converter.oc_idmanager.oc_data_storage.bloom_manager import \
+    BloomStorageManager
+from oc_ds_converter.oc_idmanager.oc_data_storage.cached_manager import \
+    CachedStorageManager
+from oc_ds_converter.oc_idmanager.oc_data_storage.compact_manager import \
+    CompactStorageManager
+from oc_ds_converter.oc_idmanager.oc_data_storage.in_memory_manager import \
+    InMemoryStorageManager
+from oc_ds_converter.oc_idmanager.oc_data_storage.mmap_manager import \
+    MmapStorageManager
+from oc_ds_converter.oc_idmanager.oc_data_storage.redis_manager import \
+    RedisStorageManager
+from oc_ds_converter.oc_idmanager.oc_data_storage.sharded_manager import (
+    is_sharded_storage, open_sharded_storage)
+from oc_ds_converter.oc_idmanager.oc_data_storage.sqlite_manager import \
+    SqliteStorageManager
+from oc_ds_converter.oc_idmanager.oc_data_storage.storage_manager import \
+    StorageManager
+
+
+def get_storage_config(config_filepath:str|None=None) -> dict:
+    '''
+    This function reads the options of the storage manager (the [storage] section) from the configuration
+    file of the data sources: the maximum number of IDs cached in front of it ("cache_size", 0 to disable the
+    cache) and whether a Bloom filter of the stored IDs is checked before reading them ("bloom_filter"), with
+    its capacity and false positive probability.
+    '''
+    config = configparser.ConfigParser(allow_no_value=True)
+    config.read(config_filepath if config_filepath else os.path.join(os.path.dirname(datasource.__file__), 'config.ini'))
+    return {
+        'cache_size': config.getint('storage', 'cache_size', fallback=0) or 0,
+        'bloom_filter': config.getboolean('storage', 'bloom_filter', fallback=False),
+        'bloom_capacity': config.getint('storage', 'bloom_capacity', fallback=10000000),
+        'bloom_error_rate': config.getfloat('storage', 'bloom_error_rate', fallback=0.01)
+    }
+
+def get_storage_cache_size(config_filepath:str|None=None) -> int:
+    '''
+    This function reads the maximum number of IDs cached in front of the storage manager ("cache_size" in
+    the [storage] section) from the configuration file of the data sources. 0, the default, disables the cache.
+    '''
+    return get_storage_config(config_filepath)['cache_size']
+
+def get_filter_filepath(storage_path:str|None, redis_storage_manager:bool, testing:bool) -> str|None:
+    '''
+    This function returns the path of the Bloom filter of a storage, saved beside it. The redis storage
+    has no filter, since it may be shared by other hosts.
+    '''
+    if redis_storage_manager:
+        return None
+    if is_sharded_storage(storage_path):
+        return os.path.join(storage_path, "ids.bloom")
+    if storage_path:
+        return storage_path + ".bloom"
+    return os.path.join(os.getcwd(), "storage", "id_valid_dict.db.bloom")
+
+def open_storage_manager(storage_path:str|None, redis_storage_manager:bool, testing:bool) -> StorageManager:
+    '''
+    This function returns a Redis storage manager if redis_storage_manager is True, otherwise a SQLite
+    (".db"), a JSON (".json"), a compact (".bin") or a memory-mapped (".mmap") storage manager saved in
+    storage_path, by default "storage/id_valid_dict.db" in the current working directory. If storage_path
+    is the directory of a sharded storage, the IDs are split among its shards.
+    '''
+    if redis_storage_manager:
+        return RedisStorageManager(testing=testing)
+    if is_sharded_storage(storage_path):
+        return open_sharded_storage(storage_path)
+    if storage_path:
+        if not os.path.exists(storage_path):
+            # if parent dir does not exist, it is created
+            Path(os.path.abspath(os.path.join(storage_path, os.pardir))).mkdir(parents=True, exist_ok=True)
+        if storage_path.endswith(".json"):
+            return InMemoryStorageManager(storage_path)
+        if storage_path.endswith(".bin"):
+            return CompactStorageManager(storage_path)
+        if storage_path.endswith(".mmap"):
+            return MmapStorageManager(storage_path)
+        return SqliteStorageManager(storage_path)
+    new_path_dir = os.path.join(os.getcwd(), "storage")
+    os.makedirs(new_path_dir, exist_ok=True)
+    return SqliteStorageManager(os.path.join(new_path_dir, "id_valid_dict.db"))
+
+def get_storage_manager(storage_path:str|None, redis_storage_manager:bool, testing:bool,
+                        cache_size:int|None=None, bloom_filter:bool|None=None) -> StorageManager:
+    '''
+    This function returns the storage manager shared by the drivers, opened by ``open_storage_manager``.
+    If bloom_filter is True, or if it is None and enabled in the configuration file of the data sources,
+    a Bloom filter saved beside the storage is checked before reading the IDs, unless the storage is redis,
+    which may be shared by other hosts whose writes would miss the local filter. If cache_size is positive,
+    or if it is None and a cache size is set in the configuration file, the values read are kept in a LRU
+    cache of that size.
+    '''
+    config = get_storage_config()
+    storage_manager = open_storage_manager(storage_path, redis_storage_manager, testing)
+    if (config['bloom_filter'] if bloom_filter is None else bloom_filter) and not redis_storage_manager:
+        storage_manager = BloomStorageManager(storage_manager,
+                                              get_filter_filepath(storage_path, redis_storage_manager, testing),
+                                              config['bloom_capacity'], config['bloom_error_rate'])
+    cache_size = config['cache_size'] if cache_size is None else cache_size
+    if cache_size > 0:
+        return CachedStorageManager(storage_manager, max_size=cache_size)
+    return storage_manager
+
+def save_csv(filepath:str, rows:List[dict]) -> None:
+    '''
+    This function writes the rows produced by the drivers to a CSV file, if there are any.
+    '''
+    if not rows:
+        return
+    pathoo(filepath)
+    with open(filepath, 'w', newline='', encoding='utf-8') as output_file:
+        dict_writer = csv.DictWriter(output_file, rows[0].keys(), delimiter=',', quotechar='"',
+                                     quoting=csv.QUOTE_NONNUMERIC, escapechar='\\')
+        dict_writer.writeheader()
+        dict_writer.writerows(rows)
+
+def read_line_batches(filepath:str, batch_size:int, skip_lines:int=0) -> Iterator[List[bytes]]:
+    '''
+    This function reads a (possibly gzipped) file of JSON lines as batches of at most batch_size
+    raw lines, without loading the whole file in memory.
+
+    :params filepath: the path of the file
+    :type filepath: str
+    :params batch_size: the maximum number of lines of a batch
+    :type batch_size: int
+    :params skip_lines: the number of lines at the beginning of the file not to be read, e.g. already processed
+    :type skip_lines: int
+    :returns: Iterator[List[bytes]] -- the batches of lines
+    '''
+    opener = gzip.open if filepath.endswith('.gz') else open
+    with opener(filepath, 'rb') as f:
+        batch = list()
+        for line_number, line in enumerate(f):
+            if line_number < skip_lines:
+                continue
+            batch.append(line)
+            if len(batch) == batch_size:
+                yield batch
+                batch = list()
+        if batch:
+            yield batch
+
+def map_batches_in_order(batches:Iterable, function:Callable, workers:int, initializer:Callable|None=None,
+                         initargs:tuple=()) -> Iterator:
+    '''
+    This function applies function to every batch with a producer/consumer scheme: a reader thread
+    consumes the batches iterator (e.g. decompressing and slicing a file), a pool of worker processes
+    converts the batches and the results are yielded in the order of the batches, so that the caller
+    can write them as numbered parts and record its progress. At most two batches per worker are held
+    in memory at a time.
+
+    :params batches: the batches to be processed
+    :type batches: Iterable
+    :params function: a picklable function taking a batch and returning its result
+    :type function: Callable
+    :params workers: the number of worker processes
+    :type workers: int
+    :params initializer: a picklable function called once by each worker process, e.g. to build the processing objects
+    :type initializer: Callable|None
+    :params initargs: the arguments of initializer
+    :type initargs: tuple
+    :returns: Iterator -- the results, in the order of the batches
+    '''
+    max_pending = workers * 2
+    queue = Queue(maxsize=max_pending)
+    end = object()
+
+    def read():
+        try:
+            for batch in batches:
+                queue.put(batch)
+        except Exception as e:
+            queue.put(e)
+        queue.put(end)
+
+    reader = Thread(target=read, daemon=True)
+    reader.start()
+    with ProcessPoolExecutor(max_workers=workers, initializer=initializer, initargs=initargs) as executor:
+        pending = deque()
+        while True:
+            batch = queue.get()
+            if batch is end:
+                break
+            if isinstance(batch, Exception):
+                raise batch
+            pending.append(executor.submit(function, batch))
+            if len(pending) >= max_pending:
+                yield pending.popleft().result()
+        while pending:
+            yield pending.popleft().result()
+    reader.join()
+
+
+class ProcessingCache(object):
+    '''
+    This class keeps track of the inputs already processed in each iteration, in a JSON file shared by
+    all the workers and protected by a file lock, so that an interrupted run can be resumed.
+    The file maps "first_iteration" and "second_iteration" to the lists of the completed inputs.
+
+    :params cache: the path of the JSON cache, by default "cache.json" in the current working directory
+    :type cache: str|None
+    '''
+    def __init__(self, cache:str|None=None):
+        if not cache or not cache.endswith(".json"):
+            cache = os.path.join(os.getcwd(), "cache.json")
+        else:
+            Path(os.path.abspath(os.path.join(cache, os.pardir))).mkdir(parents=True, exist_ok=True)
+        self.cache = cache
+        self.lock = FileLock(cache + ".lock")
+        with self.lock:
+            self.cache_dict = self._read()
+            if not os.path.exists(cache):
+                self._write(self.cache_dict)
+
+    @staticmethod
+    def get_key(is_first_iteration:bool) -> str:
+        return "first_iteration" if is_first_iteration else "second_iteration"
+
+    def is_done(self, name:str, is_first_iteration:bool) -> bool:
+        return name in self.cache_dict.get(self.get_key(is_first_iteration), [])
+
+    def task_done(self, name:str, is_first_iteration:bool) -> None:
+        '''
+        It records the input as processed in the given iteration, merging the inputs recorded
+        in the meantime by the other workers.
+        '''
+        key = self.get_key(is_first_iteration)
+        with self.lock:
+            cache_dict = self._read()
+            done = set(cache_dict.get(key, [])) | set(self.cache_dict.get(key, []))
+            done.add(name)
+            cache_dict[key] = sorted(done)
+            self._write(cache_dict)
+        self.cache_dict = cache_dict
+
+    def delete(self) -> None:
+        for filepath in (self.cache, self.cache + ".lock"):
+            if os.path.exists(filepath):
+                os.remove(filepath)
+
+    def _read(self) -> dict:
+        if not os.path.exists(self.cache):
+            return dict()
+        with open(self.cache, "r", encoding="utf-8") as c:
+            try:
+                return json.load(c)
+            except json.JSONDecodeError:
+                return dict()
+
+    def _write(self, cache_dict:dict) -> None:
+        with open(self.cache, "w", encoding="utf-8") as c:
+            json.dump(cache_dict, c)
+
+
+class SourceAdapter(object):
+    '''
+    This class describes a data source to the ``PipelineEngine``: how to read the records of an input,
+    which entity of a record is the citing (source) entity, which are its references and which IDs must be
+    retrieved in bulk before processing. Subclasses provide a processing class exposing ``csv_creator``,
+    the validation methods and the temporary storage (e.g. ``CrossrefProcessing``).
+
+    :params orcid_index: the DOI-ORCID index filepath
+    :params doi_csv: a CSV filepath containing what DOI to process
+    :params publishers_filepath: the CSV filepath containing information about publishers
+    :params testing: whether the storages are used for testing purposes
+    '''
+    # the suffixes of the CSV files with the citing and the cited entities
+    citing_suffix = '_citing'
+    cited_suffix = '_cited'
+    # whether the IDs of a record are retrieved in bulk also in the first iteration
+    prefetch_citing = True
+    # whether repeated citations of a record are written only once
+    deduplicate_citations = False
+
+    def __init__(self, orcid_index:str|None=None, doi_csv:str|None=None, publishers_filepath:str|None=None,
+                 testing:bool=True):
+        self.orcid_index = orcid_index
+        self.doi_csv = doi_csv
+        self.publishers_filepath = publishers_filepath
+        self.testing = testing
+
+    def get_processing(self, storage_manager:StorageManager, citing:bool):
+        raise NotImplementedError
+
+    def get_records(self, source) -> List[dict]:
+        '''
+        It returns the records of an input, e.g. the entities of a JSON file or of an archive.
+        '''
+        raise NotImplementedError
+
+    def get_source_id(self, record:dict) -> str|None:
+        '''
+        It returns the (not normalised) DOI of the citing entity of a record.
+        '''
+        raise NotImplementedError
+
+    def get_source_entity(self, record:dict) -> dict|None:
+        '''
+        It returns the entity passed to ``csv_creator`` in the first iteration, None if the record
+        must not produce a row. By default, every record does.
+        '''
+        return record
+
+    def get_references(self, record:dict) -> List[Tuple[str, dict|None, bool]]:
+        '''
+        It returns the references of a record as tuples of the (not normalised) DOI of the cited entity,
+        the data about it in the record, if any, and whether the relation is inverted, i.e. the entity
+        referenced cites the entity of the record.
+        '''
+        raise NotImplementedError
+
+    def get_target_entity(self, norm_id:str, cited:dict|None) -> dict:
+        '''
+        It returns the entity passed to ``csv_creator`` for a valid cited entity.
+        '''
+        raise NotImplementedError
+
+    def extract_ids(self, processing, record:dict, is_first_iteration:bool) -> Tuple[Iterable, Iterable]:
+        '''
+        It returns the IDs of the bibliographic resources and of the responsible agents of a record
+        which are retrieved in bulk from the storage before processing the input.
+        '''
+        return processing.extract_all_ids(record, is_first_iteration)
+
+    def prefetch(self, processing, all_br:list, all_ra:list) -> None:
+        processing.update_redis_values(processing.get_reids_validity_list(all_br, "br"),
+                                       processing.get_reids_validity_list(all_ra, "ra"))
+
+    def validated_as(self, processing, norm_id:str) -> bool|None:
+        return processing.validated_as({"schema": "doi", "identifier": norm_id})
+
+    def to_validated_id_list(self, processing, norm_id:str) -> list:
+        return processing.to_validated_id_list({"id": norm_id, "schema": "doi"})
+
+    def get_agent_ids(self, processing, record:dict) -> List[str]:
+        '''
+        It returns the ORCIDs, normalised with their prefix, of the responsible agents of a record which
+        ``csv_creator`` validates through the API unless they were retrieved in bulk from META, so that they
+        are validated at once before. By default, none.
+        '''
+        return list()
+
+    def get_unknown_ids(self, processing, norm_ids:Iterable[str]) -> List[str]:
+        '''
+        It returns the DOIs which ``to_validated_id_list`` would validate through the API: those neither in
+        the storage nor retrieved in bulk from META.
+        '''
+        prefetch_index = getattr(processing, 'prefetch_index', None)
+        return [norm_id for norm_id in norm_ids if self.validated_as(processing, norm_id) is None
+                and not (prefetch_index is not None and prefetch_index.has_br(norm_id))]
+
+
+class PipelineEngine(object):
+    '''
+    This class runs the two iterations shared by the drivers on a single input, whatever its source:
+    in the first iteration, a CSV table with the citing entities not processed yet is produced; in the
+    second one, the cited entities are validated and CSV tables with the new cited entities and with the
+    citations are produced. The source-specific parts are provided by a ``SourceAdapter``, while the
+    storage, the bulk retrieval of the IDs, the cache and the output are handled here for all the sources.
+
+    :params adapter: the adapter of the source
+    :type adapter: SourceAdapter
+    :params csv_dir: the directory where the CSV tables with the entities are saved
+    :type csv_dir: str
+    :params preprocessed_citations_dir: the directory where the CSV tables with the citations are saved
+    :type preprocessed_citations_dir: str
+    :params storage_path: the path of the SQLite or JSON storage, if Redis is not used
+    :type storage_path: str|None
+    :params redis_storage_manager: whether the Redis storage manager is used
+    :type redis_storage_manager: bool
+    :params cache: the path of the JSON cache
+    :type cache: str|None
+    :params doi_oracle: the DOIs with a record in the dumps available locally, which are not validated through
+        the API. By default, the oracle set in the [doi_oracle] section of the configuration file, if any
+    :type doi_oracle: DOIOracle|None
+    :params dois_dir: the directory where the first iteration saves the DOIs of the records of each input, to
+        build an oracle. By default, the one set in the [doi_oracle] section of the configuration file, if any
+    :type dois_dir: str|None
+    :params validation_queue: if given, the unknown DOIs of the cited entities are not validated, but pushed to
+        this queue, while their rows and citations are produced as pending, to be removed by ``filter_rows`` if
+        the DOIs are found invalid once the queue is drained. By default, the queue set in the
+        [validation_queue] section of the configuration file, if any
+    :type validation_queue: ValidationQueue|None
+    :params validator: the validator of the unknown IDs of an input (the DOIs of the cited entities and the IDs
+        returned by the ``get_agent_ids`` method of the adapter), which are validated at once before producing the
+        rows, e.g. a proxy of the ``ValidationBroker`` shared by the workers or a ``ThreadedValidator``. By
+        default, the broker set in the [validation_broker] section of the configuration file, if any, otherwise
+        the threaded validator set in the [threaded_validation] section, if any
+    '''
+    def __init__(self, adapter:SourceAdapter, csv_dir:str, preprocessed_citations_dir:str,
+                 storage_path:str|None=None, redis_storage_manager:bool=False, cache:str|None=None,
+                 doi_oracle:DOIOracle|None=None, dois_dir:str|None=None,
+                 validation_queue:ValidationQueue|None=None, validator=None):
+        self.adapter = adapter
+        self.csv_dir = csv_dir
+        self.preprocessed_citations_dir = preprocessed_citations_dir
+        self.storage_manager = get_storage_manager(storage_path, redis_storage_manager, testing=adapter.testing)
+        self.cache = ProcessingCache(cache)
+        self.doi_oracle = doi_oracle if doi_oracle is not None else get_doi_oracle()
+        self.dois_dir = dois_dir if dois_dir is not None else get_doi_oracle_config()['dois_dir']
+        self.validation_queue = validation_queue if validation_queue is not None else get_validation_queue()
+        if validator is None:
+            validator = get_validation_broker() or get_shared_threaded_validator()
+        self.validator = validator
+
+    def process(self, source, name:str, output_name:str, is_first_iteration:bool) -> None:
+        '''
+        It processes an input in the given iteration, unless the cache reports it as already processed.
+
+        :params source: the input, as accepted by the ``get_records`` method of the adapter
+        :params name: the name of the input in the cache
+        :type name: str
+        :params output_name: the name of the CSV tables produced, without suffixes and extension
+        :type output_name: str
+        :params is_first_iteration: True for the citing entities, False for the cited ones and the citations
+        :type is_first_iteration: bool
+        '''
+        if self.cache.is_done(name, is_first_iteration):
+            return
+        processing = self.adapter.get_processing(self.storage_manager, citing=is_first_iteration)
+        records = [record for record in self.adapter.get_records(source) if record]
+        if not is_first_iteration or self.adapter.prefetch_citing:
+            self.prefetch(processing, records, is_first_iteration)
+        if is_first_iteration:
+            if self.validator is not None:
+                self.validate_agent_ids(processing, records)
+            entities, citations = self.get_citing_entities(processing, records), list()
+            if self.dois_dir:
+                self.save_source_dois(processing, records, output_name)
+        else:
+            entities, citations = self.get_cited_entities_and_citations(processing, records, output_name)
+        self.save_files(processing, output_name, entities, citations, is_first_iteration)
+        self.cache.task_done(name, is_first_iteration)
+
+    def prefetch(self, processing, records:List[dict], is_first_iteration:bool) -> None:
+        '''
+        It retrieves in bulk the validity of the IDs of the records with at least a reference.
+        '''
+        all_br, all_ra = list(), list()
+        for record in records:
+            if self.adapter.get_references(record):
+                ent_all_br, ent_all_ra = self.adapter.extract_ids(processing, record, is_first_iteration)
+                all_br.extend(ent_all_br)
+                all_ra.extend(ent_all_ra)
+        if all_br or all_ra:
+            self.adapter.prefetch(processing, all_br, all_ra)
+
+    def get_citing_entities(self, processing, records:List[dict]) -> List[dict]:
+        '''
+        It returns the rows of the citing entities which are not in the storage yet. The validation of
+        their DOIs is not necessary: they are added as valid to the temporary storage, whose values are
+        transferred to the storage when the CSV tables are saved.
+        '''
+        entities = list()
+        for record in tqdm(records):
+            source_entity = self.adapter.get_source_entity(record)
+            if not source_entity:
+                continue
+            norm_source_id = self.normalise(processing, self.adapter.get_source_id(record))
+            if norm_source_id and not processing.doi_m.storage_manager.get_value(norm_source_id):
+                processing.tmp_doi_m.storage_manager.set_value(norm_source_id, True)
+                source_tab_data = processing.csv_creator(source_entity)
+                if source_tab_data and source_tab_data.get("id"):
+                    entities.append(source_tab_data)
+        return entities
+
+    def get_cited_entities_and_citations(self, processing, records:List[dict],
+                                         output_name:str='') -> Tuple[List[dict], List[dict]]:
+        '''
+        It returns the rows of the new valid cited entities and the citations of the records.
+        The DOI of each cited entity is looked for in the temporary storage and in the storage:
+        if it is found as valid, only the citation is produced; if it is not found, it is validated
+        through the API and, if valid, both a row for the entity and the citation are produced.
+        If the validation is deferred, the DOI is pushed to the validation queue instead, and both
+        are produced as pending: the row only by the input which pushed the DOI first.
+        '''
+        # the DOIs validated at once, whose rows are produced when they are first found
+        validated = self.validate_unknown_ids(processing, records) \
+            if self.validator is not None and self.validation_queue is None else dict()
+        entities, citations = list(), list()
+        # the pending DOIs of the input, with the data of their first reference
+        deferred = dict()
+        for record in tqdm(records):
+            references = self.adapter.get_references(record)
+            if not references:
+                continue
+            norm_source_id = self.normalise(processing, self.adapter.get_source_id(record))
+            if not norm_source_id:
+                continue
+            record_citations = list()
+            for cited_id, cited, inverted in references:
+                norm_id = self.normalise(processing, cited_id)
+                if not norm_id:
+                    continue
+                stored_validity = self.adapter.validated_as(processing, norm_id)
+                if norm_id in validated:
+                    stored_validity = None if validated.pop(norm_id) else False
+                if stored_validity is None:
+                    if self.doi_oracle is not None and norm_id in self.doi_oracle:
+                        # the DOI has a record in a dump, so it exists
+                        processing.tmp_doi_m.storage_manager.set_value(norm_id, True)
+                    elif self.validation_queue is not None:
+                        deferred.setdefault(norm_id, cited)
+                    elif norm_id not in self.adapter.to_validated_id_list(processing, norm_id):
+                        continue
+                    if norm_id not in deferred:
+                        target_tab_data = processing.csv_creator(self.adapter.get_target_entity(norm_id, cited))
+                        if not target_tab_data or not target_tab_data.get("id"):
+                            continue
+                        entities.append(target_tab_data)
+                elif stored_validity is not True:
+                    continue
+                citation = {"citing": norm_id, "cited": norm_source_id} if inverted else \
+                    {"citing": norm_source_id, "cited": norm_id}
+                if not self.adapter.deduplicate_citations or citation not in record_citations:
+                    record_citations.append(citation)
+            citations.extend(record_citations)
+        if deferred:
+            pushed = self.validation_queue.push(deferred, output_name)
+            for norm_id, cited in deferred.items():
+                if norm_id in pushed:
+                    target_tab_data = processing.csv_creator(self.adapter.get_target_entity(norm_id, cited))
+                    if target_tab_data and target_tab_data.get("id"):
+                        entities.append(target_tab_data)
+        return entities, citations
+
+    def validate_unknown_ids(self, processing, records:List[dict]) -> Dict[str, bool]:
+        '''
+        It validates with a single call to the validator the DOIs of the cited entities of the records which
+        would be validated one by one, saves their validity in the temporary storage and returns it. The DOIs
+        in the oracle or found invalid before are not validated, while those whose validation failed are
+        validated again while producing the rows.
+        '''
+        norm_ids = dict.fromkeys(self.normalise(processing, cited_id) for record in records
+                                 for cited_id, _, _ in self.adapter.get_references(record))
+        norm_ids.pop(None, None)
+        unknown = [norm_id for norm_id in self.adapter.get_unknown_ids(processing, norm_ids)
+                   if not (self.doi_oracle is not None and norm_id in self.doi_oracle)]
+        return validate_ids(self.validator, processing.tmp_doi_m, unknown)
+
+    def validate_agent_ids(self, processing, records:List[dict]) -> None:
+        '''
+        It validates with a single call to the validator the ORCIDs of the responsible agents of the citing
+        entities not processed yet, which ``csv_creator`` would validate one by one, and saves their validity
+        in the temporary storage.
+        '''
+        agent_ids = list()
+        for record in records:
+            norm_source_id = self.normalise(processing, self.adapter.get_source_id(record))
+            if norm_source_id and not processing.doi_m.storage_manager.get_value(norm_source_id):
+                agent_ids.extend(self.adapter.get_agent_ids(processing, record))
+        if agent_ids:
+            validate_ids(self.validator, processing.tmp_orcid_m, agent_ids)
+
+    def save_source_dois(self, processing, records:List[dict], output_name:str) -> None:
+        '''
+        It saves the DOIs of the records of an input, all existing by definition, in the directory of the DOIs,
+        so that they can be merged in an oracle by ``build_doi_oracle``.
+        '''
+        save_dois((self.normalise(processing, self.adapter.get_source_id(record)) for record in records),
+                  os.path.join(self.dois_dir, output_name + DOIS_EXTENSION))
+
+    @staticmethod
+    def normalise(processing, doi:str|None) -> str|None:
+        return processing.doi_m.normalise(doi, include_prefix=True) if doi else None
+
+    def save_files(self, processing, output_name:str, entities:List[dict], citations:List[dict],
+                   is_first_iteration:bool) -> None:
+        '''
+        It saves the CSV tables produced from an input and transfers the validity of the IDs
+        from the temporary storage to the storage.
+        '''
+        suffix = self.adapter.citing_suffix if is_first_iteration else self.adapter.cited_suffix
+        save_csv(os.path.join(self.csv_dir, f'{output_name}{suffix}.csv'), entities)
+        if not is_first_iteration:
+            save_csv(os.path.join(self.preprocessed_citations_dir, f'{output_name}.csv'), citations)
+        processing.memory_to_storage()
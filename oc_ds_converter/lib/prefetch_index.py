@@ -0,0 +1,87 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+# Copyright (c) 2026 The OpenCitations Index Authors.
+#
+# Permission to use, copy, modify, and/or distribute this software for any purpose
+# with or without fee is hereby granted, provided that the above copyright notice
+# and this permission notice appear in all copies.
+#
+# THE SOFTWARE IS PROVIDED "AS IS" AND THE AUTHOR DISCLAIMS ALL WARRANTIES WITH
+# REGARD TO THIS SOFTWARE INCLUDING ALL IMPLIED WARRANTIES OF MERCHANTABILITY AND
+# FITNESS. IN NO EVENT SHALL THE AUTHOR BE LIABLE FOR ANY SPECIAL, DIRECT, INDIRECT,
+# OR CONSEQUENTIAL DAMAGES OR ANY DAMAGES WHATSOEVER RESULTING FROM LOSS OF USE,
+# DATA OR PROFITS, WHETHER IN AN ACTION OF CONTRACT, NEGLIGENCE OR OTHER TORTIOUS
+# ACTION, ARISING OUT OF OR IN CONNECTION WITH THE USE OR PERFORMANCE OF THIS
+# SOFTWARE.
+
+
+from __future__ import annotations
+
+import sys
+from typing import Dict, Iterable, Set
+
+
+class PrefetchIndex(object):
+    '''
+    This class holds the normalised IDs found in the META redis databases by the bulk retrieval done
+    before processing a part of the input: the IDs of bibliographic resources (e.g. DOIs) and the ones
+    of responsible agents (e.g. ORCIDs). The IDs are kept in sets, so that each check costs a hash lookup
+    instead of a scan of the retrieved IDs, and they are interned, since the same strings are
+    checked many times. The number of lookups and hits is counted for each kind of ID.
+    '''
+    kinds = ('br', 'ra')
+
+    def __init__(self):
+        self.ids: Dict[str, Set[str]] = {kind: set() for kind in self.kinds}
+        self.lookups: Dict[str, int] = {kind: 0 for kind in self.kinds}
+        self.hits: Dict[str, int] = {kind: 0 for kind in self.kinds}
+
+    @property
+    def br(self) -> Set[str]:
+        return self.ids['br']
+
+    @property
+    def ra(self) -> Set[str]:
+        return self.ids['ra']
+
+    def update(self, br:Iterable[str]|None=None, ra:Iterable[str]|None=None) -> None:
+        '''
+        It replaces the IDs of the previous part with the ones retrieved for the current one.
+        The kinds of IDs which are not provided are emptied.
+
+        :params br: the IDs of bibliographic resources found in META
+        :type br: Iterable[str]|None
+        :params ra: the IDs of responsible agents found in META
+        :type ra: Iterable[str]|None
+        '''
+        self.ids['br'] = {sys.intern(id) for id in br} if br else set()
+        self.ids['ra'] = {sys.intern(id) for id in ra} if ra else set()
+
+    def contains(self, kind:str, id:str) -> bool:
+        '''
+        It checks whether an ID was found in META, counting the lookup.
+
+        :params kind: either 'br' or 'ra'
+        :type kind: str
+        :params id: the normalised ID, with its prefix
+        :type id: str
+        :returns: bool -- True if the ID was found in META
+        '''
+        self.lookups[kind] += 1
+        found = id in self.ids[kind]
+        if found:
+            self.hits[kind] += 1
+        return found
+
+    def has_br(self, id:str) -> bool:
+        return self.contains('br', id)
+
+    def has_ra(self, id:str) -> bool:
+        return self.contains('ra', id)
+
+    def stats(self) -> Dict[str, Dict[str, int]]:
+        '''
+        It returns, for each kind of ID, the number of IDs currently held, lookups and hits.
+        '''
+        return {kind: {'ids': len(self.ids[kind]), 'lookups': self.lookups[kind], 'hits': self.hits[kind]}
+                for kind in self.kinds}
@@ -0,0 +1,122 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+# Copyright (c) 2026 The OpenCitations Index Authors.
+#
+# Permission to use, copy, modify, and/or distribute this software for any purpose
+# with or without fee is hereby granted, provided that the above copyright notice
+# and this permission notice appear in all copies.
+#
+# THE SOFTWARE IS PROVIDED "AS IS" AND THE AUTHOR DISCLAIMS ALL WARRANTIES WITH
+# REGARD TO THIS SOFTWARE INCLUDING ALL IMPLIED WARRANTIES OF MERCHANTABILITY AND
+# FITNESS. IN NO EVENT SHALL THE AUTHOR BE LIABLE FOR ANY SPECIAL, DIRECT, INDIRECT,
+# OR CONSEQUENTIAL DAMAGES OR ANY DAMAGES WHATSOEVER RESULTING FROM LOSS OF USE,
+# DATA OR PROFITS, WHETHER IN AN ACTION OF CONTRACT, NEGLIGENCE OR OTHER TORTIOUS
+# ACTION, ARISING OUT OF OR IN CONNECTION WITH THE USE OR PERFORMANCE OF THIS
+# SOFTWARE.
+
+
+from __future__ import annotations
+
+import configparser
+import csv
+import gzip
+import itertools
+import os
+import re
+from typing import Iterable, Iterator, TextIO
+
+from oc_ds_converter import datasource
+from oc_ds_converter.datasource.snapshot import write_large_snapshot
+from oc_ds_converter.lib.doi_oracle import IDOracle
+from oc_ds_converter.oc_idmanager.doi import DOIManager
+from oc_ds_converter.oc_idmanager.pmcid import PMCIDManager
+from oc_ds_converter.oc_idmanager.pmid import PMIDManager
+
+# the PMIDs of the records of the XML files of the PubMed baseline and update files
+pmid_element_regex = re.compile(r"<PMID[^>]*>\s*(\d+)\s*</PMID>")
+
+
+def _open_text(filepath:str) -> TextIO:
+    if filepath.endswith('.gz'):
+        return gzip.open(filepath, 'rt', encoding='utf-8', newline='')
+    return open(filepath, 'r', encoding='utf-8', newline='')
+
+def read_pmc_ids(filepaths:Iterable[str]) -> Iterator[str]:
+    '''
+    This function streams the PMIDs, PMCIDs and DOIs, normalised with their prefix, of the NCBI PMC-ids.csv
+    file (https://ftp.ncbi.nlm.nih.gov/pub/pmc/PMC-ids.csv.gz), compressed or not. The IDs of a row are those
+    of an article archived in PubMed Central, so they all exist.
+
+    :params filepaths: the PMC-ids.csv files
+    :type filepaths: Iterable[str]
+    :returns: Iterator[str] -- the IDs, e.g. "pmid:33293597", "pmcid:PMC7725248" and "doi:10.1007/abc"
+    '''
+    doi_manager = DOIManager(use_api_service=False)
+    pmid_manager = PMIDManager(use_api_service=False)
+    pmcid_manager = PMCIDManager(use_api_service=False)
+    for filepath in filepaths:
+        with _open_text(filepath) as f:
+            for row in csv.DictReader(f):
+                if row.get('PMID'):
+                    pmid = pmid_manager.normalise(row['PMID'], include_prefix=True)
+                    if pmid_manager.syntax_ok(pmid):
+                        yield pmid
+                if row.get('PMCID'):
+                    pmcid = pmcid_manager.normalise(row['PMCID'], include_prefix=True)
+                    if pmcid and pmcid_manager.syntax_ok(pmcid):
+                        yield pmcid
+                if row.get('DOI'):
+                    doi = doi_manager.normalise(row['DOI'], include_prefix=True)
+                    if doi and doi_manager.syntax_ok(doi):
+                        yield doi
+
+def read_pmid_lists(filepaths:Iterable[str]) -> Iterator[str]:
+    '''
+    This function streams the PMIDs, normalised with their prefix, of the PubMed baseline, either of its XML
+    files (e.g. "pubmed24n0001.xml.gz"), whose PMID elements are matched without parsing the records, or of
+    lists of PMIDs, one per line. Both can be compressed.
+
+    :params filepaths: the XML files of the baseline and the lists of PMIDs
+    :type filepaths: Iterable[str]
+    :returns: Iterator[str] -- the PMIDs, e.g. "pmid:33293597"
+    '''
+    pmid_manager = PMIDManager(use_api_service=False)
+    for filepath in filepaths:
+        is_xml = filepath.endswith('.xml') or filepath.endswith('.xml.gz')
+        with _open_text(filepath) as f:
+            for line in f:
+                for value in (pmid_element_regex.findall(line) if is_xml else [line.strip()]):
+                    pmid = pmid_manager.normalise(value, include_prefix=True)
+                    if pmid_manager.syntax_ok(pmid):
+                        yield pmid
+
+def create_pubmed_crosswalk(pmc_ids_filepaths:Iterable[str], pmid_list_filepaths:Iterable[str], filepath:str,
+                            chunk_size:int=5000000) -> int:
+    '''
+    This function saves the PMIDs, PMCIDs and DOIs of the NCBI PMC-ids.csv file and the PMIDs of the PubMed
+    baseline in a compact index, i.e. a snapshot file of their digests, to be set in the [pubmed_crosswalk]
+    section of the configuration file of the data sources, so that the PMID and DOI managers accept the IDs it
+    contains without any API request.
+
+    :params pmc_ids_filepaths: the PMC-ids.csv files
+    :type pmc_ids_filepaths: Iterable[str]
+    :params pmid_list_filepaths: the XML files of the PubMed baseline and the lists of PMIDs
+    :type pmid_list_filepaths: Iterable[str]
+    :params filepath: the path of the index
+    :type filepath: str
+    :params chunk_size: the number of IDs sorted in memory at once
+    :type chunk_size: int
+    :returns: int -- the number of distinct IDs saved
+    '''
+    return write_large_snapshot(itertools.chain(read_pmc_ids(pmc_ids_filepaths), read_pmid_lists(pmid_list_filepaths)),
+                                filepath, chunk_size)
+
+def get_pubmed_crosswalk(config_filepath:str|None=None) -> IDOracle|None:
+    '''
+    This function returns the index of the PubMed IDs ("filepath" in the [pubmed_crosswalk] section of the
+    configuration file of the data sources) created by ``create_pubmed_crosswalk``, if any.
+    '''
+    config = configparser.ConfigParser(allow_no_value=True)
+    config.read(config_filepath if config_filepath else os.path.join(os.path.dirname(datasource.__file__), 'config.ini'))
+    filepath = config.get('pubmed_crosswalk', 'filepath', fallback='') or None
+    return IDOracle([filepath]) if filepath else None
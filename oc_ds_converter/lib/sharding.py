@@ -0,0 +1,274 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+# Copyright (c) 2026 The OpenCitations Index Authors.
+#
+# Permission to use, copy, modify, and/or distribute this software for any purpose
+# with or without fee is hereby granted, provided that the above copyright notice
+# and this permission notice appear in all copies.
+#
+# THE SOFTWARE IS PROVIDED "AS IS" AND THE AUTHOR DISCLAIMS ALL WARRANTIES WITH
+# REGARD TO THIS SOFTWARE INCLUDING ALL IMPLIED WARRANTIES OF MERCHANTABILITY AND
+# FITNESS. IN NO EVENT SHALL THE AUTHOR BE LIABLE FOR ANY SPECIAL, DIRECT, INDIRECT,
+# OR CONSEQUENTIAL DAMAGES OR ANY DAMAGES WHATSOEVER RESULTING FROM LOSS OF USE,
+# DATA OR PROFITS, WHETHER IN AN ACTION OF CONTRACT, NEGLIGENCE OR OTHER TORTIOUS
+# ACTION, ARISING OUT OF OR IN CONNECTION WITH THE USE OR PERFORMANCE OF THIS
+# SOFTWARE.
+
+
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import re
+from typing import Iterable, List, Tuple
+
+from oc_ds_converter.lib.file_manager import normalize_path
+from oc_ds_converter.lib.task_scheduler import get_item_name
+
+shard_label_pattern = re.compile(r'^shard_(\d+)_of_(\d+)$')
+
+
+def parse_shard(shard:str|None) -> Tuple[int, int]:
+    '''
+    This function parses a shard specification in the form 'i/N', where i is the zero-based
+    index of the shard and N the total number of shards.
+
+    :params shard: the shard specification, None for a run which is not sharded
+    :type shard: str|None
+    :returns: Tuple[int, int] -- the index of the shard and the number of shards, (0, 1) if shard is None
+    '''
+    if not shard:
+        return 0, 1
+    match = re.match(r'^\s*(\d+)\s*/\s*(\d+)\s*$', str(shard))
+    if not match:
+        raise ValueError(f'Invalid shard {shard}: the expected format is i/N')
+    index, count = int(match.group(1)), int(match.group(2))
+    if count < 1 or index >= count:
+        raise ValueError(f'Invalid shard {shard}: the index must be lower than the number of shards')
+    return index, count
+
+def get_shard_key(item, base_dir:str|None=None) -> str:
+    '''
+    This function returns the key used to assign an input item to a shard. Paths are made relative
+    to the input directory, so that the key does not depend on where the dump is mounted on each host.
+    '''
+    name = get_item_name(item)
+    name = str(name) if name is not None else str(item)
+    if base_dir:
+        abs_name, abs_base = os.path.abspath(name), os.path.abspath(base_dir)
+        if os.path.commonpath([abs_name, abs_base]) == abs_base:
+            name = os.path.relpath(abs_name, abs_base)
+    return name.replace(os.sep, '/')
+
+def get_shard_index(key:str, count:int) -> int:
+    '''
+    This function maps a key to a shard through a stable hash, i.e. the same on every host and run.
+    '''
+    digest = hashlib.sha1(key.encode('utf-8')).digest()
+    return int.from_bytes(digest[:8], 'big') % count
+
+
+class Shard(object):
+    '''
+    This class selects the part of the input a driver is in charge of when a dump is split across
+    several hosts with --shard i/N, and records the progress of the shard in a JSON file stored in
+    progress_dir, so that a coordinating command can merge and verify the progress of all the shards.
+    The inputs already done by a previous run of the same shard are skipped, so that a re-run resumes
+    where the previous one stopped. If shard is None, every input is selected and nothing is recorded.
+
+    :params shard: the shard specification, in the form 'i/N'
+    :type shard: str|None
+    :params progress_dir: the directory, shared by all the shards, where the progress files are saved.
+        If None, it is set by ``apply``
+    :type progress_dir: str|None
+    :params base_dir: the input directory, used to compute host-independent keys
+    :type base_dir: str|None
+    '''
+    def __init__(self, shard:str|None=None, progress_dir:str|None=None, base_dir:str|None=None):
+        self.index, self.count = parse_shard(shard)
+        self.enabled = bool(shard)
+        self.progress_dir = None
+        self.base_dir = base_dir
+        self.label = f'shard_{self.index}_of_{self.count}'
+        self.assigned = set()
+        self.done = set()
+        if progress_dir:
+            self.load(progress_dir)
+
+    def load(self, progress_dir:str) -> None:
+        '''
+        It sets the progress directory and loads the progress saved by a previous run of the shard, if any.
+        '''
+        self.progress_dir = progress_dir
+        if self.enabled and os.path.exists(self.progress_filepath):
+            with open(self.progress_filepath, 'r', encoding='utf-8') as f:
+                progress = json.load(f)
+            if progress.get('shards') == self.count:
+                self.assigned = set(progress.get('assigned', []))
+                self.done = set(progress.get('done', []))
+
+    def apply(self, csv_dir:str, cache:str|None, storage_path:str|None, redis_storage_manager:bool) -> Tuple[str, str|None, str|None]:
+        '''
+        It returns the output directory, the cache and the storage path to be used by the shard: outputs
+        are saved in a sub-directory of csv_dir named after the shard, so that outputs with the same name
+        produced by different shards do not collide, while the cache and the local storage get per-shard
+        file names. A redis storage is shared by all the shards. If no progress directory was provided,
+        the progress is saved in csv_dir followed by "_progress".
+
+        :returns: Tuple[str, str|None, str|None] -- the output directory, the cache and the storage path
+        '''
+        if not self.enabled:
+            return csv_dir, cache, storage_path
+        if not self.progress_dir:
+            self.load(csv_dir.rstrip(os.sep) + '_progress')
+        if not redis_storage_manager:
+            storage_path = self.local_path(storage_path)
+        return self.output_dir(csv_dir), self.local_path(cache), storage_path
+
+    @property
+    def progress_filepath(self) -> str:
+        return os.path.join(self.progress_dir, f'{self.label}.json')
+
+    def select(self, items:Iterable) -> list:
+        '''
+        It returns the items assigned to this shard and not done yet, keeping their order,
+        and records them as assigned.
+        '''
+        items = list(items)
+        if not self.enabled:
+            return items
+        selected = list()
+        for item in items:
+            key = get_shard_key(item, self.base_dir)
+            if get_shard_index(key, self.count) == self.index:
+                self.assigned.add(key)
+                if key not in self.done:
+                    selected.append(item)
+        self.save()
+        return selected
+
+    def mark_done(self, items:Iterable) -> None:
+        '''
+        It records the items as done and saves the progress.
+        '''
+        if not self.enabled:
+            return
+        for item in items:
+            self.done.add(get_shard_key(item, self.base_dir))
+        self.save()
+
+    def output_dir(self, csv_dir:str) -> str:
+        '''
+        It returns the output directory of the shard, i.e. a sub-directory of csv_dir named after the shard,
+        so that outputs with the same name produced by different shards do not collide.
+        '''
+        return os.path.join(csv_dir, self.label) if self.enabled else csv_dir
+
+    def local_path(self, filepath:str|None) -> str|None:
+        '''
+        It returns the path of a per-shard file (e.g. the cache or a SQLite storage), obtained by adding
+        the shard label before the extension of filepath.
+        '''
+        if not self.enabled or not filepath:
+            return filepath
+        root, ext = os.path.splitext(filepath)
+        return f'{root}_{self.label}{ext}'
+
+    def save(self) -> None:
+        '''
+        It saves the progress of the shard. The file is replaced atomically, so that the coordinator
+        never reads a partially written file.
+        '''
+        if not self.enabled or not self.progress_dir:
+            return
+        os.makedirs(self.progress_dir, exist_ok=True)
+        progress = {
+            'shard': self.index,
+            'shards': self.count,
+            'assigned': sorted(self.assigned),
+            'done': sorted(self.done & self.assigned)}
+        tmp_filepath = self.progress_filepath + '.tmp'
+        with open(tmp_filepath, 'w', encoding='utf-8') as f:
+            json.dump(progress, f, indent=4)
+        os.replace(tmp_filepath, self.progress_filepath)
+
+
+def load_progress(progress_dir:str) -> List[dict]:
+    '''
+    This function loads the progress files of all the shards saved in progress_dir.
+    '''
+    progress = list()
+    if not os.path.isdir(progress_dir):
+        return progress
+    for filename in sorted(os.listdir(progress_dir)):
+        name, ext = os.path.splitext(filename)
+        if ext == '.json' and shard_label_pattern.match(name):
+            with open(os.path.join(progress_dir, filename), 'r', encoding='utf-8') as f:
+                progress.append(json.load(f))
+    return progress
+
+def verify_progress(progress:List[dict], expected_keys:Iterable|None=None) -> dict:
+    '''
+    This function merges the progress of the shards and verifies the completeness of the run: all the shards
+    must have reported their progress, no input can be assigned to more than one shard and every assigned input
+    must be done. If expected_keys is provided, every expected input must also be assigned to its shard.
+
+    :params progress: the progress of the shards, as returned by load_progress
+    :type progress: List[dict]
+    :params expected_keys: the shard keys of all the inputs of the dump, if known
+    :type expected_keys: Iterable|None
+    :returns: dict -- the merged progress, with the 'complete' key telling whether the run is complete
+    '''
+    counts = {p['shards'] for p in progress}
+    count = max(counts) if counts else 0
+    reported = {p['shard'] for p in progress if p['shards'] == count}
+    assigned_by = dict()
+    overlapping = set()
+    done = set()
+    pending = dict()
+    for p in progress:
+        for key in p['assigned']:
+            if key in assigned_by and assigned_by[key] != p['shard']:
+                overlapping.add(key)
+            assigned_by[key] = p['shard']
+        done.update(p['done'])
+        not_done = sorted(set(p['assigned']) - set(p['done']))
+        if not_done:
+            pending[f"shard_{p['shard']}_of_{p['shards']}"] = not_done
+    unassigned = list()
+    if expected_keys is not None:
+        unassigned = sorted(key for key in expected_keys if key not in assigned_by)
+    merged = {
+        'shards': count,
+        'missing_shards': sorted(set(range(count)) - reported),
+        'inconsistent_shard_counts': sorted(counts) if len(counts) > 1 else [],
+        'assigned': len(assigned_by),
+        'done': len(done),
+        'overlapping': sorted(overlapping),
+        'unassigned': unassigned,
+        'pending': pending}
+    merged['complete'] = bool(progress) and not any(
+        merged[k] for k in ('missing_shards', 'inconsistent_shard_counts', 'overlapping', 'unassigned', 'pending'))
+    return merged
+
+def add_shard_arguments(arg_parser) -> None:
+    '''
+    This function adds the options of the sharded execution to the argument parser of a driver.
+    '''
+    arg_parser.add_argument('-sh', '--shard', dest='shard', required=False,
+                            help='The shard to process, in the form i/N (e.g. 0/4), when the dump is split across N hosts. '
+                                 'Inputs are assigned to the shards through a stable hash of their names')
+    arg_parser.add_argument('-spd', '--shard_progress_dir', dest='shard_progress_dir', required=False,
+                            help='The directory, shared by all the shards, where the progress of each shard is recorded. '
+                                 'By default, it is the output directory followed by "_progress"')
+
+def get_shard_arguments(settings:dict|None, args) -> Tuple[str|None, str|None]:
+    '''
+    This function reads the shard and the progress directory from the YAML settings, if any, or from the
+    command line arguments.
+    '''
+    shard = settings.get('shard') if settings else args.shard
+    shard_progress_dir = settings.get('shard_progress_dir') if settings else args.shard_progress_dir
+    shard_progress_dir = normalize_path(shard_progress_dir) if shard_progress_dir else None
+    return shard, shard_progress_dir
@@ -0,0 +1,454 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+# Copyright (c) 2026 The OpenCitations Index Authors.
+#
+# Permission to use, copy, modify, and/or distribute this software for any purpose
+# with or without fee is hereby granted, provided that the above copyright notice
+# and this permission notice appear in all copies.
+#
+# THE SOFTWARE IS PROVIDED "AS IS" AND THE AUTHOR DISCLAIMS ALL WARRANTIES WITH
+# REGARD TO THIS SOFTWARE INCLUDING ALL IMPLIED WARRANTIES OF MERCHANTABILITY AND
+# FITNESS. IN NO EVENT SHALL THE AUTHOR BE LIABLE FOR ANY SPECIAL, DIRECT, INDIRECT,
+# OR CONSEQUENTIAL DAMAGES OR ANY DAMAGES WHATSOEVER RESULTING FROM LOSS OF USE,
+# DATA OR PROFITS, WHETHER IN AN ACTION OF CONTRACT, NEGLIGENCE OR OTHER TORTIOUS
+# ACTION, ARISING OUT OF OR IN CONNECTION WITH THE USE OR PERFORMANCE OF THIS
+# SOFTWARE.
+
+
+from __future__ import annotations
+
+import csv
+import json
+import math
+import os
+import tarfile
+import zipfile
+from concurrent import futures
+from time import monotonic, perf_counter, sleep
+from typing import Callable, Dict, List, Tuple
+
+from oc_ds_converter.lib.file_manager import pathoo
+
+# a task running for more than six hours is considered hung: the biggest inputs of the dumps
+# processed by the drivers take far less than that on a single worker
+DEFAULT_TASK_TIMEOUT = 6 * 60 * 60
+
+
+class FailedTasksError(Exception):
+    '''
+    The exception raised at the end of a run when some tasks failed permanently.
+    '''
+    pass
+
+
+def load_manifest(manifest_filepath:str|None) -> Dict[str, int]:
+    '''
+    This function loads a manifest, i.e. a JSON file mapping input file names (or paths) to
+    the number of records they contain. The manifest is used to estimate the cost of a task
+    more precisely than the compressed size of its input.
+
+    :params manifest_filepath: the path of the JSON manifest
+    :type manifest_filepath: str|None
+    :returns: Dict[str, int] -- the mapping between file names and record counts, empty if no manifest was provided
+    '''
+    if not manifest_filepath or not os.path.exists(manifest_filepath):
+        return dict()
+    with open(manifest_filepath, 'r', encoding='utf-8') as f:
+        manifest = json.load(f)
+    return {str(k): int(v) for k, v in manifest.items()}
+
+def get_item_records(item, manifest:Dict[str, int]|None=None) -> int|None:
+    '''
+    This function returns the number of records of an input item: the length of an in-memory chunk
+    of records, which is exact, or the number declared in the manifest for a file.
+
+    :params item: a file path, a TarInfo, a ZipInfo or a list of records
+    :params manifest: an optional mapping between file names and record counts
+    :type manifest: Dict[str, int]|None
+    :returns: int|None -- the number of records, None if it is unknown
+    '''
+    if isinstance(item, (list, tuple)):
+        return len(item)
+    name = get_item_name(item)
+    if manifest and name is not None:
+        if name in manifest:
+            return manifest[name]
+        if os.path.basename(name) in manifest:
+            return manifest[os.path.basename(name)]
+    return None
+
+def get_item_size(item) -> int|None:
+    '''
+    This function returns the size in bytes of an input item: the size of a file on disk (compressed,
+    if the file is compressed), the compressed size of a zip member or the size of a tar member, which
+    is uncompressed, since tar archives are compressed as a whole.
+
+    :returns: int|None -- the size of the item, None if it is not a file nor an archive member
+    '''
+    if isinstance(item, tarfile.TarInfo):
+        return item.size
+    if isinstance(item, zipfile.ZipInfo):
+        return item.compress_size
+    if isinstance(item, str) and os.path.isfile(item):
+        return os.path.getsize(item)
+    return None
+
+def estimate_cost(item, manifest:Dict[str, int]|None=None, records_per_byte:float|None=None) -> int:
+    '''
+    This function estimates the processing cost of an input item as a number of records. The records
+    are counted (see ``get_item_records``) when possible. Otherwise, the size of the item is converted
+    into a number of records through records_per_byte, so that items with and without a known number
+    of records can be compared. If records_per_byte is not provided, the size itself is the cost.
+
+    :params item: a file path, a TarInfo, a ZipInfo or a list of records
+    :params manifest: an optional mapping between file names and record counts
+    :type manifest: Dict[str, int]|None
+    :params records_per_byte: the ratio between records and bytes, e.g. derived from the manifest
+    :type records_per_byte: float|None
+    :returns: int -- the estimated cost, 0 if it cannot be estimated
+    '''
+    records = get_item_records(item, manifest)
+    if records is not None:
+        return records
+    size = get_item_size(item)
+    if size is None:
+        return 0
+    return round(size * records_per_byte) if records_per_byte else size
+
+def get_item_name(item) -> str|None:
+    if isinstance(item, tarfile.TarInfo):
+        return item.name
+    if isinstance(item, zipfile.ZipInfo):
+        return item.filename
+    if isinstance(item, str):
+        return item
+    return None
+
+def timed_call(function:Callable, args:tuple, kwargs:dict) -> Tuple[object, float]:
+    '''
+    It runs the function and returns its result together with the elapsed time in seconds.
+    It is defined at module level so that it can be pickled and sent to worker processes.
+    '''
+    start = perf_counter()
+    result = function(*args, **kwargs)
+    return result, perf_counter() - start
+
+
+class ScheduledTask(object):
+    '''
+    A unit of work handled by the ``SizeAwareScheduler``.
+
+    :params name: the name identifying the task in the report (e.g. the input file name)
+    :type name: str
+    :params function: the function to be executed
+    :type function: Callable
+    :params args: the positional arguments of the function
+    :type args: tuple
+    :params cost: the estimated cost of the task
+    :type cost: int
+    :params records_arg: the position, in args, of the list of records processed by the task, if any.
+        Only tasks declaring it can be split into sub-tasks
+    :type records_arg: int|None
+    :params name_arg: the position, in args, of the name used by the task for its outputs and its
+        cache entries. Sub-tasks receive a suffixed name, so that their outputs do not collide
+    :type name_arg: int|None
+    :params source: the name of the input file the task comes from, shared by all its sub-tasks.
+        If not provided, it is the name of the task
+    :type source: str|None
+    '''
+    def __init__(self, name:str, function:Callable, args:tuple, cost:int=0, kwargs:dict|None=None,
+                 records_arg:int|None=None, name_arg:int|None=None, source:str|None=None):
+        self.name = name
+        self.source = source if source is not None else name
+        self.function = function
+        self.args = tuple(args)
+        self.kwargs = kwargs if kwargs else dict()
+        self.cost = cost
+        self.records_arg = records_arg
+        self.name_arg = name_arg
+        self.item = None
+        self.duration = None
+        self.attempts = 0
+        self.error = None
+
+    def split(self, max_cost:int) -> List[ScheduledTask]:
+        '''
+        It splits the task into sub-tasks whose cost does not exceed max_cost. Tasks that do not
+        declare the position of their records cannot be split and are returned unchanged.
+        '''
+        if not max_cost or self.cost <= max_cost or self.records_arg is None:
+            return [self]
+        records = self.args[self.records_arg]
+        if not isinstance(records, (list, tuple)) or len(records) < 2:
+            return [self]
+        n_parts = min(math.ceil(self.cost / max_cost), len(records))
+        part_size = math.ceil(len(records) / n_parts)
+        sub_tasks = []
+        for i, start in enumerate(range(0, len(records), part_size), start=1):
+            sub_records = records[start:start + part_size]
+            sub_args = list(self.args)
+            sub_args[self.records_arg] = sub_records
+            sub_name = f'{self.name}_part{i}'
+            if self.name_arg is not None:
+                sub_args[self.name_arg] = f'{self.args[self.name_arg]}_part{i}'
+            sub_tasks.append(ScheduledTask(sub_name, self.function, tuple(sub_args), len(sub_records),
+                                           self.kwargs, self.records_arg, self.name_arg, self.source))
+        return sub_tasks
+
+
+class SizeAwareScheduler(object):
+    '''
+    This class sits in front of ``ProcessPool.schedule`` and submits the tasks following the
+    longest-processing-time-first policy: tasks are ordered by their estimated cost, largest first,
+    so that the biggest inputs do not start at the end of the run and dominate its tail.
+    Tasks whose cost exceeds max_task_cost are split into sub-tasks, when possible.
+    The time spent by each task is recorded and can be saved as a CSV report, in order to tune the policy.
+    Failed and timed-out tasks are retried with an exponential backoff; the tasks still failing after
+    max_retries retries are moved to the dead-letter list, which can be saved as a CSV file.
+
+    :params executor: a pebble ProcessPool. If None, the tasks are run sequentially in the current process
+    :params max_task_cost: the maximum cost of a single task, None to never split tasks
+    :type max_task_cost: int|None
+    :params manifest: a mapping between file names and record counts, used to estimate costs
+    :type manifest: Dict[str, int]|None
+    :params timeout: the maximum number of seconds a task can run before its worker is killed, None or 0 for no limit.
+        It is only enforced when an executor is available
+    :type timeout: float|None
+    :params max_retries: how many times a failed task is retried before being moved to the dead-letter list
+    :type max_retries: int
+    :params backoff: the seconds to wait before the first retry, doubled at each further retry
+    :type backoff: float
+    '''
+    def __init__(self, executor=None, max_task_cost:int|None=None, manifest:Dict[str, int]|None=None,
+                 timeout:float|None=None, max_retries:int=0, backoff:float=1.0):
+        self.executor = executor
+        self.max_task_cost = max_task_cost
+        self.manifest = manifest if manifest else dict()
+        self.timeout = timeout if timeout and timeout > 0 else None
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.tasks: List[ScheduledTask] = list()
+        self.scheduled: List[tuple] = list()
+        self.dead_letter: List[dict] = list()
+        self.failed: List[ScheduledTask] = list()
+        self._pending = dict()
+        self._outstanding: Dict[str, int] = dict()
+
+    def add(self, item, function:Callable, args:tuple, kwargs:dict|None=None, name:str|None=None,
+            records_arg:int|None=None, name_arg:int|None=None, source:str|None=None) -> ScheduledTask:
+        '''
+        It adds a task processing the input item. The cost of the task is estimated from the item.
+        '''
+        if name is None:
+            name = get_item_name(item)
+            name = str(name) if name is not None else f'task_{len(self.tasks)}'
+        task = ScheduledTask(name, function, args, kwargs=kwargs, records_arg=records_arg, name_arg=name_arg,
+                             source=source)
+        task.item = item
+        self.tasks.append(task)
+        return task
+
+    def get_records_per_byte(self) -> float|None:
+        '''
+        It derives the ratio between records and bytes from the added tasks whose input has both a size
+        and a number of records declared in the manifest. It returns None if no such task exists.
+        '''
+        records, size = 0, 0
+        for task in self.tasks:
+            task_records, task_size = get_item_records(task.item, self.manifest), get_item_size(task.item)
+            if task_records is not None and task_size:
+                records += task_records
+                size += task_size
+        return records / size if size else None
+
+    def ordered_tasks(self) -> List[ScheduledTask]:
+        '''
+        It returns the tasks split according to max_task_cost and sorted by decreasing cost.
+        Ties keep the insertion order. Costs are estimated as numbers of records: when the manifest
+        does not cover all the inputs, the sizes of the inputs it does not list are converted through
+        the ratio between records and bytes of the inputs it lists.
+        '''
+        records_per_byte = self.get_records_per_byte() if self.manifest else None
+        splitted = list()
+        for task in self.tasks:
+            task.cost = estimate_cost(task.item, self.manifest, records_per_byte)
+            splitted.extend(task.split(self.max_task_cost))
+        return sorted(splitted, key=lambda t: t.cost, reverse=True)
+
+    def run(self) -> list:
+        '''
+        It schedules all the added tasks, largest first. When an executor is available, it returns
+        the list of (task, future) tuples, which can be collected with ``wait``; otherwise it runs
+        the tasks, retrying the failed ones, and returns the list of (task, result) tuples of the
+        tasks that succeeded.
+        '''
+        ordered = self.ordered_tasks()
+        self.tasks = list()
+        output = list()
+        for task in ordered:
+            self._outstanding[task.source] = self._outstanding.get(task.source, 0) + 1
+        for task in ordered:
+            if self.executor is None:
+                succeeded, result = self._run_locally(task)
+                self.scheduled.append((task, None))
+                if succeeded:
+                    output.append((task, result))
+            else:
+                future = self._submit(task)
+                self.scheduled.append((task, future))
+                output.append((task, future))
+        return output
+
+    def wait(self, on_source_done:Callable|None=None) -> list:
+        '''
+        It collects the futures of the scheduled tasks as they complete. Failed and timed-out tasks are
+        rescheduled after their backoff delay, until they succeed or run out of retries. It must be called
+        before the executor is closed.
+
+        :params on_source_done: a function called with the name of an input file as soon as all its tasks succeeded
+        :type on_source_done: Callable|None
+        :returns: list -- the (task, result) tuples of the tasks that succeeded
+        '''
+        results = list()
+        retries: List[Tuple[float, ScheduledTask]] = list()
+        while self._pending or retries:
+            now = monotonic()
+            for retry in [retry for retry in retries if retry[0] <= now]:
+                retries.remove(retry)
+                self._submit(retry[1])
+            next_retry = min(retry[0] for retry in retries) if retries else None
+            if not self._pending:
+                sleep(max(0.0, next_retry - monotonic()))
+                continue
+            timeout = max(0.0, next_retry - monotonic()) if next_retry is not None else None
+            done, _ = futures.wait(list(self._pending), timeout=timeout, return_when=futures.FIRST_COMPLETED)
+            for future in done:
+                task = self._pending.pop(future)
+                try:
+                    result, task.duration = future.result()
+                except Exception as e:
+                    if self._failed(task, e):
+                        retries.append((monotonic() + self._get_delay(task), task))
+                else:
+                    results.append((task, result))
+                    self._outstanding[task.source] -= 1
+                    if on_source_done and not self._outstanding[task.source] and task.source not in self.failed_sources():
+                        on_source_done(task.source)
+        return results
+
+    def _submit(self, task:ScheduledTask):
+        task.attempts += 1
+        future = self.executor.schedule(function=timed_call, args=(task.function, task.args, task.kwargs),
+                                        timeout=self.timeout)
+        self._pending[future] = task
+        return future
+
+    def _run_locally(self, task:ScheduledTask) -> Tuple[bool, object]:
+        while True:
+            task.attempts += 1
+            try:
+                result, task.duration = timed_call(task.function, task.args, task.kwargs)
+                return True, result
+            except Exception as e:
+                if not self._failed(task, e):
+                    return False, None
+                sleep(self._get_delay(task))
+
+    def _failed(self, task:ScheduledTask, error:Exception) -> bool:
+        '''
+        It records the error of the task and tells whether the task can be retried.
+        Otherwise, the task is moved to the dead-letter list.
+        '''
+        task.error = f'{type(error).__name__}: {error}'
+        if task.attempts <= self.max_retries:
+            return True
+        self.dead_letter.append({'task': task.name, 'attempts': task.attempts, 'error': task.error})
+        self.failed.append(task)
+        return False
+
+    def failed_sources(self) -> set:
+        '''
+        It returns the names of the input files with at least one task in the dead-letter list.
+        '''
+        return {task.source for task in self.failed}
+
+    def _get_delay(self, task:ScheduledTask) -> float:
+        return self.backoff * 2 ** (task.attempts - 1)
+
+    def report(self) -> List[dict]:
+        '''
+        It returns, for each completed task, its name, its estimated cost and the seconds it took.
+        Tasks run by an executor are reported once their future is done.
+        '''
+        report = list()
+        for task, future in self.scheduled:
+            if future is not None and task.duration is None:
+                if not future.done() or future.cancelled() or future.exception() is not None:
+                    continue
+                task.duration = future.result()[1]
+            if task.duration is None:
+                continue
+            report.append({'task': task.name, 'cost': task.cost, 'duration': round(task.duration, 3)})
+        return report
+
+    def save_report(self, report_filepath:str) -> None:
+        '''
+        It appends the per-task durations to a CSV file, creating it (with its header) if needed.
+        '''
+        report = self.report()
+        if not report:
+            return
+        if os.path.dirname(report_filepath):
+            pathoo(report_filepath)
+        file_exists = os.path.isfile(report_filepath)
+        with open(report_filepath, 'a', newline='', encoding='utf-8') as f:
+            dict_writer = csv.DictWriter(f, ['task', 'cost', 'duration'])
+            if not file_exists:
+                dict_writer.writeheader()
+            dict_writer.writerows(report)
+
+    def save_dead_letter(self, dead_letter_filepath:str) -> None:
+        '''
+        It appends the tasks that failed permanently, with the number of attempts and the last error,
+        to a CSV file, creating it (with its header) if needed. The task names are the input files to re-run.
+        '''
+        if not self.dead_letter:
+            return
+        if os.path.dirname(dead_letter_filepath):
+            pathoo(dead_letter_filepath)
+        file_exists = os.path.isfile(dead_letter_filepath)
+        with open(dead_letter_filepath, 'a', newline='', encoding='utf-8') as f:
+            dict_writer = csv.DictWriter(f, ['task', 'attempts', 'error'])
+            if not file_exists:
+                dict_writer.writeheader()
+            dict_writer.writerows(self.dead_letter)
+
+    def log_dead_letter(self, process_name:str, dead_letter_filepath:str|None=None) -> None:
+        '''
+        It warns about the tasks that failed permanently, if any, and appends them to dead_letter_filepath.
+        If no file is provided, the names of the failed tasks are listed in the warning.
+        '''
+        if not self.dead_letter:
+            return
+        message = f'[WARNING: {process_name}] {len(self.dead_letter)} tasks failed after {self.max_retries} retries'
+        if dead_letter_filepath:
+            self.save_dead_letter(dead_letter_filepath)
+            print(f'{message}, see {dead_letter_filepath}')
+        else:
+            print(f"{message}: {', '.join(row['task'] for row in self.dead_letter)}")
+
+
+def check_failed_tasks(process_name:str, failed_tasks:List[ScheduledTask]) -> None:
+    '''
+    This function makes a run fail if some of its tasks failed permanently, so that the failure is not
+    mistaken for a complete run. It is called before the cache is deleted, so that a re-run only processes
+    the inputs which were not completed.
+
+    :params process_name: the name of the driver, used in the error message
+    :type process_name: str
+    :params failed_tasks: the tasks which failed permanently in all the iterations of the run
+    :type failed_tasks: List[ScheduledTask]
+    '''
+    if failed_tasks:
+        raise FailedTasksError(f"[ERROR: {process_name}] {len(failed_tasks)} tasks failed permanently: "
+                               f"{', '.join(task.name for task in failed_tasks)}")
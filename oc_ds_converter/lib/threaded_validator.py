@@ -0,0 +1,196 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+# Copyright (c) 2026 The OpenCitations Index Authors.
+#
+# Permission to use, copy, modify, and/or distribute this software for any purpose
+# with or without fee is hereby granted, provided that the above copyright notice
+# and this permission notice appear in all copies.
+#
+# THE SOFTWARE IS PROVIDED "AS IS" AND THE AUTHOR DISCLAIMS ALL WARRANTIES WITH
+# REGARD TO THIS SOFTWARE INCLUDING ALL IMPLIED WARRANTIES OF MERCHANTABILITY AND
+# FITNESS. IN NO EVENT SHALL THE AUTHOR BE LIABLE FOR ANY SPECIAL, DIRECT, INDIRECT,
+# OR CONSEQUENTIAL DAMAGES OR ANY DAMAGES WHATSOEVER RESULTING FROM LOSS OF USE,
+# DATA OR PROFITS, WHETHER IN AN ACTION OF CONTRACT, NEGLIGENCE OR OTHER TORTIOUS
+# ACTION, ARISING OUT OF OR IN CONNECTION WITH THE USE OR PERFORMANCE OF THIS
+# SOFTWARE.
+
+
+
+from __future__ import annotations
+
+import configparser
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+from typing import Dict, Iterable, Optional
+from urllib.parse import urlparse
+
+from oc_ds_converter import datasource
+from oc_ds_converter.oc_idmanager.base import IdentifierManager
+from oc_ds_converter.oc_idmanager.doi import DOIManager
+from oc_ds_converter.oc_idmanager.negative_cache import NOT_FOUND
+from oc_ds_converter.oc_idmanager.orcid import ORCIDManager
+from oc_ds_converter.oc_idmanager.pmcid import PMCIDManager
+from oc_ds_converter.oc_idmanager.pmid import PMIDManager
+from oc_ds_converter.oc_idmanager.support import check_exists
+
+# the managers of the IDs validated concurrently, for each schema
+VALIDATOR_MANAGERS = {'doi': DOIManager, 'orcid': ORCIDManager, 'pmid': PMIDManager, 'pmcid': PMCIDManager}
+
+
+class ThreadedValidator(object):
+    '''
+    This class validates IDs through the APIs concurrently, with a pool of threads of the current process, so
+    that a worker does not wait for the answer of each request before sending the next one. The number of
+    concurrent requests to each host (e.g. "doi.org" for the DOIs) is limited, so that the APIs are not
+    flooded. The pool is created again in the processes forked after its creation.
+
+    :params max_workers: the maximum number of concurrent requests
+    :type max_workers: int
+    :params host_limits: the maximum number of concurrent requests to each host, e.g. {"pub.orcid.org": 4}
+    :type host_limits: Dict[str, int]|None
+    :params default_host_limit: the maximum number of concurrent requests to the hosts not in host_limits
+        (None: max_workers)
+    :type default_host_limit: int|None
+    '''
+    def __init__(self, max_workers:int=8, host_limits:Dict[str, int]|None=None, default_host_limit:int|None=None):
+        self.max_workers = max(1, max_workers)
+        self.host_limits = dict(host_limits) if host_limits else dict()
+        self.default_host_limit = default_host_limit if default_host_limit else self.max_workers
+        self._managers = {schema: manager_class(use_api_service=True)
+                          for schema, manager_class in VALIDATOR_MANAGERS.items()}
+        self._hosts = {schema: urlparse(manager._api).netloc for schema, manager in self._managers.items()}
+        self._semaphores = {host: threading.BoundedSemaphore(self.host_limits.get(host, self.default_host_limit))
+                            for host in set(self._hosts.values())}
+        self._executor_lock = threading.Lock()
+        self._executor = None
+        self._pid = None
+
+    @property
+    def executor(self) -> ThreadPoolExecutor:
+        with self._executor_lock:
+            if self._executor is None or self._pid != os.getpid():
+                self._pid = os.getpid()
+                self._executor = ThreadPoolExecutor(max_workers=self.max_workers)
+            return self._executor
+
+    def supports(self, id:str) -> bool:
+        return id.split(':', 1)[0] in self._managers
+
+    def check(self, id:str) -> Optional[bool]:
+        '''
+        It returns whether an ID exists, or None if its validation failed or its schema is not supported.
+        '''
+        schema = id.split(':', 1)[0]
+        if schema not in self._managers:
+            return None
+        with self._semaphores[self._hosts[schema]]:
+            return check_exists(self._managers[schema], id)
+
+    def validate(self, ids:Iterable[str]) -> Dict[str, Optional[bool]]:
+        '''
+        It returns whether each ID exists: True or False, or None if its validation failed or its schema is not
+        supported.
+
+        :params ids: the IDs, normalised with their prefix, e.g. "doi:10.1007/abc"
+        :type ids: Iterable[str]
+        :returns: Dict[str, Optional[bool]] -- the validity of each ID
+        '''
+        ids = list(dict.fromkeys(ids))
+        return dict(zip(ids, self.executor.map(self.check, ids)))
+
+    def close(self) -> None:
+        with self._executor_lock:
+            if self._executor is not None and self._pid == os.getpid():
+                self._executor.shutdown()
+            self._executor = None
+
+
+def known_validity(id_manager:IdentifierManager, id:str) -> Optional[bool]:
+    '''
+    It returns the validity of an ID known without any API request by an ID manager: the one in its storage,
+    True if it is in its oracle (or ORCID set) and False if it is in its negative cache, None otherwise.
+    '''
+    validity = id_manager.storage_manager.get_value(id)
+    if isinstance(validity, bool):
+        return validity
+    oracle = getattr(id_manager, 'oracle', None)
+    if oracle is None:
+        oracle = getattr(id_manager, 'orcid_set', None)
+    if oracle is not None and id in oracle:
+        return True
+    if id_manager.cached_as_invalid(id):
+        return False
+    return None
+
+def validate_ids(validator, id_manager:IdentifierManager, ids:Iterable[str]) -> Dict[str, bool]:
+    '''
+    This function validates with a single call to a validator (e.g. a ``ThreadedValidator``) the IDs which an
+    ID manager would validate one by one through the API, i.e. those whose validity is not known by
+    ``known_validity``. Their validity is saved in the storage of the manager, e.g. the temporary storage of a
+    driver, and the invalid ones are added to its negative cache, so that the manager does not request them
+    again. The IDs whose validation failed are not saved.
+
+    :params validator: the validator, exposing a ``validate`` method
+    :params id_manager: the ID manager, e.g. the temporary DOI manager of a driver
+    :type id_manager: IdentifierManager
+    :params ids: the IDs, normalised with their prefix
+    :type ids: Iterable[str]
+    :returns: Dict[str, bool] -- the validity of the IDs validated
+    '''
+    unknown = [id for id in dict.fromkeys(ids) if id and known_validity(id_manager, id) is None]
+    validated = dict()
+    if not unknown:
+        return validated
+    for id, valid in validator.validate(unknown).items():
+        if valid is None:
+            continue
+        if not valid:
+            id_manager.record_invalid(id, NOT_FOUND)
+        id_manager.storage_manager.set_value(id, valid)
+        validated[id] = valid
+    return validated
+
+def parse_host_limits(host_limits:str|None) -> Dict[str, int]:
+    '''
+    It parses the limits of the hosts of the configuration file, e.g. "doi.org:8, pub.orcid.org:4".
+    '''
+    limits = dict()
+    for host_limit in (host_limits or '').split(','):
+        if host_limit.strip():
+            host, limit = host_limit.rsplit(':', 1)
+            limits[host.strip()] = int(limit)
+    return limits
+
+def get_threaded_validation_config(config_filepath:str|None=None) -> dict:
+    '''
+    This function reads the [threaded_validation] section of the configuration file of the data sources: the
+    number of threads validating the IDs of an input concurrently ("workers", 0 to validate them one by one),
+    the maximum number of concurrent requests to each host ("host_limits", e.g. "doi.org:8, pub.orcid.org:4")
+    and to the other hosts ("default_host_limit").
+    '''
+    config = configparser.ConfigParser(allow_no_value=True)
+    config.read(config_filepath if config_filepath else os.path.join(os.path.dirname(datasource.__file__), 'config.ini'))
+    default_host_limit = (config.get('threaded_validation', 'default_host_limit', fallback='') or '').strip()
+    return {
+        'workers': config.getint('threaded_validation', 'workers', fallback=0) or 0,
+        'host_limits': parse_host_limits(config.get('threaded_validation', 'host_limits', fallback='')),
+        'default_host_limit': int(default_host_limit) if default_host_limit else None
+    }
+
+def get_threaded_validator(config_filepath:str|None=None) -> ThreadedValidator|None:
+    '''
+    This function returns the validator set in the configuration file of the data sources, if any.
+    '''
+    config = get_threaded_validation_config(config_filepath)
+    if not config['workers']:
+        return None
+    return ThreadedValidator(config['workers'], config['host_limits'], config['default_host_limit'])
+
+@lru_cache(maxsize=None)
+def get_shared_threaded_validator() -> ThreadedValidator|None:
+    '''
+    This function returns the validator of the configuration file, shared by all the inputs of a process.
+    '''
+    return get_threaded_validator()
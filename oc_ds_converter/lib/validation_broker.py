@@ -0,0 +1,249 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+# Copyright (c) 2026 The OpenCitations Index Authors.
+#
+# Permission to use, copy, modify, and/or distribute this software for any purpose
+# with or without fee is hereby granted, provided that the above copyright notice
+# and this permission notice appear in all copies.
+#
+# THE SOFTWARE IS PROVIDED "AS IS" AND THE AUTHOR DISCLAIMS ALL WARRANTIES WITH
+# REGARD TO THIS SOFTWARE INCLUDING ALL IMPLIED WARRANTIES OF MERCHANTABILITY AND
+# FITNESS. IN NO EVENT SHALL THE AUTHOR BE LIABLE FOR ANY SPECIAL, DIRECT, INDIRECT,
+# OR CONSEQUENTIAL DAMAGES OR ANY DAMAGES WHATSOEVER RESULTING FROM LOSS OF USE,
+# DATA OR PROFITS, WHETHER IN AN ACTION OF CONTRACT, NEGLIGENCE OR OTHER TORTIOUS
+# ACTION, ARISING OUT OF OR IN CONNECTION WITH THE USE OR PERFORMANCE OF THIS
+# SOFTWARE.
+
+
+
+from __future__ import annotations
+
+import configparser
+import os
+import secrets
+import threading
+from collections import OrderedDict
+from concurrent.futures import Future
+from functools import partial
+from multiprocessing.managers import BaseManager
+from typing import Dict, Iterable, Optional
+
+from oc_ds_converter import datasource
+from oc_ds_converter.lib.threaded_validator import ThreadedValidator, get_threaded_validation_config
+
+
+class ValidationBroker(ThreadedValidator):
+    '''
+    This class validates IDs through the APIs on behalf of all the worker processes of a driver, so that an
+    ID cited by the inputs of several workers is requested once: the IDs requested by a worker while their
+    validation for another worker is in flight wait for its result, and the results are kept in a cache
+    shared by the workers. The requests are sent concurrently by a pool of threads, with the limits of
+    concurrent requests to each host of a ``ThreadedValidator``. The IDs whose validation failed (e.g. for a
+    timeout) are not cached, so that they are validated again.
+
+    :params max_workers: the maximum number of concurrent requests
+    :type max_workers: int
+    :params cache_size: the maximum number of results cached, the least recently used being discarded
+    :type cache_size: int
+    :params host_limits: the maximum number of concurrent requests to each host
+    :type host_limits: Dict[str, int]|None
+    :params default_host_limit: the maximum number of concurrent requests to the other hosts
+    :type default_host_limit: int|None
+    '''
+    def __init__(self, max_workers:int=16, cache_size:int=1000000, host_limits:Dict[str, int]|None=None,
+                 default_host_limit:int|None=None):
+        super(ValidationBroker, self).__init__(max_workers, host_limits, default_host_limit)
+        self.cache_size = cache_size
+        self.hits = 0
+        self.joined = 0
+        self.requests = 0
+        self._cache: OrderedDict = OrderedDict()
+        self._in_flight: Dict[str, Future] = dict()
+        # the callback of a future already done runs in the thread which adds it, while the lock is held
+        self._lock = threading.RLock()
+
+    def validate(self, ids:Iterable[str]) -> Dict[str, Optional[bool]]:
+        '''
+        It returns whether each ID exists: True or False, or None if its validation failed or its schema is not
+        supported by the broker.
+
+        :params ids: the IDs, normalised with their prefix, e.g. "doi:10.1007/abc"
+        :type ids: Iterable[str]
+        :returns: Dict[str, Optional[bool]] -- the validity of each ID
+        '''
+        results, futures = dict(), dict()
+        with self._lock:
+            for id in ids:
+                if id in results or id in futures:
+                    continue
+                if id in self._cache:
+                    self._cache.move_to_end(id)
+                    results[id] = self._cache[id]
+                    self.hits += 1
+                elif id in self._in_flight:
+                    futures[id] = self._in_flight[id]
+                    self.joined += 1
+                elif not self.supports(id):
+                    results[id] = None
+                else:
+                    future = self.executor.submit(self.check, id)
+                    self._in_flight[id] = futures[id] = future
+                    self.requests += 1
+                    future.add_done_callback(partial(self._done, id))
+        for id, future in futures.items():
+            try:
+                results[id] = future.result()
+            except Exception:
+                results[id] = None
+        return results
+
+    def _done(self, id:str, future:Future) -> None:
+        with self._lock:
+            self._in_flight.pop(id, None)
+            if future.cancelled() or future.exception() is not None or future.result() is None:
+                return
+            self._cache[id] = future.result()
+            if len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {'size': len(self._cache), 'in_flight': len(self._in_flight), 'hits': self.hits,
+                    'joined': self.joined, 'requests': self.requests}
+
+
+class ValidationBrokerManager(BaseManager):
+    '''
+    The manager through which the worker processes connect to the broker, served on a Unix socket (or on a
+    host and port) by ``start_validation_broker`` or ``serve_validation_broker``. Since the manager unpickles
+    the requests, the socket is accessible by its owner only, and the workers authenticate with a key: the one
+    given, which is required on a host and port, or a random one saved beside the socket, readable by its
+    owner only.
+    '''
+
+ValidationBrokerManager.register('get_broker')
+
+_broker: ValidationBroker|None = None
+
+def _get_broker() -> ValidationBroker|None:
+    return _broker
+
+def _init_broker(max_workers:int, cache_size:int, unix_socket:bool=False) -> None:
+    global _broker
+    if unix_socket:
+        # the socket, created after the initialisation of the broker process, is accessible by its owner only
+        os.umask(0o177)
+    # the limits of the hosts are the ones of the threaded validation
+    config = get_threaded_validation_config()
+    _broker = ValidationBroker(max_workers, cache_size, config['host_limits'], config['default_host_limit'])
+
+
+class _ValidationBrokerServer(BaseManager):
+    pass
+
+_ValidationBrokerServer.register('get_broker', callable=_get_broker)
+
+
+def _key_filepath(address:str) -> str:
+    return address + '.key'
+
+def _server_authkey(address:str|tuple, authkey:bytes|None) -> bytes:
+    '''
+    It returns the key of a broker: the one given, or, on a Unix socket, a random one saved beside it.
+    '''
+    if authkey:
+        return authkey
+    if not isinstance(address, str):
+        raise ValueError('a broker served on a host and port requires an explicit authkey')
+    authkey = secrets.token_hex(32).encode('utf-8')
+    key_filepath = _key_filepath(address)
+    if os.path.exists(key_filepath):
+        os.remove(key_filepath)
+    # the key is created readable by its owner only, whatever the umask
+    fd = os.open(key_filepath, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o600)
+    with os.fdopen(fd, 'wb') as f:
+        f.write(authkey)
+    return authkey
+
+def _client_authkey(address:str|tuple, authkey:bytes|None) -> bytes:
+    '''
+    It returns the key to connect to a broker: the one given, or, on a Unix socket, the one saved beside it.
+    '''
+    if authkey:
+        return authkey
+    if not isinstance(address, str):
+        raise ValueError('a broker served on a host and port requires an explicit authkey')
+    with open(_key_filepath(address), 'rb') as f:
+        return f.read()
+
+def start_validation_broker(address:str|tuple, authkey:bytes|None=None, max_workers:int=16,
+                            cache_size:int=1000000) -> BaseManager:
+    '''
+    This function starts the broker in a new process, which is stopped by the ``shutdown`` method of the
+    manager returned.
+
+    :params address: the path of the Unix socket, or the host and port, of the broker
+    :type address: str|tuple
+    :params authkey: the key the workers authenticate with, required on a host and port. If it is not
+        given, a random key is saved beside the Unix socket, in a file with the ".key" suffix
+    :type authkey: bytes|None
+    :params max_workers: the maximum number of concurrent requests
+    :type max_workers: int
+    :params cache_size: the maximum number of results cached
+    :type cache_size: int
+    :returns: BaseManager -- the manager of the broker process
+    '''
+    manager = _ValidationBrokerServer(address=address, authkey=_server_authkey(address, authkey))
+    manager.start(_init_broker, (max_workers, cache_size, isinstance(address, str)))
+    return manager
+
+def serve_validation_broker(address:str|tuple, authkey:bytes|None=None, max_workers:int=16,
+                            cache_size:int=1000000) -> None:
+    '''
+    This function runs the broker in the current process until it is interrupted. The key is the one given,
+    required on a host and port, or a random one saved beside the Unix socket.
+    '''
+    authkey = _server_authkey(address, authkey)
+    _init_broker(max_workers, cache_size)
+    # the socket is accessible by its owner only
+    umask = os.umask(0o177) if isinstance(address, str) else None
+    try:
+        server = _ValidationBrokerServer(address=address, authkey=authkey).get_server()
+    finally:
+        if umask is not None:
+            os.umask(umask)
+    server.serve_forever()
+
+def connect_validation_broker(address:str|tuple, authkey:bytes|None=None):
+    '''
+    This function connects to a running broker, and returns a proxy exposing its ``validate`` and ``stats``
+    methods, to be used by the process which created it. The key is the one given, required on a host and
+    port, or the one saved beside the Unix socket by the broker.
+    '''
+    manager = ValidationBrokerManager(address=address, authkey=_client_authkey(address, authkey))
+    manager.connect()
+    return manager.get_broker()
+
+def get_validation_broker_config(config_filepath:str|None=None) -> dict:
+    '''
+    This function reads the [validation_broker] section of the configuration file of the data sources: the
+    path of the Unix socket of the broker ("address", empty to validate the IDs in each worker), the key the
+    workers authenticate with ("authkey", empty to use the random key saved beside the socket by the broker),
+    the maximum number of concurrent requests ("workers") and of results cached ("cache_size").
+    '''
+    config = configparser.ConfigParser(allow_no_value=True)
+    config.read(config_filepath if config_filepath else os.path.join(os.path.dirname(datasource.__file__), 'config.ini'))
+    authkey = config.get('validation_broker', 'authkey', fallback='') or ''
+    return {
+        'address': config.get('validation_broker', 'address', fallback='') or None,
+        'authkey': authkey.encode('utf-8') if authkey else None,
+        'workers': config.getint('validation_broker', 'workers', fallback=16),
+        'cache_size': config.getint('validation_broker', 'cache_size', fallback=1000000)
+    }
+
+def get_validation_broker(config_filepath:str|None=None):
+    '''
+    This function connects to the broker set in the configuration file of the data sources, if any.
+    '''
+    config = get_validation_broker_config(config_filepath)
+    return connect_validation_broker(config['address'], config['authkey']) if config['address'] else None
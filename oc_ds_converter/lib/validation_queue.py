@@ -0,0 +1,296 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+# Copyright (c) 2026 The OpenCitations Index Authors.
+#
+# Permission to use, copy, modify, and/or distribute this software for any purpose
+# with or without fee is hereby granted, provided that the above copyright notice
+# and this permission notice appear in all copies.
+#
+# THE SOFTWARE IS PROVIDED "AS IS" AND THE AUTHOR DISCLAIMS ALL WARRANTIES WITH
+# REGARD TO THIS SOFTWARE INCLUDING ALL IMPLIED WARRANTIES OF MERCHANTABILITY AND
+# FITNESS. IN NO EVENT SHALL THE AUTHOR BE LIABLE FOR ANY SPECIAL, DIRECT, INDIRECT,
+# OR CONSEQUENTIAL DAMAGES OR ANY DAMAGES WHATSOEVER RESULTING FROM LOSS OF USE,
+# DATA OR PROFITS, WHETHER IN AN ACTION OF CONTRACT, NEGLIGENCE OR OTHER TORTIOUS
+# ACTION, ARISING OUT OF OR IN CONNECTION WITH THE USE OR PERFORMANCE OF THIS
+# SOFTWARE.
+
+
+
+from __future__ import annotations
+
+import configparser
+import csv
+import os
+import sqlite3
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+from oc_ds_converter import datasource
+from oc_ds_converter.lib.threaded_validator import known_validity
+from oc_ds_converter.oc_idmanager.base import IdentifierManager
+from oc_ds_converter.oc_idmanager.negative_cache import NOT_FOUND
+from oc_ds_converter.oc_idmanager.support import check_exists
+
+
+class ValidationQueue(object):
+    '''
+    This class keeps the IDs whose validation is deferred: in this mode the second iteration of the drivers
+    does not validate the unknown IDs of the cited entities, but produces their rows and citations as pending
+    and pushes the IDs to this queue. The queue is then drained by ``drain_validation_queue``, which validates
+    the IDs under a budget of requests per second, and the rows with the IDs found invalid are removed by
+    ``filter_rows``. The IDs are kept once, with the input which pushed them first, in a SQLite database shared
+    by the processes.
+
+    :params filepath: the SQLite file of the queue
+    :type filepath: str
+    '''
+    def __init__(self, filepath:str):
+        self.filepath = filepath
+        self._lock = threading.Lock()
+        Path(os.path.abspath(os.path.join(filepath, os.pardir))).mkdir(parents=True, exist_ok=True)
+        self._connect()
+
+    def _connect(self) -> None:
+        # a connection is not shared with the processes forked after its creation
+        self._pid = os.getpid()
+        self.con = sqlite3.connect(self.filepath, timeout=60, check_same_thread=False, isolation_level=None)
+        self.con.execute('PRAGMA journal_mode=WAL')
+        # valid is NULL while the ID is pending, 1 if it is valid and 0 if it is not
+        self.con.execute('CREATE TABLE IF NOT EXISTS queue(id TEXT PRIMARY KEY, source TEXT, valid INTEGER, '
+                         'attempts INTEGER DEFAULT 0)')
+
+    def _execute_many(self, queries:Iterable[Tuple[str, tuple]]) -> List[Tuple[list, int]]:
+        with self._lock:
+            if os.getpid() != self._pid:
+                self._connect()
+            results = list()
+            self.con.execute('BEGIN IMMEDIATE')
+            try:
+                for query, parameters in queries:
+                    cursor = self.con.execute(query, parameters)
+                    results.append((cursor.fetchall(), cursor.rowcount))
+                self.con.execute('COMMIT')
+            except BaseException:
+                self.con.execute('ROLLBACK')
+                raise
+            return results
+
+    def _execute(self, query:str, parameters:tuple=()) -> list:
+        return self._execute_many([(query, parameters)])[0][0]
+
+    def push(self, ids:Iterable[str], source:str) -> Set[str]:
+        '''
+        It adds IDs to the queue, unless they are already there, and returns the ones for which the input
+        has to produce a row: the IDs added, and those pushed by the same input before, e.g. by a run which
+        was interrupted, so that each pending entity has exactly one row.
+
+        :params ids: the IDs, normalised with their prefix
+        :type ids: Iterable[str]
+        :params source: the name of the input
+        :type source: str
+        :returns: Set[str] -- the IDs whose rows are produced by the input
+        '''
+        ids = list(dict.fromkeys(ids))
+        if not ids:
+            return set()
+        results = self._execute_many([('INSERT OR IGNORE INTO queue(id, source) VALUES (?, ?)', (id, source))
+                                      for id in ids] +
+                                     [('SELECT id FROM queue WHERE id = ? AND source = ?', (id, source))
+                                      for id in ids])
+        return {rows[0][0] for rows, _ in results[len(ids):] if rows}
+
+    def pending(self, limit:int, max_attempts:int|None=None) -> List[str]:
+        '''
+        It returns at most limit IDs not validated yet, excluding those whose validation already failed
+        max_attempts times, if given.
+        '''
+        if max_attempts is None:
+            rows = self._execute('SELECT id FROM queue WHERE valid IS NULL LIMIT ?', (limit,))
+        else:
+            rows = self._execute('SELECT id FROM queue WHERE valid IS NULL AND attempts < ? LIMIT ?',
+                                 (max_attempts, limit))
+        return [row[0] for row in rows]
+
+    def set_results(self, results:Dict[str, Optional[bool]]) -> None:
+        '''
+        It saves the validity of IDs. The IDs whose validity is None, because their validation failed,
+        stay pending and their attempts are counted.
+        '''
+        self._execute_many([('UPDATE queue SET valid = ? WHERE id = ?', (int(valid), id))
+                            if valid is not None else
+                            ('UPDATE queue SET attempts = attempts + 1 WHERE id = ?', (id,))
+                            for id, valid in results.items()])
+
+    def get(self, id:str) -> Optional[bool]:
+        '''
+        It returns the validity of an ID of the queue, or None if it is pending or not in the queue.
+        '''
+        rows = self._execute('SELECT valid FROM queue WHERE id = ?', (id,))
+        return bool(rows[0][0]) if rows and rows[0][0] is not None else None
+
+    def rejected_ids(self) -> Set[str]:
+        '''
+        It returns the IDs of the queue which were not found valid: the invalid ones and those still pending.
+        '''
+        return {row[0] for row in self._execute('SELECT id FROM queue WHERE valid IS NULL OR valid = 0')}
+
+    def __len__(self) -> int:
+        return self._execute('SELECT COUNT(*) FROM queue')[0][0]
+
+    def stats(self) -> Dict[str, int]:
+        counts = dict(self._execute('SELECT valid, COUNT(*) FROM queue GROUP BY valid'))
+        return {'pending': counts.get(None, 0), 'valid': counts.get(1, 0), 'invalid': counts.get(0, 0)}
+
+    def close(self) -> None:
+        with self._lock:
+            self.con.close()
+
+
+class RateLimiter(object):
+    '''
+    This class spaces out the requests of the threads which share it, so that at most rate requests
+    per second are sent.
+
+    :params rate: the maximum number of requests per second (0 or None: no limit)
+    :type rate: float|None
+    '''
+    def __init__(self, rate:float|None):
+        self.interval = 1.0 / rate if rate else 0.0
+        self._next = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self) -> None:
+        '''
+        It waits until the next request can be sent.
+        '''
+        if not self.interval:
+            return
+        with self._lock:
+            now = time.monotonic()
+            wait = self._next - now
+            self._next = max(self._next, now) + self.interval
+        if wait > 0:
+            time.sleep(wait)
+
+
+def get_validation_queue_config(config_filepath:str|None=None) -> dict:
+    '''
+    This function reads the [validation_queue] section of the configuration file of the data sources: the
+    SQLite file of the queue of the deferred validation ("filepath", empty to validate the IDs during the
+    conversion), the maximum number of requests per second ("rate"), the number of concurrent validations
+    ("workers") and the number of failed validations after which an ID is not validated again ("max_attempts").
+    '''
+    config = configparser.ConfigParser(allow_no_value=True)
+    config.read(config_filepath if config_filepath else os.path.join(os.path.dirname(datasource.__file__), 'config.ini'))
+    return {
+        'filepath': config.get('validation_queue', 'filepath', fallback='') or None,
+        'rate': config.getfloat('validation_queue', 'rate', fallback=10.0),
+        'workers': config.getint('validation_queue', 'workers', fallback=8),
+        'max_attempts': config.getint('validation_queue', 'max_attempts', fallback=3)
+    }
+
+def get_validation_queue(config_filepath:str|None=None) -> ValidationQueue|None:
+    '''
+    This function returns the queue of the deferred validation set in the configuration file of the data
+    sources, if any.
+    '''
+    filepath = get_validation_queue_config(config_filepath)['filepath']
+    return ValidationQueue(filepath) if filepath else None
+
+def _check(id_manager:IdentifierManager, limiter:RateLimiter, id:str) -> Optional[bool]:
+    limiter.acquire()
+    return check_exists(id_manager, id)
+
+def drain_validation_queue(queue:ValidationQueue, id_manager:IdentifierManager, rate:float|None=10.0,
+                           workers:int=8, max_attempts:int=3, batch_size:int=1000) -> Dict[str, int]:
+    '''
+    This function validates the pending IDs of a queue through the API of an ID manager, with at most
+    workers concurrent requests and at most rate requests per second. The IDs already in the storage,
+    in the oracle or in the negative cache of the manager are not requested. The validity of the IDs is
+    saved in the queue and in the storage of the manager, so that they are not validated again by the next
+    runs, and the invalid IDs are added to its negative cache. The IDs whose validation failed, e.g.
+    because of a timeout, are validated again, up to max_attempts times.
+
+    :params queue: the queue
+    :type queue: ValidationQueue
+    :params id_manager: the manager of the IDs of the queue, e.g. a DOIManager
+    :type id_manager: IdentifierManager
+    :params rate: the maximum number of requests per second (0 or None: no limit)
+    :type rate: float|None
+    :params workers: the maximum number of concurrent requests
+    :type workers: int
+    :params max_attempts: the number of failed validations after which an ID is left pending
+    :type max_attempts: int
+    :params batch_size: the number of IDs taken from the queue at once
+    :type batch_size: int
+    :returns: Dict[str, int] -- the number of IDs found valid, invalid and whose validation failed
+    '''
+    limiter = RateLimiter(rate)
+    counts = {'valid': 0, 'invalid': 0, 'failed': 0}
+    with ThreadPoolExecutor(max_workers=max(1, workers)) as executor:
+        while True:
+            ids = queue.pending(batch_size, max_attempts)
+            if not ids:
+                break
+            results = {id: known_validity(id_manager, id) for id in ids}
+            to_check = [id for id, valid in results.items() if valid is None]
+            # only the requests run in the threads, while the storage is written by this thread
+            results.update(zip(to_check, executor.map(lambda id: _check(id_manager, limiter, id), to_check)))
+            checked = set(to_check)
+            for id, valid in results.items():
+                if valid is False and id in checked:
+                    id_manager.record_invalid(id, NOT_FOUND)
+            id_manager.storage_manager.set_multi_value([(id, valid) for id, valid in results.items()
+                                                        if valid is not None])
+            queue.set_results(results)
+            for valid in results.values():
+                counts['failed' if valid is None else 'valid' if valid else 'invalid'] += 1
+    id_manager.storage_manager.store_file()
+    return counts
+
+def _csv_filepaths(paths:Iterable[str]) -> List[str]:
+    filepaths = list()
+    for path in paths:
+        if os.path.isdir(path):
+            for dirpath, _, filenames in os.walk(path):
+                filepaths.extend(os.path.join(dirpath, filename) for filename in sorted(filenames)
+                                 if filename.endswith('.csv'))
+        elif os.path.exists(path):
+            filepaths.append(path)
+    return filepaths
+
+def filter_rows(queue:ValidationQueue, paths:Iterable[str]) -> int:
+    '''
+    This function is the final pass of the deferred validation: it removes from the CSV tables produced by
+    the drivers the rows of the entities ("id" column) and the citations ("citing" and "cited" columns) with
+    an ID of the queue which was not found valid. A table is rewritten only if rows are removed.
+
+    :params queue: the drained queue
+    :type queue: ValidationQueue
+    :params paths: the CSV tables, or the directories with them, e.g. those of the cited entities and of the citations
+    :type paths: Iterable[str]
+    :returns: int -- the number of rows removed
+    '''
+    rejected = queue.rejected_ids()
+    if not rejected:
+        return 0
+    removed = 0
+    for filepath in _csv_filepaths(paths):
+        with open(filepath, 'r', encoding='utf-8', newline='') as f:
+            reader = csv.DictReader(f, delimiter=',', quotechar='"', escapechar='\\')
+            fieldnames = reader.fieldnames
+            rows = list(reader)
+        kept = [row for row in rows if not any(id in rejected for id in
+                                                (row.get('id') or '').split() + [row.get('citing'), row.get('cited')])]
+        if len(kept) == len(rows):
+            continue
+        removed += len(rows) - len(kept)
+        with open(filepath, 'w', encoding='utf-8', newline='') as f:
+            writer = csv.DictWriter(f, fieldnames, delimiter=',', quotechar='"', quoting=csv.QUOTE_NONNUMERIC,
+                                    escapechar='\\')
+            writer.writeheader()
+            writer.writerows(kept)
+    return removed
@@ -0,0 +1,224 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+# Copyright (c) 2026 The OpenCitations Index Authors.
+#
+# Permission to use, copy, modify, and/or distribute this software for any purpose
+# with or without fee is hereby granted, provided that the above copyright notice
+# and this permission notice appear in all copies.
+#
+# THE SOFTWARE IS PROVIDED "AS IS" AND THE AUTHOR DISCLAIMS ALL WARRANTIES WITH
+# REGARD TO THIS SOFTWARE INCLUDING ALL IMPLIED WARRANTIES OF MERCHANTABILITY AND
+# FITNESS. IN NO EVENT SHALL THE AUTHOR BE LIABLE FOR ANY SPECIAL, DIRECT, INDIRECT,
+# OR CONSEQUENTIAL DAMAGES OR ANY DAMAGES WHATSOEVER RESULTING FROM LOSS OF USE,
+# DATA OR PROFITS, WHETHER IN AN ACTION OF CONTRACT, NEGLIGENCE OR OTHER TORTIOUS
+# ACTION, ARISING OUT OF OR IN CONNECTION WITH THE USE OR PERFORMANCE OF THIS
+# SOFTWARE.
+
+
+from __future__ import annotations
+
+import heapq
+import os
+import tempfile
+from itertools import groupby
+from operator import itemgetter
+from pathlib import Path
+from typing import Iterable, Iterator, List, Tuple
+
+import zstandard as zstd
+
+from oc_ds_converter.oc_idmanager.oc_data_storage.storage_manager import StorageManager
+
+DUMP_MAGIC = b'OCVALID1'
+# the size of the blocks written to and read from the compressed stream
+READ_SIZE = 1 << 20
+
+
+def _varint(value:int) -> bytes:
+    encoded = bytearray()
+    while value > 0x7f:
+        encoded.append((value & 0x7f) | 0x80)
+        value >>= 7
+    encoded.append(value)
+    return bytes(encoded)
+
+def write_dump(id_values:Iterable[Tuple[str, bool]], filepath:str) -> int:
+    '''
+    This function saves the validity values of IDs, sorted by ID, in a dump: a zstandard-compressed stream
+    of records, each made of the length of the prefix shared with the previous ID, the length of the rest
+    of the ID, the rest of the ID and the validity value. The file is replaced atomically.
+
+    :params id_values: the IDs and their validity values, sorted by ID and without duplicates
+    :type id_values: Iterable[Tuple[str, bool]]
+    :params filepath: the path of the dump
+    :type filepath: str
+    :returns: int -- the number of IDs saved
+    '''
+    Path(os.path.abspath(os.path.join(filepath, os.pardir))).mkdir(parents=True, exist_ok=True)
+    tmp_filepath = filepath + '.tmp'
+    saved = 0
+    previous = b''
+    with open(tmp_filepath, 'wb') as f:
+        with zstd.ZstdCompressor().stream_writer(f, closefd=False) as writer:
+            writer.write(DUMP_MAGIC)
+            buffer = bytearray()
+            for id, value in id_values:
+                id_bytes = id.encode('utf-8')
+                if id_bytes <= previous and saved:
+                    raise ValueError(f'the IDs of a dump must be sorted and unique: {id} after {previous.decode("utf-8")}')
+                # the IDs are sorted, so the prefix shared with the previous one (e.g. "doi:10.1") is not repeated
+                shared = 0
+                limit = min(len(previous), len(id_bytes))
+                while shared < limit and previous[shared] == id_bytes[shared]:
+                    shared += 1
+                buffer += _varint(shared) + _varint(len(id_bytes) - shared) + id_bytes[shared:] + (b'\x01' if value else b'\x00')
+                previous = id_bytes
+                saved += 1
+                if len(buffer) >= READ_SIZE:
+                    writer.write(bytes(buffer))
+                    buffer = bytearray()
+            writer.write(bytes(buffer))
+    os.replace(tmp_filepath, filepath)
+    return saved
+
+def read_dump(filepath:str) -> Iterator[Tuple[str, bool]]:
+    '''
+    This function streams the IDs and their validity values saved in a dump, sorted by ID.
+
+    :params filepath: the path of the dump
+    :type filepath: str
+    :returns: Iterator[Tuple[str, bool]] -- the IDs and their validity values
+    '''
+    with open(filepath, 'rb') as f:
+        with zstd.ZstdDecompressor().stream_reader(f) as reader:
+            data = reader.read(READ_SIZE)
+            if data[:len(DUMP_MAGIC)] != DUMP_MAGIC:
+                raise ValueError(f'{filepath} is not a dump of validity values')
+            position = len(DUMP_MAGIC)
+            previous = b''
+            while True:
+                # a record is read only if it is complete in the buffer, otherwise more data are read
+                start = position
+                try:
+                    values = []
+                    for _ in range(2):
+                        value, shift = 0, 0
+                        while True:
+                            byte = data[position]
+                            position += 1
+                            value |= (byte & 0x7f) << shift
+                            shift += 7
+                            if byte < 0x80:
+                                break
+                        values.append(value)
+                    shared, rest = values
+                    if position + rest >= len(data):
+                        raise IndexError
+                    id_bytes = previous[:shared] + data[position:position + rest]
+                    validity = data[position + rest] == 1
+                    position += rest + 1
+                except IndexError:
+                    more = reader.read(READ_SIZE)
+                    if not more:
+                        if start < len(data):
+                            raise ValueError(f'{filepath} is truncated')
+                        return
+                    data = data[start:] + more
+                    position = 0
+                    continue
+                previous = id_bytes
+                yield id_bytes.decode('utf-8'), validity
+
+def merge_id_values(*sorted_id_values:Iterable[Tuple[str, bool]]) -> Iterator[Tuple[str, bool]]:
+    '''
+    This function merges several streams of IDs and validity values sorted by ID into a single sorted
+    stream without duplicates. As in the merge of the storages of the shards of a run, an ID is valid if
+    at least one stream reports it as valid.
+    '''
+    for id, id_values in groupby(heapq.merge(*sorted_id_values, key=itemgetter(0)), key=itemgetter(0)):
+        yield id, any(value for _, value in id_values)
+
+def export_storage(storage_manager:StorageManager, filepath:str, chunk_size:int=5000000) -> int:
+    '''
+    This function saves the validity values of a storage in a dump. The values are sorted in chunks of
+    chunk_size IDs, saved in temporary dumps and merged, so that the memory used does not depend on the
+    size of the storage, except for the values returned by the storage manager.
+
+    :params storage_manager: the storage to be exported
+    :type storage_manager: StorageManager
+    :params filepath: the path of the dump
+    :type filepath: str
+    :params chunk_size: the number of IDs sorted in memory at once
+    :type chunk_size: int
+    :returns: int -- the number of IDs saved
+    '''
+    Path(os.path.abspath(os.path.join(filepath, os.pardir))).mkdir(parents=True, exist_ok=True)
+    tmp_dir = tempfile.mkdtemp(dir=os.path.dirname(os.path.abspath(filepath)))
+    try:
+        chunk_filepaths: List[str] = list()
+        chunk = list()
+        for id_value in storage_manager.get_validity_list_of_tuples():
+            chunk.append(id_value)
+            if len(chunk) >= chunk_size:
+                chunk_filepaths.append(_save_chunk(chunk, tmp_dir, len(chunk_filepaths)))
+                chunk = list()
+        if not chunk_filepaths:
+            return write_dump(_sort(chunk), filepath)
+        if chunk:
+            chunk_filepaths.append(_save_chunk(chunk, tmp_dir, len(chunk_filepaths)))
+        return merge_dumps(chunk_filepaths, filepath)
+    finally:
+        for chunk_filepath in os.listdir(tmp_dir):
+            os.remove(os.path.join(tmp_dir, chunk_filepath))
+        os.rmdir(tmp_dir)
+
+def _sort(chunk:List[Tuple[str, bool]]) -> Iterator[Tuple[str, bool]]:
+    # the order of the code points is the order of the UTF-8 bytes, used by the dumps
+    chunk.sort(key=itemgetter(0))
+    return merge_id_values(chunk)
+
+def _save_chunk(chunk:List[Tuple[str, bool]], tmp_dir:str, index:int) -> str:
+    chunk_filepath = os.path.join(tmp_dir, f'{index}.dump')
+    write_dump(_sort(chunk), chunk_filepath)
+    return chunk_filepath
+
+def merge_dumps(filepaths:List[str], filepath:str) -> int:
+    '''
+    This function merges several dumps, e.g. exported from the storages of different hosts, into a new one.
+    An ID is valid if at least one dump reports it as valid.
+
+    :params filepaths: the paths of the dumps to be merged
+    :type filepaths: List[str]
+    :params filepath: the path of the new dump
+    :type filepath: str
+    :returns: int -- the number of IDs saved
+    '''
+    return write_dump(merge_id_values(*[read_dump(dump_filepath) for dump_filepath in filepaths]), filepath)
+
+def import_dumps(filepaths:List[str], storage_manager:StorageManager, batch_size:int=100000) -> int:
+    '''
+    This function loads the validity values saved in one or more dumps into a storage, through bulk writes of
+    batch_size IDs, e.g. to start a new run with the IDs already validated. If the dumps disagree, an ID is
+    valid if at least one of them reports it as valid. The values already in the storage are overwritten.
+
+    :params filepaths: the paths of the dumps
+    :type filepaths: List[str]
+    :params storage_manager: the storage where the values are loaded
+    :type storage_manager: StorageManager
+    :params batch_size: the number of IDs of each bulk write
+    :type batch_size: int
+    :returns: int -- the number of IDs loaded
+    '''
+    loaded = 0
+    batch = list()
+    for id_value in merge_id_values(*[read_dump(filepath) for filepath in filepaths]):
+        batch.append(id_value)
+        if len(batch) >= batch_size:
+            storage_manager.set_multi_value(batch)
+            loaded += len(batch)
+            batch = list()
+    if batch:
+        storage_manager.set_multi_value(batch)
+        loaded += len(batch)
+    storage_manager.store_file()
+    return loaded
@@ -22,6 +22,8 @@ from urllib.parse import quote, unquote
 import xmltodict
 from oc_ds_converter.oc_idmanager import *
 from oc_ds_converter.oc_idmanager.base import IdentifierManager
+from oc_ds_converter.oc_idmanager.negative_cache import SYNTAX
+from oc_ds_converter.oc_idmanager.support import call_api, get_batches, prepare_batch, set_api_failed
 from requests import ReadTimeout, get
 from requests.exceptions import ConnectionError
 from oc_ds_converter.oc_idmanager.oc_data_storage.storage_manager import StorageManager
@@ -45,6 +47,9 @@ class ArXivManager(IdentifierManager):
         self._p = "arxiv:"
         self._api = f'https://export.arxiv.org/api/query?search_query=all:'
         self._api_v = f'https://arxiv.org/abs/'
+        # the id_list of a query is limited to 100 arXiv IDs per request
+        self._api_batch = 'https://export.arxiv.org/api/query'
+        self._batch_size = 100
         self._headers = {
             "User-Agent": "Identifier Manager / OpenCitations Indexes "
                           "(http://opencitations.net; mailto:contact@opencitations.net)"
@@ -78,14 +83,27 @@ class ArXivManager(IdentifierManager):
                 if get_extra_info:
                     return arxiv_vaidation_value, {"id":arxiv, "valid":arxiv_vaidation_value}
                 return arxiv_vaidation_value
+            elif not self.syntax_ok(arxiv):
+                self.record_invalid(arxiv, SYNTAX)
+                self.storage_manager.set_value(arxiv, False)
+                if get_extra_info:
+                    return False, {"id": arxiv, "valid": False}
+                return False
+            elif self.cached_as_invalid(arxiv):
+                # the arXiv ID was found invalid before, e.g. by a previous run, and this result is not expired yet
+                if get_extra_info:
+                    return False, {"id": arxiv, "valid": False}
+                return False
             else:
                 if get_extra_info:
                     info = self.exists(arxiv, get_extra_info=True)
-                    self.storage_manager.set_full_value(arxiv,info[1])
-                    return (info[0] and self.syntax_ok(arxiv)), info[1]
-                validity_check = self.exists(arxiv) and self.syntax_ok(arxiv)
-                self.storage_manager.set_value(arxiv, validity_check)
-
+                    # the result of a failed request is not stored, so that the arXiv ID is checked again
+                    if info[0] or self.record_invalid(arxiv):
+                        self.storage_manager.set_full_value(arxiv, info[1])
+                    return info[0], info[1]
+                validity_check = self.exists(arxiv)
+                if validity_check or self.record_invalid(arxiv):
+                    self.storage_manager.set_value(arxiv, validity_check)
                 return validity_check
 
     def normalise(self, id_string, include_prefix=False):
@@ -149,6 +167,7 @@ class ArXivManager(IdentifierManager):
         Returns:
             bool: True if the arxiv exists (is registered), False otherwise.
         """
+        set_api_failed(False)
         valid_bool = True
         if self._use_api_service:
             arxiv_full_norm = self.normalise(arxiv_full, include_prefix=False)
@@ -213,6 +232,8 @@ class ArXivManager(IdentifierManager):
                     except ConnectionError:
                         # Sleep 5 seconds, then try again
                         sleep(5)
+                # all the attempts failed, so the existence of the ID is not known
+                set_api_failed(True)
                 valid_bool = False
             else:
                 if get_extra_info:
@@ -223,6 +244,39 @@ class ArXivManager(IdentifierManager):
         return valid_bool
 
 
+    def exists_batch(self, id_strings):
+        existence, arxiv_ids = prepare_batch(self, id_strings)
+        if not self._use_api_service:
+            existence.update(dict.fromkeys(arxiv_ids, True))
+            return existence
+        # the IDs are requested without their version, the API returns the last version of each of them
+        versions = dict()
+        for arxiv_id in arxiv_ids:
+            base_id, version = search(r"^(.+?)v(\d+)$", arxiv_id[len(self._p):]).groups()
+            versions[arxiv_id] = (base_id, int(version))
+        base_ids = list(dict.fromkeys(base_id for base_id, _ in versions.values()))
+        last_versions = dict()
+        requested = set()
+        for batch in get_batches(base_ids, self._batch_size):
+            xml_res = call_api(url=self._api_batch, headers=self._headers, r_format="text",
+                               params={"id_list": ",".join(batch), "max_results": len(batch)})
+            if not xml_res:
+                continue
+            try:
+                feed = xmltodict.parse(xml_res).get("feed") or dict()
+            except Exception:
+                continue
+            requested.update(batch)
+            entries = feed.get("entry") or []
+            for entry in entries if isinstance(entries, list) else [entries]:
+                found = search(r"/abs/(.+?)v(\d+)$", str(entry.get("id", ""))) if isinstance(entry, dict) else None
+                if found:
+                    last_versions[found.group(1)] = max(int(found.group(2)), last_versions.get(found.group(1), 0))
+        for arxiv_id, (base_id, version) in versions.items():
+            if base_id in requested:
+                existence[arxiv_id] = version <= last_versions.get(base_id, 0)
+        return existence
+
     def extra_info(self, api_response, choose_api=None, info_dict:dict={}):
         result = {}
         result["valid"] = True
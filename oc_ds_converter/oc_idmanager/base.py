@@ -17,6 +17,9 @@
 
 from abc import ABCMeta, abstractmethod
 
+from oc_ds_converter.oc_idmanager.negative_cache import API_ERROR, NOT_FOUND, get_shared_negative_cache
+from oc_ds_converter.oc_idmanager.support import api_failed, set_api_failed
+
 
 class IdentifierManager(metaclass=ABCMeta):
     """This is the interface that must be implemented by any identifier manager
@@ -49,6 +52,58 @@ class IdentifierManager(metaclass=ABCMeta):
     def validated_as_id(self, id_string):
         return None
 
+    def validity_info(self, id_string, validity):
+        """Returns the information saved about an id whose validity was decided without the API,
+        e.g. by its syntax or by an oracle.
+
+        Args:
+            id_string (str): the id, normalised with its prefix
+            validity (bool): the validity of the id
+        Returns:
+            dict: the id without its prefix and its validity.
+        """
+        return {"id": id_string[len(getattr(self, "_p", "")):], "valid": validity}
+
+    @property
+    def negative_cache(self):
+        """The cache of the ids found invalid (see oc_ds_converter/oc_idmanager/negative_cache.py),
+        by default the one set in the configuration file, shared by all the id managers."""
+        if not hasattr(self, "_negative_cache"):
+            self._negative_cache = get_shared_negative_cache()
+        return self._negative_cache
+
+    @negative_cache.setter
+    def negative_cache(self, negative_cache):
+        self._negative_cache = negative_cache
+
+    def cached_as_invalid(self, id_string):
+        """Returns True if the id was found invalid and this negative result is not expired yet.
+
+        Args:
+            id_string (str): the id, normalised with its prefix
+        Returns:
+            bool: True if the id is in the negative cache, False otherwise.
+        """
+        return self.negative_cache is not None and id_string in self.negative_cache
+
+    def record_invalid(self, id_string, reason=None):
+        """Records an invalid id in the negative cache, if any. If no reason is given, it is
+        "api-error" if the last API request failed and "not-found" otherwise.
+
+        Args:
+            id_string (str): the id, normalised with its prefix
+            reason (str, optional): "syntax", "not-found" or "api-error"
+        Returns:
+            bool: False if the id could not be checked because of an API error, so that this
+                transient result must not be stored as the validity of the id, True otherwise.
+        """
+        if reason is None:
+            reason = API_ERROR if api_failed() else NOT_FOUND
+            set_api_failed(False)
+        if self.negative_cache is not None:
+            self.negative_cache.add(id_string, reason)
+        return reason != API_ERROR
+
     @abstractmethod
     def normalise(self, id_string, include_prefix=False):
         """Returns the id normalized.
@@ -99,6 +154,25 @@ class IdentifierManager(metaclass=ABCMeta):
         """
         return True
 
+    def exists_batch(self, id_strings):
+        """  Returns whether several ids exist, checked with as few requests as possible.
+        The child classes whose API accepts several ids per request check them in batches,
+        the others check them one by one.
+
+        Args:
+            id_strings (Iterable[str]): the id strings to check
+        Returns:
+            dict: the existence of each id, normalised with its prefix: True if it exists, False
+                if it does not exist or is malformed, None if it could not be checked (e.g. because
+                of a network error)
+        """
+        existence = dict()
+        for id_string in id_strings:
+            id_string = self.normalise(id_string, include_prefix=True) if id_string else None
+            if id_string and id_string not in existence:
+                existence[id_string] = self.syntax_ok(id_string) and self.exists(id_string)
+        return existence
+
     def extra_info(self, api_response, choose_api=None, info_dict={}):
         """  Returns a dictionary with extra info about the id, if available.
         Not all child classes check id existence because of API policies
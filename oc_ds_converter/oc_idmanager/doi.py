@@ -26,20 +26,26 @@ from oc_ds_converter.oc_idmanager.isbn import ISBNManager
 from oc_ds_converter.oc_idmanager.issn import ISSNManager
 from oc_ds_converter.oc_idmanager.orcid import ORCIDManager
 from oc_ds_converter.oc_idmanager.support import call_api
+from oc_ds_converter.oc_idmanager.validation_pipeline import PrefixRegistry, ValidationPipeline
 
 from oc_ds_converter.metadata_manager import MetadataManager
 from oc_ds_converter.oc_idmanager.oc_data_storage.storage_manager import StorageManager
 from oc_ds_converter.oc_idmanager.oc_data_storage.in_memory_manager import InMemoryStorageManager
 # from oc_ds_converter.oc_idmanager.oc_data_storage.sqlite_manager import SqliteStorageManager
-from typing import Optional, Type, Tuple
+from typing import Container, Optional, Type, Tuple
 
 
 class DOIManager(IdentifierManager):
     """This class implements an identifier manager for doi identifier"""
 
-    def __init__(self, use_api_service=True, storage_manager:Optional[StorageManager] = None):
-        """DOI manager constructor."""
+    def __init__(self, use_api_service=True, storage_manager:Optional[StorageManager] = None, oracle:Optional[Container] = None,
+                 prefix_registry:Optional[PrefixRegistry] = None):
+        """DOI manager constructor. If an oracle is provided (e.g. the index of the PubMed IDs created with
+        oc_ds_converter/run/pubmed_crosswalk.py), the DOIs it contains are valid without any API request. If a
+        registry of the known DOI prefixes is provided, the DOIs whose prefix is not known are invalid."""
         super(DOIManager,self).__init__()
+        self.oracle = oracle
+        self.prefix_registry = prefix_registry
         if storage_manager is None:
             self.storage_manager = InMemoryStorageManager()
         else:
@@ -59,6 +65,7 @@ class DOIManager(IdentifierManager):
         self._api_unknown = "https://doi.org/ra/"
         self._use_api_service = use_api_service
         self._p = "doi:"
+        self.validation_pipeline = ValidationPipeline(self)
         self._issnm = ISSNManager()
         self._isbnm = ISBNManager()
         self._om = ORCIDManager()
@@ -112,21 +119,11 @@ class DOIManager(IdentifierManager):
             return None
 
     def is_valid(self, id_string, get_extra_info=False):
-        doi = self.normalise(id_string, include_prefix=True)
-        if doi is None:
-            return False
-        else:
-            doi_vaidation_value = self.storage_manager.get_value(doi)
-            if isinstance(doi_vaidation_value, bool):
-                return doi_vaidation_value
-            else:
-                if get_extra_info:
-                    info = self.exists(doi, get_extra_info=True)
-                    self.storage_manager.set_full_value(doi,info[1])
-                    return (info[0] and self.syntax_ok(doi)), info[1]
-                validity_check = self.exists(doi) and self.syntax_ok(doi)
-                self.storage_manager.set_value(doi, validity_check)
-                return validity_check
+        # the syntax is checked before the storage and the API, so that a malformed DOI costs no request
+        return self.validation_pipeline.is_valid(id_string, get_extra_info)
+
+    def validity_info(self, id_string, validity):
+        return {'id': id_string[len(self._p):], 'valid': validity, 'ra': 'unknown'}
 
     def base_normalise(self, id_string):
         try:
@@ -36,11 +36,8 @@ class ISSNManager(IdentifierManager):
             return False
         else:
             if issn not in self._data or self._data[issn] is None:
-                self._data[issn] = {"valid":self.check_digit(issn) and self.syntax_ok(issn)}
-                return (
-                    self.syntax_ok(issn)
-                    and self.check_digit(issn)
-                )
+                # the syntax is checked first, since the check digit requires 8 characters
+                self._data[issn] = {"valid": self.syntax_ok(issn) and self.check_digit(issn)}
             return self._data[issn].get("valid")
 
     def normalise(self, id_string, include_prefix=False):
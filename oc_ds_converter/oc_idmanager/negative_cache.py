@@ -0,0 +1,156 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+# Copyright (c) 2026 The OpenCitations Index Authors.
+#
+# Permission to use, copy, modify, and/or distribute this software for any purpose
+# with or without fee is hereby granted, provided that the above copyright notice
+# and this permission notice appear in all copies.
+#
+# THE SOFTWARE IS PROVIDED "AS IS" AND THE AUTHOR DISCLAIMS ALL WARRANTIES WITH
+# REGARD TO THIS SOFTWARE INCLUDING ALL IMPLIED WARRANTIES OF MERCHANTABILITY AND
+# FITNESS. IN NO EVENT SHALL THE AUTHOR BE LIABLE FOR ANY SPECIAL, DIRECT, INDIRECT,
+# OR CONSEQUENTIAL DAMAGES OR ANY DAMAGES WHATSOEVER RESULTING FROM LOSS OF USE,
+# DATA OR PROFITS, WHETHER IN AN ACTION OF CONTRACT, NEGLIGENCE OR OTHER TORTIOUS
+# ACTION, ARISING OUT OF OR IN CONNECTION WITH THE USE OR PERFORMANCE OF THIS
+# SOFTWARE.
+
+
+from __future__ import annotations
+
+import configparser
+import os
+import sqlite3
+import threading
+import time
+from functools import lru_cache
+from pathlib import Path
+from typing import Dict, Optional, Tuple
+
+from oc_ds_converter import datasource
+
+# the reasons why an ID is invalid
+SYNTAX = "syntax"
+NOT_FOUND = "not-found"
+API_ERROR = "api-error"
+# the seconds after which an invalid ID is checked again, for each reason (None: never)
+DEFAULT_TTLS = {SYNTAX: None, NOT_FOUND: 30 * 24 * 3600, API_ERROR: 3600}
+
+
+class NegativeCache(object):
+    '''
+    This class keeps the IDs found invalid, e.g. the malformed DOIs of the references and the ORCIDs which do
+    not exist, with the reason why they are invalid, so that they are not validated again by the next runs
+    and on the next dumps, whatever the storage manager and even if they were validated by the temporary
+    managers of a driver, whose storage is discarded. An invalid ID is checked again once the time to live of
+    its reason is expired: the IDs whose check failed because of an API error (e.g. a timeout) are only kept
+    for a short time, so that a transient error does not make them invalid. The IDs are kept in a SQLite
+    database, which is shared by the processes if a file is provided, and in memory otherwise.
+
+    :params filepath: the SQLite file of the cache, if any
+    :type filepath: str|None
+    :params ttls: the time to live in seconds of each reason (None: never expires), replacing the default ones
+    :type ttls: Dict[str, int|None]|None
+    '''
+    def __init__(self, filepath:str|None=None, ttls:Dict[str, Optional[int]]|None=None):
+        self.filepath = filepath
+        self.ttls = dict(DEFAULT_TTLS)
+        if ttls:
+            self.ttls.update(ttls)
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        if filepath:
+            Path(os.path.abspath(os.path.join(filepath, os.pardir))).mkdir(parents=True, exist_ok=True)
+        self._connect()
+
+    def _connect(self) -> None:
+        # a connection is not shared with the processes forked after its creation
+        self._pid = os.getpid()
+        self.con = sqlite3.connect(self.filepath if self.filepath else ':memory:', timeout=60,
+                                   check_same_thread=False, isolation_level=None)
+        if self.filepath:
+            self.con.execute('PRAGMA journal_mode=WAL')
+        self.con.execute('CREATE TABLE IF NOT EXISTS invalid(id TEXT PRIMARY KEY, reason TEXT, expires REAL)')
+
+    def _execute(self, query:str, parameters:tuple=()) -> Tuple[list, int]:
+        with self._lock:
+            if os.getpid() != self._pid:
+                self._connect()
+            cursor = self.con.execute(query, parameters)
+            # the rows are fetched before another thread uses the connection
+            return cursor.fetchall(), cursor.rowcount
+
+    def add(self, id:str, reason:str) -> None:
+        '''
+        It records that an ID, normalised with its prefix, is invalid.
+
+        :params id: the ID, e.g. "doi:10.1007/abc"
+        :type id: str
+        :params reason: why the ID is invalid: SYNTAX, NOT_FOUND or API_ERROR
+        :type reason: str
+        '''
+        if reason not in self.ttls:
+            raise ValueError(f"unknown reason: {reason}")
+        ttl = self.ttls[reason]
+        self._execute('INSERT OR REPLACE INTO invalid VALUES (?, ?, ?)',
+                      (id, reason, time.time() + ttl if ttl is not None else None))
+
+    def get(self, id:str) -> Optional[str]:
+        '''
+        It returns the reason why an ID is invalid, or None if it is not in the cache or its time to live is expired.
+        '''
+        rows, _ = self._execute('SELECT reason FROM invalid WHERE id = ? AND (expires IS NULL OR expires > ?)',
+                                (id, time.time()))
+        if rows:
+            self.hits += 1
+            return rows[0][0]
+        self.misses += 1
+        return None
+
+    def __contains__(self, id:str) -> bool:
+        return self.get(id) is not None
+
+    def remove(self, id:str) -> None:
+        self._execute('DELETE FROM invalid WHERE id = ?', (id,))
+
+    def purge(self) -> int:
+        '''
+        It deletes the IDs whose time to live is expired, and returns their number.
+        '''
+        return self._execute('DELETE FROM invalid WHERE expires IS NOT NULL AND expires <= ?', (time.time(),))[1]
+
+    def stats(self) -> Dict[str, int]:
+        counts = dict(self._execute('SELECT reason, COUNT(*) FROM invalid WHERE expires IS NULL OR expires > ? '
+                                    'GROUP BY reason', (time.time(),))[0])
+        stats = {reason: counts.get(reason, 0) for reason in self.ttls}
+        stats.update({'hits': self.hits, 'misses': self.misses})
+        return stats
+
+    def close(self) -> None:
+        with self._lock:
+            self.con.close()
+
+
+def get_negative_cache(config_filepath:str|None=None) -> NegativeCache|None:
+    '''
+    This function returns the negative cache set in the [negative_cache] section of the configuration file of
+    the data sources ("filepath"), with the times to live of the reasons set there, if any.
+    '''
+    config = configparser.ConfigParser(allow_no_value=True)
+    config.read(config_filepath if config_filepath else os.path.join(os.path.dirname(datasource.__file__), 'config.ini'))
+    filepath = config.get('negative_cache', 'filepath', fallback='') or None
+    if not filepath:
+        return None
+    ttls = dict()
+    for reason in DEFAULT_TTLS:
+        ttl = config.get('negative_cache', reason.replace('-', '_') + '_ttl', fallback=None)
+        if ttl is not None:
+            ttls[reason] = int(ttl) if ttl.strip() else None
+    return NegativeCache(filepath, ttls)
+
+@lru_cache(maxsize=None)
+def get_shared_negative_cache() -> NegativeCache|None:
+    '''
+    This function returns the negative cache of the configuration file, shared by all the ID managers of a process.
+    '''
+    return get_negative_cache()
@@ -0,0 +1,159 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+# Copyright (c) 2026 The OpenCitations Index Authors.
+#
+# Permission to use, copy, modify, and/or distribute this software for any purpose
+# with or without fee is hereby granted, provided that the above copyright notice
+# and this permission notice appear in all copies.
+#
+# THE SOFTWARE IS PROVIDED "AS IS" AND THE AUTHOR DISCLAIMS ALL WARRANTIES WITH
+# REGARD TO THIS SOFTWARE INCLUDING ALL IMPLIED WARRANTIES OF MERCHANTABILITY AND
+# FITNESS. IN NO EVENT SHALL THE AUTHOR BE LIABLE FOR ANY SPECIAL, DIRECT, INDIRECT,
+# OR CONSEQUENTIAL DAMAGES OR ANY DAMAGES WHATSOEVER RESULTING FROM LOSS OF USE,
+# DATA OR PROFITS, WHETHER IN AN ACTION OF CONTRACT, NEGLIGENCE OR OTHER TORTIOUS
+# ACTION, ARISING OUT OF OR IN CONNECTION WITH THE USE OR PERFORMANCE OF THIS
+# SOFTWARE.
+
+from __future__ import annotations
+
+import os
+from typing import Dict
+
+from filelock import FileLock
+
+from oc_ds_converter.lib.bloom_filter import BloomFilter
+from oc_ds_converter.oc_idmanager.oc_data_storage.redis_manager import RedisStorageManager
+from oc_ds_converter.oc_idmanager.oc_data_storage.storage_manager import StorageManager
+
+
+class BloomStorageManager(StorageManager):
+    """A concrete implementation of the ``StorageManager`` interface that checks a Bloom filter of the IDs
+    stored in a backend storage manager before reading them: most IDs never seen before are reported as not
+    found without querying the backend. The filter is built from the IDs of the backend the first time, and
+    saved beside it; the IDs written are added to the filter before being written to the backend, so that
+    an ID in the backend is never missing from the filter, even after a crash. The filter is shared by the
+    processes using the same file: the first one builds it under a lock file, and the others open it. Since
+    the filter is a local file, it cannot filter a redis backend, which may be written by other hosts. The
+    negative answers and the backend reads are counted."""
+
+    def __init__(self, backend: StorageManager, filter_filepath: str = None, capacity: int = 10000000,
+                 error_rate: float = 0.01, **params) -> None:
+        """
+        Constructor of the ``BloomStorageManager`` class.
+
+        :param backend: The storage manager whose IDs are filtered
+        :type backend: StorageManager
+        :param filter_filepath: The file of the filter. If it does not exist, the filter is built from the IDs of
+            the backend; if it is not provided, the filter is kept in memory only
+        :type filter_filepath: str
+        :param capacity: The number of IDs the filter is sized for, at least twice the IDs of the backend
+        :type capacity: int
+        :param error_rate: The probability that an ID not stored is not filtered, with capacity IDs
+        :type error_rate: float
+        :raises ValueError: if ``backend`` is a redis storage manager.
+        """
+        if isinstance(backend, RedisStorageManager):
+            raise ValueError("a redis storage may be shared by other hosts, whose writes would miss the filter")
+        super().__init__(**params)
+        self.backend = backend
+        self.filter_filepath = filter_filepath
+        self.capacity = capacity
+        self.error_rate = error_rate
+        self.negatives = 0
+        self.reads = 0
+        if not filter_filepath:
+            self.bloom_filter = self._build()
+        else:
+            # the processes sharing the storage wait for the first one to build the filter, then open it
+            with FileLock(filter_filepath + ".lock"):
+                if os.path.exists(filter_filepath):
+                    self.bloom_filter = BloomFilter.open(filter_filepath)
+                else:
+                    self.bloom_filter = self._build()
+
+    def _build(self) -> BloomFilter:
+        keys = list(self.backend.get_all_keys() or [])
+        return BloomFilter.create(max(self.capacity, 2 * len(keys)), self.error_rate, self.filter_filepath, ids=keys)
+
+    def set_full_value(self, id: str, value: dict) -> None:
+        """
+        It adds an id to the filter and sets its information in the backend.
+
+        :param value: The information about the id
+        :type value: dict
+        :param id: The id string with prefix
+        :type id: str
+        :return: None
+        """
+        self.bloom_filter.add(str(id))
+        self.backend.set_full_value(id, value)
+
+    def set_value(self, id: str, value: bool) -> None:
+        """
+        It adds an id to the filter and sets its validity value in the backend.
+
+        :param value: The validity value
+        :type value: bool
+        :param id: The id string with prefix
+        :type id: str
+        :raises ValueError: if ``value`` is not a boolean.
+        :return: None
+        """
+        if not isinstance(value, bool):
+            raise ValueError("value must be boolean")
+        self.bloom_filter.add(str(id))
+        self.backend.set_value(id, value)
+
+    def set_multi_value(self, list_of_tuples: list) -> None:
+        """
+        It adds several ids to the filter and sets their validity values in the backend with a single bulk write.
+
+        :param list_of_tuples: a list of tuples of ids and booleans (id, value)
+        :type list_of_tuples: list
+        :return: None
+        """
+        self.bloom_filter.update([str(id) for id, _ in list_of_tuples])
+        self.backend.set_multi_value(list_of_tuples)
+
+    def get_value(self, id: str):
+        """
+        It reads the validity value of an id from the backend, unless the filter reports it as not stored.
+
+        :param id: The id name
+        :type id: str
+        :return: The requested id value (True if valid, False if invalid, None if not found).
+        """
+        if str(id) not in self.bloom_filter:
+            self.negatives += 1
+            return None
+        self.reads += 1
+        return self.backend.get_value(id)
+
+    def might_contain(self, id: str) -> bool:
+        return str(id) in self.bloom_filter
+
+    def stats(self) -> Dict[str, int]:
+        """
+        It returns the number of ids reported as not stored by the filter and of reads of the backend.
+        """
+        return {"negatives": self.negatives, "reads": self.reads}
+
+    def store_file(self) -> None:
+        self.backend.store_file()
+        self.bloom_filter.flush()
+
+    def delete_storage(self):
+        self.backend.delete_storage()
+        self.bloom_filter.close()
+        if self.filter_filepath and os.path.exists(self.filter_filepath):
+            os.remove(self.filter_filepath)
+        self.bloom_filter = BloomFilter.create(self.capacity, self.error_rate)
+
+    def get_all_keys(self):
+        return self.backend.get_all_keys()
+
+    def get_validity_dict(self):
+        return self.backend.get_validity_dict()
+
+    def get_validity_list_of_tuples(self):
+        return self.backend.get_validity_list_of_tuples()
@@ -0,0 +1,141 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+# Copyright (c) 2026 The OpenCitations Index Authors.
+#
+# Permission to use, copy, modify, and/or distribute this software for any purpose
+# with or without fee is hereby granted, provided that the above copyright notice
+# and this permission notice appear in all copies.
+#
+# THE SOFTWARE IS PROVIDED "AS IS" AND THE AUTHOR DISCLAIMS ALL WARRANTIES WITH
+# REGARD TO THIS SOFTWARE INCLUDING ALL IMPLIED WARRANTIES OF MERCHANTABILITY AND
+# FITNESS. IN NO EVENT SHALL THE AUTHOR BE LIABLE FOR ANY SPECIAL, DIRECT, INDIRECT,
+# OR CONSEQUENTIAL DAMAGES OR ANY DAMAGES WHATSOEVER RESULTING FROM LOSS OF USE,
+# DATA OR PROFITS, WHETHER IN AN ACTION OF CONTRACT, NEGLIGENCE OR OTHER TORTIOUS
+# ACTION, ARISING OUT OF OR IN CONNECTION WITH THE USE OR PERFORMANCE OF THIS
+# SOFTWARE.
+
+from __future__ import annotations
+
+from collections import OrderedDict
+from typing import Dict
+
+from oc_ds_converter.oc_idmanager.oc_data_storage.storage_manager import StorageManager
+
+
+class CachedStorageManager(StorageManager):
+    """A concrete implementation of the ``StorageManager`` interface that keeps the validity values read from
+    a backend storage manager in a least recently used cache of bounded size, so that the IDs looked up many
+    times (e.g. the ORCIDs and ISSNs of the same authors and journals) are read from the backend only once.
+    Writes go to the backend and update the cache (write-through). The IDs not found are cached as well:
+    an ID written to the backend by another process is seen only once it leaves the cache, which at worst
+    costs a new validation. The hits and misses of the cache are counted."""
+
+    def __init__(self, backend: StorageManager, max_size: int = 100000, **params) -> None:
+        """
+        Constructor of the ``CachedStorageManager`` class.
+
+        :param backend: The storage manager whose values are cached
+        :type backend: StorageManager
+        :param max_size: The maximum number of ids in the cache
+        :type max_size: int
+        """
+        super().__init__(**params)
+        if max_size < 1:
+            raise ValueError("max_size must be positive")
+        self.backend = backend
+        self.max_size = max_size
+        self.cache: OrderedDict = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def _cache(self, id_name: str, value) -> None:
+        self.cache[id_name] = value
+        self.cache.move_to_end(id_name)
+        if len(self.cache) > self.max_size:
+            self.cache.popitem(last=False)
+
+    def set_full_value(self, id: str, value: dict) -> None:
+        """
+        It sets the information about an id in the backend, and removes the id from the cache.
+
+        :param value: The information about the id
+        :type value: dict
+        :param id: The id string with prefix
+        :type id: str
+        :return: None
+        """
+        self.backend.set_full_value(id, value)
+        # the backends keep either the new or the stored value
+        self.cache.pop(str(id), None)
+
+    def set_value(self, id: str, value: bool) -> None:
+        """
+        It sets the validity value of an id in the backend and in the cache.
+
+        :param value: The validity value
+        :type value: bool
+        :param id: The id string with prefix
+        :type id: str
+        :raises ValueError: if ``value`` is not a boolean.
+        :return: None
+        """
+        if not isinstance(value, bool):
+            raise ValueError("value must be boolean")
+        self.backend.set_value(id, value)
+        self._cache(str(id), value)
+
+    def set_multi_value(self, list_of_tuples: list) -> None:
+        """
+        It sets the validity values of several ids in the backend, with a single bulk write, and in the cache.
+
+        :param list_of_tuples: a list of tuples of ids and booleans (id, value)
+        :type list_of_tuples: list
+        :return: None
+        """
+        self.backend.set_multi_value(list_of_tuples)
+        for id, value in list_of_tuples:
+            self._cache(str(id), value)
+
+    def get_value(self, id: str):
+        """
+        It reads the validity value of an id from the cache or, if it is not cached, from the backend.
+
+        :param id: The id name
+        :type id: str
+        :return: The requested id value (True if valid, False if invalid, None if not found).
+        """
+        id_name = str(id)
+        if id_name in self.cache:
+            self.hits += 1
+            self.cache.move_to_end(id_name)
+            return self.cache[id_name]
+        self.misses += 1
+        value = self.backend.get_value(id_name)
+        self._cache(id_name, value)
+        return value
+
+    def del_value(self, id: str) -> None:
+        self.backend.del_value(id)
+        self.cache.pop(str(id), None)
+
+    def stats(self) -> Dict[str, int]:
+        """
+        It returns the number of ids in the cache, hits and misses.
+        """
+        return {"size": len(self.cache), "hits": self.hits, "misses": self.misses}
+
+    def store_file(self) -> None:
+        self.backend.store_file()
+
+    def delete_storage(self):
+        self.cache.clear()
+        self.backend.delete_storage()
+
+    def get_all_keys(self):
+        return self.backend.get_all_keys()
+
+    def get_validity_dict(self):
+        return self.backend.get_validity_dict()
+
+    def get_validity_list_of_tuples(self):
+        return self.backend.get_validity_list_of_tuples()
@@ -0,0 +1,258 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+# Copyright (c) 2026 The OpenCitations Index Authors.
+#
+# Permission to use, copy, modify, and/or distribute this software for any purpose
+# with or without fee is hereby granted, provided that the above copyright notice
+# and this permission notice appear in all copies.
+#
+# THE SOFTWARE IS PROVIDED "AS IS" AND THE AUTHOR DISCLAIMS ALL WARRANTIES WITH
+# REGARD TO THIS SOFTWARE INCLUDING ALL IMPLIED WARRANTIES OF MERCHANTABILITY AND
+# FITNESS. IN NO EVENT SHALL THE AUTHOR BE LIABLE FOR ANY SPECIAL, DIRECT, INDIRECT,
+# OR CONSEQUENTIAL DAMAGES OR ANY DAMAGES WHATSOEVER RESULTING FROM LOSS OF USE,
+# DATA OR PROFITS, WHETHER IN AN ACTION OF CONTRACT, NEGLIGENCE OR OTHER TORTIOUS
+# ACTION, ARISING OUT OF OR IN CONNECTION WITH THE USE OR PERFORMANCE OF THIS
+# SOFTWARE.
+
+from __future__ import annotations
+
+import glob
+import os
+import struct
+import threading
+from pathlib import Path
+from typing import Iterable, Set, Tuple
+
+from filelock import FileLock
+
+from oc_ds_converter.oc_idmanager.oc_data_storage.storage_manager import StorageManager
+
+SNAPSHOT_MAGIC = b"OCCOMP01"
+# magic, generation of the first journal not included in the snapshot, number of valid and invalid ids
+SNAPSHOT_HEADER = struct.Struct(">8sQQQ")
+
+
+class CompactStorageManager(StorageManager):
+    """A concrete implementation of the ``StorageManager`` interface that keeps the IDs validity values in
+    memory as two sets of strings, one of valid and one of invalid IDs, instead of a dictionary per ID.
+    Each change is appended to a journal, so that saving costs as much as the changes, and the journal is
+    periodically compacted, in a background thread, into a binary snapshot holding the two sets. The
+    storage is made of the snapshot file, saved in the storage path, and of the journals, saved next to it
+    and numbered by generation: when a compaction starts, the changes are appended to a new journal, and
+    the older ones are deleted once the snapshot is saved, so that a crash never loses a change. Several
+    processes can share the storage: the journal writes and the compactions are serialised by a lock file,
+    a compaction saves the snapshot from the files, which include the changes of every process, and a
+    process whose journal was compacted by another one moves to the new journal."""
+
+    def __init__(self, storage_filepath: str = None, compaction_threshold: int = 1000000, **params) -> None:
+        """
+        Constructor of the ``CompactStorageManager`` class.
+
+        :param storage_filepath: The path of the snapshot file, by default "storage/id_valid.bin". The
+            journals and the lock file are saved next to it
+        :type storage_filepath: str
+        :param compaction_threshold: The number of journal entries after which a compaction is started
+        :type compaction_threshold: int
+        """
+        super().__init__(**params)
+        if not storage_filepath:
+            storage_filepath = os.path.join(os.getcwd(), "storage", "id_valid.bin")
+        Path(os.path.abspath(os.path.join(storage_filepath, os.pardir))).mkdir(parents=True, exist_ok=True)
+        self.storage_filepath = storage_filepath
+        self.compaction_threshold = compaction_threshold
+        self.valid: Set[str] = set()
+        self.invalid: Set[str] = set()
+        self._lock = threading.Lock()
+        self._file_lock = FileLock(storage_filepath + ".lock")
+        self._compaction: threading.Thread | None = None
+        with self._file_lock:
+            self.valid, self.invalid, self.generation = self._read()
+            self.journal_entries = 0
+            self._journal = open(self._journal_filepath(self.generation), "a", encoding="utf8")
+
+    def _journal_filepath(self, generation: int) -> str:
+        return f"{self.storage_filepath}.journal.{generation}"
+
+    def _journal_generations(self) -> list:
+        prefix = f"{self.storage_filepath}.journal."
+        return sorted(int(filepath[len(prefix):]) for filepath in glob.glob(glob.escape(prefix) + "*")
+                      if filepath[len(prefix):].isdigit())
+
+    def _read(self, until: int | None = None) -> Tuple[Set[str], Set[str], int]:
+        '''
+        It reads the snapshot and the journals following it, up to the generation ``until`` excluded, and
+        returns the sets of valid and invalid ids and the generation of the last journal read.
+        '''
+        valid, invalid, generation = set(), set(), 0
+        if os.path.exists(self.storage_filepath):
+            with open(self.storage_filepath, "rb") as f:
+                data = f.read()
+            magic, generation, valid_count, invalid_count = SNAPSHOT_HEADER.unpack_from(data, 0)
+            if magic != SNAPSHOT_MAGIC:
+                raise ValueError(f"{self.storage_filepath} is not a compact storage")
+            ids = data[SNAPSHOT_HEADER.size:].decode("utf8").split("\n") if valid_count + invalid_count else []
+            valid = set(ids[:valid_count])
+            invalid = set(ids[valid_count:])
+        for journal_generation in self._journal_generations():
+            if journal_generation < generation or (until is not None and journal_generation >= until):
+                continue
+            with open(self._journal_filepath(journal_generation), "r", encoding="utf8") as f:
+                for line in f:
+                    # a line truncated by a crash has no newline and is ignored
+                    if len(line) > 2 and line.endswith("\n"):
+                        self._apply(valid, invalid, line[2:-1], line[0] == "1")
+            generation = journal_generation
+        return valid, invalid, generation
+
+    @staticmethod
+    def _apply(valid: Set[str], invalid: Set[str], id_name: str, value: bool) -> None:
+        if value:
+            invalid.discard(id_name)
+            valid.add(id_name)
+        else:
+            valid.discard(id_name)
+            invalid.add(id_name)
+
+    def _open_journal(self, generation: int) -> None:
+        self._journal.close()
+        self.generation = generation
+        self._journal = open(self._journal_filepath(generation), "a", encoding="utf8")
+
+    def _write(self, list_of_tuples: Iterable[Tuple[str, bool]]) -> None:
+        lines = []
+        with self._file_lock, self._lock:
+            for id, value in list_of_tuples:
+                id_name = str(id)
+                if not isinstance(value, bool):
+                    raise ValueError("value must be boolean")
+                self._apply(self.valid, self.invalid, id_name, value)
+                lines.append(f"{1 if value else 0}\t{id_name}\n")
+            if not os.path.exists(self._journal_filepath(self.generation)):
+                # the journal was compacted by another process, which created a new one
+                self._open_journal(self._journal_generations()[-1])
+            self._journal.write("".join(lines))
+            self._journal.flush()
+            self.journal_entries += len(lines)
+        if self.journal_entries >= self.compaction_threshold:
+            self.compact(wait=False)
+
+    def set_full_value(self, id: str, value: dict) -> None:
+        """
+        It allows to set the validity value of an id from a dict with a "valid" key, if the id is not stored yet.
+
+        :param value: The information about the id
+        :type value: dict
+        :param id: The id string with prefix
+        :type id: str
+        :raises ValueError: if ``value`` is not a dict.
+        :return: None
+        """
+        if not isinstance(value, dict):
+            raise ValueError("value must be dict")
+        if not isinstance(self.get_value(id), bool) and isinstance(value.get("valid"), bool):
+            self.set_value(id, value["valid"])
+
+    def set_value(self, id: str, value: bool) -> None:
+        """
+        It allows to set the validity value of an id.
+
+        :param value: The validity value
+        :type value: bool
+        :param id: The id string with prefix
+        :type id: str
+        :raises ValueError: if ``value`` is not a boolean.
+        :return: None
+        """
+        self._write([(id, value)])
+
+    def set_multi_value(self, list_of_tuples: list) -> None:
+        """
+        It allows to set the validity values of several ids, with a single journal write.
+
+        :param list_of_tuples: a list of tuples of ids and booleans (id, value)
+        :type list_of_tuples: list
+        :return: None
+        """
+        self._write(list_of_tuples)
+
+    def get_value(self, id: str):
+        """
+        It allows to read the validity value of an id.
+
+        :param id: The id name
+        :type id: str
+        :return: The requested id value (True if valid, False if invalid, None if not found).
+        """
+        id_name = str(id)
+        if id_name in self.valid:
+            return True
+        if id_name in self.invalid:
+            return False
+        return None
+
+    def compact(self, wait: bool = True) -> None:
+        """
+        It saves a new snapshot, in a background thread, and deletes the journals it includes. The snapshot
+        is read from the files under the lock file, so that it includes the changes of the other processes
+        sharing the storage. The changes made in the meantime are appended to a new journal.
+
+        :param wait: Whether to wait for the end of the compaction
+        :type wait: bool
+        :return: None
+        """
+        if self._compaction and self._compaction.is_alive():
+            if wait:
+                self._compaction.join()
+            return
+        with self._lock:
+            self.journal_entries = 0
+        self._compaction = threading.Thread(target=self._save_snapshot, daemon=True)
+        self._compaction.start()
+        if wait:
+            self._compaction.join()
+
+    def _save_snapshot(self) -> None:
+        with self._file_lock:
+            with self._lock:
+                # the journals of the other processes may have a greater generation than this one
+                generation = max(self._journal_generations() + [self.generation]) + 1
+                self._open_journal(generation)
+            valid, invalid, _ = self._read(until=generation)
+            valid, invalid = list(valid), list(invalid)
+            tmp_filepath = self.storage_filepath + ".tmp"
+            with open(tmp_filepath, "wb") as f:
+                f.write(SNAPSHOT_HEADER.pack(SNAPSHOT_MAGIC, generation, len(valid), len(invalid)))
+                f.write("\n".join(valid + invalid).encode("utf8"))
+            os.replace(tmp_filepath, self.storage_filepath)
+            for journal_generation in self._journal_generations():
+                if journal_generation < generation:
+                    os.remove(self._journal_filepath(journal_generation))
+
+    def store_file(self) -> None:
+        """
+        It saves a new snapshot, waiting for its end.
+        """
+        self.compact(wait=True)
+
+    def delete_storage(self):
+        if self._compaction:
+            self._compaction.join()
+        with self._file_lock, self._lock:
+            self._journal.close()
+            self.valid, self.invalid = set(), set()
+            for filepath in [self.storage_filepath] + [self._journal_filepath(g) for g in self._journal_generations()]:
+                if os.path.exists(filepath):
+                    os.remove(filepath)
+            self.generation, self.journal_entries = 0, 0
+            self._journal = open(self._journal_filepath(self.generation), "a", encoding="utf8")
+
+    def get_all_keys(self):
+        return self.valid | self.invalid
+
+    def get_validity_dict(self):
+        validity_dict = dict.fromkeys(self.invalid, False)
+        validity_dict.update(dict.fromkeys(self.valid, True))
+        return validity_dict
+
+    def get_validity_list_of_tuples(self):
+        return [(id, True) for id in self.valid] + [(id, False) for id in self.invalid]
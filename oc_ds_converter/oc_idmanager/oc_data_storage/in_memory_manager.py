@@ -98,6 +98,17 @@ class InMemoryStorageManager(StorageManager):
         else:
             self.id_value_dict[id_name] = {"valid": value}
 
+    def set_multi_value(self, list_of_tuples: list) -> None:
+        """
+        It allows to set the validity values of several ids.
+
+        :param list_of_tuples: a list of tuples of ids and booleans (id, value)
+        :type list_of_tuples: list
+        :return: None
+        """
+        for id, value in list_of_tuples:
+            self.set_value(id, value)
+
     def get_value(self, id: str):
         """
         It allows to read the value of the "valid" key of the identifier's dict.
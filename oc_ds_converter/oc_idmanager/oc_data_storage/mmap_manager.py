@@ -0,0 +1,344 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+# Copyright (c) 2026 The OpenCitations Index Authors.
+#
+# Permission to use, copy, modify, and/or distribute this software for any purpose
+# with or without fee is hereby granted, provided that the above copyright notice
+# and this permission notice appear in all copies.
+#
+# THE SOFTWARE IS PROVIDED "AS IS" AND THE AUTHOR DISCLAIMS ALL WARRANTIES WITH
+# REGARD TO THIS SOFTWARE INCLUDING ALL IMPLIED WARRANTIES OF MERCHANTABILITY AND
+# FITNESS. IN NO EVENT SHALL THE AUTHOR BE LIABLE FOR ANY SPECIAL, DIRECT, INDIRECT,
+# OR CONSEQUENTIAL DAMAGES OR ANY DAMAGES WHATSOEVER RESULTING FROM LOSS OF USE,
+# DATA OR PROFITS, WHETHER IN AN ACTION OF CONTRACT, NEGLIGENCE OR OTHER TORTIOUS
+# ACTION, ARISING OUT OF OR IN CONNECTION WITH THE USE OR PERFORMANCE OF THIS
+# SOFTWARE.
+
+from __future__ import annotations
+
+import mmap
+import os
+import struct
+from hashlib import blake2b
+from pathlib import Path
+from typing import Dict, Iterator, List, Tuple
+
+from filelock import FileLock
+
+from oc_ds_converter.oc_idmanager.oc_data_storage.storage_manager import StorageManager
+
+TABLE_MAGIC = b"OCMMAP01"
+DATA_MAGIC = b"OCMDAT01"
+# magic, number of slots, superseded flag (set when the table is replaced by a bigger one)
+TABLE_PREFIX = struct.Struct(">8sQQ")
+# transaction id, number of ids, committed end of the data file, checksum of the previous fields
+META = struct.Struct(">QQQQ")
+META_OFFSETS = (TABLE_PREFIX.size, TABLE_PREFIX.size + META.size)
+TABLE_HEADER_SIZE = 128
+# digest of the id (0 if the slot is empty), offset of its last record (0 if it has none)
+SLOT = struct.Struct(">QQ")
+# offset of the previous record of the same id (0 if none), validity value, length of the id
+RECORD = struct.Struct(">QBI")
+INITIAL_SLOTS = 1024
+MAX_LOAD = 0.7
+
+
+def _digest(data: bytes) -> int:
+    return int.from_bytes(blake2b(data, digest_size=8).digest(), "big")
+
+def _id_digest(id_bytes: bytes) -> int:
+    # 0 marks the empty slots
+    return _digest(id_bytes) or 1
+
+
+class MmapStorageManager(StorageManager):
+    """A concrete implementation of the ``StorageManager`` interface that stores the IDs validity values in
+    two memory-mapped files, with no server: an append-only data file, holding a record (id, value and
+    offset of the previous record of the id) for each change, and an open-addressing hash table pointing
+    each id to its last record. The table header holds two copies of the transaction metadata (the committed
+    end of the data file among the others), written alternately, as the meta pages of LMDB.
+
+    Every write is a transaction: the records are appended and synced, the slots are updated and synced,
+    and the new metadata are written last, which is the commit point. Readers never lock: a slot pointing
+    beyond the committed end of the data file belongs to a transaction not committed yet, or broken by a
+    crash, and readers follow the chain of previous records back to the committed one. Writers of several
+    processes are serialised by a lock file. When the table gets too full, a bigger one replaces it and
+    the old one is flagged, so that the other processes reopen it."""
+
+    def __init__(self, storage_filepath: str = None, sync: bool = True, **params) -> None:
+        """
+        Constructor of the ``MmapStorageManager`` class.
+
+        :param storage_filepath: The path of the hash table, by default "storage/id_valid.mmap". The data file
+            and the lock file are saved next to it, with the ".data" and ".lock" suffixes
+        :type storage_filepath: str
+        :param sync: Whether to sync the files to disk at each transaction, so that a committed
+            transaction survives a crash of the system, not only of the process
+        :type sync: bool
+        """
+        super().__init__(**params)
+        if not storage_filepath:
+            storage_filepath = os.path.join(os.getcwd(), "storage", "id_valid.mmap")
+        Path(os.path.abspath(os.path.join(storage_filepath, os.pardir))).mkdir(parents=True, exist_ok=True)
+        self.storage_filepath = storage_filepath
+        self.data_filepath = storage_filepath + ".data"
+        self.sync = sync
+        self._lock = FileLock(storage_filepath + ".lock")
+        self._table = None
+        self._data = None
+        with self._lock:
+            if not os.path.exists(self.data_filepath):
+                with open(self.data_filepath, "wb") as f:
+                    f.write(DATA_MAGIC)
+            if not os.path.exists(self.storage_filepath):
+                self._create_table(self.storage_filepath, INITIAL_SLOTS, (0, 0, len(DATA_MAGIC)), [])
+        self._open()
+
+    # files
+
+    def _create_table(self, filepath: str, slots: int, meta: Tuple[int, int, int], entries: List[Tuple[int, int]]) -> None:
+        tmp_filepath = filepath + ".tmp"
+        table = bytearray(TABLE_HEADER_SIZE + slots * SLOT.size)
+        TABLE_PREFIX.pack_into(table, 0, TABLE_MAGIC, slots, 0)
+        self._pack_meta(table, meta)
+        mask = slots - 1
+        for digest, offset in entries:
+            index = digest & mask
+            while SLOT.unpack_from(table, TABLE_HEADER_SIZE + index * SLOT.size)[0]:
+                index = (index + 1) & mask
+            SLOT.pack_into(table, TABLE_HEADER_SIZE + index * SLOT.size, digest, offset)
+        with open(tmp_filepath, "wb") as f:
+            f.write(table)
+            f.flush()
+            if self.sync:
+                os.fsync(f.fileno())
+        os.replace(tmp_filepath, filepath)
+
+    def _open(self) -> None:
+        self._close()
+        with open(self.storage_filepath, "r+b") as f:
+            self._table = mmap.mmap(f.fileno(), 0)
+        magic, self.slots, _ = TABLE_PREFIX.unpack_from(self._table, 0)
+        if magic != TABLE_MAGIC:
+            raise ValueError(f"{self.storage_filepath} is not a mmap storage")
+        self._mask = self.slots - 1
+        self._map_data()
+
+    def _map_data(self) -> None:
+        if self._data is not None:
+            self._data.close()
+        with open(self.data_filepath, "rb") as f:
+            self._data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+    def _close(self) -> None:
+        if self._table is not None:
+            self._table.close()
+            self._table = None
+        if self._data is not None:
+            self._data.close()
+            self._data = None
+
+    # metadata
+
+    def _pack_meta(self, table, meta: Tuple[int, int, int]) -> None:
+        txn = meta[0]
+        fields = META.pack(*meta, 0)[:-8]
+        META.pack_into(table, META_OFFSETS[txn % 2], *meta, _digest(fields))
+
+    def _meta(self) -> Tuple[int, int, int]:
+        if TABLE_PREFIX.unpack_from(self._table, 0)[2]:
+            # the table was replaced by a bigger one
+            self._open()
+        best = None
+        for offset in META_OFFSETS:
+            txn, count, data_end, checksum = META.unpack_from(self._table, offset)
+            if checksum == _digest(META.pack(txn, count, data_end, 0)[:-8]) and (best is None or txn > best[0]):
+                best = (txn, count, data_end)
+        if best is None:
+            raise ValueError(f"{self.storage_filepath} is corrupted")
+        if best[2] > len(self._data):
+            self._map_data()
+        return best
+
+    # reading
+
+    def _record(self, offset: int) -> Tuple[int, bool, bytes]:
+        prev, value, length = RECORD.unpack_from(self._data, offset)
+        start = offset + RECORD.size
+        return prev, value == 1, self._data[start:start + length]
+
+    def _committed(self, offset: int, data_end: int) -> int:
+        while offset >= data_end:
+            if offset + RECORD.size > len(self._data):
+                # a record appended by a transaction of another process, not committed yet
+                self._map_data()
+            offset = RECORD.unpack_from(self._data, offset)[0]
+        return offset
+
+    def _slot(self, index: int) -> Tuple[int, int]:
+        return SLOT.unpack_from(self._table, TABLE_HEADER_SIZE + index * SLOT.size)
+
+    def _find(self, id_bytes: bytes, data_end: int) -> Tuple[int, int]:
+        '''
+        It returns the index of the slot of an id, or of the empty slot where it would be inserted, and
+        the offset of its last committed record (0 if none).
+        '''
+        digest = _id_digest(id_bytes)
+        index = digest & self._mask
+        while True:
+            slot_digest, offset = self._slot(index)
+            if not slot_digest:
+                return index, 0
+            if slot_digest == digest and offset:
+                committed = self._committed(offset, data_end)
+                if committed and self._record(committed)[2] == id_bytes:
+                    return index, committed
+            index = (index + 1) & self._mask
+
+    def get_value(self, id: str):
+        """
+        It allows to read the validity value of an id.
+
+        :param id: The id name
+        :type id: str
+        :return: The requested id value (True if valid, False if invalid, None if not found).
+        """
+        _, _, data_end = self._meta()
+        _, offset = self._find(str(id).encode("utf8"), data_end)
+        return self._record(offset)[1] if offset else None
+
+    def _iter_committed(self) -> Iterator[Tuple[str, bool]]:
+        _, _, data_end = self._meta()
+        for index in range(self.slots):
+            digest, offset = self._slot(index)
+            offset = self._committed(offset, data_end) if digest and offset else 0
+            if offset:
+                _, value, id_bytes = self._record(offset)
+                yield id_bytes.decode("utf8"), value
+
+    def get_all_keys(self):
+        return {id for id, _ in self._iter_committed()}
+
+    def get_validity_dict(self):
+        return dict(self._iter_committed())
+
+    def get_validity_list_of_tuples(self):
+        return list(self._iter_committed())
+
+    # writing
+
+    def _repair(self, data_end: int) -> None:
+        # the slots updated by a transaction broken by a crash are brought back to the committed records
+        for index in range(self.slots):
+            position = TABLE_HEADER_SIZE + index * SLOT.size
+            digest, offset = SLOT.unpack_from(self._table, position)
+            if digest and offset >= data_end:
+                SLOT.pack_into(self._table, position, digest, self._committed(offset, data_end))
+        self._table.flush()
+
+    def _grow(self, meta: Tuple[int, int, int], needed: int) -> None:
+        slots = self.slots
+        while needed > slots * MAX_LOAD:
+            slots *= 2
+        entries = []
+        for index in range(self.slots):
+            digest, offset = self._slot(index)
+            if digest and offset:
+                entries.append((digest, offset))
+        self._create_table(self.storage_filepath, slots, meta, entries)
+        # the processes which mapped the old table reopen the new one
+        TABLE_PREFIX.pack_into(self._table, 0, TABLE_MAGIC, self.slots, 1)
+        self._table.flush()
+        self._open()
+
+    def set_multi_value(self, list_of_tuples: list) -> None:
+        """
+        It allows to set the validity values of several ids in a single transaction.
+
+        :param list_of_tuples: a list of tuples of ids and booleans (id, value)
+        :type list_of_tuples: list
+        :raises ValueError: if a value is not a boolean.
+        :return: None
+        """
+        items = []
+        for id, value in list_of_tuples:
+            if not isinstance(value, bool):
+                raise ValueError("value must be boolean")
+            items.append((str(id).encode("utf8"), value))
+        if not items:
+            return
+        with self._lock:
+            txn, count, data_end = self._meta()
+            data_size = os.path.getsize(self.data_filepath)
+            if data_size > data_end:
+                self._repair(data_end)
+            if (count + len(items)) > self.slots * MAX_LOAD:
+                self._grow((txn, count, data_end), count + len(items))
+            records = []
+            slot_updates: Dict[int, Tuple[int, int]] = dict()
+            pending: Dict[bytes, int] = dict()
+            position = data_size
+            for id_bytes, value in items:
+                if id_bytes in pending:
+                    index = pending[id_bytes]
+                    prev = slot_updates[index][1]
+                else:
+                    index, prev = self._find(id_bytes, data_end)
+                    if not prev:
+                        # the empty slot may have been taken by another new id of the transaction
+                        while index in slot_updates or self._slot(index)[0]:
+                            index = (index + 1) & self._mask
+                        count += 1
+                    pending[id_bytes] = index
+                records.append(RECORD.pack(prev, 1 if value else 0, len(id_bytes)) + id_bytes)
+                slot_updates[index] = (_id_digest(id_bytes), position)
+                position += len(records[-1])
+            with open(self.data_filepath, "ab") as f:
+                f.write(b"".join(records))
+                f.flush()
+                if self.sync:
+                    os.fsync(f.fileno())
+            self._map_data()
+            for index, (digest, offset) in slot_updates.items():
+                SLOT.pack_into(self._table, TABLE_HEADER_SIZE + index * SLOT.size, digest, offset)
+            if self.sync:
+                self._table.flush()
+            self._pack_meta(self._table, (txn + 1, count, position))
+            if self.sync:
+                self._table.flush()
+
+    def set_value(self, id: str, value: bool) -> None:
+        """
+        It allows to set the validity value of an id.
+
+        :param value: The validity value
+        :type value: bool
+        :param id: The id string with prefix
+        :type id: str
+        :raises ValueError: if ``value`` is not a boolean.
+        :return: None
+        """
+        self.set_multi_value([(id, value)])
+
+    def set_full_value(self, id: str, value: dict) -> None:
+        """
+        It allows to set the validity value of an id from a dict with a "valid" key, if the id is not stored yet.
+
+        :param value: The information about the id
+        :type value: dict
+        :param id: The id string with prefix
+        :type id: str
+        :raises ValueError: if ``value`` is not a dict.
+        :return: None
+        """
+        if not isinstance(value, dict):
+            raise ValueError("value must be dict")
+        if not isinstance(self.get_value(id), bool) and isinstance(value.get("valid"), bool):
+            self.set_value(id, value["valid"])
+
+    def delete_storage(self):
+        with self._lock:
+            self._close()
+            for filepath in (self.storage_filepath, self.data_filepath):
+                if os.path.exists(filepath):
+                    os.remove(filepath)
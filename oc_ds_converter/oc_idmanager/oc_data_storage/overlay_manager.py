@@ -0,0 +1,130 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+# Copyright (c) 2026 The OpenCitations Index Authors.
+#
+# Permission to use, copy, modify, and/or distribute this software for any purpose
+# with or without fee is hereby granted, provided that the above copyright notice
+# and this permission notice appear in all copies.
+#
+# THE SOFTWARE IS PROVIDED "AS IS" AND THE AUTHOR DISCLAIMS ALL WARRANTIES WITH
+# REGARD TO THIS SOFTWARE INCLUDING ALL IMPLIED WARRANTIES OF MERCHANTABILITY AND
+# FITNESS. IN NO EVENT SHALL THE AUTHOR BE LIABLE FOR ANY SPECIAL, DIRECT, INDIRECT,
+# OR CONSEQUENTIAL DAMAGES OR ANY DAMAGES WHATSOEVER RESULTING FROM LOSS OF USE,
+# DATA OR PROFITS, WHETHER IN AN ACTION OF CONTRACT, NEGLIGENCE OR OTHER TORTIOUS
+# ACTION, ARISING OUT OF OR IN CONNECTION WITH THE USE OR PERFORMANCE OF THIS
+# SOFTWARE.
+
+from __future__ import annotations
+
+from oc_ds_converter.oc_idmanager.oc_data_storage.storage_manager import StorageManager
+
+
+class OverlayStorageManager(StorageManager):
+    """A concrete implementation of the ``StorageManager`` interface that buffers in RAM the IDs validity
+    values set while processing an input, over a backend storage manager. Values are read from the buffer
+    first and then from the backend. They are written to the backend all together, through a single
+    ``set_multi_value`` call, only when ``commit`` is called, and they are discarded by ``rollback``: in this
+    way, if the process breaks while processing an input, its IDs are not considered as already processed.
+    The buffer is never saved on the filesystem."""
+
+    def __init__(self, backend: StorageManager, **params) -> None:
+        """
+        Constructor of the ``OverlayStorageManager`` class.
+
+        :param backend: The storage manager where the values are written on commit
+        :type backend: StorageManager
+        """
+        super().__init__(**params)
+        self.backend = backend
+        self.id_value_dict = dict()
+
+    def set_full_value(self, id: str, value: dict) -> None:
+        """
+        It buffers the information about an id, keeping the keys already buffered.
+
+        :param value: The information about the id
+        :type value: dict
+        :param id: The id string with prefix
+        :type id: str
+        :raises ValueError: if ``value`` is not a dict.
+        :return: None
+        """
+        id_name = str(id)
+        if not isinstance(value, dict):
+            raise ValueError("value must be dict")
+        if id_name in self.id_value_dict:
+            new_info = {k: v for k, v in value.items() if k not in self.id_value_dict[id_name]}
+            self.id_value_dict[id_name].update(new_info)
+        else:
+            self.id_value_dict[id_name] = value
+
+    def set_value(self, id: str, value: bool) -> None:
+        """
+        It buffers the validity value of an id.
+
+        :param value: The validity value
+        :type value: bool
+        :param id: The id string with prefix
+        :type id: str
+        :raises ValueError: if ``value`` is not a boolean.
+        :return: None
+        """
+        id_name = str(id)
+        if not isinstance(value, bool):
+            raise ValueError("value must be boolean")
+        if id_name in self.id_value_dict:
+            self.id_value_dict[id_name]["valid"] = value
+        else:
+            self.id_value_dict[id_name] = {"valid": value}
+
+    def set_multi_value(self, list_of_tuples: list) -> None:
+        """
+        It buffers the validity values of several ids.
+
+        :param list_of_tuples: a list of tuples of ids and booleans (id, value)
+        :type list_of_tuples: list
+        :return: None
+        """
+        for id, value in list_of_tuples:
+            self.set_value(id, value)
+
+    def get_value(self, id: str):
+        """
+        It reads the validity value of an id from the buffer or, if it is not buffered, from the backend.
+
+        :param id: The id name
+        :type id: str
+        :return: The requested id value (True if valid, False if invalid, None if not found).
+        """
+        id_in_dict = self.id_value_dict.get(str(id))
+        if id_in_dict and isinstance(id_in_dict.get("valid"), bool):
+            return id_in_dict["valid"]
+        return self.backend.get_value(id)
+
+    def commit(self) -> None:
+        """
+        It writes the buffered validity values to the backend with a single bulk write and empties the buffer.
+        """
+        kv_in_memory = self.get_validity_list_of_tuples()
+        if kv_in_memory:
+            self.backend.set_multi_value(kv_in_memory)
+        self.id_value_dict = dict()
+
+    def rollback(self) -> None:
+        """
+        It discards the buffered validity values.
+        """
+        self.id_value_dict = dict()
+
+    def delete_storage(self):
+        # only the buffer is deleted: the backend is managed by its owner
+        self.rollback()
+
+    def get_all_keys(self):
+        return set(self.id_value_dict.keys()) | set(self.backend.get_all_keys() or [])
+
+    def get_validity_dict(self):
+        return {k: v["valid"] for k, v in self.id_value_dict.items() if isinstance(v.get("valid"), bool)}
+
+    def get_validity_list_of_tuples(self):
+        return list(self.get_validity_dict().items())
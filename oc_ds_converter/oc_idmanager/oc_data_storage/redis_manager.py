@@ -129,4 +129,9 @@ class RedisStorageManager(StorageManager):
                 result = set(result)
         else:
             result = set()
-        return result
\ No newline at end of file
+        return result
+
+    def get_validity_list_of_tuples(self):
+        keys = list(self.get_all_keys())
+        values = self.PROCESS_redis.mget(keys) if keys else []
+        return [(k, int(v) == 1) for k, v in zip(keys, values) if v is not None]
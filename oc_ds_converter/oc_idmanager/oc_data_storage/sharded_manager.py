@@ -0,0 +1,217 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+# Copyright (c) 2026 The OpenCitations Index Authors.
+#
+# Permission to use, copy, modify, and/or distribute this software for any purpose
+# with or without fee is hereby granted, provided that the above copyright notice
+# and this permission notice appear in all copies.
+#
+# THE SOFTWARE IS PROVIDED "AS IS" AND THE AUTHOR DISCLAIMS ALL WARRANTIES WITH
+# REGARD TO THIS SOFTWARE INCLUDING ALL IMPLIED WARRANTIES OF MERCHANTABILITY AND
+# FITNESS. IN NO EVENT SHALL THE AUTHOR BE LIABLE FOR ANY SPECIAL, DIRECT, INDIRECT,
+# OR CONSEQUENTIAL DAMAGES OR ANY DAMAGES WHATSOEVER RESULTING FROM LOSS OF USE,
+# DATA OR PROFITS, WHETHER IN AN ACTION OF CONTRACT, NEGLIGENCE OR OTHER TORTIOUS
+# ACTION, ARISING OUT OF OR IN CONNECTION WITH THE USE OR PERFORMANCE OF THIS
+# SOFTWARE.
+
+from __future__ import annotations
+
+import json
+import os
+from typing import Dict, List
+
+from oc_ds_converter.lib.sharding import get_shard_index
+from oc_ds_converter.oc_idmanager.oc_data_storage.compact_manager import CompactStorageManager
+from oc_ds_converter.oc_idmanager.oc_data_storage.in_memory_manager import InMemoryStorageManager
+from oc_ds_converter.oc_idmanager.oc_data_storage.mmap_manager import MmapStorageManager
+from oc_ds_converter.oc_idmanager.oc_data_storage.sqlite_manager import SqliteStorageManager
+from oc_ds_converter.oc_idmanager.oc_data_storage.storage_manager import StorageManager
+
+MANIFEST_FILENAME = "shards.json"
+
+# the storage manager of the shards of each backend
+storage_managers = {"db": SqliteStorageManager, "json": InMemoryStorageManager, "bin": CompactStorageManager,
+                    "mmap": MmapStorageManager}
+
+
+class ShardedStorageManager(StorageManager):
+    """A concrete implementation of the ``StorageManager`` interface that splits the IDs validity values
+    among several storage managers (the shards), e.g. SQLite databases, JSON files or redis databases.
+    Each ID is routed to a shard through a stable hash, the same on every host and run, so that the size of
+    each database and the contention on its write lock decrease with the number of shards. Bulk writes are
+    grouped by shard, so that each shard receives a single ``set_multi_value`` call."""
+
+    def __init__(self, shards: List[StorageManager], storage_dir: str = None, **params) -> None:
+        """
+        Constructor of the ``ShardedStorageManager`` class.
+
+        :param shards: The storage managers of the shards. Their order determines the routing of the IDs
+        :type shards: List[StorageManager]
+        :param storage_dir: The directory of the shards, if they were opened with ``open_sharded_storage``
+        :type storage_dir: str
+        """
+        super().__init__(**params)
+        if not shards:
+            raise ValueError("at least a shard is needed")
+        self.shards = list(shards)
+        self.storage_dir = storage_dir
+
+    def get_shard(self, id: str) -> StorageManager:
+        """
+        It returns the shard where an id is stored.
+
+        :param id: The id string with prefix
+        :type id: str
+        :return: The storage manager of the shard
+        """
+        return self.shards[get_shard_index(str(id), len(self.shards))]
+
+    def set_full_value(self, id: str, value: dict) -> None:
+        """
+        It sets the information about an id in its shard.
+
+        :param value: The information about the id
+        :type value: dict
+        :param id: The id string with prefix
+        :type id: str
+        :return: None
+        """
+        self.get_shard(id).set_full_value(id, value)
+
+    def set_value(self, id: str, value: bool) -> None:
+        """
+        It sets the validity value of an id in its shard.
+
+        :param value: The validity value
+        :type value: bool
+        :param id: The id string with prefix
+        :type id: str
+        :raises ValueError: if ``value`` is not a boolean.
+        :return: None
+        """
+        if not isinstance(value, bool):
+            raise ValueError("value must be boolean")
+        self.get_shard(id).set_value(id, value)
+
+    def set_multi_value(self, list_of_tuples: list) -> None:
+        """
+        It sets the validity values of several ids, with a single bulk write for each shard involved.
+
+        :param list_of_tuples: a list of tuples of ids and booleans (id, value)
+        :type list_of_tuples: list
+        :return: None
+        """
+        by_shard: Dict[int, list] = dict()
+        for id, value in list_of_tuples:
+            by_shard.setdefault(get_shard_index(str(id), len(self.shards)), []).append((id, value))
+        for index, shard_tuples in by_shard.items():
+            self.shards[index].set_multi_value(shard_tuples)
+
+    def get_value(self, id: str):
+        """
+        It reads the validity value of an id from its shard.
+
+        :param id: The id name
+        :type id: str
+        :return: The requested id value (True if valid, False if invalid, None if not found).
+        """
+        return self.get_shard(id).get_value(id)
+
+    def store_file(self) -> None:
+        for shard in self.shards:
+            shard.store_file()
+
+    def delete_storage(self):
+        for shard in self.shards:
+            shard.delete_storage()
+        manifest_filepath = os.path.join(self.storage_dir, MANIFEST_FILENAME) if self.storage_dir else None
+        if manifest_filepath and os.path.exists(manifest_filepath):
+            os.remove(manifest_filepath)
+
+    def get_all_keys(self):
+        keys = set()
+        for shard in self.shards:
+            keys.update(shard.get_all_keys() or [])
+        return keys
+
+    def get_validity_list_of_tuples(self):
+        return [id_value for shard in self.shards for id_value in shard.get_validity_list_of_tuples()]
+
+    def get_validity_dict(self):
+        return dict(self.get_validity_list_of_tuples())
+
+
+def is_sharded_storage(storage_path: str) -> bool:
+    """
+    It checks whether a storage path is the directory of a sharded storage created by ``create_sharded_storage``.
+    """
+    return bool(storage_path) and os.path.isfile(os.path.join(storage_path, MANIFEST_FILENAME))
+
+def create_sharded_storage(storage_dir: str, count: int, backend: str = "db") -> ShardedStorageManager:
+    """
+    It creates a sharded storage in a directory, made of ``count`` SQLite (backend "db"), JSON (backend
+    "json"), compact (backend "bin") or memory-mapped (backend "mmap") files, and records its layout in a manifest, so that it can be
+    reopened by ``open_sharded_storage``.
+
+    :param storage_dir: The directory of the shards
+    :type storage_dir: str
+    :param count: The number of shards
+    :type count: int
+    :param backend: Either "db", "json", "bin" or "mmap"
+    :type backend: str
+    :return: The sharded storage manager
+    """
+    if count < 1:
+        raise ValueError("the number of shards must be positive")
+    if backend not in storage_managers:
+        raise ValueError('the backend must be either "db", "json", "bin" or "mmap"')
+    if is_sharded_storage(storage_dir):
+        raise ValueError(f"{storage_dir} already contains a sharded storage")
+    os.makedirs(storage_dir, exist_ok=True)
+    with open(os.path.join(storage_dir, MANIFEST_FILENAME), "w", encoding="utf8") as f:
+        json.dump({"count": count, "backend": backend}, f)
+    return open_sharded_storage(storage_dir)
+
+def open_sharded_storage(storage_dir: str) -> ShardedStorageManager:
+    """
+    It opens the sharded storage saved in a directory by ``create_sharded_storage``.
+
+    :param storage_dir: The directory of the shards
+    :type storage_dir: str
+    :return: The sharded storage manager
+    """
+    with open(os.path.join(storage_dir, MANIFEST_FILENAME), "r", encoding="utf8") as f:
+        manifest = json.load(f)
+    count, backend = manifest["count"], manifest["backend"]
+    shards = []
+    for index in range(count):
+        shard_filepath = os.path.join(storage_dir, f"id_valid_dict_{index}_of_{count}.{backend}")
+        shards.append(storage_managers[backend](shard_filepath))
+    return ShardedStorageManager(shards, storage_dir=storage_dir)
+
+def reshard(source: StorageManager, target: ShardedStorageManager, batch_size: int = 100000) -> int:
+    """
+    It copies all the validity values of a storage, either sharded or not, into a sharded storage with a
+    different number of shards. It is meant to be run offline, while no process writes the source.
+
+    :param source: The storage to be copied
+    :type source: StorageManager
+    :param target: The new sharded storage
+    :type target: ShardedStorageManager
+    :param batch_size: The number of values written to the target with each bulk write
+    :type batch_size: int
+    :return: The number of values copied
+    """
+    copied = 0
+    batch = []
+    for id_value in source.get_validity_list_of_tuples():
+        batch.append(id_value)
+        if len(batch) >= batch_size:
+            target.set_multi_value(batch)
+            copied += len(batch)
+            batch = []
+    if batch:
+        target.set_multi_value(batch)
+        copied += len(batch)
+    target.store_file()
+    return copied
@@ -145,4 +145,7 @@ class SqliteStorageManager(StorageManager):
 
     def get_all_keys(self):
         ids = [id[0] for id in self.cur.execute("SELECT id FROM info")]
-        return ids
\ No newline at end of file
+        return ids
+
+    def get_validity_list_of_tuples(self):
+        return [(id, True if value == 1 else False) for id, value in self.cur.execute("SELECT id, value FROM info")]
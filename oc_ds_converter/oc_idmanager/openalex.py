@@ -15,6 +15,8 @@
 # SOFTWARE.
 
 from oc_ds_converter.oc_idmanager.base import IdentifierManager
+from oc_ds_converter.oc_idmanager.negative_cache import SYNTAX
+from oc_ds_converter.oc_idmanager.support import call_api, get_batches, prepare_batch, set_api_failed
 from oc_ds_converter.oc_idmanager.oc_data_storage.storage_manager import StorageManager
 from oc_ds_converter.oc_idmanager.oc_data_storage.in_memory_manager import InMemoryStorageManager
 from re import sub, match
@@ -38,6 +40,8 @@ class OpenAlexManager(IdentifierManager):
         self._api = "https://api.openalex.org/"
         self._api_works_route = r"https://api.openalex.org/works/"
         self._api_sources_route = r"https://api.openalex.org/sources/"
+        # the OR filters of the OpenAlex API accept up to 100 values, 50 IDs are requested at once
+        self._batch_size = 50
         self._use_api_service = use_api_service
         self._p = "openalex:"
         self._url_id_pref = "https://openalex.org/"
@@ -55,14 +59,27 @@ class OpenAlexManager(IdentifierManager):
             id_validation_value = self.storage_manager.get_value(oal_id)
             if isinstance(id_validation_value, bool):
                 return id_validation_value
+            elif not self.syntax_ok(oal_id):
+                self.record_invalid(oal_id, SYNTAX)
+                self.storage_manager.set_value(oal_id, False)
+                if get_extra_info:
+                    return False, {"id": oal_id, "valid": False}
+                return False
+            elif self.cached_as_invalid(oal_id):
+                # the OpenAlex ID was found invalid before, e.g. by a previous run, and this result is not expired yet
+                if get_extra_info:
+                    return False, {"id": oal_id, "valid": False}
+                return False
             else:
                 if get_extra_info:
                     info = self.exists(oal_id, get_extra_info=True)
-                    self.storage_manager.set_full_value(oal_id,info[1])
-                    return (info[0] and self.syntax_ok(oal_id)), info[1]
-                validity_check = self.exists(oal_id) and self.syntax_ok(oal_id)
-                self.storage_manager.set_value(oal_id, validity_check)
-
+                    # the result of a failed request is not stored, so that the OpenAlex ID is checked again
+                    if info[0] or self.record_invalid(oal_id):
+                        self.storage_manager.set_full_value(oal_id, info[1])
+                    return info[0], info[1]
+                validity_check = self.exists(oal_id)
+                if validity_check or self.record_invalid(oal_id):
+                    self.storage_manager.set_value(oal_id, validity_check)
                 return validity_check
 
     def normalise(self, id_string, include_prefix=False):
@@ -95,6 +112,7 @@ class OpenAlexManager(IdentifierManager):
         return True if match("^openalex:[WS][1-9]\\d*$", id_string) else False
 
     def exists(self, openalex_id_full, get_extra_info=False, allow_extra_api=None):
+        set_api_failed(False)
         valid_bool = True
         openalex_id_full = self._p + openalex_id_full if not openalex_id_full.startswith(self._p) else openalex_id_full
         if self._use_api_service:
@@ -134,6 +152,8 @@ class OpenAlexManager(IdentifierManager):
                     except ConnectionError:
                         # Sleep 5 seconds, then try again
                         sleep(5)
+                # all the attempts failed, so the existence of the ID is not known
+                set_api_failed(True)
                 valid_bool = False
             else:
                 if get_extra_info:
@@ -144,6 +164,25 @@ class OpenAlexManager(IdentifierManager):
             return valid_bool, {'id': openalex_id_full, 'valid': valid_bool}
         return valid_bool
 
+    def exists_batch(self, id_strings):
+        existence, oal_ids = prepare_batch(self, id_strings)
+        if not self._use_api_service:
+            existence.update(dict.fromkeys(oal_ids, True))
+            return existence
+        for route, entity_type in ((self._api_works_route, "W"), (self._api_sources_route, "S")):
+            same_type = [oal_id for oal_id in oal_ids if oal_id[len(self._p)] == entity_type]
+            for batch in get_batches(same_type, self._batch_size):
+                json_res = call_api(url=route.rstrip("/"), headers=self._headers, params={
+                    "filter": "openalex:" + "|".join(oal_id[len(self._p):] for oal_id in batch),
+                    "per-page": self._batch_size, "select": "id"})
+                if not isinstance(json_res, dict) or not isinstance(json_res.get("results"), list):
+                    continue
+                # the IDs merged in other ones are returned with the ID they were merged in
+                found = {result.get("id") for result in json_res["results"] if isinstance(result, dict)}
+                for oal_id in batch:
+                    existence[oal_id] = (self._url_id_pref + oal_id[len(self._p):]) in found
+        return existence
+
     def extra_info(self, api_response, choose_api=None, info_dict={}):
         result = {}
         result["valid"] = True
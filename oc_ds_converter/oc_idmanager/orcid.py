@@ -22,28 +22,38 @@ from urllib.parse import quote
 import datetime
 
 from oc_ds_converter.oc_idmanager.base import IdentifierManager
+from oc_ds_converter.oc_idmanager.support import set_api_failed
+from oc_ds_converter.oc_idmanager.validation_pipeline import ValidationPipeline
 from requests import ReadTimeout, get
 from requests.exceptions import ConnectionError
 from oc_ds_converter.oc_idmanager.oc_data_storage.storage_manager import StorageManager
 from oc_ds_converter.oc_idmanager.oc_data_storage.in_memory_manager import InMemoryStorageManager
 #from oc_ds_converter.oc_idmanager.oc_data_storage.sqlite_manager import SqliteStorageManager
-from typing import Type, Optional
+from typing import Container, Type, Optional
 
 # POSSIBLE EXTENSION: adding a new parameter in order to directly use the input orcid - doi map in the orcid manager
 class ORCIDManager(IdentifierManager):
     """This class implements an identifier manager for orcid identifier."""
 
-    def __init__(self, use_api_service=True, storage_manager:Optional[StorageManager] = None):
-        """Orcid Manager constructor."""
+    def __init__(self, use_api_service=True, storage_manager:Optional[StorageManager] = None, orcid_set:Optional[Container] = None):
+        """Orcid Manager constructor. If an ORCID set is provided (e.g. the one created from the ORCID public data
+        file with oc_ds_converter/run/orcid_set.py), the ORCIDs it contains are valid without any API request."""
         super(ORCIDManager, self).__init__()
         self._api = "https://pub.orcid.org/v3.0/"
         self._use_api_service = use_api_service
+        self.orcid_set = orcid_set
         if storage_manager is None:
             self.storage_manager = InMemoryStorageManager()
         else:
             self.storage_manager = storage_manager
 
         self._p = "orcid:"
+        self.validation_pipeline = ValidationPipeline(self)
+
+    @property
+    def oracle(self):
+        """The ORCID set, which is the oracle of the validation pipeline."""
+        return self.orcid_set
 
     def validated_as_id(self, id_string):
         arxiv_vaidation_value = self.storage_manager.get_value(id_string)
@@ -53,27 +63,8 @@ class ORCIDManager(IdentifierManager):
             return None
 
     def is_valid(self, id_string, get_extra_info=False):
-        orcid = self.normalise(id_string, include_prefix=True)
-        if orcid is None:
-            if get_extra_info:
-
-                return False, {"id":orcid, "valid": False}
-            return False
-        else:
-            orcid_vaidation_value = self.storage_manager.get_value(orcid)
-            if isinstance(orcid_vaidation_value, bool):
-                if get_extra_info:
-                    return orcid_vaidation_value, {"id": orcid, "valid": orcid_vaidation_value}
-                return orcid_vaidation_value
-            else:
-                if get_extra_info:
-                    info = self.exists(orcid, get_extra_info=True)
-                    self.storage_manager.set_full_value(orcid,info[1])
-                    return (info[0] and self.check_digit(orcid) and self.syntax_ok(orcid)), info[1]
-                validity_check = self.exists(orcid) and self.syntax_ok(orcid) and self.check_digit(orcid)
-                self.storage_manager.set_value(orcid, validity_check)
-                return validity_check
-
+        # the syntax and the check digit are checked before the storage and the API
+        return self.validation_pipeline.is_valid(id_string, get_extra_info)
 
     def normalise(self, id_string, include_prefix=False):
         try:
@@ -108,6 +99,7 @@ class ORCIDManager(IdentifierManager):
 
 
     def exists(self, orcid, get_extra_info=False, allow_extra_api=None):
+        set_api_failed(False)
         info_dict = {"id": orcid}
         valid_bool = True
         if self._use_api_service:
@@ -128,12 +120,20 @@ class ORCIDManager(IdentifierManager):
                                 info_dict.update(self.extra_info(json_res))
                                 return valid_bool, info_dict
                             return valid_bool
+                        elif 400 <= r.status_code < 500:
+                            # the ORCID does not exist
+                            if get_extra_info:
+                                info_dict["valid"] = False
+                                return False, info_dict
+                            return False
                     except ReadTimeout:
                         # Do nothing, just try again
                         pass
                     except ConnectionError:
                         # Sleep 5 seconds, then try again
                         sleep(5)
+                # all the attempts failed, so the existence of the ID is not known
+                set_api_failed(True)
                 valid_bool = False
             else:
                 if get_extra_info:
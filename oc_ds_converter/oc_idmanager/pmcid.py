@@ -21,6 +21,8 @@ from time import sleep
 from urllib.parse import quote, unquote
 
 from oc_ds_converter.oc_idmanager.base import IdentifierManager
+from oc_ds_converter.oc_idmanager.negative_cache import SYNTAX
+from oc_ds_converter.oc_idmanager.support import set_api_failed
 from requests import ReadTimeout, get
 from requests.exceptions import ConnectionError
 from oc_ds_converter.oc_idmanager.oc_data_storage.storage_manager import StorageManager
@@ -67,14 +69,27 @@ class PMCIDManager(IdentifierManager):
             pmc_vaidation_value = self.storage_manager.get_value(pmcid)
             if isinstance(pmc_vaidation_value, bool):
                 return pmc_vaidation_value
+            elif not self.syntax_ok(pmcid):
+                self.record_invalid(pmcid, SYNTAX)
+                self.storage_manager.set_value(pmcid, False)
+                if get_extra_info:
+                    return False, {"id": pmcid, "valid": False}
+                return False
+            elif self.cached_as_invalid(pmcid):
+                # the PMCID was found invalid before, e.g. by a previous run, and this result is not expired yet
+                if get_extra_info:
+                    return False, {"id": pmcid, "valid": False}
+                return False
             else:
                 if get_extra_info:
                     info = self.exists(pmcid, get_extra_info=True)
-                    self.storage_manager.set_full_value(pmcid,info[1])
-                    return (info[0] and self.syntax_ok(pmcid)), info[1]
-                validity_check = self.exists(pmcid) and self.syntax_ok(pmcid)
-                self.storage_manager.set_value(pmcid, validity_check)
-
+                    # the result of a failed request is not stored, so that the PMCID is checked again
+                    if info[0] or self.record_invalid(pmcid):
+                        self.storage_manager.set_full_value(pmcid, info[1])
+                    return info[0], info[1]
+                validity_check = self.exists(pmcid)
+                if validity_check or self.record_invalid(pmcid):
+                    self.storage_manager.set_value(pmcid, validity_check)
                 return validity_check
 
     def normalise(self, id_string, include_prefix=False):
@@ -102,6 +117,7 @@ class PMCIDManager(IdentifierManager):
         return True if match(r"^pmcid:PMC[1-9]\d+(\.\d{1,2})?$", id_string) else False
 
     def exists(self, pmcid_full, get_extra_info=False, allow_extra_api=None):
+        set_api_failed(False)
         valid_bool = True
         if self._use_api_service:
             pmcid = self.normalise(pmcid_full)
@@ -147,6 +163,8 @@ class PMCIDManager(IdentifierManager):
                     except ConnectionError:
                         # Sleep 5 seconds, then try again
                         sleep(5)
+                # all the attempts failed, so the existence of the ID is not known
+                set_api_failed(True)
                 valid_bool = False
             else:
                 if get_extra_info:
@@ -24,23 +24,30 @@ from urllib.parse import quote
 from bs4 import BeautifulSoup
 from oc_ds_converter.oc_idmanager import *
 from oc_ds_converter.oc_idmanager.base import IdentifierManager
+from oc_ds_converter.oc_idmanager.validation_pipeline import ValidationPipeline
+from oc_ds_converter.oc_idmanager.support import call_api, get_batches, prepare_batch, set_api_failed
 from requests import ReadTimeout, get
 from requests.exceptions import ConnectionError
 
 from oc_ds_converter.oc_idmanager.oc_data_storage.storage_manager import StorageManager
 from oc_ds_converter.oc_idmanager.oc_data_storage.in_memory_manager import InMemoryStorageManager
 #from oc_ds_converter.oc_idmanager.oc_data_storage.sqlite_manager import SqliteStorageManager
-from typing import Optional, Type
+from typing import Container, Optional, Type
 
 
 
 class PMIDManager(IdentifierManager):
     """This class implements an identifier manager for pmid identifier"""
 
-    def __init__(self, use_api_service=True,  storage_manager: Optional[StorageManager] = None):
-        """PMID manager constructor."""
+    def __init__(self, use_api_service=True,  storage_manager: Optional[StorageManager] = None, oracle: Optional[Container] = None):
+        """PMID manager constructor. If an oracle is provided (e.g. the index of the PubMed IDs created with
+        oc_ds_converter/run/pubmed_crosswalk.py), the PMIDs it contains are valid without any API request."""
         super(PMIDManager, self).__init__()
+        self.oracle = oracle
         self._api = "https://pubmed.ncbi.nlm.nih.gov/"
+        # the E-utilities esummary endpoint accepts up to 200 PMIDs per request
+        self._api_batch = "https://eutils.ncbi.nlm.nih.gov/entrez/eutils/esummary.fcgi"
+        self._batch_size = 200
         self._use_api_service = use_api_service
         if storage_manager is None:
             self.storage_manager = InMemoryStorageManager()
@@ -48,6 +55,7 @@ class PMIDManager(IdentifierManager):
             self.storage_manager = storage_manager
 
         self._p = "pmid:"
+        self.validation_pipeline = ValidationPipeline(self)
         self._im = ISSNManager()
         #regex
         self._doi_regex = r"(?<=^AID\s-\s).*\[doi\]\s*\n"
@@ -72,25 +80,11 @@ class PMIDManager(IdentifierManager):
             return None
 
     def is_valid(self, pmid, get_extra_info=False):
-        pmid = self.normalise(pmid, include_prefix=True)
-
-        if not pmid:
-            return False
-        else:
-            pmid_vaidation_value = self.storage_manager.get_value(pmid)
-            if isinstance(pmid_vaidation_value, bool):
-                return pmid_vaidation_value
-            else:
-                if get_extra_info:
-                    info = self.exists(pmid, get_extra_info=True)
-                    self.storage_manager.set_full_value(pmid,info[1])
-                    return (info[0] and self.syntax_ok(pmid)), info[1]
-                validity_check = self.exists(pmid) and self.syntax_ok(pmid)
-                self.storage_manager.set_value(pmid, validity_check)
-
-                return validity_check
-
+        # the syntax is checked before the storage and the API, so that a malformed PMID costs no request
+        return self.validation_pipeline.is_valid(pmid, get_extra_info)
 
+    def validity_info(self, id_string, validity):
+        return {"id": id_string, "valid": validity}
 
     def normalise(self, id_string, include_prefix=False):
         id_string = str(id_string)
@@ -107,6 +101,7 @@ class PMIDManager(IdentifierManager):
         return True if match("^pmid:[1-9]\d*$", id_string) else False
 
     def exists(self, pmid_full, get_extra_info=False, allow_extra_api=None):
+        set_api_failed(False)
         valid_bool = True
         pmid = pmid_full
         pmid_p = "pmid:"+pmid if not pmid.startswith("pmid:") else pmid
@@ -147,6 +142,8 @@ class PMIDManager(IdentifierManager):
                     except ConnectionError:
                         # Sleep 5 seconds, then try again
                         sleep(5)
+                # all the attempts failed, so the existence of the ID is not known
+                set_api_failed(True)
                 valid_bool = False
             else:
                 if get_extra_info:
@@ -156,6 +153,22 @@ class PMIDManager(IdentifierManager):
             return valid_bool, {"id":pmid_p, "valid": valid_bool}
         return valid_bool
 
+    def exists_batch(self, id_strings):
+        existence, pmids = prepare_batch(self, id_strings)
+        if not self._use_api_service:
+            existence.update(dict.fromkeys(pmids, True))
+            return existence
+        for batch in get_batches(pmids, self._batch_size):
+            json_res = call_api(url=self._api_batch, headers=self._headers, params={
+                "db": "pubmed", "retmode": "json", "id": ",".join(pmid[len(self._p):] for pmid in batch)})
+            if not isinstance(json_res, dict) or not isinstance(json_res.get("result"), dict):
+                continue
+            for pmid in batch:
+                # the summaries of the PMIDs which do not exist only contain an error
+                summary = json_res["result"].get(pmid[len(self._p):])
+                existence[pmid] = isinstance(summary, dict) and "error" not in summary
+        return existence
+
     def extra_info(self, api_response, choose_api=None, info_dict={}):
         result = {}
         result["valid"] = True
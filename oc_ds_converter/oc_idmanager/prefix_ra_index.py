@@ -0,0 +1,185 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+# Copyright (c) 2026 The OpenCitations Index Authors.
+#
+# Permission to use, copy, modify, and/or distribute this software for any purpose
+# with or without fee is hereby granted, provided that the above copyright notice
+# and this permission notice appear in all copies.
+#
+# THE SOFTWARE IS PROVIDED "AS IS" AND THE AUTHOR DISCLAIMS ALL WARRANTIES WITH
+# REGARD TO THIS SOFTWARE INCLUDING ALL IMPLIED WARRANTIES OF MERCHANTABILITY AND
+# FITNESS. IN NO EVENT SHALL THE AUTHOR BE LIABLE FOR ANY SPECIAL, DIRECT, INDIRECT,
+# OR CONSEQUENTIAL DAMAGES OR ANY DAMAGES WHATSOEVER RESULTING FROM LOSS OF USE,
+# DATA OR PROFITS, WHETHER IN AN ACTION OF CONTRACT, NEGLIGENCE OR OTHER TORTIOUS
+# ACTION, ARISING OUT OF OR IN CONNECTION WITH THE USE OR PERFORMANCE OF THIS
+# SOFTWARE.
+
+
+from __future__ import annotations
+
+import csv
+import os
+import re
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional
+from urllib.parse import quote
+
+from filelock import FileLock
+
+from oc_ds_converter.oc_idmanager.support import call_api
+
+RA_API = "https://doi.org/ra/"
+# the registration agency of the prefixes which do not exist
+INVALID_RA = "invalid"
+# the maximum number of prefixes resolved by a single request to the RA API
+BATCH_SIZE = 20
+HEADERS = {
+    "User-Agent": "Identifier Manager / OpenCitations Indexes "
+    "(http://opencitations.net; mailto:contact@opencitations.net)"
+}
+
+prefix_regex = re.compile(r"10\.\d{4,9}")
+
+
+def get_prefix(doi_or_prefix:str) -> Optional[str]:
+    '''
+    It returns the prefix of a DOI, with or without the "doi:" prefix, or of a prefix, e.g. "10.1007" for
+    "doi:10.1007/s11192-022-04367-w", or None if it does not contain a prefix.
+    '''
+    found = prefix_regex.search(str(doi_or_prefix).split('/', 1)[0]) if doi_or_prefix else None
+    return found.group(0) if found else None
+
+
+class PrefixRAIndex(object):
+    '''
+    This class maps the DOI prefixes to the registration agencies (RAs) which assigned them, e.g. "10.1007"
+    to "crossref", so that the RA of a DOI is known without a request per DOI. The index is built from the
+    dumps (every DOI of a Crossref dump is assigned by Crossref) and from the answers of the RA API of doi.org,
+    which are requested in batches and concurrently for the prefixes not known yet. If a file is provided, the
+    index is loaded from it and the new prefixes are appended to it, so that it is shared by the processes
+    and the runs. The prefixes which do not exist are saved with the RA "invalid", while the prefixes whose RA
+    could not be retrieved (e.g. for a network error) are not saved, so that they are requested again.
+
+    :params filepath: the CSV file of the index, with the "prefix" and "ra" columns, if any
+    :type filepath: str|None
+    :params max_workers: the maximum number of concurrent requests to the RA API
+    :type max_workers: int
+    '''
+    def __init__(self, filepath:str|None=None, max_workers:int=8):
+        self.filepath = filepath
+        self.max_workers = max_workers
+        self._prefix_to_ra: Dict[str, str] = dict()
+        self.hits = 0
+        self.misses = 0
+        if filepath:
+            Path(os.path.abspath(os.path.join(filepath, os.pardir))).mkdir(parents=True, exist_ok=True)
+            self.lock = FileLock(filepath + ".lock")
+            self.reload()
+
+    def reload(self) -> None:
+        '''
+        It loads the prefixes saved in the file of the index, including the ones added by other processes.
+        '''
+        if self.filepath and os.path.exists(self.filepath):
+            with open(self.filepath, 'r', encoding='utf-8', newline='') as f:
+                for row in csv.DictReader(f):
+                    if row.get('prefix') and row.get('ra'):
+                        self._prefix_to_ra[row['prefix']] = row['ra']
+
+    def __len__(self) -> int:
+        return len(self._prefix_to_ra)
+
+    def __contains__(self, doi_or_prefix:str) -> bool:
+        return get_prefix(doi_or_prefix) in self._prefix_to_ra
+
+    def get(self, doi_or_prefix:str) -> Optional[str]:
+        '''
+        It returns the RA of the prefix of a DOI, or of a prefix, if it is in the index, None otherwise.
+        '''
+        ra = self._prefix_to_ra.get(get_prefix(doi_or_prefix))
+        if ra is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return ra
+
+    def add(self, prefixes_to_ra:Dict[str, str]) -> None:
+        '''
+        It adds prefixes and their RAs to the index, and appends the new ones to its file, if any.
+
+        :params prefixes_to_ra: the RA (e.g. "crossref") of each prefix (e.g. "10.1007")
+        :type prefixes_to_ra: Dict[str, str]
+        '''
+        new = {prefix: ra for prefix, ra in prefixes_to_ra.items()
+               if prefix and ra and self._prefix_to_ra.get(prefix) != ra}
+        if not new:
+            return
+        self._prefix_to_ra.update(new)
+        if self.filepath:
+            with self.lock:
+                exists = os.path.exists(self.filepath)
+                with open(self.filepath, 'a', encoding='utf-8', newline='') as f:
+                    writer = csv.DictWriter(f, ['prefix', 'ra'])
+                    if not exists:
+                        writer.writeheader()
+                    writer.writerows({'prefix': prefix, 'ra': ra} for prefix, ra in new.items())
+
+    def add_dois(self, dois:Iterable[str], ra:str) -> None:
+        '''
+        It adds the prefixes of DOIs assigned by the same RA, e.g. the DOIs of a Crossref dump.
+        '''
+        self.add({prefix: ra for prefix in {get_prefix(doi) for doi in dois} if prefix})
+
+    def known_prefixes(self) -> List[str]:
+        '''
+        It returns the prefixes of the index which exist, e.g. to build a ``PrefixRegistry``.
+        '''
+        return [prefix for prefix, ra in self._prefix_to_ra.items() if ra != INVALID_RA]
+
+    def resolve(self, dois_or_prefixes:Iterable[str]) -> Dict[str, Optional[str]]:
+        '''
+        It returns the RA of the prefix of each DOI or prefix. The prefixes not in the index are requested to
+        the RA API in batches of BATCH_SIZE prefixes, with at most max_workers concurrent requests, and added to
+        the index. The RA of a prefix which could not be retrieved is None.
+
+        :params dois_or_prefixes: the DOIs or prefixes
+        :type dois_or_prefixes: Iterable[str]
+        :returns: Dict[str, Optional[str]] -- the RA of each DOI or prefix
+        '''
+        dois_or_prefixes = list(dois_or_prefixes)
+        prefixes = {doi_or_prefix: get_prefix(doi_or_prefix) for doi_or_prefix in dois_or_prefixes}
+        unknown = sorted({prefix for prefix in prefixes.values() if prefix and prefix not in self._prefix_to_ra})
+        if unknown and self.filepath:
+            # the prefixes may have been resolved by another process in the meantime
+            self.reload()
+            unknown = [prefix for prefix in unknown if prefix not in self._prefix_to_ra]
+        if unknown:
+            batches = [unknown[i:i + BATCH_SIZE] for i in range(0, len(unknown), BATCH_SIZE)]
+            with ThreadPoolExecutor(max_workers=max(1, min(self.max_workers, len(batches)))) as executor:
+                for resolved in executor.map(self.request_ras, batches):
+                    self.add(resolved)
+        return {doi_or_prefix: self.get(prefix) if prefix else None for doi_or_prefix, prefix in prefixes.items()}
+
+    @staticmethod
+    def request_ras(prefixes:List[str]) -> Dict[str, str]:
+        '''
+        It requests the RAs of several prefixes to the RA API with a single request. The prefixes whose RA could
+        not be retrieved are not in the dictionary returned.
+        '''
+        api_response = call_api(url=RA_API + ','.join(quote(prefix) for prefix in prefixes), headers=HEADERS)
+        resolved = dict()
+        if not isinstance(api_response, list):
+            return resolved
+        for answer in api_response:
+            prefix = get_prefix(answer.get('DOI'))
+            if prefix not in prefixes:
+                continue
+            if answer.get('RA'):
+                resolved[prefix] = answer['RA'].lower().strip()
+            elif 'not exist' in str(answer.get('status', '')).lower() or answer.get('status') == 'Invalid DOI':
+                resolved[prefix] = INVALID_RA
+        return resolved
+
+    def stats(self) -> Dict[str, int]:
+        return {'size': len(self._prefix_to_ra), 'hits': self.hits, 'misses': self.misses}
@@ -22,6 +22,8 @@ from urllib.parse import quote, unquote
 from oc_ds_converter.oc_idmanager.oc_data_storage.storage_manager import StorageManager
 from oc_ds_converter.oc_idmanager.oc_data_storage.in_memory_manager import InMemoryStorageManager
 from oc_ds_converter.oc_idmanager.base import IdentifierManager
+from oc_ds_converter.oc_idmanager.negative_cache import SYNTAX
+from oc_ds_converter.oc_idmanager.support import call_api, get_batches, prepare_batch, set_api_failed
 from requests import ReadTimeout, get
 from requests.exceptions import ConnectionError
 from typing import Type, Optional
@@ -34,6 +36,9 @@ class RORManager(IdentifierManager):
         """PMCID manager constructor."""
         super(RORManager, self).__init__()
         self._api = "https://api.ror.org/organizations/"
+        # the search of the ROR API returns 20 organizations per page
+        self._api_batch = "https://api.ror.org/organizations"
+        self._batch_size = 20
         self._use_api_service = use_api_service
         if storage_manager is None:
             self.storage_manager = InMemoryStorageManager()
@@ -54,13 +59,27 @@ class RORManager(IdentifierManager):
                 if get_extra_info:
                     return ror_id_validation_value, {"id": ror_id, "valid": ror_id_validation_value}
                 return ror_id_validation_value
+            elif not self.syntax_ok(ror_id):
+                self.record_invalid(ror_id, SYNTAX)
+                self.storage_manager.set_value(ror_id, False)
+                if get_extra_info:
+                    return False, {"id": ror_id, "valid": False}
+                return False
+            elif self.cached_as_invalid(ror_id):
+                # the ROR ID was found invalid before, e.g. by a previous run, and this result is not expired yet
+                if get_extra_info:
+                    return False, {"id": ror_id, "valid": False}
+                return False
             else:
                 if get_extra_info:
                     info = self.exists(ror_id, get_extra_info=True)
-                    self.storage_manager.set_full_value(ror_id, info[1])
-                    return (info[0] and self.syntax_ok(ror_id)), info[1]
-                validity_check = self.exists(ror_id) and self.syntax_ok(ror_id)
-                self.storage_manager.set_value(ror_id, validity_check)
+                    # the result of a failed request is not stored, so that the ROR ID is checked again
+                    if info[0] or self.record_invalid(ror_id):
+                        self.storage_manager.set_full_value(ror_id, info[1])
+                    return info[0], info[1]
+                validity_check = self.exists(ror_id)
+                if validity_check or self.record_invalid(ror_id):
+                    self.storage_manager.set_value(ror_id, validity_check)
                 return validity_check
 
     def normalise(self, id_string, include_prefix=False):
@@ -87,6 +106,7 @@ class RORManager(IdentifierManager):
         return True if match(r"^ror:0[a-hj-km-np-tv-z|0-9]{6}[0-9]{2}$", id_string) else False
 
     def exists(self, ror_id_full, get_extra_info=False, allow_extra_api=None):
+        set_api_failed(False)
         valid_bool = True
         if self._use_api_service:
             ror_id = self.normalise(ror_id_full)
@@ -123,6 +143,8 @@ class RORManager(IdentifierManager):
                     except ConnectionError:
                         # Sleep 5 seconds, then try again
                         sleep(5)
+                # all the attempts failed, so the existence of the ID is not known
+                set_api_failed(True)
                 valid_bool = False
             else:
                 if get_extra_info:
@@ -133,6 +155,21 @@ class RORManager(IdentifierManager):
             return valid_bool, {"valid": valid_bool}
         return valid_bool
 
+    def exists_batch(self, id_strings):
+        existence, ror_ids = prepare_batch(self, id_strings)
+        if not self._use_api_service:
+            existence.update(dict.fromkeys(ror_ids, True))
+            return existence
+        for batch in get_batches(ror_ids, self._batch_size):
+            json_res = call_api(url=self._api_batch, headers=self._headers, params={
+                "query.advanced": " OR ".join("id:https\\://ror.org/" + ror_id[len(self._p):] for ror_id in batch)})
+            if not isinstance(json_res, dict) or not isinstance(json_res.get("items"), list):
+                continue
+            found = {item.get("id") for item in json_res["items"] if isinstance(item, dict)}
+            for ror_id in batch:
+                existence[ror_id] = ("https://ror.org/" + ror_id[len(self._p):]) in found
+        return existence
+
     def extra_info(self, api_response, choose_api=None, info_dict={}):
         result = {}
         result["valid"] = True
@@ -17,24 +17,40 @@
 
 from __future__ import annotations
 
+import threading
 from json import loads
 from time import sleep
+from typing import Dict, Iterable, Iterator, List, Tuple
 
 from bs4 import BeautifulSoup
 from requests import ReadTimeout, get
 from requests.exceptions import ConnectionError
 
 
-def call_api(url:str, headers:str, r_format:str="json") -> dict|None:
+# whether the last API request of the current thread failed (e.g. for a network error) instead of being answered
+_api_state = threading.local()
+
+
+def set_api_failed(failed:bool) -> None:
+    _api_state.failed = failed
+
+def api_failed() -> bool:
+    return getattr(_api_state, 'failed', False)
+
+def call_api(url:str, headers:str, r_format:str="json", params:dict|None=None) -> dict|None:
     tentative = 3
     while tentative:
         tentative -= 1
         try:
-            r = get(url, headers=headers, timeout=30)
+            r = get(url, params=params, headers=headers, timeout=30)
             if r.status_code == 200:
+                set_api_failed(False)
                 r.encoding = "utf-8"
+                if r_format == "text":
+                    return r.text
                 return loads(r.text) if r_format == "json" else BeautifulSoup(r.text, 'xml')
             elif r.status_code == 404:
+                set_api_failed(False)
                 return None
         except ReadTimeout:
             # Do nothing, just try again
@@ -42,8 +58,38 @@ def call_api(url:str, headers:str, r_format:str="json") -> dict|None:
         except ConnectionError:
             # Sleep 5 seconds, then try again
             sleep(5)
+    set_api_failed(True)
     return None
 
+def check_exists(id_manager, id_string:str) -> bool|None:
+    '''
+    It checks through the API of an ID manager whether an ID exists. It returns None if the check failed (e.g. for
+    a timeout) instead of being answered, so that the ID is not considered invalid.
+    '''
+    set_api_failed(False)
+    if id_manager.exists(id_string):
+        return True
+    if api_failed():
+        set_api_failed(False)
+        return None
+    return False
+
+def prepare_batch(id_manager, id_strings:Iterable[str]) -> Tuple[Dict[str, bool|None], List[str]]:
+    '''
+    It normalises the IDs to be checked by the ``exists_batch`` method of an ID manager. It returns the existence
+    of each ID, False for the malformed ones and None for the others, and the IDs to be requested, without repetitions.
+    '''
+    existence = dict()
+    for id_string in id_strings:
+        normalised = id_manager.normalise(id_string, include_prefix=True) if id_string else None
+        if normalised and normalised not in existence:
+            existence[normalised] = None if id_manager.syntax_ok(normalised) else False
+    return existence, [id for id, value in existence.items() if value is None]
+
+def get_batches(ids:List[str], batch_size:int) -> Iterator[List[str]]:
+    for i in range(0, len(ids), batch_size):
+        yield ids[i:i + batch_size]
+
 def extract_info(api_response:dict, choose_api:str|None=None) -> dict:
     from oc_ds_converter.oc_idmanager.metadata_manager import MetadataManager
     info_dict = {'valid': True}
@@ -0,0 +1,255 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+# Copyright (c) 2026 The OpenCitations Index Authors.
+#
+# Permission to use, copy, modify, and/or distribute this software for any purpose
+# with or without fee is hereby granted, provided that the above copyright notice
+# and this permission notice appear in all copies.
+#
+# THE SOFTWARE IS PROVIDED "AS IS" AND THE AUTHOR DISCLAIMS ALL WARRANTIES WITH
+# REGARD TO THIS SOFTWARE INCLUDING ALL IMPLIED WARRANTIES OF MERCHANTABILITY AND
+# FITNESS. IN NO EVENT SHALL THE AUTHOR BE LIABLE FOR ANY SPECIAL, DIRECT, INDIRECT,
+# OR CONSEQUENTIAL DAMAGES OR ANY DAMAGES WHATSOEVER RESULTING FROM LOSS OF USE,
+# DATA OR PROFITS, WHETHER IN AN ACTION OF CONTRACT, NEGLIGENCE OR OTHER TORTIOUS
+# ACTION, ARISING OUT OF OR IN CONNECTION WITH THE USE OR PERFORMANCE OF THIS
+# SOFTWARE.
+
+
+from __future__ import annotations
+
+from typing import Callable, Container, Dict, Iterable, Optional
+
+from oc_ds_converter.oc_idmanager.base import IdentifierManager
+from oc_ds_converter.oc_idmanager.negative_cache import SYNTAX
+
+# the tiers of the validation, from the cheapest to the most expensive
+TIERS = ('normalisation', 'syntax', 'registry', 'storage', 'oracle', 'negative_cache', 'api')
+
+
+def doi_prefix(doi:str) -> Optional[str]:
+    '''
+    It returns the registrant prefix of a DOI, e.g. "doi:10.1007" for "doi:10.1007/s11192-022-04367-w".
+    '''
+    slash = doi.find('/')
+    return doi[:slash] if slash > 0 else None
+
+
+class PrefixRegistry(object):
+    '''
+    This class keeps the prefixes known for some schemas, e.g. the DOI prefixes assigned to the registrants
+    by the registration agencies. An ID of a schema in the registry whose prefix is not known cannot exist,
+    so it is rejected without any request. The IDs of the other schemas are not checked.
+
+    :params prefixes: the known prefixes, each with the prefix of its schema, e.g. "doi:10.1007"
+    :type prefixes: Iterable[str]
+    :params prefix_functions: the functions returning the prefix of an ID, by schema
+    :type prefix_functions: Dict[str, Callable[[str], Optional[str]]]
+    '''
+    def __init__(self, prefixes:Iterable[str]=(), prefix_functions:Dict[str, Callable[[str], Optional[str]]]|None=None):
+        self.prefix_functions = prefix_functions if prefix_functions is not None else {'doi': doi_prefix}
+        self.prefixes: Dict[str, set] = dict()
+        for prefix in prefixes:
+            self.add(prefix)
+
+    @classmethod
+    def load(cls, filepath:str) -> PrefixRegistry:
+        '''
+        It creates a registry from a text file with one prefix per line, e.g. "doi:10.1007".
+        '''
+        with open(filepath, 'r', encoding='utf-8') as f:
+            return cls(line.strip().lower() for line in f if line.strip())
+
+    def add(self, prefix:str) -> None:
+        schema = prefix.split(':', 1)[0]
+        self.prefixes.setdefault(schema, set()).add(prefix)
+
+    def is_known(self, id:str) -> Optional[bool]:
+        '''
+        It returns False if the prefix of the ID is not known, True if it is known, and None if the
+        schema of the ID is not in the registry.
+
+        :params id: the normalised ID, with the prefix of its schema
+        :type id: str
+        :returns: Optional[bool] -- whether the prefix of the ID is known
+        '''
+        schema = id.split(':', 1)[0]
+        prefixes = self.prefixes.get(schema)
+        prefix_function = self.prefix_functions.get(schema)
+        if not prefixes or prefix_function is None:
+            return None
+        return prefix_function(id) in prefixes
+
+
+class ValidationPipeline(object):
+    '''
+    This class validates the IDs of a schema through ordered tiers, from the cheapest to the most expensive:
+    normalisation, syntax and check digit, known-prefix registry, storage, local oracle, negative cache and
+    API. Each tier either decides the validity of an ID or passes it to the next tier, so that most invalid IDs
+    are rejected in a few microseconds, without any request. The IDs checked, accepted and rejected by each tier
+    are counted. It is the cascade of the ``is_valid`` method of the DOI, ORCID and PMID managers: the IDs
+    rejected by the syntax or the registry and the ones decided by the oracle or the API are saved in the
+    storage of the identifier manager, and the ones found invalid are recorded in its negative cache.
+
+    :params id_manager: the identifier manager of the schema
+    :type id_manager: IdentifierManager
+    :params prefix_registry: the known prefixes, by default the ``prefix_registry`` of the identifier manager, if any
+    :type prefix_registry: PrefixRegistry|None
+    :params oracle: the IDs known to exist, e.g. a ``DOIOracle`` of the DOIs with a record in the dumps, by
+        default the ``oracle`` of the identifier manager, if any
+    :type oracle: Container[str]|None
+    :params use_storage: True to look up the storage of the identifier manager
+    :type use_storage: bool
+    :params use_api: True to check the IDs not decided by the other tiers through the API
+    :type use_api: bool
+    '''
+    def __init__(self, id_manager:IdentifierManager, prefix_registry:PrefixRegistry|None=None,
+                 oracle:Container[str]|None=None, use_storage:bool=True, use_api:bool=True):
+        self.id_manager = id_manager
+        self._prefix_registry = prefix_registry
+        self._oracle_ids = oracle
+        self.use_storage = use_storage
+        self.use_api = use_api
+        self.counters = {tier: {'checked': 0, 'accepted': 0, 'rejected': 0} for tier in TIERS}
+        self._tiers = [
+            ('syntax', self._syntax),
+            ('registry', self._registry),
+            ('storage', self._storage),
+            ('oracle', self._oracle),
+            ('negative_cache', self._negative_cache),
+            ('api', self._api)]
+
+    @property
+    def prefix_registry(self) -> PrefixRegistry|None:
+        # the registry and the oracle of the identifier manager are read at each validation, since they may be set later
+        if self._prefix_registry is not None:
+            return self._prefix_registry
+        return getattr(self.id_manager, 'prefix_registry', None)
+
+    @property
+    def oracle(self) -> Container[str]|None:
+        if self._oracle_ids is not None:
+            return self._oracle_ids
+        return getattr(self.id_manager, 'oracle', None)
+
+    def _store(self, id:str, validity:bool, info:dict|None) -> None:
+        storage_manager = getattr(self.id_manager, 'storage_manager', None)
+        if storage_manager is None:
+            return
+        if info is not None:
+            storage_manager.set_full_value(id, info)
+        else:
+            storage_manager.set_value(id, validity)
+
+    def _info(self, id:str, validity:bool, get_extra_info:bool) -> dict|None:
+        return self.id_manager.validity_info(id, validity) if get_extra_info else None
+
+    def _syntax(self, id:str, get_extra_info:bool) -> tuple:
+        # an ID with a correct syntax and check digit may still not exist
+        if self.id_manager.syntax_ok(id) and self.id_manager.check_digit(id):
+            return None, None
+        return self._reject(id, get_extra_info)
+
+    def _registry(self, id:str, get_extra_info:bool) -> tuple:
+        prefix_registry = self.prefix_registry
+        # a known prefix does not mean that the ID exists
+        if prefix_registry is None or prefix_registry.is_known(id) is not False:
+            return None, None
+        return self._reject(id, get_extra_info)
+
+    def _reject(self, id:str, get_extra_info:bool) -> tuple:
+        # an ID which cannot exist is never checked again
+        self.id_manager.record_invalid(id, SYNTAX)
+        info = self._info(id, False, get_extra_info)
+        self._store(id, False, info)
+        return False, info
+
+    def _storage(self, id:str, get_extra_info:bool) -> tuple:
+        if not self.use_storage:
+            return None, None
+        validity = self.id_manager.validated_as_id(id)
+        return validity, None if validity is None else self._info(id, validity, get_extra_info)
+
+    def _oracle(self, id:str, get_extra_info:bool) -> tuple:
+        oracle = self.oracle
+        # an ID not in the oracle may still exist
+        if oracle is None or id not in oracle:
+            return None, None
+        info = self._info(id, True, get_extra_info)
+        self._store(id, True, info)
+        return True, info
+
+    def _negative_cache(self, id:str, get_extra_info:bool) -> tuple:
+        # the ID was found invalid before, e.g. by a previous run, and this result is not expired yet
+        if not self.id_manager.cached_as_invalid(id):
+            return None, None
+        return False, self._info(id, False, get_extra_info)
+
+    def _api(self, id:str, get_extra_info:bool) -> tuple:
+        if not self.use_api:
+            return None, None
+        if get_extra_info:
+            validity, info = self.id_manager.exists(id, get_extra_info=True)
+        else:
+            validity, info = self.id_manager.exists(id), None
+        validity = bool(validity)
+        if not validity and not self.id_manager.record_invalid(id):
+            # the request failed, so the validity of the ID is not known and it is not stored
+            return None, info
+        self._store(id, validity, info)
+        return validity, info
+
+    def _count(self, tier:str, validity:Optional[bool]) -> Optional[bool]:
+        counter = self.counters[tier]
+        counter['checked'] += 1
+        if validity is True:
+            counter['accepted'] += 1
+        elif validity is False:
+            counter['rejected'] += 1
+        return validity
+
+    def normalise(self, id_string:str) -> Optional[str]:
+        '''
+        It returns the ID normalised with the prefix of its schema, or None if it cannot be normalised.
+        '''
+        id = self.id_manager.normalise(id_string, include_prefix=True)
+        prefix = getattr(self.id_manager, '_p', '')
+        # the managers of some schemas return their prefix only when nothing is left of the ID
+        return id if id and id != prefix else None
+
+    def validate(self, id_string:str, get_extra_info:bool=False):
+        '''
+        It returns the validity of an ID, decided by the cheapest tier able to decide it, or None if no tier
+        could decide it, e.g. because the API is not used or its request failed.
+
+        :params id_string: the ID to be validated
+        :type id_string: str
+        :params get_extra_info: True to return the information about the ID as well
+        :type get_extra_info: bool
+        :returns: Optional[bool] -- the validity of the ID, with a dictionary of information if get_extra_info is True
+        '''
+        id = self.normalise(id_string)
+        if self._count('normalisation', None if id else False) is False:
+            return (False, {'id': None, 'valid': False}) if get_extra_info else False
+        validity, info = None, None
+        for tier, check in self._tiers:
+            validity, info = check(id, get_extra_info)
+            if self._count(tier, validity) is not None:
+                break
+        if get_extra_info:
+            return validity, info if info is not None else self.id_manager.validity_info(id, bool(validity))
+        return validity
+
+    def is_valid(self, id_string:str, get_extra_info:bool=False):
+        '''
+        It returns True if the ID is valid, False if it is not or if its validity could not be decided.
+        '''
+        if get_extra_info:
+            validity, info = self.validate(id_string, get_extra_info=True)
+            return validity is True, info
+        return self.validate(id_string) is True
+
+    def stats(self) -> Dict[str, Dict[str, int]]:
+        '''
+        It returns the number of IDs checked, accepted and rejected by each tier.
+        '''
+        return {tier: dict(counter) for tier, counter in self.counters.items()}
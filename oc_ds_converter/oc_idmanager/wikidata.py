@@ -21,6 +21,7 @@ from time import sleep
 from urllib.parse import quote, unquote
 
 from oc_ds_converter.oc_idmanager.base import IdentifierManager
+from oc_ds_converter.oc_idmanager.support import call_api, get_batches, prepare_batch
 from requests import ReadTimeout, get
 from requests.exceptions import ConnectionError
 
@@ -32,6 +33,9 @@ class WikidataManager(IdentifierManager):
         """Wikidata manager constructor."""
         super(WikidataManager, self).__init__()
         self._api = "https://www.wikidata.org/wiki/Special:EntityData/"
+        # the wbgetentities action accepts up to 50 Q-IDs per request
+        self._api_batch = "https://www.wikidata.org/w/api.php"
+        self._batch_size = 50
         self._use_api_service = use_api_service
         self._p = "wikidata:"
         self._data = data
@@ -125,6 +129,23 @@ class WikidataManager(IdentifierManager):
             return valid_bool, {"valid": valid_bool}
         return valid_bool
 
+    def exists_batch(self, id_strings):
+        existence, wikidata_ids = prepare_batch(self, id_strings)
+        if not self._use_api_service:
+            existence.update(dict.fromkeys(wikidata_ids, True))
+            return existence
+        for batch in get_batches(wikidata_ids, self._batch_size):
+            json_res = call_api(url=self._api_batch, headers=self._headers, params={
+                "action": "wbgetentities", "props": "info", "format": "json",
+                "ids": "|".join(wikidata_id[len(self._p):] for wikidata_id in batch)})
+            if not isinstance(json_res, dict) or not isinstance(json_res.get("entities"), dict):
+                continue
+            for wikidata_id in batch:
+                # the Q-IDs which do not exist are marked as missing, the redirected ones are returned with their target
+                entity = json_res["entities"].get(wikidata_id[len(self._p):])
+                existence[wikidata_id] = isinstance(entity, dict) and "missing" not in entity
+        return existence
+
     def extra_info(self, api_response, choose_api=None, info_dict={}):
         result = {}
         result["valid"] = True
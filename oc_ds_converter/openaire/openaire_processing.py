@@ -24,14 +24,16 @@ from typing import Dict, List, Tuple, Optional, Type, Callable
 
 import fakeredis
 from bs4 import BeautifulSoup
-from oc_ds_converter.datasource.redis import RedisDataSource
+from oc_ds_converter.datasource.snapshot import get_meta_data_source
 from re import search, match, sub
 from oc_ds_converter.lib.cleaner import Cleaner
 from oc_ds_converter.lib.master_of_regex import *
+from oc_ds_converter.lib.orcid_set import get_orcid_set
+from oc_ds_converter.lib.prefetch_index import PrefetchIndex
 from oc_ds_converter.pubmed.get_publishers import ExtractPublisherDOI
 from oc_ds_converter.ra_processor import RaProcessor
 from oc_ds_converter.oc_idmanager.oc_data_storage.storage_manager import StorageManager
-from oc_ds_converter.oc_idmanager.oc_data_storage.in_memory_manager import InMemoryStorageManager
+from oc_ds_converter.oc_idmanager.oc_data_storage.overlay_manager import OverlayStorageManager
 from oc_ds_converter.oc_idmanager.oc_data_storage.sqlite_manager import SqliteStorageManager
 
 warnings.filterwarnings("ignore", category=UserWarning, module='bs4')
@@ -45,7 +47,7 @@ class OpenaireProcessing(RaProcessor):
         else:
             self.storage_manager = storage_manager
 
-        self.temporary_manager = InMemoryStorageManager('../memory.json')
+        self.temporary_manager = OverlayStorageManager(self.storage_manager)
 
         self.types_dict = {
             "Article": "journal article",
@@ -93,23 +95,25 @@ class OpenaireProcessing(RaProcessor):
         self.pmc_m = PMCIDManager(storage_manager=self.storage_manager)
         self.arxiv_m = ArXivManager(storage_manager=self.storage_manager)
 
-        self.orcid_m = ORCIDManager(storage_manager=self.storage_manager)
+        # the ORCIDs of the ORCID public data file, if set in the configuration file, are not checked through the API
+        self.orcid_set = get_orcid_set()
+        self.orcid_m = ORCIDManager(storage_manager=self.storage_manager, orcid_set=self.orcid_set)
 
         self._id_man_dict = {"doi":self.doi_m, "pmid": self.pmid_m, "pmcid": self.pmc_m,"pmc": self.pmc_m, "arxiv":self.arxiv_m}
 
         # Temporary storage managers : all data must be stored in tmp storage manager and passed all together to the
-        # main storage_manager  only once the full file is processed. Checks must be done both on tmp and in
-        # storage_manager, so that in case the process breaks while processing a file which does not complete (so
-        # without writing the final file) all the data concerning the ids are not stored. Otherwise, the ids saved in
-        # a storage_manager db would be considered to have been processed and thus would be ignored by the process
-        # and lost.
+        # main storage_manager  only once the full file is processed. The tmp storage manager is an in-RAM overlay
+        # of storage_manager, so checks done on tmp also look in storage_manager. In case the process breaks while
+        # processing a file which does not complete (so without writing the final file) all the data concerning the
+        # ids are not stored. Otherwise, the ids saved in a storage_manager db would be considered to have been
+        # processed and thus would be ignored by the process and lost.
 
         self.tmp_doi_m = DOIManager(storage_manager=self.temporary_manager)
         self.tmp_pmid_m = PMIDManager(storage_manager=self.temporary_manager)
         self.tmp_pmc_m = PMCIDManager(storage_manager=self.temporary_manager)
         self.tmp_arxiv_m = ArXivManager(storage_manager=self.temporary_manager)
 
-        self.tmp_orcid_m = ORCIDManager(storage_manager=self.temporary_manager)
+        self.tmp_orcid_m = ORCIDManager(storage_manager=self.temporary_manager, orcid_set=self.orcid_set)
 
         self.tmp_id_man_dict = {"doi": self.tmp_doi_m, "pmid": self.tmp_pmid_m, "pmcid": self.tmp_pmc_m, "pmc": self.tmp_pmc_m,
                              "arxiv": self.tmp_arxiv_m}
@@ -139,11 +143,10 @@ class OpenaireProcessing(RaProcessor):
             self.RA_redis = fakeredis.FakeStrictRedis()
 
         else:
-            self.BR_redis = RedisDataSource("DB-META-BR")
-            self.RA_redis = RedisDataSource("DB-META-RA")
+            self.BR_redis = get_meta_data_source("DB-META-BR")
+            self.RA_redis = get_meta_data_source("DB-META-RA")
 
-        self._redis_values_ra = []
-        self._redis_values_br = []
+        self.prefetch_index = PrefetchIndex()
 
 
         if not publishers_filepath_openaire:
@@ -178,36 +181,25 @@ class OpenaireProcessing(RaProcessor):
                 json.dump({}, fdp, ensure_ascii=False, indent=4)
 
     def update_redis_values(self, br, ra):
-        self._redis_values_br = br
-        self._redis_values_ra = ra
+        self.prefetch_index.update(br, ra)
 
     def validated_as(self, id_dict):
         # Check if the validity was already retrieved and thus
-        # a) if it is now saved either in the in-memory database, which only concerns data validated
+        # a) if it is now saved either in the in-memory overlay, which only concerns data validated
         # during the current file processing;
         # b) or if it is now saved in the storage_manager database, which only concerns data validated
         # during the previous files processing.
-        # In memory db is checked first because the dimension is smaller and the check is faster and
-        # Because we assume that it is more likely to find the same ids in close positions, e.g.: same
-        # citing id in several citations with different cited ids.
+        # The overlay looks in the storage_manager database only for the ids it does not contain.
 
         schema = id_dict["schema"].strip().lower()
         id = id_dict["identifier"]
 
         if schema != "orcid":
             tmp_id_m = self.get_id_manager(schema, self.tmp_id_man_dict)
-            validity_value = tmp_id_m.validated_as_id(id)
-
-            if validity_value is None:
-                id_m = self.get_id_manager(schema, self._id_man_dict)
-                validity_value = id_m.validated_as_id(id)
-            return validity_value
+            return tmp_id_m.validated_as_id(id)
 
         else:
-            validity_value = self.tmp_orcid_m.validated_as_id(id)
-            if validity_value is None:
-                validity_value = self.orcid_m.validated_as_id(id)
-            return validity_value
+            return self.tmp_orcid_m.validated_as_id(id)
 
     def get_id_manager(self, schema_or_id, id_man_dict):
         """Given as input the string of a schema (e.g.:'pmid') and a dictionary mapping strings of
@@ -492,7 +484,7 @@ class OpenaireProcessing(RaProcessor):
                     if id_dict.get("identifier").split("/")[0] in prefixes_w_max_priority:
                         norm_id = self.doi_m.normalise(id_dict["identifier"], include_prefix=True)
                         #if self.BR_redis.get(norm_id):
-                        if norm_id in self._redis_values_br:
+                        if self.prefetch_index.has_br(norm_id):
                             result_id_dict_list.append(id_dict)
                             return result_id_dict_list
                         # if the id is not in redis db, validate it before appending
@@ -513,7 +505,7 @@ class OpenaireProcessing(RaProcessor):
                             if id_dict.get("identifier").split("/")[0] in prefixes_w_max_priority:
                                 norm_id = self.doi_m.normalise(id_dict["identifier"], include_prefix=True)
                                 #if self.BR_redis.get(norm_id):
-                                if norm_id in self._redis_values_br:
+                                if self.prefetch_index.has_br(norm_id):
                                     result_id_dict_list.append(id_dict)
                                     return result_id_dict_list
                                 # if the id is not in redis db, validate it before appending
@@ -570,7 +562,7 @@ class OpenaireProcessing(RaProcessor):
                 tmp_id_man = self.get_id_manager(schema, self.tmp_id_man_dict)
                 if schema in {"pmid", "pmcid", "pmc", "arxiv", "doi"}:
                     #if self.BR_redis.get(norm_id):
-                    if norm_id in self._redis_values_br:
+                    if self.prefetch_index.has_br(norm_id):
                         tmp_id_man.storage_manager.set_value(norm_id, True) #In questo modo l'id presente in redis viene inserito anche nello storage e risulta già
                         # preso in considerazione negli step successivi
                         valid_id_set.add(norm_id)
@@ -625,7 +617,7 @@ class OpenaireProcessing(RaProcessor):
                                 orcid = norm_orcid
                             elif validity_value_orcid is None:
                                 #if self.RA_redis.get(norm_orcid):
-                                if norm_orcid in self._redis_values_ra:
+                                if self.prefetch_index.has_ra(norm_orcid):
                                     orcid = norm_orcid
                                 # if the id is not in redis db, validate it before appending
                                 elif self.tmp_orcid_m.is_valid(norm_orcid):
@@ -635,9 +627,7 @@ class OpenaireProcessing(RaProcessor):
         return orcid
 
     def memory_to_storage(self):
-        kv_in_memory = self.temporary_manager.get_validity_list_of_tuples()
-        self.storage_manager.set_multi_value(kv_in_memory)
-        self.temporary_manager.delete_storage()
+        self.temporary_manager.commit()
 
     def extract_all_ids(self, citation):
         all_br = set()
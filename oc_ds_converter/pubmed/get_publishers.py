@@ -3,34 +3,24 @@ import re
 import requests
 from lxml import etree
 
+from oc_ds_converter.oc_idmanager.prefix_ra_index import INVALID_RA, PrefixRAIndex
+
 
 class ExtractPublisherDOI(object):
-    def __init__(self, pref_info_dict):
+    def __init__(self, pref_info_dict, ra_index=None):
         self.description = "class aimed at extracting publishers' names exploiting the DOI "
+        # the registration agencies of the prefixes, shared with the other processes if saved in a file
+        self.ra_index = ra_index if ra_index is not None else PrefixRAIndex()
         self.datacite_prefixes = ['10.48550', '10.4230', '10.5281', '10.17863', '10.3929', '10.6084', '10.5451', '10.5445', '10.17615', '10.17877', '10.5167', '10.13140', '10.18154', '10.48350', '10.7892', '10.17605', '10.5283', '10.17169', '10.15488', '10.5169', '10.1184', '10.3204', '10.6073', '10.14288', '10.5061', '10.25384']
+        self.ra_index.add({prefix: 'datacite' for prefix in self.datacite_prefixes if prefix not in self.ra_index})
         if pref_info_dict:
             self._prefix_to_data_dict = pref_info_dict
         else:
             self._prefix_to_data_dict = dict()
 
     def get_registration_agency(self, prefix):
-        req_url = "https://doi.org/ra/"+prefix
-        try:
-            req = requests.get(url=req_url)
-            req_status_code = req.status_code
-            if req_status_code == 200:
-                req_data = req.json()
-                ra = req_data[0].get("RA")
-                if ra:
-                    norm_ra = ra.lower().strip()
-                    if norm_ra:
-                        return norm_ra
-                    else:
-                        return ""
-        except requests.ConnectionError:
-            print("failed to connect to crossref for", prefix)
-            quit()
-        return ""
+        ra = self.ra_index.resolve([prefix])[prefix]
+        return ra if ra and ra != INVALID_RA else ""
 
     def get_last_map_ver(self):
         return self._prefix_to_data_dict
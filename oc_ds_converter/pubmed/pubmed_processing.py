@@ -15,7 +15,9 @@ from oc_ds_converter.oc_idmanager.pmid import PMIDManager
 from oc_ds_converter.lib.cleaner import Cleaner
 from oc_ds_converter.lib.master_of_regex import *
 
-from oc_ds_converter.datasource.redis import RedisDataSource
+from oc_ds_converter.datasource.snapshot import get_meta_data_source
+from oc_ds_converter.lib.pubmed_crosswalk import get_pubmed_crosswalk
+from oc_ds_converter.lib.threaded_validator import validate_ids
 from oc_ds_converter.pubmed.finder_nih import NIHResourceFinder
 from oc_ds_converter.pubmed.get_publishers import ExtractPublisherDOI
 from oc_ds_converter.ra_processor import RaProcessor
@@ -27,15 +29,17 @@ class PubmedProcessing(RaProcessor):
     def __init__(self, orcid_index: str = None, doi_csv: str = None, publishers_filepath_pubmed: str = None, journals_filepath: str = None, testing:bool = True):
         super(PubmedProcessing, self).__init__(orcid_index, doi_csv)
         self.nihrf = NIHResourceFinder()
-        self.doi_m = DOIManager()
-        self.pmid_m = PMIDManager()
+        # the PMIDs and DOIs of the index of the PubMed IDs, if any, are valid without any API request
+        self.pubmed_crosswalk = get_pubmed_crosswalk()
+        self.doi_m = DOIManager(oracle=self.pubmed_crosswalk)
+        self.pmid_m = PMIDManager(oracle=self.pubmed_crosswalk)
         if testing:
             self.BR_redis= fakeredis.FakeStrictRedis()
             self.RA_redis= fakeredis.FakeStrictRedis()
 
         else:
-            self.BR_redis = RedisDataSource("DB-META-BR")
-            self.RA_redis = RedisDataSource("DB-META-RA")
+            self.BR_redis = get_meta_data_source("DB-META-BR")
+            self.RA_redis = get_meta_data_source("DB-META-RA")
 
         if not journals_filepath:
             if not exists(os.path.join(pathlib.Path(__file__).parent.resolve(), "support_files")):
@@ -91,6 +95,21 @@ class PubmedProcessing(RaProcessor):
         with open(path, "w", encoding="utf-8") as fd:
             json.dump(pref_pub_dict, fd, ensure_ascii=False, indent=4)
 
+    def validate_dois(self, items: List[dict], validator) -> None:
+        '''
+        It validates with a single call to a validator (e.g. a ``ThreadedValidator``) the DOIs of the items which
+        ``csv_creator`` would validate one by one, i.e. those not in META, and saves their validity in the storage
+        of the DOI manager.
+        '''
+        dois = list()
+        for item in items:
+            pmid = self.pmid_m.normalise(str(item['pmid']))
+            if item.get('doi') and ((pmid and self.doi_set and pmid in self.doi_set) or (pmid and not self.doi_set)):
+                doi = self.doi_m.normalise(item['doi'], include_prefix=True)
+                if doi and not self.BR_redis.get(doi):
+                    dois.append(doi)
+        validate_ids(validator, self.doi_m, dois)
+
     def csv_creator(self, item: dict) -> dict:
         row = dict()
         doi = ""
@@ -0,0 +1,59 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+# Copyright (c) 2026 The OpenCitations Index Authors.
+#
+# Permission to use, copy, modify, and/or distribute this software for any purpose
+# with or without fee is hereby granted, provided that the above copyright notice
+# and this permission notice appear in all copies.
+#
+# THE SOFTWARE IS PROVIDED "AS IS" AND THE AUTHOR DISCLAIMS ALL WARRANTIES WITH
+# REGARD TO THIS SOFTWARE INCLUDING ALL IMPLIED WARRANTIES OF MERCHANTABILITY AND
+# FITNESS. IN NO EVENT SHALL THE AUTHOR BE LIABLE FOR ANY SPECIAL, DIRECT, INDIRECT,
+# OR CONSEQUENTIAL DAMAGES OR ANY DAMAGES WHATSOEVER RESULTING FROM LOSS OF USE,
+# DATA OR PROFITS, WHETHER IN AN ACTION OF CONTRACT, NEGLIGENCE OR OTHER TORTIOUS
+# ACTION, ARISING OUT OF OR IN CONNECTION WITH THE USE OR PERFORMANCE OF THIS
+# SOFTWARE.
+
+
+from __future__ import annotations
+
+from argparse import ArgumentParser
+
+from oc_ds_converter.lib.doi_oracle import build_doi_oracle, get_dois_filepaths
+from oc_ds_converter.lib.file_manager import normalize_path
+
+
+def create_doi_oracle(inputs:list, output:str, verbose:bool=False) -> int:
+    '''
+    This function merges the DOIs saved by the first iterations of the drivers in the directories set as
+    "dois_dir" in the [doi_oracle] section of the configuration file, and possibly other oracles, in an
+    oracle to be set as "filepaths" in the same section, so that the DOIs with a record in the dumps are
+    not validated through the API.
+
+    :params inputs: the directories with the ".dois" files and the oracles to be merged
+    :type inputs: list
+    :params output: the path of the oracle
+    :type output: str
+    :returns: int -- the number of distinct DOIs in the oracle
+    '''
+    if verbose:
+        print(f'[INFO: doi_oracle] Merging {len(get_dois_filepaths(inputs))} files of DOIs')
+    saved = build_doi_oracle(inputs, output)
+    if verbose:
+        print(f'[INFO: doi_oracle] {saved} DOIs saved in {output}')
+    return saved
+
+if __name__ == '__main__':
+    arg_parser = ArgumentParser('doi_oracle.py', description='This script merges the DOIs of the records of the dumps '
+                                '(e.g. Crossref, DataCite and JaLC), saved by the first iteration of the drivers, in '
+                                'a DOI oracle, to be set in the [doi_oracle] section of the configuration file so '
+                                'that these DOIs are not validated through the API')
+    arg_parser.add_argument('-i', '--input', dest='input', nargs='+', required=True,
+                            help='The directories with the DOIs saved by the first iteration (".dois" files) and '
+                                 'the oracles to be merged')
+    arg_parser.add_argument('-o', '--output', dest='output', required=True,
+                            help='The path of the oracle')
+    arg_parser.add_argument('-v', '--verbose', dest='verbose', action='store_true', required=False,
+                            help='Show the number of DOIs saved')
+    args = arg_parser.parse_args()
+    create_doi_oracle([normalize_path(path) for path in args.input], normalize_path(args.output), args.verbose)
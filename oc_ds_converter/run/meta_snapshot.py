@@ -0,0 +1,92 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+# Copyright (c) 2026 The OpenCitations Index Authors.
+#
+# Permission to use, copy, modify, and/or distribute this software for any purpose
+# with or without fee is hereby granted, provided that the above copyright notice
+# and this permission notice appear in all copies.
+#
+# THE SOFTWARE IS PROVIDED "AS IS" AND THE AUTHOR DISCLAIMS ALL WARRANTIES WITH
+# REGARD TO THIS SOFTWARE INCLUDING ALL IMPLIED WARRANTIES OF MERCHANTABILITY AND
+# FITNESS. IN NO EVENT SHALL THE AUTHOR BE LIABLE FOR ANY SPECIAL, DIRECT, INDIRECT,
+# OR CONSEQUENTIAL DAMAGES OR ANY DAMAGES WHATSOEVER RESULTING FROM LOSS OF USE,
+# DATA OR PROFITS, WHETHER IN AN ACTION OF CONTRACT, NEGLIGENCE OR OTHER TORTIOUS
+# ACTION, ARISING OUT OF OR IN CONNECTION WITH THE USE OR PERFORMANCE OF THIS
+# SOFTWARE.
+
+
+from __future__ import annotations
+
+import os
+from argparse import ArgumentParser
+
+from oc_ds_converter.datasource.redis import RedisDataSource
+from oc_ds_converter.datasource.snapshot import SnapshotDataSource, export_snapshot
+from oc_ds_converter.lib.bloom_filter import BloomFilter
+from oc_ds_converter.lib.file_manager import normalize_path
+
+snapshot_filenames = {'DB-META-BR': 'meta_br.snapshot', 'DB-META-RA': 'meta_ra.snapshot'}
+
+
+def create_filter(snapshot_filepath:str, filter_filepath:str, error_rate:float=0.01) -> BloomFilter:
+    '''
+    This function creates a Bloom filter from the digests saved in a snapshot file, which can be set in the
+    [snapshot] section of the configuration file of the data sources, so that the processes query redis only
+    for the IDs possibly in META.
+    '''
+    snapshot = SnapshotDataSource(None, snapshot_filepath)
+    bloom_filter = BloomFilter.create(len(snapshot), error_rate, filter_filepath, digests=snapshot.digests())
+    snapshot.close()
+    return bloom_filter
+
+def create_snapshots(output_dir:str, services:list=None, config_filepath:str='config.ini', verbose:bool=False,
+                     error_rate:float=None) -> dict:
+    '''
+    This function exports the IDs of the META redis databases to snapshot files, one per database,
+    which can be set in the [snapshot] section of the configuration file of the data sources, so that
+    the processes check whether an ID is in META without connecting to redis. If error_rate is provided,
+    a Bloom filter with that false positive probability is created from each snapshot as well.
+
+    :params output_dir: the directory where the snapshot files are saved
+    :type output_dir: str
+    :params services: the databases to export, "DB-META-BR" and/or "DB-META-RA" (both by default)
+    :type services: list
+    :params config_filepath: the configuration file of the redis data sources
+    :type config_filepath: str
+    :params error_rate: the false positive probability of the Bloom filters, if they are created
+    :type error_rate: float
+    :returns: dict -- the path of the snapshot file of each database
+    '''
+    services = services if services else list(snapshot_filenames)
+    snapshots = dict()
+    for service in services:
+        filepath = os.path.join(output_dir, snapshot_filenames[service])
+        saved = export_snapshot(RedisDataSource(service, config_filepath), filepath)
+        if verbose:
+            print(f'[INFO: meta_snapshot] {saved} IDs of {service} saved in {filepath}')
+        if error_rate:
+            filter_filepath = os.path.splitext(filepath)[0] + '.bloom'
+            create_filter(filepath, filter_filepath, error_rate)
+            if verbose:
+                print(f'[INFO: meta_snapshot] Bloom filter of {service} saved in {filter_filepath}')
+        snapshots[service] = filepath
+    return snapshots
+
+if __name__ == '__main__':
+    arg_parser = ArgumentParser('meta_snapshot.py', description='This script exports the IDs of the META redis databases '
+                                '(DB-META-BR and DB-META-RA) to compact local snapshot files, to be set in the [snapshot] '
+                                'section of the configuration file so that the processes do not need a redis server')
+    arg_parser.add_argument('-o', '--output', dest='output', required=True,
+                            help='The directory where the snapshot files are saved')
+    arg_parser.add_argument('-s', '--service', dest='service', required=False, choices=list(snapshot_filenames),
+                            help='The only database to export. Both are exported by default')
+    arg_parser.add_argument('-c', '--config', dest='config', required=False, default='config.ini',
+                            help='The configuration file of the redis data sources')
+    arg_parser.add_argument('-v', '--verbose', dest='verbose', action='store_true', required=False,
+                            help='Show the number of IDs exported')
+    arg_parser.add_argument('-e', '--bloom_error_rate', dest='bloom_error_rate', type=float, required=False,
+                            help='If provided, a Bloom filter with this false positive probability (e.g. 0.01) is '
+                                 'created from each snapshot, to be set in the [snapshot] section of the configuration file')
+    args = arg_parser.parse_args()
+    create_snapshots(normalize_path(args.output), [args.service] if args.service else None, args.config, args.verbose,
+                     args.bloom_error_rate)
@@ -4,8 +4,16 @@ import sys
 from tarfile import TarInfo
 
 import yaml
-from oc_ds_converter.lib.file_manager import normalize_path
+from oc_ds_converter.lib.file_manager import normalize_path, pathoo
+from oc_ds_converter.lib.pipeline import (get_storage_manager,
+                                          map_batches_in_order,
+                                          read_line_batches)
 from oc_ds_converter.lib.jsonmanager import *
+from oc_ds_converter.lib.sharding import Shard, add_shard_arguments, get_shard_arguments
+from oc_ds_converter.lib.task_scheduler import (DEFAULT_TASK_TIMEOUT,
+                                                SizeAwareScheduler,
+                                                check_failed_tasks,
+                                                load_manifest)
 from oc_ds_converter.oc_idmanager.oc_data_storage.in_memory_manager import \
     InMemoryStorageManager
 from oc_ds_converter.oc_idmanager.oc_data_storage.redis_manager import \
@@ -13,7 +21,7 @@ from oc_ds_converter.oc_idmanager.oc_data_storage.redis_manager import \
 from oc_ds_converter.oc_idmanager.oc_data_storage.sqlite_manager import \
     SqliteStorageManager
 from oc_ds_converter.openaire.openaire_processing import *
-from pebble import ProcessFuture, ProcessPool
+from pebble import ProcessPool
 from tqdm import tqdm
 from filelock import Timeout, FileLock
 
@@ -21,7 +29,10 @@ from filelock import Timeout, FileLock
 def preprocess(
         openaire_json_dir:str, publishers_filepath:str, orcid_doi_filepath:str, 
         csv_dir:str, wanted_doi_filepath:str=None, cache:str=None, verbose:bool=False, storage_path:str = None, 
-        testing: bool = True, redis_storage_manager: bool = False, max_workers: int = 1, target=50000) -> None:
+        testing: bool = True, redis_storage_manager: bool = False, max_workers: int = 1, target=50000,
+        manifest_filepath: str = None, task_report: str = None,
+        task_timeout: float = DEFAULT_TASK_TIMEOUT, max_retries: int = 2, dead_letter: str = None,
+        shard: str = None, shard_progress_dir: str = None, parsing_workers: int = 1) -> None:
 
     if not testing: # NON CANCELLARE FILES MA PRENDI SOLO IN CONSIDERAZIONE
         input_dir_cont = os.listdir(openaire_json_dir)
@@ -43,6 +54,9 @@ def preprocess(
 
 
 
+    sharding = Shard(shard, shard_progress_dir, base_dir=openaire_json_dir)
+    csv_dir, cache, storage_path = sharding.apply(csv_dir, cache, storage_path, redis_storage_manager)
+
     # creare cartella di output se non esiste (dove verranno salvati i csv delle tabelle di meta)
     if not os.path.exists(csv_dir):
         os.makedirs(csv_dir)
@@ -70,20 +84,33 @@ def preprocess(
         print(f'[INFO: openaire_process] Getting all files from {openaire_json_dir}')
 
     all_input_tar = os.listdir(openaire_json_dir)
-    for tar in all_input_tar:
-        all_files, targz_fd = get_all_files_by_type(os.path.join(openaire_json_dir, tar), req_type, cache)
-        if not redis_storage_manager or max_workers == 1:
+    # the files are converted one at a time when each of them is parsed by a pool of processes,
+    # since the workers of the scheduler pool cannot start processes on their own
+    if not redis_storage_manager or max_workers == 1 or parsing_workers > 1:
+        for tar in all_input_tar:
+            all_files, targz_fd = get_all_files_by_type(os.path.join(openaire_json_dir, tar), req_type, cache)
+            all_files = sharding.select(all_files)
             for filename in all_files:
-                get_citations_and_metadata(tar, preprocessed_citations_dir, csv_dir, filename, orcid_doi_filepath, wanted_doi_filepath, publishers_filepath, storage_path, redis_storage_manager, testing, cache, target)
-
-
-        elif redis_storage_manager or max_workers > 1:
-            with ProcessPool(max_workers=max_workers, max_tasks=1) as executor:
+                get_citations_and_metadata(tar, preprocessed_citations_dir, csv_dir, filename, orcid_doi_filepath, wanted_doi_filepath, publishers_filepath, storage_path, redis_storage_manager, testing, cache, target, parsing_workers)
+                sharding.mark_done([filename])
+
+    elif redis_storage_manager or max_workers > 1:
+        # the members of all the archives share the same pool, so that the biggest ones are scheduled first
+        with ProcessPool(max_workers=max_workers, max_tasks=1) as executor:
+            scheduler = SizeAwareScheduler(executor, manifest=load_manifest(manifest_filepath), timeout=task_timeout, max_retries=max_retries)
+            for tar in all_input_tar:
+                all_files, targz_fd = get_all_files_by_type(os.path.join(openaire_json_dir, tar), req_type, cache)
+                all_files = sharding.select(all_files)
                 for filename in all_files:
-                    future:ProcessFuture = executor.schedule(
-                        function = get_citations_and_metadata,
+                    scheduler.add(filename, get_citations_and_metadata,
                         args=(tar, preprocessed_citations_dir, csv_dir, filename, orcid_doi_filepath, wanted_doi_filepath, publishers_filepath, storage_path, redis_storage_manager, testing, cache, target)
                     )
+            scheduler.run()
+            scheduler.wait(on_source_done=lambda source: sharding.mark_done([source]))
+        if task_report:
+            scheduler.save_report(task_report)
+        scheduler.log_dead_letter('openaire_process', dead_letter)
+        check_failed_tasks('openaire_process', scheduler.failed)
 
 
     if cache:
@@ -99,9 +126,155 @@ def preprocess(
         storage_manager.delete_storage()
 
 
-def get_citations_and_metadata(tar: str, preprocessed_citations_dir: str, csv_dir: str, filename: str, orcid_index: str, doi_csv: str, publishers_filepath_openaire: str, storage_path: str, redis_storage_manager: bool, testing: bool, cache:str, target=50000):
+def prefetch_ids(openaire_csv:OpenaireProcessing, lines:list) -> None:
+    '''
+    This function retrieves in bulk the validity of the IDs of the citations in lines.
+    '''
+    all_br = []
+    all_ra = []
+    for entity in lines:
+        # start check: if line is processable
+        if entity:
+            d = json.loads(entity.decode('utf-8'))
+            if d.get("relationship"):
+                if d.get("relationship").get("name") == "Cites":
+                    # end check: if line is processable
+                    ent_all_br, ent_all_ra = openaire_csv.extract_all_ids(d)
+                    all_br.extend(ent_all_br)
+                    all_ra.extend(ent_all_ra)
+
+    redis_validity_values_br = openaire_csv.get_reids_validity_list(all_br, "br")
+    redis_validity_values_ra = openaire_csv.get_reids_validity_list(all_ra, "ra")
+    openaire_csv.update_redis_values(redis_validity_values_br, redis_validity_values_ra)
+
+def convert_lines(openaire_csv:OpenaireProcessing, lines:list) -> tuple:
+    '''
+    This function converts a part of an OpenAIRE file, i.e. a list of JSON lines, into the rows of
+    the META table and of the citations table, and transfers the validity of the IDs checked to the storage.
+
+    :params openaire_csv: the processing object
+    :type openaire_csv: OpenaireProcessing
+    :params lines: the raw JSON lines of the part
+    :type lines: list
+    :returns: tuple -- the rows of the META table and the citations
+    '''
+    index_citations_to_csv = []
+    data = []
+    prefetch_ids(openaire_csv, lines)
+    for entity in lines:
+        if entity:
+            d = json.loads(entity.decode('utf-8'))
+            if d.get("relationship"):
+                if d.get("relationship").get("name") == "Cites":
+
+                    norm_source_ids = []
+                    norm_target_ids = []
+
+                    any_source_id = ""
+                    any_target_id = ""
+
+                    source_entity = d.get("source")
+                    if source_entity:
+                        norm_source_ids = openaire_csv.get_norm_ids(source_entity['identifier'])
+                        if norm_source_ids:
+                            for e, nsi in enumerate(norm_source_ids):
+                                stored_validity = openaire_csv.validated_as(nsi)
+                                norm_source_ids[e]["valid"] = stored_validity
+
+
+                    target_entity = d.get("target")
+                    if target_entity:
+                        norm_target_ids = openaire_csv.get_norm_ids(target_entity['identifier'])
+                        if norm_target_ids:
+                            for i, nti in enumerate(norm_target_ids):
+                                stored_validity_t = openaire_csv.validated_as(nti)
+                                norm_target_ids[i]["valid"] = stored_validity_t
+
+                    # check that there is a citation we can handle (i.e.: expressed with ids we actually manage)
+                    if norm_source_ids and norm_target_ids:
+
+                        source_entity_upd_ids = {k:v for k,v in source_entity.items() if k != "identifier"}
+                        source_valid_ids = [x for x in norm_source_ids if x["valid"] is True]
+                        source_invalid_ids = [x for x in norm_source_ids if x["valid"] is False]
+                        source_to_be_val_ids = [x for x in norm_source_ids if x["valid"] is None]
+                        source_identifier = {}
+                        source_identifier["valid"] = source_valid_ids
+                        source_identifier["not_valid"] = source_invalid_ids
+                        source_identifier["to_be_val"] = source_to_be_val_ids
+                        source_entity_upd_ids["identifier"] = source_identifier
+                        #source_entity_upd_ids["redis_validity_lists"] = [redis_validity_values_br, redis_validity_values_ra]
 
+                        target_entity_upd_ids = {k:v for k,v in target_entity.items() if k != "identifier"}
+                        target_valid_ids = [x for x in norm_target_ids if x["valid"] is True]
+                        target_invalid_ids = [x for x in norm_target_ids if x["valid"] is False]
+                        target_to_be_val_ids = [x for x in norm_target_ids if x["valid"] is None]
+                        target_identifier = {}
+                        target_identifier["valid"] = target_valid_ids
+                        target_identifier["not_valid"] = target_invalid_ids
+                        target_identifier["to_be_val"] = target_to_be_val_ids
+                        target_entity_upd_ids["identifier"] = target_identifier
+                        #target_entity_upd_ids["redis_validity_lists"] = [redis_validity_values_br, redis_validity_values_ra]
+
+                        # creation of a new row in meta table because there are new ids to be validated.
+                        # "any_source_id" will be chosen among the valid source entity ids, if any
+                        if source_identifier["to_be_val"]:
+                            source_tab_data = openaire_csv.csv_creator(source_entity_upd_ids) #valid_citation_ids_s --> evitare rivalidazione ?
+                            if source_tab_data:
+                                processed_source_ids = source_tab_data["id"].split(" ")
+                                all_citing_valid = processed_source_ids
+                                if all_citing_valid: # It meanst that there is at least one valid id for the citing entity
+                                    any_source_id = all_citing_valid[0]
+                                    data.append(source_tab_data) # Otherwise the row should not be included in meta tables
+
+
+                        # skip creation of a new row in meta table because there is no new id to be validated
+                        # "any_source_id" will be chosen among the valid source entity ids, if any
+                        elif source_identifier["valid"]:
+                            all_citing_valid = source_identifier["valid"]
+                            any_source_id = all_citing_valid[0]["identifier"]
+
+                        # creation of a new row in meta table because there are new ids to be validated.
+                        # "any_target_id" will be chosen among the valid target entity ids, if any
+                        if target_identifier["to_be_val"]:
+                            target_tab_data = openaire_csv.csv_creator(target_entity_upd_ids)
+                            if target_tab_data:
+                                processed_target_ids = target_tab_data["id"].split(" ")
+                                all_cited_valid = processed_target_ids
+                                if all_cited_valid:
+                                    any_target_id = all_cited_valid[0]
+                                    data.append(target_tab_data) # otherwise the row should not be included in meta tables
+
+                        # skip creation of a new row in meta table because there is no new id to be validated
+                        # "any_target_id" will be chosen among the valid source entity ids, if any
+                        elif target_identifier["valid"]:
+                            all_cited_valid = target_identifier["valid"]
+                            any_target_id = all_cited_valid[0]["identifier"]
+
+
+                    if any_source_id and any_target_id:
+                        citation = dict()
+                        citation["citing"] = any_source_id
+                        citation["referenced"] = any_target_id
+                        index_citations_to_csv.append(citation)
+    openaire_csv.memory_to_storage()
+    return data, index_citations_to_csv
+
+# the processing object of a worker process converting the parts of a file in parallel
+_part_processing = None
+
+def init_part_worker(orcid_index:str, doi_csv:str, publishers_filepath_openaire:str, storage_path:str,
+                     redis_storage_manager:bool, testing:bool) -> None:
+    global _part_processing
     storage_manager = get_storage_manager(storage_path, redis_storage_manager, testing=testing)
+    _part_processing = OpenaireProcessing(orcid_index=orcid_index, doi_csv=doi_csv,
+                                          publishers_filepath_openaire=publishers_filepath_openaire,
+                                          storage_manager=storage_manager, testing=testing)
+
+def convert_part(lines:list) -> tuple:
+    return convert_lines(_part_processing, lines)
+
+
+def get_citations_and_metadata(tar: str, preprocessed_citations_dir: str, csv_dir: str, filename: str, orcid_index: str, doi_csv: str, publishers_filepath_openaire: str, storage_path: str, redis_storage_manager: bool, testing: bool, cache:str, target=50000, parsing_workers:int=1):
 
     if cache:
         if not cache.endswith(".json"):
@@ -152,48 +325,16 @@ def get_citations_and_metadata(tar: str, preprocessed_citations_dir: str, csv_di
                     else:
                         last_part_processed = cache_dict[tar][filename]
 
-    openaire_csv = OpenaireProcessing(orcid_index=orcid_index, doi_csv=doi_csv, publishers_filepath_openaire=publishers_filepath_openaire, storage_manager=storage_manager, testing=testing)
-
-    index_citations_to_csv = []
-    data = []
-
-    target = target
-
     skip_rows = target * last_part_processed
 
-    f = gzip.open(filename, 'rb')
-    source_data = f.readlines()
-    pbar = tqdm(total=len(source_data))
-    f.close()
     filename = filename.name if isinstance(filename, TarInfo) else filename
     filename_without_ext = filename.replace('.json', '').replace('.tar', '').replace('.gz', '')
     filepath_ne = os.path.join(csv_dir, f'{os.path.basename(filename_without_ext)}')
     filepath_citations_ne = os.path.join(preprocessed_citations_dir, f'{os.path.basename(filename_without_ext)}')
 
     filepath = os.path.join(csv_dir, f'{os.path.basename(filename_without_ext)}.csv')
-    filepath_citations = os.path.join(preprocessed_citations_dir, f'{os.path.basename(filename_without_ext)}.csv')
     pathoo(filepath)
 
-    def get_all_redis_ids_and_save_updates(sli_da):
-        all_br = []
-        all_ra = []
-        for entity in sli_da:
-
-            # start check: if line is processable
-            if entity:
-                d = json.loads(entity.decode('utf-8'))
-                if d.get("relationship"):
-                    if d.get("relationship").get("name") == "Cites":
-                        # end check: if line is processable
-
-                        ent_all_br, ent_all_ra = openaire_csv.extract_all_ids(json.loads(entity))
-                        all_br.extend(ent_all_br)
-                        all_ra.extend(ent_all_ra)
-
-        redis_validity_values_br = openaire_csv.get_reids_validity_list(all_br, "br")
-        redis_validity_values_ra = openaire_csv.get_reids_validity_list(all_ra, "ra")
-        openaire_csv.update_redis_values(redis_validity_values_br, redis_validity_values_ra)
-
     def save_files(ent_list, citation_list, nf, is_last_sf=False):
         if ent_list:
             filename_str = filepath_ne+"_"+str(nf) + ".csv"
@@ -213,8 +354,6 @@ def get_citations_and_metadata(tar: str, preprocessed_citations_dir: str, csv_di
                 dict_writer.writerows(citation_list)
             citation_list = []
 
-        openaire_csv.memory_to_storage()
-
         task_done(nf, is_last=is_last_sf)
 
         return ent_list, citation_list
@@ -266,162 +405,22 @@ def get_citations_and_metadata(tar: str, preprocessed_citations_dir: str, csv_di
             print(e)
 
 
-    start = skip_rows
-    cnt = skip_rows
-    end = start + target
-
-    if len(source_data[start:]) > target:
-        source_data_slice = source_data[start: end]
+    # the file is read in parts of target lines, the parts already processed in a previous run are skipped
+    parts = read_line_batches(filename, target, skip_rows)
+    if parsing_workers > 1:
+        # a reader thread decompresses and slices the file, while the parts are converted by a pool of
+        # processes; the results are saved in the order of the parts, so that the cache stays consistent
+        results = map_batches_in_order(parts, convert_part, parsing_workers, init_part_worker, (
+            orcid_index, doi_csv, publishers_filepath_openaire, storage_path, redis_storage_manager, testing))
     else:
-        source_data_slice = source_data[start:]
-
-    get_all_redis_ids_and_save_updates(source_data_slice)
-
-    for entity in source_data:
-
-        # in case the current entity is the <target>nth entity
-        if cnt == end:
-            start = cnt
-            end = start + target
-            if len(source_data[start:]) > target:
-                source_data_slice = source_data[start: end]
-            else:
-                source_data_slice = source_data[start:]
-
-            # update redis validated id list + save citation and meta file
-            get_all_redis_ids_and_save_updates(source_data_slice)
-            last_part_processed += 1
-            data, index_citations_to_csv = save_files(data, index_citations_to_csv, last_part_processed)
-
-        # real entity process
-        if entity:
-            d = json.loads(entity.decode('utf-8'))
-            if d.get("relationship"):
-                if d.get("relationship").get("name") == "Cites":
-
-                    norm_source_ids = []
-                    norm_target_ids = []
-
-                    any_source_id = ""
-                    any_target_id = ""
-
-                    source_entity = d.get("source")
-                    if source_entity:
-                        norm_source_ids = openaire_csv.get_norm_ids(source_entity['identifier'])
-                        if norm_source_ids:
-                            for e, nsi in enumerate(norm_source_ids):
-                                stored_validity = openaire_csv.validated_as(nsi)
-                                norm_source_ids[e]["valid"] = stored_validity
-
-
-                    target_entity = d.get("target")
-                    if target_entity:
-                        norm_target_ids = openaire_csv.get_norm_ids(target_entity['identifier'])
-                        if norm_target_ids:
-                            for i, nti in enumerate(norm_target_ids):
-                                stored_validity_t = openaire_csv.validated_as(nti)
-                                norm_target_ids[i]["valid"] = stored_validity_t
-
-                    # check that there is a citation we can handle (i.e.: expressed with ids we actually manage)
-                    if norm_source_ids and norm_target_ids:
-
-                        source_entity_upd_ids = {k:v for k,v in source_entity.items() if k != "identifier"}
-                        source_valid_ids = [x for x in norm_source_ids if x["valid"] is True]
-                        source_invalid_ids = [x for x in norm_source_ids if x["valid"] is False]
-                        source_to_be_val_ids = [x for x in norm_source_ids if x["valid"] is None]
-                        source_identifier = {}
-                        source_identifier["valid"] = source_valid_ids
-                        source_identifier["not_valid"] = source_invalid_ids
-                        source_identifier["to_be_val"] = source_to_be_val_ids
-                        source_entity_upd_ids["identifier"] = source_identifier
-                        #source_entity_upd_ids["redis_validity_lists"] = [redis_validity_values_br, redis_validity_values_ra]
-
-                        target_entity_upd_ids = {k:v for k,v in target_entity.items() if k != "identifier"}
-                        target_valid_ids = [x for x in norm_target_ids if x["valid"] is True]
-                        target_invalid_ids = [x for x in norm_target_ids if x["valid"] is False]
-                        target_to_be_val_ids = [x for x in norm_target_ids if x["valid"] is None]
-                        target_identifier = {}
-                        target_identifier["valid"] = target_valid_ids
-                        target_identifier["not_valid"] = target_invalid_ids
-                        target_identifier["to_be_val"] = target_to_be_val_ids
-                        target_entity_upd_ids["identifier"] = target_identifier
-                        #target_entity_upd_ids["redis_validity_lists"] = [redis_validity_values_br, redis_validity_values_ra]
-
-                        # creation of a new row in meta table because there are new ids to be validated.
-                        # "any_source_id" will be chosen among the valid source entity ids, if any
-                        if source_identifier["to_be_val"]:
-                            source_tab_data = openaire_csv.csv_creator(source_entity_upd_ids) #valid_citation_ids_s --> evitare rivalidazione ?
-                            if source_tab_data:
-                                processed_source_ids = source_tab_data["id"].split(" ")
-                                all_citing_valid = processed_source_ids
-                                if all_citing_valid: # It meanst that there is at least one valid id for the citing entity
-                                    any_source_id = all_citing_valid[0]
-                                    data.append(source_tab_data) # Otherwise the row should not be included in meta tables
-
-
-                        # skip creation of a new row in meta table because there is no new id to be validated
-                        # "any_source_id" will be chosen among the valid source entity ids, if any
-                        elif source_identifier["valid"]:
-                            all_citing_valid = source_identifier["valid"]
-                            any_source_id = all_citing_valid[0]["identifier"]
-
-                        # creation of a new row in meta table because there are new ids to be validated.
-                        # "any_target_id" will be chosen among the valid target entity ids, if any
-                        if target_identifier["to_be_val"]:
-                            target_tab_data = openaire_csv.csv_creator(target_entity_upd_ids)
-                            if target_tab_data:
-                                processed_target_ids = target_tab_data["id"].split(" ")
-                                all_cited_valid = processed_target_ids
-                                if all_cited_valid:
-                                    any_target_id = all_cited_valid[0]
-                                    data.append(target_tab_data) # otherwise the row should not be included in meta tables
-
-                        # skip creation of a new row in meta table because there is no new id to be validated
-                        # "any_target_id" will be chosen among the valid source entity ids, if any
-                        elif target_identifier["valid"]:
-                            all_cited_valid = target_identifier["valid"]
-                            any_target_id = all_cited_valid[0]["identifier"]
-
-
-                    if any_source_id and any_target_id:
-                        citation = dict()
-                        citation["citing"] = any_source_id
-                        citation["referenced"] = any_target_id
-                        index_citations_to_csv.append(citation)
-        pbar.update()
-        cnt += 1
-    last_part_processed += 1
-    data, index_citations_to_csv = save_files(data, index_citations_to_csv, last_part_processed, is_last_sf=True)
-    pbar.close()
-
-def get_storage_manager(storage_path: str, redis_storage_manager: bool, testing: bool):
-    if not redis_storage_manager:
-        if storage_path:
-            if not os.path.exists(storage_path):
-            # if parent dir does not exist, it is created
-                if not os.path.exists(os.path.abspath(os.path.join(storage_path, os.pardir))):
-                    Path(os.path.abspath(os.path.join(storage_path, os.pardir))).mkdir(parents=True, exist_ok=True)
-            if storage_path.endswith(".db"):
-                storage_manager = SqliteStorageManager(storage_path)
-            elif storage_path.endswith(".json"):
-                storage_manager = InMemoryStorageManager(storage_path)
-
-        if not storage_path and not redis_storage_manager:
-            new_path_dir = os.path.join(os.getcwd(), "storage")
-            if not os.path.exists(new_path_dir):
-                os.makedirs(new_path_dir)
-            storage_manager = SqliteStorageManager(os.path.join(new_path_dir, "id_valid_dict.db"))
-    elif redis_storage_manager:
-        if testing:
-            storage_manager = RedisStorageManager(testing=True)
-        else:
-            storage_manager = RedisStorageManager(testing=False)
-    return storage_manager
-
+        storage_manager = get_storage_manager(storage_path, redis_storage_manager, testing=testing)
+        openaire_csv = OpenaireProcessing(orcid_index=orcid_index, doi_csv=doi_csv, publishers_filepath_openaire=publishers_filepath_openaire, storage_manager=storage_manager, testing=testing)
+        results = (convert_lines(openaire_csv, lines) for lines in parts)
 
-def pathoo(path:str) -> None:
-    if not os.path.exists(os.path.dirname(path)):
-        os.makedirs(os.path.dirname(path))
+    for data, index_citations_to_csv in tqdm(results):
+        last_part_processed += 1
+        save_files(data, index_citations_to_csv, last_part_processed)
+    task_done(last_part_processed, is_last=True)
 
 if __name__ == '__main__':
     arg_parser = ArgumentParser('openaire_process.py', description='This script creates CSV files from Openaire JSON files, enriching them through of a DOI-ORCID index')
@@ -456,6 +455,24 @@ if __name__ == '__main__':
                                  'value is set to false, which means that -unless it is differently stated- the storage manager used is'
                                  'derived by the storage filepath type (i.e.: .db or .json). The redis db used by the storage manager is the n.2')
     arg_parser.add_argument('-m', '--max_workers', dest='max_workers', required=False, default=1, type=int, help='Workers number')
+    arg_parser.add_argument('-mf', '--manifest', dest='manifest_filepath', required=False,
+                            help='A JSON file mapping input file names to their number of records, used to schedule the '
+                                 'biggest files first. If not provided, the files size is used')
+    arg_parser.add_argument('-tr', '--task_report', dest='task_report', required=False,
+                            help='A CSV file where to append the time spent processing each input file')
+    arg_parser.add_argument('-to', '--task_timeout', dest='task_timeout', required=False, type=float,
+                            default=DEFAULT_TASK_TIMEOUT,
+                            help='The maximum number of seconds a single task can run before its worker is killed and the task is retried. '
+                                 'The default is six hours, 0 for no limit')
+    arg_parser.add_argument('-mr', '--max_retries', dest='max_retries', required=False, default=2, type=int,
+                            help='How many times a failed or timed-out task is retried, with an exponential backoff')
+    arg_parser.add_argument('-dl', '--dead_letter', dest='dead_letter', required=False,
+                            help='A CSV file where to append the tasks that failed permanently, so that they can be re-run')
+    arg_parser.add_argument('-pw', '--parsing_workers', dest='parsing_workers', required=False, default=1, type=int,
+                            help='The number of processes converting the parts of a single input file in parallel, useful when '
+                                 'the dump is made of a few giant files. The files are then processed one at a time. It requires '
+                                 'a storage shared across processes, i.e. redis or a ".db" file')
+    add_shard_arguments(arg_parser)
     args = arg_parser.parse_args()
     config = args.config
     settings = None
@@ -480,8 +497,17 @@ if __name__ == '__main__':
     testing = settings['testing'] if settings else args.testing
     redis_storage_manager = settings['redis_storage_manager'] if settings else args.redis_storage_manager
     max_workers = settings['max_workers'] if settings else args.max_workers
+    manifest_filepath = settings.get('manifest_filepath') if settings else args.manifest_filepath
+    task_report = settings.get('task_report') if settings else args.task_report
+    task_timeout = settings.get('task_timeout', DEFAULT_TASK_TIMEOUT) if settings else args.task_timeout
+    max_retries = settings.get('max_retries', 2) if settings else args.max_retries
+    dead_letter = settings.get('dead_letter') if settings else args.dead_letter
+    parsing_workers = settings.get('parsing_workers', 1) if settings else args.parsing_workers
+    shard, shard_progress_dir = get_shard_arguments(settings, args)
 
     preprocess(openaire_json_dir=openaire_json_dir, publishers_filepath=publishers_filepath,
                orcid_doi_filepath=orcid_doi_filepath, csv_dir=csv_dir, wanted_doi_filepath=wanted_doi_filepath, 
                cache=cache, verbose=verbose, storage_path=storage_path, testing=testing, 
-               redis_storage_manager=redis_storage_manager, max_workers=max_workers)
+               redis_storage_manager=redis_storage_manager, max_workers=max_workers, manifest_filepath=manifest_filepath,
+               task_report=task_report, task_timeout=task_timeout, max_retries=max_retries, dead_letter=dead_letter,
+               shard=shard, shard_progress_dir=shard_progress_dir, parsing_workers=parsing_workers)
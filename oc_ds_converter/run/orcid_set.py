@@ -0,0 +1,38 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+# Copyright (c) 2026 The OpenCitations Index Authors.
+#
+# Permission to use, copy, modify, and/or distribute this software for any purpose
+# with or without fee is hereby granted, provided that the above copyright notice
+# and this permission notice appear in all copies.
+#
+# THE SOFTWARE IS PROVIDED "AS IS" AND THE AUTHOR DISCLAIMS ALL WARRANTIES WITH
+# REGARD TO THIS SOFTWARE INCLUDING ALL IMPLIED WARRANTIES OF MERCHANTABILITY AND
+# FITNESS. IN NO EVENT SHALL THE AUTHOR BE LIABLE FOR ANY SPECIAL, DIRECT, INDIRECT,
+# OR CONSEQUENTIAL DAMAGES OR ANY DAMAGES WHATSOEVER RESULTING FROM LOSS OF USE,
+# DATA OR PROFITS, WHETHER IN AN ACTION OF CONTRACT, NEGLIGENCE OR OTHER TORTIOUS
+# ACTION, ARISING OUT OF OR IN CONNECTION WITH THE USE OR PERFORMANCE OF THIS
+# SOFTWARE.
+
+
+from __future__ import annotations
+
+from argparse import ArgumentParser
+
+from oc_ds_converter.lib.file_manager import normalize_path
+from oc_ds_converter.lib.orcid_set import create_orcid_set
+
+if __name__ == '__main__':
+    arg_parser = ArgumentParser('orcid_set.py', description='This script saves the ORCIDs of the records of the ORCID '
+                                'public data file in a compact ORCID set, to be set in the [orcid_set] section of the '
+                                'configuration file so that these ORCIDs are not validated through the API')
+    arg_parser.add_argument('-i', '--input', dest='input', nargs='+', required=True,
+                            help='The summaries archives of the ORCID public data file (e.g. ORCID_2023_10_summaries.tar.gz), '
+                                 'or the directories where they were extracted')
+    arg_parser.add_argument('-o', '--output', dest='output', required=True,
+                            help='The path of the ORCID set')
+    arg_parser.add_argument('-ch', '--chunk_size', dest='chunk_size', type=int, required=False, default=5000000,
+                            help='The number of ORCIDs sorted in memory at once')
+    args = arg_parser.parse_args()
+    saved = create_orcid_set([normalize_path(path) for path in args.input], normalize_path(args.output), args.chunk_size)
+    print(f'[INFO: orcid_set] {saved} ORCIDs saved in {args.output}')
@@ -0,0 +1,45 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+# Copyright (c) 2026 The OpenCitations Index Authors.
+#
+# Permission to use, copy, modify, and/or distribute this software for any purpose
+# with or without fee is hereby granted, provided that the above copyright notice
+# and this permission notice appear in all copies.
+#
+# THE SOFTWARE IS PROVIDED "AS IS" AND THE AUTHOR DISCLAIMS ALL WARRANTIES WITH
+# REGARD TO THIS SOFTWARE INCLUDING ALL IMPLIED WARRANTIES OF MERCHANTABILITY AND
+# FITNESS. IN NO EVENT SHALL THE AUTHOR BE LIABLE FOR ANY SPECIAL, DIRECT, INDIRECT,
+# OR CONSEQUENTIAL DAMAGES OR ANY DAMAGES WHATSOEVER RESULTING FROM LOSS OF USE,
+# DATA OR PROFITS, WHETHER IN AN ACTION OF CONTRACT, NEGLIGENCE OR OTHER TORTIOUS
+# ACTION, ARISING OUT OF OR IN CONNECTION WITH THE USE OR PERFORMANCE OF THIS
+# SOFTWARE.
+
+
+from __future__ import annotations
+
+from argparse import ArgumentParser
+
+from oc_ds_converter.lib.file_manager import normalize_path
+from oc_ds_converter.lib.pubmed_crosswalk import create_pubmed_crosswalk
+
+if __name__ == '__main__':
+    arg_parser = ArgumentParser('pubmed_crosswalk.py', description='This script saves the PMIDs, PMCIDs and DOIs of the '
+                                'NCBI PMC-ids.csv file and the PMIDs of the PubMed baseline in a compact index, to be '
+                                'set in the [pubmed_crosswalk] section of the configuration file so that these IDs are '
+                                'not validated through the API')
+    arg_parser.add_argument('-pmc', '--pmc_ids', dest='pmc_ids', nargs='*', required=False, default=[],
+                            help='The PMC-ids.csv files, compressed or not')
+    arg_parser.add_argument('-pm', '--pmids', dest='pmids', nargs='*', required=False, default=[],
+                            help='The XML files of the PubMed baseline (e.g. pubmed24n0001.xml.gz) and the lists of '
+                                 'PMIDs, one per line, compressed or not')
+    arg_parser.add_argument('-o', '--output', dest='output', required=True,
+                            help='The path of the index')
+    arg_parser.add_argument('-ch', '--chunk_size', dest='chunk_size', type=int, required=False, default=5000000,
+                            help='The number of IDs sorted in memory at once')
+    args = arg_parser.parse_args()
+    if not args.pmc_ids and not args.pmids:
+        arg_parser.error('at least one PMC-ids.csv file or PubMed baseline file is required')
+    saved = create_pubmed_crosswalk([normalize_path(path) for path in args.pmc_ids],
+                                    [normalize_path(path) for path in args.pmids],
+                                    normalize_path(args.output), args.chunk_size)
+    print(f'[INFO: pubmed_crosswalk] {saved} IDs saved in {args.output}')
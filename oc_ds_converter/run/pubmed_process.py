@@ -25,6 +25,7 @@ import pandas as pd
 import yaml
 from oc_ds_converter.lib.file_manager import normalize_path
 from oc_ds_converter.lib.jsonmanager import get_all_files_by_type
+from oc_ds_converter.lib.threaded_validator import get_shared_threaded_validator
 from tqdm import tqdm
 
 from oc_ds_converter.pubmed.pubmed_processing import *
@@ -81,6 +82,8 @@ def preprocess(pubmed_csv_dir: str, publishers_filepath: str, orcid_doi_filepath
     pubmed_csv = PubmedProcessing(orcid_index=orcid_doi_filepath, doi_csv=wanted_doi_filepath,
                                   publishers_filepath_pubmed=publishers_filepath, journals_filepath=journals_filepath,
                                   testing=testing)
+    # if set in the configuration file, the DOIs of each chunk are validated concurrently before producing the rows
+    validator = get_shared_threaded_validator()
     if verbose:
         print(f'[INFO: pubmed_process] Getting all files from {pubmed_csv_dir}')
 
@@ -107,6 +110,8 @@ def preprocess(pubmed_csv_dir: str, publishers_filepath: str, orcid_doi_filepath
                 chunk.fillna("", inplace=True)
                 df_dict_list = chunk.to_dict("records")
                 filt_values = [d for d in df_dict_list if (d.get("cited_by") or d.get("references"))]
+                if validator is not None:
+                    pubmed_csv.validate_dois(filt_values, validator)
 
                 for item in filt_values:
                     tabular_data = pubmed_csv.csv_creator(item)
@@ -0,0 +1,76 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+# Copyright (c) 2026 The OpenCitations Index Authors.
+#
+# Permission to use, copy, modify, and/or distribute this software for any purpose
+# with or without fee is hereby granted, provided that the above copyright notice
+# and this permission notice appear in all copies.
+#
+# THE SOFTWARE IS PROVIDED "AS IS" AND THE AUTHOR DISCLAIMS ALL WARRANTIES WITH
+# REGARD TO THIS SOFTWARE INCLUDING ALL IMPLIED WARRANTIES OF MERCHANTABILITY AND
+# FITNESS. IN NO EVENT SHALL THE AUTHOR BE LIABLE FOR ANY SPECIAL, DIRECT, INDIRECT,
+# OR CONSEQUENTIAL DAMAGES OR ANY DAMAGES WHATSOEVER RESULTING FROM LOSS OF USE,
+# DATA OR PROFITS, WHETHER IN AN ACTION OF CONTRACT, NEGLIGENCE OR OTHER TORTIOUS
+# ACTION, ARISING OUT OF OR IN CONNECTION WITH THE USE OR PERFORMANCE OF THIS
+# SOFTWARE.
+
+
+from __future__ import annotations
+
+import os
+from argparse import ArgumentParser
+
+from oc_ds_converter.lib.file_manager import normalize_path
+from oc_ds_converter.lib.pipeline import get_storage_manager
+from oc_ds_converter.oc_idmanager.oc_data_storage.sharded_manager import (
+    create_sharded_storage, reshard)
+
+
+def reshard_storage(source_path:str, target_dir:str, shards:int, backend:str='db', redis_storage_manager:bool=False,
+                    verbose:bool=False) -> int:
+    '''
+    This function copies a storage into a new sharded storage, to be passed to the drivers as storage
+    path. The source can be a SQLite (".db"), JSON (".json"), compact (".bin") or memory-mapped (".mmap")
+    storage, a sharded storage with a different number of shards or, if redis_storage_manager is True,
+    the redis storage. It must be run offline.
+
+    :params source_path: the storage path of the source
+    :type source_path: str
+    :params target_dir: the directory of the new sharded storage
+    :type target_dir: str
+    :params shards: the number of shards of the new sharded storage
+    :type shards: int
+    :params backend: the type of the shards: "db" (SQLite), "json", "bin" (compact) or "mmap" (memory-mapped)
+    :type backend: str
+    :returns: int -- the number of IDs copied
+    '''
+    if not redis_storage_manager and not os.path.exists(source_path):
+        raise FileNotFoundError(source_path)
+    source = get_storage_manager(source_path, redis_storage_manager, testing=False)
+    copied = reshard(source, create_sharded_storage(target_dir, shards, backend))
+    if verbose:
+        print(f'[INFO: reshard_storage] {copied} IDs copied into {shards} shards in {target_dir}')
+    return copied
+
+
+if __name__ == '__main__':
+    arg_parser = ArgumentParser('reshard_storage.py', description='This script copies the storage of the validated IDs '
+                                'into a new storage split into shards, whose directory can then be passed to the drivers as '
+                                '--storage_path. It must be run while no driver uses the storage')
+    arg_parser.add_argument('-s', '--source', dest='source', required=False,
+                            help='The storage path of the source: a ".db" or ".json" file, or the directory of a sharded storage')
+    arg_parser.add_argument('-r', '--redis_storage_manager', dest='redis_storage_manager', action='store_true', required=False,
+                            help='Copy the redis storage (db n.2) instead of a storage path')
+    arg_parser.add_argument('-t', '--target', dest='target', required=True,
+                            help='The directory of the new sharded storage')
+    arg_parser.add_argument('-n', '--shards', dest='shards', type=int, required=True,
+                            help='The number of shards of the new sharded storage')
+    arg_parser.add_argument('-b', '--backend', dest='backend', choices=['db', 'json', 'bin', 'mmap'], default='db', required=False,
+                            help='The type of the shards: SQLite ("db", default), JSON ("json"), compact ("bin") or memory-mapped ("mmap")')
+    arg_parser.add_argument('-v', '--verbose', dest='verbose', action='store_true', required=False,
+                            help='Show the number of IDs copied')
+    args = arg_parser.parse_args()
+    if not args.source and not args.redis_storage_manager:
+        arg_parser.error('either --source or --redis_storage_manager is required')
+    reshard_storage(normalize_path(args.source) if args.source else None, normalize_path(args.target), args.shards,
+                    args.backend, args.redis_storage_manager, args.verbose)
@@ -0,0 +1,120 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+# Copyright (c) 2026 The OpenCitations Index Authors.
+#
+# Permission to use, copy, modify, and/or distribute this software for any purpose
+# with or without fee is hereby granted, provided that the above copyright notice
+# and this permission notice appear in all copies.
+#
+# THE SOFTWARE IS PROVIDED "AS IS" AND THE AUTHOR DISCLAIMS ALL WARRANTIES WITH
+# REGARD TO THIS SOFTWARE INCLUDING ALL IMPLIED WARRANTIES OF MERCHANTABILITY AND
+# FITNESS. IN NO EVENT SHALL THE AUTHOR BE LIABLE FOR ANY SPECIAL, DIRECT, INDIRECT,
+# OR CONSEQUENTIAL DAMAGES OR ANY DAMAGES WHATSOEVER RESULTING FROM LOSS OF USE,
+# DATA OR PROFITS, WHETHER IN AN ACTION OF CONTRACT, NEGLIGENCE OR OTHER TORTIOUS
+# ACTION, ARISING OUT OF OR IN CONNECTION WITH THE USE OR PERFORMANCE OF THIS
+# SOFTWARE.
+
+
+from __future__ import annotations
+
+import json
+import os
+import sys
+from argparse import ArgumentParser
+from typing import Dict, List
+
+from oc_ds_converter.lib.file_manager import normalize_path
+from oc_ds_converter.lib.sharding import Shard, load_progress, verify_progress
+from oc_ds_converter.oc_idmanager.oc_data_storage.in_memory_manager import \
+    InMemoryStorageManager
+from oc_ds_converter.oc_idmanager.oc_data_storage.sqlite_manager import \
+    SqliteStorageManager
+
+
+def load_expected_keys(expected_filepath:str) -> List[str]:
+    '''
+    This function loads the names of all the inputs of the dump, either from a JSON manifest
+    (its keys) or from a text file with a name per line.
+    '''
+    with open(expected_filepath, 'r', encoding='utf-8') as f:
+        if expected_filepath.endswith('.json'):
+            return [str(k).replace(os.sep, '/') for k in json.load(f)]
+        return [line.strip().replace(os.sep, '/') for line in f if line.strip()]
+
+def merge_shard_storages(storage_path:str, shards:int) -> int:
+    '''
+    This function merges the per-shard local storages (SQLite or JSON files) produced by a sharded run
+    into storage_path, i.e. the storage path passed to the drivers. An ID is considered valid if at least
+    one shard validated it.
+
+    :params storage_path: the path of the storage, ending with ".db" or ".json"
+    :type storage_path: str
+    :params shards: the number of shards
+    :type shards: int
+    :returns: int -- the number of IDs in the merged storage
+    '''
+    merged: Dict[str, bool] = dict()
+    for index in range(shards):
+        shard_storage_path = Shard(f'{index}/{shards}').local_path(storage_path)
+        if not os.path.exists(shard_storage_path):
+            continue
+        if storage_path.endswith('.db'):
+            shard_storage = SqliteStorageManager(shard_storage_path)
+        else:
+            shard_storage = InMemoryStorageManager(shard_storage_path)
+        for id, value in shard_storage.get_validity_list_of_tuples():
+            merged[id] = merged.get(id, False) or value
+    if storage_path.endswith('.db'):
+        storage_manager = SqliteStorageManager(storage_path)
+        storage_manager.set_multi_value(list(merged.items()))
+    else:
+        storage_manager = InMemoryStorageManager(storage_path)
+        for id, value in merged.items():
+            storage_manager.set_value(id, value)
+        storage_manager.store_file()
+    return len(merged)
+
+def coordinate(progress_dir:str, expected_filepath:str|None=None, storage_path:str|None=None, verbose:bool=False) -> dict:
+    '''
+    This function merges the progress of all the shards of a run, saves it in progress_dir as
+    merged_progress.json and verifies the completeness of the run. If storage_path is provided and
+    the run is complete, the per-shard local storages are merged into it.
+    '''
+    progress = load_progress(progress_dir)
+    expected_keys = load_expected_keys(expected_filepath) if expected_filepath else None
+    merged = verify_progress(progress, expected_keys)
+    if storage_path and merged['complete']:
+        merged['merged_ids'] = merge_shard_storages(storage_path, merged['shards'])
+    with open(os.path.join(progress_dir, 'merged_progress.json'), 'w', encoding='utf-8') as f:
+        json.dump(merged, f, indent=4)
+    if verbose:
+        print(f"[INFO: shard_coordinator] {merged['done']}/{merged['assigned']} inputs done in {merged['shards']} shards")
+        if merged['missing_shards']:
+            print(f"[INFO: shard_coordinator] Shards without progress: {merged['missing_shards']}")
+        for shard_label, pending in merged['pending'].items():
+            print(f"[INFO: shard_coordinator] {shard_label}: {len(pending)} inputs not done")
+        if merged['overlapping']:
+            print(f"[INFO: shard_coordinator] Inputs assigned to more than one shard: {len(merged['overlapping'])}")
+        if merged['unassigned']:
+            print(f"[INFO: shard_coordinator] Inputs not assigned to any shard: {len(merged['unassigned'])}")
+    return merged
+
+
+if __name__ == '__main__':
+    arg_parser = ArgumentParser('shard_coordinator.py', description='This script merges the progress of the shards of a '
+                                'run split across several hosts with --shard i/N, and verifies its completeness. It exits with '
+                                'status 1 if the run is not complete')
+    arg_parser.add_argument('-p', '--shard_progress_dir', dest='shard_progress_dir', required=True,
+                            help='The directory where the shards recorded their progress')
+    arg_parser.add_argument('-e', '--expected', dest='expected', required=False,
+                            help='A JSON manifest or a text file listing the names of all the inputs of the dump, '
+                                 'relative to the input directory, used to check that none of them was left out')
+    arg_parser.add_argument('-sp', '--storage_path', dest='storage_path', required=False,
+                            help='The storage path (".db" or ".json") passed to the drivers. If provided, the per-shard '
+                                 'storages are merged into it once the run is complete. Not needed with a shared redis storage')
+    arg_parser.add_argument('-v', '--verbose', dest='verbose', action='store_true', required=False,
+                            help='Show a summary of the progress')
+    args = arg_parser.parse_args()
+    merged = coordinate(normalize_path(args.shard_progress_dir), normalize_path(args.expected) if args.expected else None,
+                        normalize_path(args.storage_path) if args.storage_path else None, args.verbose)
+    sys.exit(0 if merged['complete'] else 1)
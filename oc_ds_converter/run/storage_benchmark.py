@@ -0,0 +1,143 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+# Copyright (c) 2026 The OpenCitations Index Authors.
+#
+# Permission to use, copy, modify, and/or distribute this software for any purpose
+# with or without fee is hereby granted, provided that the above copyright notice
+# and this permission notice appear in all copies.
+#
+# THE SOFTWARE IS PROVIDED "AS IS" AND THE AUTHOR DISCLAIMS ALL WARRANTIES WITH
+# REGARD TO THIS SOFTWARE INCLUDING ALL IMPLIED WARRANTIES OF MERCHANTABILITY AND
+# FITNESS. IN NO EVENT SHALL THE AUTHOR BE LIABLE FOR ANY SPECIAL, DIRECT, INDIRECT,
+# OR CONSEQUENTIAL DAMAGES OR ANY DAMAGES WHATSOEVER RESULTING FROM LOSS OF USE,
+# DATA OR PROFITS, WHETHER IN AN ACTION OF CONTRACT, NEGLIGENCE OR OTHER TORTIOUS
+# ACTION, ARISING OUT OF OR IN CONNECTION WITH THE USE OR PERFORMANCE OF THIS
+# SOFTWARE.
+
+
+from __future__ import annotations
+
+import os
+import random
+import shutil
+import time
+from argparse import ArgumentParser
+from concurrent.futures import ProcessPoolExecutor
+from typing import Callable, Dict, List
+
+from oc_ds_converter.lib.file_manager import normalize_path
+from oc_ds_converter.oc_idmanager.oc_data_storage.compact_manager import CompactStorageManager
+from oc_ds_converter.oc_idmanager.oc_data_storage.in_memory_manager import InMemoryStorageManager
+from oc_ds_converter.oc_idmanager.oc_data_storage.mmap_manager import MmapStorageManager
+from oc_ds_converter.oc_idmanager.oc_data_storage.redis_manager import RedisStorageManager
+from oc_ds_converter.oc_idmanager.oc_data_storage.sqlite_manager import SqliteStorageManager
+from oc_ds_converter.oc_idmanager.oc_data_storage.storage_manager import StorageManager
+
+
+def get_backends(work_dir:str, redis_testing:bool) -> Dict[str, Callable[[], StorageManager]]:
+    '''
+    This function returns, for each storage backend, a function opening it in work_dir. The redis storage
+    manager uses fakeredis if redis_testing is True, otherwise the redis db n.2, which is emptied.
+    '''
+    return {
+        'json': lambda: InMemoryStorageManager(os.path.join(work_dir, 'id_valid.json')),
+        'sqlite': lambda: SqliteStorageManager(os.path.join(work_dir, 'id_valid.db')),
+        'redis': lambda: RedisStorageManager(testing=redis_testing),
+        'compact': lambda: CompactStorageManager(os.path.join(work_dir, 'id_valid.bin')),
+        'mmap': lambda: MmapStorageManager(os.path.join(work_dir, 'id_valid.mmap'))
+    }
+
+def _read_ids(backend:str, work_dir:str, redis_testing:bool, ids:List[str]) -> float:
+    storage_manager = get_backends(work_dir, redis_testing)[backend]()
+    start = time.perf_counter()
+    for id in ids:
+        storage_manager.get_value(id)
+    return time.perf_counter() - start
+
+def benchmark(work_dir:str, ids_count:int=100000, batch_size:int=10000, reads:int=100000, readers:int=4,
+              backends:List[str]=None, redis_testing:bool=True) -> Dict[str, Dict[str, float]]:
+    '''
+    This function measures, for each storage backend, the seconds taken to write ids_count IDs in bulk
+    writes of batch_size IDs (the way the temporary storage is committed after each input), to save and
+    reopen the storage, and to read the values of random IDs, half of which are stored, from a single process
+    and from several processes at once.
+
+    :params work_dir: the directory where the storages are created, deleted at the end
+    :type work_dir: str
+    :params ids_count: the number of IDs written
+    :type ids_count: int
+    :params batch_size: the number of IDs of each bulk write
+    :type batch_size: int
+    :params reads: the number of IDs read
+    :type reads: int
+    :params readers: the number of processes reading at once
+    :type readers: int
+    :params backends: the backends to measure, all of them by default
+    :type backends: List[str]
+    :returns: Dict[str, Dict[str, float]] -- the seconds taken by each operation, for each backend
+    '''
+    rng = random.Random(0)
+    values = [(f'doi:10.{rng.randrange(1000, 99999)}/{i}', rng.random() < 0.9) for i in range(ids_count)]
+    read_ids = [rng.choice(values)[0] if i % 2 else f'doi:10.1/missing.{i}' for i in range(reads)]
+    results = dict()
+    for backend in backends if backends else get_backends(work_dir, redis_testing):
+        backend_dir = os.path.join(work_dir, backend)
+        os.makedirs(backend_dir, exist_ok=True)
+        open_storage = get_backends(backend_dir, redis_testing)[backend]
+        storage_manager = open_storage()
+        storage_manager.delete_storage()
+        storage_manager = open_storage()
+        timings = dict()
+        start = time.perf_counter()
+        for i in range(0, ids_count, batch_size):
+            storage_manager.set_multi_value(values[i:i + batch_size])
+        timings['write'] = time.perf_counter() - start
+        start = time.perf_counter()
+        storage_manager.store_file()
+        timings['save'] = time.perf_counter() - start
+        # fakeredis is neither persistent nor shared among processes
+        shared = not (backend == 'redis' and redis_testing)
+        if shared:
+            start = time.perf_counter()
+            storage_manager = open_storage()
+            timings['open'] = time.perf_counter() - start
+        start = time.perf_counter()
+        for id in read_ids:
+            storage_manager.get_value(id)
+        timings['read'] = time.perf_counter() - start
+        if readers > 1 and shared:
+            parts = [read_ids[i::readers] for i in range(readers)]
+            start = time.perf_counter()
+            with ProcessPoolExecutor(readers) as executor:
+                list(executor.map(_read_ids, [backend] * readers, [backend_dir] * readers,
+                                  [redis_testing] * readers, parts))
+            timings[f'read_{readers}_processes'] = time.perf_counter() - start
+        storage_manager.delete_storage()
+        results[backend] = timings
+    shutil.rmtree(work_dir, ignore_errors=True)
+    return results
+
+
+if __name__ == '__main__':
+    arg_parser = ArgumentParser('storage_benchmark.py', description='This script measures the time taken by the storage '
+                                'backends of the validated IDs to write them in bulk, save and reopen the storage, and read them')
+    arg_parser.add_argument('-w', '--work_dir', dest='work_dir', required=True,
+                            help='The directory where the storages are created. It is deleted at the end')
+    arg_parser.add_argument('-n', '--ids', dest='ids', type=int, default=100000, required=False,
+                            help='The number of IDs written')
+    arg_parser.add_argument('-bs', '--batch_size', dest='batch_size', type=int, default=10000, required=False,
+                            help='The number of IDs of each bulk write')
+    arg_parser.add_argument('-rd', '--reads', dest='reads', type=int, default=100000, required=False,
+                            help='The number of IDs read')
+    arg_parser.add_argument('-p', '--readers', dest='readers', type=int, default=4, required=False,
+                            help='The number of processes reading at once')
+    arg_parser.add_argument('-b', '--backends', dest='backends', nargs='+', required=False,
+                            choices=['json', 'sqlite', 'redis', 'compact', 'mmap'],
+                            help='The backends to measure. All of them by default')
+    arg_parser.add_argument('-r', '--redis', dest='redis', action='store_true', required=False,
+                            help='Measure the redis db n.2 instead of fakeredis. The db is emptied')
+    args = arg_parser.parse_args()
+    results = benchmark(normalize_path(args.work_dir), args.ids, args.batch_size, args.reads, args.readers,
+                        args.backends, not args.redis)
+    for backend, timings in results.items():
+        print(f'{backend:>8}: ' + ', '.join(f'{operation} {seconds:.3f}s' for operation, seconds in timings.items()))
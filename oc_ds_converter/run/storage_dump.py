@@ -0,0 +1,93 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+# Copyright (c) 2026 The OpenCitations Index Authors.
+#
+# Permission to use, copy, modify, and/or distribute this software for any purpose
+# with or without fee is hereby granted, provided that the above copyright notice
+# and this permission notice appear in all copies.
+#
+# THE SOFTWARE IS PROVIDED "AS IS" AND THE AUTHOR DISCLAIMS ALL WARRANTIES WITH
+# REGARD TO THIS SOFTWARE INCLUDING ALL IMPLIED WARRANTIES OF MERCHANTABILITY AND
+# FITNESS. IN NO EVENT SHALL THE AUTHOR BE LIABLE FOR ANY SPECIAL, DIRECT, INDIRECT,
+# OR CONSEQUENTIAL DAMAGES OR ANY DAMAGES WHATSOEVER RESULTING FROM LOSS OF USE,
+# DATA OR PROFITS, WHETHER IN AN ACTION OF CONTRACT, NEGLIGENCE OR OTHER TORTIOUS
+# ACTION, ARISING OUT OF OR IN CONNECTION WITH THE USE OR PERFORMANCE OF THIS
+# SOFTWARE.
+
+
+from __future__ import annotations
+
+import os
+from argparse import ArgumentParser
+
+from oc_ds_converter.lib.file_manager import normalize_path
+from oc_ds_converter.lib.pipeline import get_storage_manager
+from oc_ds_converter.lib.validity_dump import export_storage, import_dumps, merge_dumps
+
+
+def export_validity(storage_path:str|None, redis_storage_manager:bool, dump_filepath:str, verbose:bool=False) -> int:
+    '''
+    This function exports the validity values of the IDs of a storage, i.e. the storage path passed to the
+    drivers or, if redis_storage_manager is True, the redis storage, to a dump.
+    '''
+    if not redis_storage_manager and not os.path.exists(storage_path):
+        raise FileNotFoundError(storage_path)
+    storage_manager = get_storage_manager(storage_path, redis_storage_manager, testing=False, cache_size=0)
+    saved = export_storage(storage_manager, dump_filepath)
+    if verbose:
+        print(f'[INFO: storage_dump] {saved} IDs exported to {dump_filepath}')
+    return saved
+
+def import_validity(dump_filepaths:list, storage_path:str|None, redis_storage_manager:bool, batch_size:int=100000,
+                    verbose:bool=False) -> int:
+    '''
+    This function imports the validity values saved in one or more dumps into a storage, i.e. the storage
+    path passed to the drivers or, if redis_storage_manager is True, the redis storage.
+    '''
+    storage_manager = get_storage_manager(storage_path, redis_storage_manager, testing=False, cache_size=0)
+    loaded = import_dumps(dump_filepaths, storage_manager, batch_size)
+    if verbose:
+        print(f'[INFO: storage_dump] {loaded} IDs imported into {"redis" if redis_storage_manager else storage_path}')
+    return loaded
+
+
+if __name__ == '__main__':
+    arg_parser = ArgumentParser('storage_dump.py', description='This script moves the validity values of the IDs '
+                                'between storages, hosts and runs through compressed, sorted dumps: it exports a storage '
+                                'to a dump, merges the dumps of several hosts, or imports dumps into a storage, e.g. to '
+                                'start a new run with the IDs already validated')
+    subparsers = arg_parser.add_subparsers(dest='command', required=True)
+    export_parser = subparsers.add_parser('export', help='Export a storage to a dump')
+    export_parser.add_argument('-sp', '--storage_path', dest='storage_path', required=False,
+                               help='The storage path passed to the drivers')
+    export_parser.add_argument('-r', '--redis_storage_manager', dest='redis_storage_manager', action='store_true',
+                               required=False, help='Export the redis storage (db n.2)')
+    export_parser.add_argument('-o', '--output', dest='output', required=True, help='The path of the dump')
+    import_parser = subparsers.add_parser('import', help='Import one or more dumps into a storage')
+    import_parser.add_argument('-i', '--input', dest='input', nargs='+', required=True, help='The paths of the dumps')
+    import_parser.add_argument('-sp', '--storage_path', dest='storage_path', required=False,
+                               help='The storage path passed to the drivers')
+    import_parser.add_argument('-r', '--redis_storage_manager', dest='redis_storage_manager', action='store_true',
+                               required=False, help='Import into the redis storage (db n.2)')
+    import_parser.add_argument('-bs', '--batch_size', dest='batch_size', type=int, default=100000, required=False,
+                               help='The number of IDs of each bulk write')
+    merge_parser = subparsers.add_parser('merge', help='Merge several dumps into a new one')
+    merge_parser.add_argument('-i', '--input', dest='input', nargs='+', required=True, help='The paths of the dumps')
+    merge_parser.add_argument('-o', '--output', dest='output', required=True, help='The path of the new dump')
+    for parser in (export_parser, import_parser, merge_parser):
+        parser.add_argument('-v', '--verbose', dest='verbose', action='store_true', required=False,
+                            help='Show the number of IDs moved')
+    args = arg_parser.parse_args()
+    if args.command == 'merge':
+        merged = merge_dumps([normalize_path(filepath) for filepath in args.input], normalize_path(args.output))
+        if args.verbose:
+            print(f'[INFO: storage_dump] {merged} IDs merged into {args.output}')
+    else:
+        if not args.storage_path and not args.redis_storage_manager:
+            arg_parser.error('either --storage_path or --redis_storage_manager is required')
+        storage_path = normalize_path(args.storage_path) if args.storage_path else None
+        if args.command == 'export':
+            export_validity(storage_path, args.redis_storage_manager, normalize_path(args.output), args.verbose)
+        else:
+            import_validity([normalize_path(filepath) for filepath in args.input], storage_path,
+                            args.redis_storage_manager, args.batch_size, args.verbose)
@@ -0,0 +1,47 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+# Copyright (c) 2026 The OpenCitations Index Authors.
+#
+# Permission to use, copy, modify, and/or distribute this software for any purpose
+# with or without fee is hereby granted, provided that the above copyright notice
+# and this permission notice appear in all copies.
+#
+# THE SOFTWARE IS PROVIDED "AS IS" AND THE AUTHOR DISCLAIMS ALL WARRANTIES WITH
+# REGARD TO THIS SOFTWARE INCLUDING ALL IMPLIED WARRANTIES OF MERCHANTABILITY AND
+# FITNESS. IN NO EVENT SHALL THE AUTHOR BE LIABLE FOR ANY SPECIAL, DIRECT, INDIRECT,
+# OR CONSEQUENTIAL DAMAGES OR ANY DAMAGES WHATSOEVER RESULTING FROM LOSS OF USE,
+# DATA OR PROFITS, WHETHER IN AN ACTION OF CONTRACT, NEGLIGENCE OR OTHER TORTIOUS
+# ACTION, ARISING OUT OF OR IN CONNECTION WITH THE USE OR PERFORMANCE OF THIS
+# SOFTWARE.
+
+
+
+from __future__ import annotations
+
+from argparse import ArgumentParser
+
+from oc_ds_converter.lib.file_manager import normalize_path
+from oc_ds_converter.lib.validation_broker import get_validation_broker_config, serve_validation_broker
+
+if __name__ == '__main__':
+    arg_parser = ArgumentParser('validation_broker.py', description='This script runs the broker which validates the '
+                                'IDs through the APIs on behalf of all the worker processes of the drivers, so that '
+                                'the IDs cited by the inputs of several workers are requested once. The drivers use '
+                                'the broker set in the [validation_broker] section of the configuration file')
+    arg_parser.add_argument('-a', '--address', dest='address', required=False,
+                            help='The path of the Unix socket of the broker, by default the one of the configuration file')
+    arg_parser.add_argument('-w', '--workers', dest='workers', type=int, required=False,
+                            help='The maximum number of concurrent requests')
+    arg_parser.add_argument('-cs', '--cache_size', dest='cache_size', type=int, required=False,
+                            help='The maximum number of results cached')
+    args = arg_parser.parse_args()
+    config = get_validation_broker_config()
+    address = normalize_path(args.address) if args.address else config['address']
+    if not address:
+        arg_parser.error('no address set for the broker')
+    print(f'[INFO: validation_broker] Serving on {address}')
+    if not config['authkey']:
+        print(f'[INFO: validation_broker] Saving the key of the workers in {address}.key')
+    serve_validation_broker(address, config['authkey'],
+                            config['workers'] if args.workers is None else args.workers,
+                            config['cache_size'] if args.cache_size is None else args.cache_size)
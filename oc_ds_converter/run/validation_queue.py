@@ -0,0 +1,102 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+# Copyright (c) 2026 The OpenCitations Index Authors.
+#
+# Permission to use, copy, modify, and/or distribute this software for any purpose
+# with or without fee is hereby granted, provided that the above copyright notice
+# and this permission notice appear in all copies.
+#
+# THE SOFTWARE IS PROVIDED "AS IS" AND THE AUTHOR DISCLAIMS ALL WARRANTIES WITH
+# REGARD TO THIS SOFTWARE INCLUDING ALL IMPLIED WARRANTIES OF MERCHANTABILITY AND
+# FITNESS. IN NO EVENT SHALL THE AUTHOR BE LIABLE FOR ANY SPECIAL, DIRECT, INDIRECT,
+# OR CONSEQUENTIAL DAMAGES OR ANY DAMAGES WHATSOEVER RESULTING FROM LOSS OF USE,
+# DATA OR PROFITS, WHETHER IN AN ACTION OF CONTRACT, NEGLIGENCE OR OTHER TORTIOUS
+# ACTION, ARISING OUT OF OR IN CONNECTION WITH THE USE OR PERFORMANCE OF THIS
+# SOFTWARE.
+
+
+
+from __future__ import annotations
+
+from argparse import ArgumentParser
+
+from oc_ds_converter.lib.doi_oracle import get_doi_oracle
+from oc_ds_converter.lib.file_manager import normalize_path
+from oc_ds_converter.lib.pipeline import get_storage_manager
+from oc_ds_converter.lib.validation_queue import (ValidationQueue, drain_validation_queue, filter_rows,
+                                                  get_validation_queue_config)
+from oc_ds_converter.oc_idmanager.doi import DOIManager
+
+
+def validate_queue(queue_filepath:str, outputs:list, storage_path:str|None=None, redis_storage_manager:bool=False,
+                   rate:float|None=None, workers:int|None=None, max_attempts:int|None=None,
+                   verbose:bool=False) -> dict:
+    '''
+    This function completes a conversion run with the deferred validation: it validates the DOIs pushed to the
+    queue by the second iteration of the drivers, under a budget of requests per second, saving their validity
+    in the storage of the run, and then removes from the CSV tables produced the rows with the DOIs found invalid.
+
+    :params queue_filepath: the SQLite file of the queue
+    :type queue_filepath: str
+    :params outputs: the CSV tables, or the directories with them, to be filtered, e.g. the output directory of
+        the driver and the one of the citations
+    :type outputs: list
+    :params storage_path: the path of the storage of the run, if Redis is not used
+    :type storage_path: str|None
+    :params redis_storage_manager: whether the Redis storage manager is used
+    :type redis_storage_manager: bool
+    :params rate: the maximum number of requests per second, by default the one of the configuration file
+    :type rate: float|None
+    :params workers: the number of concurrent requests, by default the one of the configuration file
+    :type workers: int|None
+    :params max_attempts: the number of failed validations after which a DOI is left pending (and its rows
+        removed), by default the one of the configuration file
+    :type max_attempts: int|None
+    :returns: dict -- the number of DOIs found valid, invalid and whose validation failed, and of rows removed
+    '''
+    config = get_validation_queue_config()
+    queue = ValidationQueue(queue_filepath)
+    doi_manager = DOIManager(storage_manager=get_storage_manager(storage_path, redis_storage_manager, testing=False),
+                             oracle=get_doi_oracle())
+    if verbose:
+        print(f'[INFO: validation_queue] Validating {queue.stats()["pending"]} pending DOIs')
+    counts = drain_validation_queue(queue, doi_manager,
+                                    rate=config['rate'] if rate is None else rate,
+                                    workers=config['workers'] if workers is None else workers,
+                                    max_attempts=config['max_attempts'] if max_attempts is None else max_attempts)
+    counts['removed'] = filter_rows(queue, outputs)
+    if verbose:
+        print(f'[INFO: validation_queue] {counts["valid"]} valid and {counts["invalid"]} invalid DOIs, '
+              f'{counts["failed"]} failed validations, {counts["removed"]} rows removed')
+    queue.close()
+    return counts
+
+if __name__ == '__main__':
+    arg_parser = ArgumentParser('validation_queue.py', description='This script validates the DOIs whose validation '
+                                'was deferred by the drivers (the [validation_queue] section of the configuration '
+                                'file), under a budget of requests per second, and removes the rows with the DOIs '
+                                'found invalid from the CSV tables produced')
+    arg_parser.add_argument('-q', '--queue', dest='queue', required=False,
+                            help='The SQLite file of the queue, by default the one of the configuration file')
+    arg_parser.add_argument('-o', '--output', dest='output', nargs='+', required=True,
+                            help='The CSV tables, or the directories with them, to be filtered, e.g. the output '
+                                 'directory of the driver and the one of the citations')
+    arg_parser.add_argument('-s', '--storage_path', dest='storage_path', required=False,
+                            help='The path of the storage of the validated IDs used by the driver')
+    arg_parser.add_argument('-r', '--redis_storage_manager', dest='redis_storage_manager', action='store_true',
+                            required=False, help='Use the Redis storage manager')
+    arg_parser.add_argument('-rps', '--rate', dest='rate', type=float, required=False,
+                            help='The maximum number of requests per second')
+    arg_parser.add_argument('-w', '--workers', dest='workers', type=int, required=False,
+                            help='The number of concurrent requests')
+    arg_parser.add_argument('-ma', '--max_attempts', dest='max_attempts', type=int, required=False,
+                            help='The number of failed validations after which a DOI is considered invalid')
+    arg_parser.add_argument('-v', '--verbose', dest='verbose', action='store_true', required=False,
+                            help='Show the progress of the validation')
+    args = arg_parser.parse_args()
+    queue_filepath = normalize_path(args.queue) if args.queue else get_validation_queue_config()['filepath']
+    if not queue_filepath:
+        arg_parser.error('no validation queue set')
+    validate_queue(queue_filepath, [normalize_path(path) for path in args.output],
+                   normalize_path(args.storage_path) if args.storage_path else None, args.redis_storage_manager,
+                   args.rate, args.workers, args.max_attempts, args.verbose)
@@ -0,0 +1,112 @@
+import os
+import shutil
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+
+import fakeredis
+
+from oc_ds_converter.datasource.redis import RedisDataSource
+from oc_ds_converter.datasource.snapshot import FilteredDataSource, get_meta_data_source, write_snapshot
+from oc_ds_converter.lib.bloom_filter import BloomFilter
+from oc_ds_converter.lib.pipeline import get_storage_manager
+from oc_ds_converter.oc_idmanager.oc_data_storage.bloom_manager import BloomStorageManager
+from oc_ds_converter.oc_idmanager.oc_data_storage.redis_manager import RedisStorageManager
+from oc_ds_converter.oc_idmanager.oc_data_storage.sqlite_manager import SqliteStorageManager
+from oc_ds_converter.run.meta_snapshot import create_filter
+
+BASE = os.path.join('test', 'bloom_filter')
+
+
+class CountingStorageManager(SqliteStorageManager):
+    def __init__(self, database):
+        super().__init__(database)
+        self.reads = 0
+
+    def get_value(self, id):
+        self.reads += 1
+        return super().get_value(id)
+
+
+class TestBloomFilter(unittest.TestCase):
+    def tearDown(self):
+        shutil.rmtree(BASE, ignore_errors=True)
+
+    def test_filter(self):
+        ids = [f'doi:10.1/{i}' for i in range(10000)]
+        bloom_filter = BloomFilter.create(10000, 0.01, ids=ids)
+        self.assertTrue(all(id in bloom_filter for id in ids))
+        false_positives = sum(f'doi:10.2/{i}' in bloom_filter for i in range(10000))
+        self.assertLess(false_positives, 200)
+
+    def test_shared_file(self):
+        filepath = os.path.join(BASE, 'ids.bloom')
+        first = BloomFilter.create(1000, 0.01, filepath, ids=['doi:10.1/a'])
+        second = BloomFilter.open(filepath)
+        self.assertIn('doi:10.1/a', second)
+        first.add('doi:10.1/b')
+        self.assertIn('doi:10.1/b', second)
+        first.close()
+        second.close()
+        with open(filepath, 'ab') as f:
+            f.write(b'0')
+        self.assertRaises(ValueError, BloomFilter.open, filepath)
+
+    def test_concurrent_writes(self):
+        # the filters opened on the same file set bits of the same bytes at the same time without losing any
+        filepath = os.path.join(BASE, 'ids.bloom')
+        BloomFilter.create(100, 0.01, filepath).close()
+        filters = [BloomFilter.open(filepath) for _ in range(4)]
+        with ThreadPoolExecutor(4) as executor:
+            list(executor.map(lambda i: filters[i].update(f'doi:10.1/{i}.{j}' for j in range(500)), range(4)))
+        self.assertTrue(all(f'doi:10.1/{i}.{j}' in filters[0] for i in range(4) for j in range(500)))
+        for bloom_filter in filters:
+            bloom_filter.close()
+
+    def test_storage_manager(self):
+        backend = CountingStorageManager(os.path.join(BASE, 'id_valid.db'))
+        backend.set_multi_value([('doi:10.1/a', True), ('doi:10.1/b', False)])
+        filter_filepath = os.path.join(BASE, 'id_valid.db.bloom')
+        storage = BloomStorageManager(backend, filter_filepath, capacity=1000)
+        # the filter is built from the stored ids
+        self.assertEqual((storage.get_value('doi:10.1/a'), storage.get_value('doi:10.1/b')), (True, False))
+        self.assertEqual([storage.get_value(f'doi:10.1/{i}') for i in range(100)], [None] * 100)
+        self.assertLess(backend.reads, 10)
+        storage.set_multi_value([('doi:10.1/c', True)])
+        storage.set_value('doi:10.1/d', False)
+        # the filter saved beside the storage is shared
+        other = BloomStorageManager(backend, filter_filepath, capacity=1000)
+        self.assertEqual((other.get_value('doi:10.1/c'), other.get_value('doi:10.1/d')), (True, False))
+        self.assertEqual(storage.stats()['reads'] + storage.stats()['negatives'], 102)
+        self.assertRaises(ValueError, storage.set_value, 'doi:10.1/e', 1)
+        storage.delete_storage()
+        self.assertFalse(os.path.exists(filter_filepath))
+
+    def test_get_storage_manager(self):
+        storage = get_storage_manager(os.path.join(BASE, 'id_valid.db'), False, testing=True, bloom_filter=True)
+        self.assertIsInstance(storage, BloomStorageManager)
+        self.assertEqual(storage.filter_filepath, os.path.join(BASE, 'id_valid.db.bloom'))
+        storage.delete_storage()
+        # the redis storage may be shared by other hosts, so it is never filtered
+        self.assertIsInstance(get_storage_manager(None, True, testing=True, bloom_filter=True, cache_size=0),
+                              RedisStorageManager)
+        self.assertRaises(ValueError, BloomStorageManager, RedisStorageManager(testing=True))
+
+    def test_meta_filter(self):
+        snapshot_filepath = os.path.join(BASE, 'meta_br.snapshot')
+        filter_filepath = os.path.join(BASE, 'meta_br.bloom')
+        write_snapshot(['doi:10.1/a', 'doi:10.1/b'], snapshot_filepath)
+        create_filter(snapshot_filepath, filter_filepath)
+        config = os.path.join(BASE, 'config.ini')
+        with open(config, 'w', encoding='utf-8') as f:
+            f.write(f'[redis]\n[database 0]\ndb=11\n[database 1]\ndb=10\n[snapshot]\nbr_filter={filter_filepath}\n')
+        br = get_meta_data_source('DB-META-BR', config)
+        self.assertIsInstance(br, FilteredDataSource)
+        self.assertIsInstance(br.data_source, RedisDataSource)
+        br.data_source._r = fakeredis.FakeRedis(decode_responses=True)
+        br.data_source._r.mset({'doi:10.1/a': 'omid:br/1', 'doi:10.1/b': 'omid:br/2'})
+        self.assertEqual(br.mget(['doi:10.1/c', 'doi:10.1/a', 'doi:10.1/b']), [None, 'omid:br/1', 'omid:br/2'])
+        self.assertIsNone(br.get('doi:10.1/c'))
+
+
+if __name__ == '__main__':
+    unittest.main()
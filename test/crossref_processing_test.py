@@ -685,9 +685,9 @@ class TestCrossrefProcessing(unittest.TestCase):
         cp.storage_manager.delete_storage()
 
         cp= CrossrefProcessing()
-        #CASE_4: invalid doi in self._redis_values_br
+        #CASE_4: invalid doi in self.prefetch_index
         inp_4 = {'id': 'doi:10.1089/bsp.2008.002', 'schema': 'doi'}
-        cp._redis_values_br.append(inp_4['id'])
+        cp.prefetch_index.br.add(inp_4['id'])
         out_4 = cp.to_validated_id_list(inp_4)
         exp_4 = ['doi:10.1089/bsp.2008.002']
         self.assertEqual(out_4, exp_4)
@@ -721,9 +721,9 @@ class TestCrossrefProcessing(unittest.TestCase):
         cp.storage_manager.delete_storage()
 
         cp = CrossrefProcessing(storage_manager=RedisStorageManager(testing=True))
-        # CASE_4: invalid doi in self._redis_values_br
+        # CASE_4: invalid doi in self.prefetch_index
         inp_4 = {'id': 'doi:10.1089/bsp.2008.002', 'schema': 'doi'}
-        cp._redis_values_br.append(inp_4['id'])
+        cp.prefetch_index.br.add(inp_4['id'])
         out_4 = cp.to_validated_id_list(inp_4)
         exp_4 = ['doi:10.1089/bsp.2008.002']
         self.assertEqual(out_4, exp_4)
@@ -176,8 +176,8 @@ class DataciteProcessTest(unittest.TestCase):
         if os.path.exists(citations_output_path):
             shutil.rmtree(citations_output_path)
         with open(self.cache_test, "w") as write_cache:
-            processed_files_dict = {'first_iteration': ['chunk_1'],
-                                    'second_iteration': ['chunk_1']}
+            processed_files_dict = {'first_iteration': ['sample_datacite_chunk_1'],
+                                    'second_iteration': ['sample_datacite_chunk_1']}
             json.dump(processed_files_dict, write_cache)
 
         preprocess(datacite_ndjson_dir=self.zst_input_folder, publishers_filepath=self.publisher_mapping,
@@ -220,5 +220,30 @@ class DataciteProcessTest(unittest.TestCase):
         if os.path.exists(self.db):
             os.remove(self.db)
 
+    def test_parallel_chunks(self):
+        'With more than one worker, the chunks of target records are named as in the sequential branch'
+        input_dir = os.path.join(self.test_dir, 'split_input')
+        report = os.path.join(self.test_dir, 'task_report.csv')
+        citations_output_path = self.output_dir + "_citations"
+        os.makedirs(os.path.join(input_dir, 'sample'), exist_ok=True)
+        with open(os.path.join(input_dir, 'sample', 'sample.ndjson'), 'w', encoding='utf-8') as f:
+            for i in range(5):
+                f.write(json.dumps({'id': f'10.1/a{i}', 'type': 'dois',
+                                    'attributes': {'doi': f'10.1/a{i}', 'relatedIdentifiers': []}}) + '\n')
+
+        preprocess(datacite_ndjson_dir=input_dir, publishers_filepath=None, orcid_doi_filepath=None,
+                   csv_dir=self.output_dir, redis_storage_manager=True, cache=self.cache,
+                   max_workers=2, target=2, task_report=report)
+
+        with open(report, 'r', encoding='utf-8') as f:
+            rows = list(csv.DictReader(f))
+        self.assertEqual(sorted({(row['task'], row['cost']) for row in rows}),
+                         [('sample.ndjson_chunk_1', '2'), ('sample.ndjson_chunk_2', '2'),
+                          ('sample.ndjson_chunk_3', '1')])
+
+        for path in (input_dir, self.output_dir, citations_output_path):
+            shutil.rmtree(path, ignore_errors=True)
+        os.remove(report)
+
 if __name__ == '__main__':
     unittest.main()
\ No newline at end of file
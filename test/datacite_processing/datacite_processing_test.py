@@ -601,9 +601,9 @@ class TestDataciteProcessing(unittest.TestCase):
         dcp.storage_manager.delete_storage()
 
         dcp = DataciteProcessing()
-        # CASE_4: invalid doi in self._redis_values_br
+        # CASE_4: invalid doi in self.prefetch_index
         inp_4 = {'id': 'doi:10.1089/bsp.2008.002', 'schema': 'doi'}
-        dcp._redis_values_br.append(inp_4['id'])
+        dcp.prefetch_index.br.add(inp_4['id'])
         out_4 = dcp.to_validated_id_list(inp_4)
         exp_4 = ['doi:10.1089/bsp.2008.002']
         self.assertEqual(out_4, exp_4)
@@ -636,9 +636,9 @@ class TestDataciteProcessing(unittest.TestCase):
         dcp.storage_manager.delete_storage()
 
         dcp = DataciteProcessing(storage_manager=RedisStorageManager(testing=True))
-        # CASE_4: invalid doi in self._redis_values_br
+        # CASE_4: invalid doi in self.prefetch_index
         inp_4 = {'id': 'doi:10.1089/bsp.2008.002', 'schema': 'doi'}
-        dcp._redis_values_br.append(inp_4['id'])
+        dcp.prefetch_index.br.add(inp_4['id'])
         out_4 = dcp.to_validated_id_list(inp_4)
         exp_4 = ['doi:10.1089/bsp.2008.002']
         self.assertEqual(out_4, exp_4)
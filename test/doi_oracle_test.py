@@ -0,0 +1,104 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+# Copyright (c) 2026 The OpenCitations Index Authors.
+#
+# Permission to use, copy, modify, and/or distribute this software for any purpose
+# with or without fee is hereby granted, provided that the above copyright notice
+# and this permission notice appear in all copies.
+#
+# THE SOFTWARE IS PROVIDED "AS IS" AND THE AUTHOR DISCLAIMS ALL WARRANTIES WITH
+# REGARD TO THIS SOFTWARE INCLUDING ALL IMPLIED WARRANTIES OF MERCHANTABILITY AND
+# FITNESS. IN NO EVENT SHALL THE AUTHOR BE LIABLE FOR ANY SPECIAL, DIRECT, INDIRECT,
+# OR CONSEQUENTIAL DAMAGES OR ANY DAMAGES WHATSOEVER RESULTING FROM LOSS OF USE,
+# DATA OR PROFITS, WHETHER IN AN ACTION OF CONTRACT, NEGLIGENCE OR OTHER TORTIOUS
+# ACTION, ARISING OUT OF OR IN CONNECTION WITH THE USE OR PERFORMANCE OF THIS
+# SOFTWARE.
+
+import os
+import shutil
+import unittest
+from unittest.mock import patch
+
+from oc_ds_converter.datasource.snapshot import SnapshotDataSource, id_digest, write_digests
+from oc_ds_converter.lib.doi_oracle import (DOIOracle, build_doi_oracle, get_doi_oracle, get_doi_oracle_config,
+                                            save_dois)
+from oc_ds_converter.oc_idmanager.doi import DOIManager
+from oc_ds_converter.oc_idmanager.validation_pipeline import ValidationPipeline
+from oc_ds_converter.run.doi_oracle import create_doi_oracle
+
+BASE = os.path.join('test', 'doi_oracle')
+
+
+class DOIOracleTest(unittest.TestCase):
+    def setUp(self):
+        os.makedirs(BASE, exist_ok=True)
+        self.crossref_dir = os.path.join(BASE, 'crossref_dois')
+        self.datacite_dir = os.path.join(BASE, 'datacite_dois')
+        save_dois(['doi:10.1/a', 'doi:10.1/b', None], os.path.join(self.crossref_dir, 'part_1.dois'))
+        save_dois(['doi:10.1/b', 'doi:10.1/c'], os.path.join(self.crossref_dir, 'nested', 'part_2.dois'))
+        save_dois(['doi:10.5/d'], os.path.join(self.datacite_dir, 'part_1.dois'))
+
+    def tearDown(self):
+        shutil.rmtree(BASE, ignore_errors=True)
+
+    def test_build_doi_oracle(self):
+        oracle_filepath = os.path.join(BASE, 'oracle.snapshot')
+        self.assertEqual(create_doi_oracle([self.crossref_dir, self.datacite_dir], oracle_filepath), 4)
+        oracle = DOIOracle([oracle_filepath])
+        self.assertEqual(len(oracle), 4)
+        for doi in ('doi:10.1/a', 'doi:10.1/b', 'doi:10.1/c', 'doi:10.5/d'):
+            self.assertIn(doi, oracle)
+        self.assertNotIn('doi:10.1/e', oracle)
+        self.assertEqual(oracle.stats(), {'hits': 4, 'misses': 1})
+        oracle.close()
+
+        # an oracle can be merged with new DOIs
+        save_dois(['doi:10.9/f'], os.path.join(BASE, 'jalc.dois'))
+        merged_filepath = os.path.join(BASE, 'merged.snapshot')
+        self.assertEqual(build_doi_oracle([oracle_filepath, os.path.join(BASE, 'jalc.dois')], merged_filepath), 5)
+        # the oracles of different dumps can be used together as well
+        oracle = DOIOracle([oracle_filepath, os.path.join(BASE, 'jalc.dois')])
+        self.assertIn('doi:10.9/f', oracle)
+        self.assertIn('doi:10.1/a', oracle)
+        oracle.close()
+
+    def test_write_digests(self):
+        filepath = os.path.join(BASE, 'digests.snapshot')
+        digests = sorted(id_digest(f'doi:10.1/{i}') for i in range(100))
+        self.assertEqual(write_digests(digests + digests[-1:], filepath, buffer_size=7), 100)
+        snapshot = SnapshotDataSource(None, filepath)
+        self.assertEqual(list(snapshot.digests()), digests)
+        self.assertIn('doi:10.1/42', snapshot)
+        snapshot.close()
+        with self.assertRaises(ValueError):
+            write_digests([2, 1], filepath)
+
+    def test_config(self):
+        config_filepath = os.path.join(BASE, 'config.ini')
+        with open(config_filepath, 'w', encoding='utf-8') as f:
+            f.write(f'[doi_oracle]\nfilepaths={os.path.join(self.crossref_dir, "part_1.dois")}, '
+                    f'{os.path.join(self.datacite_dir, "part_1.dois")}\ndois_dir=dois\n')
+        self.assertEqual(get_doi_oracle_config(config_filepath)['dois_dir'], 'dois')
+        oracle = get_doi_oracle(config_filepath)
+        self.assertEqual(len(oracle.snapshots), 2)
+        self.assertIn('doi:10.5/d', oracle)
+        oracle.close()
+        empty_filepath = os.path.join(BASE, 'empty.ini')
+        open(empty_filepath, 'w').close()
+        self.assertIsNone(get_doi_oracle(empty_filepath))
+        self.assertEqual(get_doi_oracle_config(empty_filepath), {'filepaths': [], 'dois_dir': None})
+
+    def test_validation_tier(self):
+        oracle = DOIOracle([os.path.join(self.crossref_dir, 'part_1.dois')])
+        doi_manager = DOIManager()
+        pipeline = ValidationPipeline(doi_manager, oracle=oracle)
+        with patch.object(doi_manager, 'exists', return_value=False) as exists:
+            self.assertTrue(pipeline.validate('10.1/A'))
+            self.assertFalse(pipeline.validate('10.1/z'))
+            exists.assert_called_once_with('doi:10.1/z')
+        self.assertEqual(pipeline.stats()['oracle'], {'checked': 2, 'accepted': 1, 'rejected': 0})
+        oracle.close()
+
+
+if __name__ == '__main__':
+    unittest.main()
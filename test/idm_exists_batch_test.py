@@ -0,0 +1,149 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+# Copyright (c) 2026 The OpenCitations Index Authors.
+#
+# Permission to use, copy, modify, and/or distribute this software for any purpose
+# with or without fee is hereby granted, provided that the above copyright notice
+# and this permission notice appear in all copies.
+#
+# THE SOFTWARE IS PROVIDED "AS IS" AND THE AUTHOR DISCLAIMS ALL WARRANTIES WITH
+# REGARD TO THIS SOFTWARE INCLUDING ALL IMPLIED WARRANTIES OF MERCHANTABILITY AND
+# FITNESS. IN NO EVENT SHALL THE AUTHOR BE LIABLE FOR ANY SPECIAL, DIRECT, INDIRECT,
+# OR CONSEQUENTIAL DAMAGES OR ANY DAMAGES WHATSOEVER RESULTING FROM LOSS OF USE,
+# DATA OR PROFITS, WHETHER IN AN ACTION OF CONTRACT, NEGLIGENCE OR OTHER TORTIOUS
+# ACTION, ARISING OUT OF OR IN CONNECTION WITH THE USE OR PERFORMANCE OF THIS
+# SOFTWARE.
+
+import json
+import threading
+import unittest
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+from oc_ds_converter.oc_idmanager.arxiv import ArXivManager
+from oc_ds_converter.oc_idmanager.openalex import OpenAlexManager
+from oc_ds_converter.oc_idmanager.pmid import PMIDManager
+from oc_ds_converter.oc_idmanager.ror import RORManager
+from oc_ds_converter.oc_idmanager.wikidata import WikidataManager
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    '''
+    It answers like the batch endpoints of the E-utilities, Wikidata, OpenAlex, arXiv and ROR, for the IDs
+    ending with an even digit only, and records the requests.
+    '''
+    def do_GET(self):
+        url = urlparse(self.path)
+        params = {key: values[0] for key, values in parse_qs(url.query).items()}
+        self.server.requests.append((url.path, params))
+        if self.server.fail:
+            return self._send(500, 'text/plain', 'error')
+        if url.path == '/esummary.fcgi':
+            result = {'uids': []}
+            for pmid in params['id'].split(','):
+                result[pmid] = {'uid': pmid} if int(pmid[-1]) % 2 == 0 else {'uid': pmid, 'error': 'cannot get document summary'}
+            body = {'result': result}
+        elif url.path == '/w/api.php':
+            body = {'entities': {qid: {'id': qid} if int(qid[-1]) % 2 == 0 else {'id': qid, 'missing': ''}
+                                 for qid in params['ids'].split('|')}}
+        elif url.path in ('/works', '/sources'):
+            body = {'results': [{'id': 'https://openalex.org/' + oal_id} for oal_id in params['filter'][len('openalex:'):].split('|')
+                                if int(oal_id[-1]) % 2 == 0]}
+        elif url.path == '/organizations':
+            ror_ids = [value.split('/')[-1] for value in params['query.advanced'].split(' OR ')]
+            body = {'items': [{'id': 'https://ror.org/' + ror_id} for ror_id in ror_ids if int(ror_id[-1]) % 2 == 0]}
+        elif url.path == '/api/query':
+            entries = ''.join(f'<entry><id>http://arxiv.org/abs/{arxiv_id}v2</id></entry>'
+                              for arxiv_id in params['id_list'].split(',') if int(arxiv_id[-1]) % 2 == 0)
+            return self._send(200, 'application/atom+xml', f'<feed xmlns="http://www.w3.org/2005/Atom">{entries}</feed>')
+        else:
+            return self._send(404, 'text/plain', 'not found')
+        self._send(200, 'application/json', json.dumps(body))
+
+    def _send(self, status, content_type, text):
+        self.send_response(status)
+        self.send_header('Content-Type', content_type)
+        self.end_headers()
+        self.wfile.write(text.encode('utf-8'))
+
+    def log_message(self, format, *args):
+        pass
+
+
+class ExistsBatchTest(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.server = ThreadingHTTPServer(('127.0.0.1', 0), StubHandler)
+        cls.server.requests = list()
+        cls.server.fail = False
+        cls.url = f'http://127.0.0.1:{cls.server.server_address[1]}'
+        threading.Thread(target=cls.server.serve_forever, daemon=True).start()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.shutdown()
+        cls.server.server_close()
+
+    def setUp(self):
+        self.server.requests.clear()
+        self.server.fail = False
+
+    def test_pmid(self):
+        pmid_manager = PMIDManager()
+        pmid_manager._api_batch = self.url + '/esummary.fcgi'
+        existence = pmid_manager.exists_batch([str(n) for n in range(1, 451)] + ['pmid:2', 'pmid:0', ''])
+        self.assertEqual(len(existence), 451)
+        self.assertTrue(existence['pmid:2'])
+        self.assertFalse(existence['pmid:1'])
+        # the malformed PMIDs are not requested
+        self.assertFalse(existence['pmid:'])
+        self.assertEqual(sum(existence.values()), 225)
+        self.assertEqual(len(self.server.requests), 3)
+
+    def test_wikidata(self):
+        wikidata_manager = WikidataManager()
+        wikidata_manager._api_batch = self.url + '/w/api.php'
+        existence = wikidata_manager.exists_batch([f'Q{n}' for n in range(1, 101)])
+        self.assertEqual(existence['wikidata:Q4'], True)
+        self.assertEqual(existence['wikidata:Q5'], False)
+        self.assertEqual(len(self.server.requests), 2)
+        self.assertEqual(self.server.requests[0][1]['action'], 'wbgetentities')
+
+    def test_openalex(self):
+        openalex_manager = OpenAlexManager()
+        openalex_manager._api_works_route = self.url + '/works/'
+        openalex_manager._api_sources_route = self.url + '/sources/'
+        existence = openalex_manager.exists_batch(['W2', 'https://openalex.org/W3', 'S4', 'openalex:S5'])
+        self.assertEqual(existence, {'openalex:W2': True, 'openalex:W3': False, 'openalex:S4': True, 'openalex:S5': False})
+        self.assertEqual([path for path, _ in self.server.requests], ['/works', '/sources'])
+
+    def test_arxiv(self):
+        arxiv_manager = ArXivManager()
+        arxiv_manager._api_batch = self.url + '/api/query'
+        existence = arxiv_manager.exists_batch(['2101.00002', '2101.00002v2', 'arxiv:2101.00002v3', '2101.00003v1'])
+        self.assertEqual(existence, {'arxiv:2101.00002v1': True, 'arxiv:2101.00002v2': True,
+                                     'arxiv:2101.00002v3': False, 'arxiv:2101.00003v1': False})
+        self.assertEqual(len(self.server.requests), 1)
+        self.assertEqual(self.server.requests[0][1]['id_list'], '2101.00002,2101.00003')
+
+    def test_ror(self):
+        ror_manager = RORManager()
+        ror_manager._api_batch = self.url + '/organizations'
+        existence = ror_manager.exists_batch(['https://ror.org/02mhbdp94', 'ror:040gcmg81', '0123'])
+        self.assertEqual(existence, {'ror:02mhbdp94': True, 'ror:040gcmg81': False, 'ror:0123': False})
+        self.assertEqual(len(self.server.requests), 1)
+
+    def test_api_errors_and_no_api(self):
+        self.server.fail = True
+        pmid_manager = PMIDManager()
+        pmid_manager._api_batch = self.url + '/esummary.fcgi'
+        # the IDs which could not be checked are not reported as invalid
+        self.assertEqual(pmid_manager.exists_batch(['2', 'pmid:abc']), {'pmid:2': None, 'pmid:': False})
+        self.server.requests.clear()
+        self.assertEqual(WikidataManager(use_api_service=False).exists_batch(['Q1', 'P1']),
+                         {'wikidata:Q1': True, 'wikidata:1': False})
+        self.assertEqual(self.server.requests, [])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,136 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+# Copyright (c) 2026 The OpenCitations Index Authors.
+#
+# Permission to use, copy, modify, and/or distribute this software for any purpose
+# with or without fee is hereby granted, provided that the above copyright notice
+# and this permission notice appear in all copies.
+#
+# THE SOFTWARE IS PROVIDED "AS IS" AND THE AUTHOR DISCLAIMS ALL WARRANTIES WITH
+# REGARD TO THIS SOFTWARE INCLUDING ALL IMPLIED WARRANTIES OF MERCHANTABILITY AND
+# FITNESS. IN NO EVENT SHALL THE AUTHOR BE LIABLE FOR ANY SPECIAL, DIRECT, INDIRECT,
+# OR CONSEQUENTIAL DAMAGES OR ANY DAMAGES WHATSOEVER RESULTING FROM LOSS OF USE,
+# DATA OR PROFITS, WHETHER IN AN ACTION OF CONTRACT, NEGLIGENCE OR OTHER TORTIOUS
+# ACTION, ARISING OUT OF OR IN CONNECTION WITH THE USE OR PERFORMANCE OF THIS
+# SOFTWARE.
+
+import os
+import shutil
+import unittest
+from unittest.mock import patch
+
+from oc_ds_converter.oc_idmanager.doi import DOIManager
+from oc_ds_converter.oc_idmanager.issn import ISSNManager
+from oc_ds_converter.oc_idmanager.orcid import ORCIDManager
+from oc_ds_converter.oc_idmanager.pmid import PMIDManager
+from oc_ds_converter.oc_idmanager.validation_pipeline import PrefixRegistry, ValidationPipeline, doi_prefix
+
+BASE = os.path.join('test', 'validation_pipeline')
+
+
+class ValidationPipelineTest(unittest.TestCase):
+    def setUp(self):
+        os.makedirs(BASE, exist_ok=True)
+
+    def tearDown(self):
+        shutil.rmtree(BASE, ignore_errors=True)
+
+    def test_invalid_ids_without_requests(self):
+        for manager, invalid_ids in [
+                (DOIManager(), ['not a doi', '10.1007']),
+                (ORCIDManager(), ['0000-0003-0530-430C', '0000-0001-5506-5232', '1-5506-5232']),
+                (PMIDManager(), ['pmid:abc', '']),
+                (ISSNManager(), ['0000-0948', '1234'])]:
+            pipeline = ValidationPipeline(manager)
+            with patch.object(manager, 'exists') as exists:
+                for invalid_id in invalid_ids:
+                    self.assertFalse(pipeline.validate(invalid_id), invalid_id)
+                exists.assert_not_called()
+            stats = pipeline.stats()
+            self.assertEqual(stats['normalisation']['rejected'] + stats['syntax']['rejected'], len(invalid_ids))
+            self.assertEqual(stats['api']['checked'], 0)
+
+    def test_tiers(self):
+        doi_manager = DOIManager()
+        registry = PrefixRegistry(['doi:10.1007'])
+        pipeline = ValidationPipeline(doi_manager, registry)
+        with patch.object(doi_manager, 'exists', return_value=True) as exists:
+            self.assertFalse(pipeline.validate('10.9999/unknown.prefix'))
+            self.assertTrue(pipeline.validate('https://doi.org/10.1007/S11192-022-04367-W'))
+            self.assertTrue(pipeline.validate('10.1007/s11192-022-04367-w'))
+            exists.assert_called_once_with('doi:10.1007/s11192-022-04367-w')
+        self.assertTrue(doi_manager.storage_manager.get_value('doi:10.1007/s11192-022-04367-w'))
+        self.assertEqual(pipeline.stats(), {
+            'normalisation': {'checked': 3, 'accepted': 0, 'rejected': 0},
+            'syntax': {'checked': 3, 'accepted': 0, 'rejected': 0},
+            'registry': {'checked': 3, 'accepted': 0, 'rejected': 1},
+            'storage': {'checked': 2, 'accepted': 1, 'rejected': 0},
+            'oracle': {'checked': 1, 'accepted': 0, 'rejected': 0},
+            'negative_cache': {'checked': 1, 'accepted': 0, 'rejected': 0},
+            'api': {'checked': 1, 'accepted': 1, 'rejected': 0}})
+        # the DOI rejected by the registry is stored as well
+        self.assertFalse(doi_manager.storage_manager.get_value('doi:10.9999/unknown.prefix'))
+
+    def test_managers_use_the_pipeline(self):
+        doi_manager = DOIManager(prefix_registry=PrefixRegistry(['doi:10.1007']), oracle={'doi:10.1007/in-oracle'})
+        with patch.object(doi_manager, 'exists', return_value=(True, {'id': '10.1007/abc', 'valid': True, 'ra': 'crossref'})) as exists:
+            self.assertEqual(doi_manager.is_valid('10.9999/abc', get_extra_info=True),
+                             (False, {'id': '10.9999/abc', 'valid': False, 'ra': 'unknown'}))
+            self.assertTrue(doi_manager.is_valid('10.1007/in-oracle'))
+            self.assertEqual(doi_manager.is_valid('10.1007/abc', get_extra_info=True),
+                             (True, {'id': '10.1007/abc', 'valid': True, 'ra': 'crossref'}))
+            self.assertEqual(doi_manager.is_valid('10.1007/abc', get_extra_info=True),
+                             (True, {'id': '10.1007/abc', 'valid': True, 'ra': 'unknown'}))
+            exists.assert_called_once_with('doi:10.1007/abc', get_extra_info=True)
+        stats = doi_manager.validation_pipeline.stats()
+        self.assertEqual((stats['registry']['rejected'], stats['storage']['accepted'], stats['oracle']['accepted'],
+                          stats['api']['accepted']), (1, 1, 1, 1))
+        orcid_manager = ORCIDManager(orcid_set={'orcid:0000-0003-0530-4305'})
+        with patch.object(orcid_manager, 'exists') as exists:
+            self.assertTrue(orcid_manager.is_valid('0000-0003-0530-4305'))
+            exists.assert_not_called()
+        self.assertEqual(orcid_manager.validation_pipeline.stats()['oracle']['accepted'], 1)
+
+    def test_without_api(self):
+        orcid_manager = ORCIDManager()
+        pipeline = ValidationPipeline(orcid_manager, use_api=False)
+        with patch.object(orcid_manager, 'exists') as exists:
+            self.assertIsNone(pipeline.validate('0000-0003-0530-4305'))
+            self.assertFalse(pipeline.is_valid('0000-0003-0530-4305'))
+            exists.assert_not_called()
+        orcid_manager.storage_manager.set_value('orcid:0000-0003-0530-4305', True)
+        self.assertTrue(pipeline.validate('0000-0003-0530-4305'))
+
+    def test_prefix_registry(self):
+        filepath = os.path.join(BASE, 'prefixes.txt')
+        with open(filepath, 'w', encoding='utf-8') as f:
+            f.write('doi:10.1007\nDOI:10.1016\n\n')
+        registry = PrefixRegistry.load(filepath)
+        self.assertTrue(registry.is_known('doi:10.1016/j.joi.2021.101161'))
+        self.assertFalse(registry.is_known('doi:10.9999/abc'))
+        self.assertIsNone(registry.is_known('orcid:0000-0003-0530-4305'))
+        self.assertEqual(doi_prefix('doi:10.1007/abc/def'), 'doi:10.1007')
+        self.assertIsNone(doi_prefix('doi:10.1007'))
+
+    def test_managers_check_syntax_first(self):
+        doi_manager = DOIManager()
+        orcid_manager = ORCIDManager()
+        pmid_manager = PMIDManager()
+        with patch.object(doi_manager, 'exists') as doi_exists, \
+                patch.object(orcid_manager, 'exists') as orcid_exists, \
+                patch.object(pmid_manager, 'exists') as pmid_exists:
+            self.assertFalse(doi_manager.is_valid('10.1007'))
+            self.assertEqual(doi_manager.is_valid('10.1007', get_extra_info=True),
+                             (False, {'id': '10.1007', 'valid': False, 'ra': 'unknown'}))
+            self.assertFalse(orcid_manager.is_valid('0000-0003-0530-430C'))
+            self.assertFalse(orcid_manager.is_valid('0000-0001-5506-5232'))
+            self.assertFalse(pmid_manager.is_valid('pmid:0'))
+            doi_exists.assert_not_called()
+            orcid_exists.assert_not_called()
+            pmid_exists.assert_not_called()
+        self.assertFalse(doi_manager.storage_manager.get_value('doi:10.1007'))
+        self.assertFalse(orcid_manager.storage_manager.get_value('orcid:0000-0001-5506-5232'))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,65 @@
+import os
+import shutil
+import unittest
+
+import fakeredis
+
+from oc_ds_converter.datasource.redis import RedisDataSource
+from oc_ds_converter.datasource.snapshot import (SnapshotDataSource, export_snapshot, get_meta_data_source,
+                                                 write_snapshot)
+
+BASE = os.path.join('test', 'meta_snapshot')
+
+
+class TestMetaSnapshot(unittest.TestCase):
+    def setUp(self):
+        os.makedirs(BASE, exist_ok=True)
+        self.snapshot = os.path.join(BASE, 'meta_br.snapshot')
+
+    def tearDown(self):
+        shutil.rmtree(BASE, ignore_errors=True)
+
+    def test_membership(self):
+        ids = [f'doi:10.1/{i}' for i in range(1000)]
+        self.assertEqual(write_snapshot(ids + ids[:10], self.snapshot), 1000)
+        br = SnapshotDataSource('DB-META-BR', self.snapshot)
+        self.assertEqual(len(br), 1000)
+        self.assertEqual(br.mget(['doi:10.1/0', 'doi:10.1/999', 'doi:10.1/1000', 'doi:10.2/0']), [1, 1, None, None])
+        self.assertEqual(br.get('doi:10.1/500'), 1)
+        self.assertIsNone(br.get('orcid:0000-0002-6227-4053'))
+        self.assertRaises(NotImplementedError, br.set, 'doi:10.1/1000', 1)
+        br.close()
+
+    def test_empty_and_invalid(self):
+        write_snapshot([], self.snapshot)
+        empty = SnapshotDataSource('DB-META-RA', self.snapshot)
+        self.assertEqual(empty.mget(['orcid:0000-0002-6227-4053']), [None])
+        empty.close()
+        with open(self.snapshot, 'ab') as f:
+            f.write(b'1234')
+        self.assertRaises(ValueError, SnapshotDataSource, 'DB-META-RA', self.snapshot)
+
+    def test_export(self):
+        br = RedisDataSource('DB-META-BR')
+        br._r = fakeredis.FakeRedis()
+        br._r.mset({'doi:10.1/a': 'omid:br/1', 'doi:10.1/b': 'omid:br/2', 'pmid:1': 'omid:br/3'})
+        self.assertEqual(export_snapshot(br, self.snapshot), 3)
+        snapshot = SnapshotDataSource('DB-META-BR', self.snapshot)
+        self.assertEqual(snapshot.mget(['doi:10.1/a', 'pmid:1', 'doi:10.1/c']), [1, 1, None])
+        snapshot.close()
+        self.assertEqual(export_snapshot(br, self.snapshot, chunk_size=2), 3)
+        snapshot = SnapshotDataSource('DB-META-BR', self.snapshot)
+        self.assertEqual(snapshot.mget(['doi:10.1/a', 'doi:10.1/b', 'pmid:1', 'doi:10.1/c']), [1, 1, 1, None])
+        snapshot.close()
+
+    def test_get_meta_data_source(self):
+        write_snapshot(['doi:10.1/a'], self.snapshot)
+        config = os.path.join(BASE, 'config.ini')
+        with open(config, 'w', encoding='utf-8') as f:
+            f.write(f'[redis]\n[database 0]\ndb=11\n[database 1]\ndb=10\n[snapshot]\nbr={self.snapshot}\nra=\n')
+        self.assertIsInstance(get_meta_data_source('DB-META-BR', config), SnapshotDataSource)
+        self.assertIsInstance(get_meta_data_source('DB-META-RA', config), RedisDataSource)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,146 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+# Copyright (c) 2026 The OpenCitations Index Authors.
+#
+# Permission to use, copy, modify, and/or distribute this software for any purpose
+# with or without fee is hereby granted, provided that the above copyright notice
+# and this permission notice appear in all copies.
+#
+# THE SOFTWARE IS PROVIDED "AS IS" AND THE AUTHOR DISCLAIMS ALL WARRANTIES WITH
+# REGARD TO THIS SOFTWARE INCLUDING ALL IMPLIED WARRANTIES OF MERCHANTABILITY AND
+# FITNESS. IN NO EVENT SHALL THE AUTHOR BE LIABLE FOR ANY SPECIAL, DIRECT, INDIRECT,
+# OR CONSEQUENTIAL DAMAGES OR ANY DAMAGES WHATSOEVER RESULTING FROM LOSS OF USE,
+# DATA OR PROFITS, WHETHER IN AN ACTION OF CONTRACT, NEGLIGENCE OR OTHER TORTIOUS
+# ACTION, ARISING OUT OF OR IN CONNECTION WITH THE USE OR PERFORMANCE OF THIS
+# SOFTWARE.
+
+import os
+import shutil
+import time
+import unittest
+from unittest.mock import patch
+
+from oc_ds_converter.oc_idmanager.doi import DOIManager
+from oc_ds_converter.oc_idmanager.negative_cache import (API_ERROR, NOT_FOUND, SYNTAX, NegativeCache,
+                                                         get_negative_cache)
+from oc_ds_converter.oc_idmanager.orcid import ORCIDManager
+from oc_ds_converter.oc_idmanager.ror import RORManager
+from oc_ds_converter.oc_idmanager.support import set_api_failed
+from oc_ds_converter.oc_idmanager.validation_pipeline import ValidationPipeline
+
+BASE = os.path.join('test', 'negative_cache')
+
+
+def fail_request(id, get_extra_info=False):
+    # a request which could not be answered, e.g. because of a timeout
+    set_api_failed(True)
+    return (False, {'id': id, 'valid': False}) if get_extra_info else False
+
+
+class NegativeCacheTest(unittest.TestCase):
+    def setUp(self):
+        os.makedirs(BASE, exist_ok=True)
+        self.filepath = os.path.join(BASE, 'invalid.db')
+
+    def tearDown(self):
+        set_api_failed(False)
+        shutil.rmtree(BASE, ignore_errors=True)
+
+    def test_reasons_and_ttls(self):
+        negative_cache = NegativeCache(self.filepath, {API_ERROR: 0})
+        negative_cache.add('doi:10.1007', SYNTAX)
+        negative_cache.add('orcid:0000-0001-5000-0007', NOT_FOUND)
+        negative_cache.add('doi:10.1007/abc', API_ERROR)
+        self.assertEqual(negative_cache.get('doi:10.1007'), SYNTAX)
+        self.assertEqual(negative_cache.get('orcid:0000-0001-5000-0007'), NOT_FOUND)
+        # the API errors expire immediately
+        self.assertIsNone(negative_cache.get('doi:10.1007/abc'))
+        self.assertNotIn('doi:10.1007/xyz', negative_cache)
+        self.assertRaises(ValueError, negative_cache.add, 'doi:10.1007/abc', 'unknown')
+        self.assertEqual(negative_cache.purge(), 1)
+        self.assertEqual(negative_cache.stats(), {SYNTAX: 1, NOT_FOUND: 1, API_ERROR: 0, 'hits': 2, 'misses': 2})
+        negative_cache.close()
+        # the cache is persistent
+        negative_cache = NegativeCache(self.filepath)
+        self.assertIn('doi:10.1007', negative_cache)
+        negative_cache.remove('doi:10.1007')
+        self.assertNotIn('doi:10.1007', negative_cache)
+        negative_cache.close()
+
+    def test_expiration(self):
+        negative_cache = NegativeCache(ttls={NOT_FOUND: 1})
+        negative_cache.add('pmid:1', NOT_FOUND)
+        self.assertIn('pmid:1', negative_cache)
+        with patch('oc_ds_converter.oc_idmanager.negative_cache.time.time', return_value=time.time() + 2):
+            self.assertNotIn('pmid:1', negative_cache)
+
+    def test_config(self):
+        config_filepath = os.path.join(BASE, 'config.ini')
+        with open(config_filepath, 'w', encoding='utf-8') as f:
+            f.write(f'[negative_cache]\nfilepath={self.filepath}\nsyntax_ttl=\nnot_found_ttl=60\n')
+        negative_cache = get_negative_cache(config_filepath)
+        self.assertEqual(negative_cache.ttls, {SYNTAX: None, NOT_FOUND: 60, API_ERROR: 3600})
+        negative_cache.close()
+        open(config_filepath, 'w').close()
+        self.assertIsNone(get_negative_cache(config_filepath))
+
+    def test_shared_by_the_managers(self):
+        negative_cache = NegativeCache(self.filepath)
+        doi_manager = DOIManager()
+        doi_manager.negative_cache = negative_cache
+        with patch.object(doi_manager, 'exists', return_value=False) as exists:
+            self.assertFalse(doi_manager.is_valid('10.1007/not-found'))
+            self.assertFalse(doi_manager.is_valid('10.1007'))
+            exists.assert_called_once()
+        self.assertEqual(negative_cache.get('doi:10.1007/not-found'), NOT_FOUND)
+        self.assertEqual(negative_cache.get('doi:10.1007'), SYNTAX)
+        # another manager, e.g. of the next run, with an empty storage does not check the DOI again
+        next_doi_manager = DOIManager()
+        next_doi_manager.negative_cache = negative_cache
+        with patch.object(next_doi_manager, 'exists') as exists:
+            self.assertFalse(next_doi_manager.is_valid('doi:10.1007/NOT-FOUND'))
+            self.assertEqual(next_doi_manager.is_valid('10.1007/not-found', get_extra_info=True),
+                             (False, {'id': '10.1007/not-found', 'valid': False, 'ra': 'unknown'}))
+            exists.assert_not_called()
+        orcid_manager = ORCIDManager()
+        orcid_manager.negative_cache = negative_cache
+        with patch.object(orcid_manager, 'exists', return_value=False):
+            self.assertFalse(orcid_manager.is_valid('0000-0001-5000-0007'))
+        self.assertEqual(negative_cache.get('orcid:0000-0001-5000-0007'), NOT_FOUND)
+        negative_cache.close()
+
+    def test_api_errors_are_transient(self):
+        negative_cache = NegativeCache(ttls={API_ERROR: 0})
+        ror_manager = RORManager()
+        ror_manager.negative_cache = negative_cache
+        with patch.object(ror_manager, 'exists', side_effect=fail_request):
+            self.assertFalse(ror_manager.is_valid('040gcmg81'))
+            self.assertFalse(ror_manager.is_valid('040gcmg81', get_extra_info=True)[0])
+        # the failed check is neither stored nor kept in the negative cache beyond its time to live
+        self.assertIsNone(ror_manager.storage_manager.get_value('ror:040gcmg81'))
+        with patch.object(ror_manager, 'exists', return_value=True):
+            self.assertTrue(ror_manager.is_valid('040gcmg81'))
+        self.assertTrue(ror_manager.storage_manager.get_value('ror:040gcmg81'))
+        # the same without any negative cache
+        doi_manager = DOIManager()
+        doi_manager.negative_cache = None
+        with patch.object(doi_manager, 'exists', side_effect=fail_request):
+            self.assertFalse(doi_manager.is_valid('10.1007/abc'))
+        self.assertIsNone(doi_manager.storage_manager.get_value('doi:10.1007/abc'))
+
+    def test_validation_pipeline(self):
+        negative_cache = NegativeCache()
+        doi_manager = DOIManager()
+        doi_manager.negative_cache = negative_cache
+        pipeline = ValidationPipeline(doi_manager)
+        with patch.object(doi_manager, 'exists', side_effect=fail_request):
+            self.assertIsNone(pipeline.validate('10.1007/abc'))
+        with patch.object(doi_manager, 'exists', return_value=False):
+            self.assertFalse(pipeline.validate('10.1007/xyz'))
+        self.assertEqual(negative_cache.get('doi:10.1007/abc'), API_ERROR)
+        self.assertFalse(ValidationPipeline(doi_manager, use_api=False).validate('10.1007/abc'))
+        self.assertEqual(pipeline.stats()['api'], {'checked': 2, 'accepted': 0, 'rejected': 1})
+
+
+if __name__ == '__main__':
+    unittest.main()
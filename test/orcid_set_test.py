@@ -0,0 +1,88 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+# Copyright (c) 2026 The OpenCitations Index Authors.
+#
+# Permission to use, copy, modify, and/or distribute this software for any purpose
+# with or without fee is hereby granted, provided that the above copyright notice
+# and this permission notice appear in all copies.
+#
+# THE SOFTWARE IS PROVIDED "AS IS" AND THE AUTHOR DISCLAIMS ALL WARRANTIES WITH
+# REGARD TO THIS SOFTWARE INCLUDING ALL IMPLIED WARRANTIES OF MERCHANTABILITY AND
+# FITNESS. IN NO EVENT SHALL THE AUTHOR BE LIABLE FOR ANY SPECIAL, DIRECT, INDIRECT,
+# OR CONSEQUENTIAL DAMAGES OR ANY DAMAGES WHATSOEVER RESULTING FROM LOSS OF USE,
+# DATA OR PROFITS, WHETHER IN AN ACTION OF CONTRACT, NEGLIGENCE OR OTHER TORTIOUS
+# ACTION, ARISING OUT OF OR IN CONNECTION WITH THE USE OR PERFORMANCE OF THIS
+# SOFTWARE.
+
+import io
+import os
+import shutil
+import tarfile
+import unittest
+from unittest.mock import patch
+
+from oc_ds_converter.lib.doi_oracle import IDOracle
+from oc_ds_converter.lib.orcid_set import create_orcid_set, get_orcid_set, read_orcids
+from oc_ds_converter.oc_idmanager.orcid import ORCIDManager
+
+BASE = os.path.join('test', 'orcid_set')
+
+
+class ORCIDSetTest(unittest.TestCase):
+    def setUp(self):
+        os.makedirs(BASE, exist_ok=True)
+        # the summaries of the ORCID public data file, one XML file per record
+        self.archive = os.path.join(BASE, 'ORCID_2023_10_summaries.tar.gz')
+        with tarfile.open(self.archive, 'w:gz') as archive:
+            for name in ('ORCID_2023_10_summaries/305/0000-0003-0530-4305.xml',
+                         'ORCID_2023_10_summaries/23X/0000-0001-5506-523X.xml',
+                         'ORCID_2023_10_summaries/README.txt'):
+                data = b'<record/>'
+                info = tarfile.TarInfo(name)
+                info.size = len(data)
+                archive.addfile(info, io.BytesIO(data))
+        self.extracted = os.path.join(BASE, 'extracted', '012')
+        os.makedirs(self.extracted)
+        open(os.path.join(self.extracted, '0000-0002-8420-0696.xml'), 'w').close()
+
+    def tearDown(self):
+        shutil.rmtree(BASE, ignore_errors=True)
+
+    def test_create_orcid_set(self):
+        self.assertEqual(sorted(read_orcids([self.archive, os.path.join(BASE, 'extracted')])),
+                         ['orcid:0000-0001-5506-523X', 'orcid:0000-0002-8420-0696', 'orcid:0000-0003-0530-4305'])
+        filepath = os.path.join(BASE, 'orcids.snapshot')
+        # the chunks are sorted separately and merged
+        self.assertEqual(create_orcid_set([self.archive, os.path.join(BASE, 'extracted'), self.archive], filepath,
+                                          chunk_size=2), 3)
+        self.assertEqual(os.listdir(BASE).count('orcids.snapshot'), 1)
+        config_filepath = os.path.join(BASE, 'config.ini')
+        with open(config_filepath, 'w', encoding='utf-8') as f:
+            f.write(f'[orcid_set]\nfilepath={filepath}\n')
+        orcid_set = get_orcid_set(config_filepath)
+        self.assertIn('orcid:0000-0002-8420-0696', orcid_set)
+        self.assertNotIn('orcid:0000-0001-5000-0007', orcid_set)
+        orcid_set.close()
+        open(config_filepath, 'w').close()
+        self.assertIsNone(get_orcid_set(config_filepath))
+
+    def test_orcid_manager(self):
+        filepath = os.path.join(BASE, 'orcids.snapshot')
+        create_orcid_set([self.archive], filepath)
+        orcid_set = IDOracle([filepath])
+        orcid_manager = ORCIDManager(orcid_set=orcid_set)
+        with patch.object(orcid_manager, 'exists', return_value=False) as exists:
+            self.assertTrue(orcid_manager.is_valid('0000-0003-0530-4305'))
+            self.assertEqual(orcid_manager.is_valid('https://orcid.org/0000-0001-5506-523X', get_extra_info=True),
+                             (True, {'id': '0000-0001-5506-523X', 'valid': True}))
+            # the checksum is checked before the set, and the ORCIDs not in the set are checked through the API
+            self.assertFalse(orcid_manager.is_valid('0000-0003-0530-430C'))
+            self.assertFalse(orcid_manager.is_valid('0000-0001-5000-0007'))
+            exists.assert_called_once_with('orcid:0000-0001-5000-0007')
+        self.assertTrue(orcid_manager.storage_manager.get_value('orcid:0000-0003-0530-4305'))
+        self.assertEqual(orcid_set.stats(), {'hits': 2, 'misses': 1})
+        orcid_set.close()
+
+
+if __name__ == '__main__':
+    unittest.main()
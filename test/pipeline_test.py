@@ -0,0 +1,229 @@
+import csv
+import gzip
+import os
+import shutil
+import unittest
+
+from oc_ds_converter.lib.doi_oracle import DOIOracle, build_doi_oracle, save_dois
+from oc_ds_converter.lib.pipeline import (PipelineEngine, ProcessingCache, SourceAdapter, map_batches_in_order,
+                                          read_line_batches)
+from oc_ds_converter.lib.validation_queue import ValidationQueue, filter_rows
+from oc_ds_converter.oc_idmanager.oc_data_storage.overlay_manager import OverlayStorageManager
+
+BASE = os.path.join('test', 'pipeline')
+
+# the state of a worker process, set by its initializer
+_offset = 0
+
+
+def init_offset(offset):
+    global _offset
+    _offset = offset
+
+
+def sum_batch(batch):
+    return sum(batch) + _offset
+
+
+class StubIdManager(object):
+    def __init__(self, storage_manager):
+        self.storage_manager = storage_manager
+
+    def normalise(self, id_string, include_prefix=False):
+        return 'doi:' + id_string.lower() if id_string else None
+
+    def cached_as_invalid(self, id_string):
+        return False
+
+    def record_invalid(self, id_string, reason=None):
+        return True
+
+
+class StubProcessing(object):
+    # the DOIs ending with "x" are not valid
+    def __init__(self, storage_manager):
+        self.doi_m = StubIdManager(storage_manager)
+        self.tmp_doi_m = StubIdManager(OverlayStorageManager(storage_manager))
+        self.prefetched = list()
+
+    def extract_all_ids(self, entity, is_first_iteration):
+        return [ref['DOI'] for ref in entity['reference']], []
+
+    def get_reids_validity_list(self, id_list, redis_db):
+        return id_list
+
+    def update_redis_values(self, br, ra):
+        self.prefetched.extend(br)
+
+    def validated_as(self, id_dict):
+        return self.tmp_doi_m.storage_manager.get_value(id_dict['identifier'])
+
+    def to_validated_id_list(self, id_dict):
+        valid = not id_dict['id'].endswith('x')
+        self.tmp_doi_m.storage_manager.set_value(id_dict['id'], valid)
+        return [id_dict['id']] if valid else []
+
+    def csv_creator(self, entity):
+        return {'id': 'doi:' + entity['DOI'].lower().replace('doi:', '')}
+
+    def memory_to_storage(self):
+        self.tmp_doi_m.storage_manager.commit()
+
+
+class StubValidator(object):
+    # e.g. the proxy of the broker shared by the workers
+    def __init__(self):
+        self.batches = list()
+
+    def validate(self, ids):
+        self.batches.append(list(ids))
+        return {id: not id.endswith('x') for id in ids}
+
+
+class StubAdapter(SourceAdapter):
+    processings = list()
+
+    def get_processing(self, storage_manager, citing):
+        processing = StubProcessing(storage_manager)
+        self.processings.append(processing)
+        return processing
+
+    def get_records(self, source):
+        return source
+
+    def get_source_id(self, record):
+        return record['DOI']
+
+    def get_references(self, record):
+        return [(ref['DOI'], ref, False) for ref in record.get('reference', [])]
+
+    def get_target_entity(self, norm_id, cited):
+        return {'DOI': norm_id}
+
+
+class TestPipelineEngine(unittest.TestCase):
+    def setUp(self):
+        self.csv_dir = os.path.join(BASE, 'csv')
+        self.citations_dir = os.path.join(BASE, 'citations')
+        self.cache = os.path.join(BASE, 'cache.json')
+        self.records = [
+            {'DOI': '10.1/A', 'reference': [{'DOI': '10.1/B'}, {'DOI': '10.1/x'}]},
+            {'DOI': '10.1/C', 'reference': [{'DOI': '10.1/B'}, {'DOI': '10.1/A'}]}]
+
+    def tearDown(self):
+        shutil.rmtree(BASE, ignore_errors=True)
+
+    def read(self, *path):
+        with open(os.path.join(*path), 'r', encoding='utf-8') as f:
+            return list(csv.DictReader(f))
+
+    def test_two_iterations(self):
+        adapter = StubAdapter()
+        engine = PipelineEngine(adapter, self.csv_dir, self.citations_dir, os.path.join(BASE, 'storage.db'),
+                                cache=self.cache)
+        for is_first_iteration in (True, False):
+            engine.process(self.records, 'input', 'out', is_first_iteration)
+        self.assertEqual([row['id'] for row in self.read(self.csv_dir, 'out_citing.csv')], ['doi:10.1/a', 'doi:10.1/c'])
+        # the cited entities already processed as citing entities do not produce new rows
+        self.assertEqual([row['id'] for row in self.read(self.csv_dir, 'out_cited.csv')], ['doi:10.1/b'])
+        self.assertEqual([(row['citing'], row['cited']) for row in self.read(self.citations_dir, 'out.csv')],
+                         [('doi:10.1/a', 'doi:10.1/b'), ('doi:10.1/c', 'doi:10.1/b'), ('doi:10.1/c', 'doi:10.1/a')])
+        self.assertEqual(adapter.processings[-1].prefetched, ['10.1/B', '10.1/x', '10.1/B', '10.1/A'])
+
+        # the cache makes a second run skip the input
+        processings = len(adapter.processings)
+        engine.process(self.records, 'input', 'out', False)
+        self.assertEqual(len(adapter.processings), processings)
+
+    def test_doi_oracle(self):
+        dois_dir = os.path.join(BASE, 'dois')
+        engine = PipelineEngine(StubAdapter(), self.csv_dir, self.citations_dir, os.path.join(BASE, 'storage.db'),
+                                cache=self.cache, dois_dir=dois_dir)
+        engine.process(self.records, 'input', 'out', True)
+        # e.g. the DOIs of another dump, whose records include the one of "10.1/x"
+        save_dois(['doi:10.1/x'], os.path.join(dois_dir, 'other.dois'))
+        oracle_filepath = os.path.join(BASE, 'oracle.snapshot')
+        self.assertEqual(build_doi_oracle([dois_dir], oracle_filepath), 3)
+        oracle = DOIOracle([oracle_filepath])
+        adapter = StubAdapter()
+        engine = PipelineEngine(adapter, self.csv_dir, self.citations_dir, os.path.join(BASE, 'storage.db'),
+                                cache=self.cache, doi_oracle=oracle)
+        engine.process(self.records, 'input', 'out', False)
+        # the DOI in the oracle is not validated, while the one not in the oracle is
+        self.assertEqual([row['id'] for row in self.read(self.csv_dir, 'out_cited.csv')], ['doi:10.1/b', 'doi:10.1/x'])
+        self.assertEqual(oracle.stats(), {'hits': 1, 'misses': 1})
+        oracle.close()
+
+    def test_deferred_validation(self):
+        queue = ValidationQueue(os.path.join(BASE, 'queue.db'))
+        adapter = StubAdapter()
+        engine = PipelineEngine(adapter, self.csv_dir, self.citations_dir, os.path.join(BASE, 'storage.db'),
+                                cache=self.cache, validation_queue=queue)
+        records = self.records + [{'DOI': '10.1/D', 'reference': [{'DOI': '10.1/X'}]}]
+        for is_first_iteration in (True, False):
+            engine.process(records, 'input', 'out', is_first_iteration)
+        # the unknown DOIs are not validated, but their rows and citations are produced as pending
+        self.assertEqual([row['id'] for row in self.read(self.csv_dir, 'out_cited.csv')], ['doi:10.1/b', 'doi:10.1/x'])
+        self.assertEqual(len(self.read(self.citations_dir, 'out.csv')), 5)
+        self.assertEqual(queue.stats(), {'pending': 2, 'valid': 0, 'invalid': 0})
+        self.assertIsNone(adapter.processings[-1].validated_as({'identifier': 'doi:10.1/x'}))
+        queue.set_results({'doi:10.1/b': True, 'doi:10.1/x': False})
+        self.assertEqual(filter_rows(queue, [self.csv_dir, self.citations_dir]), 3)
+        self.assertEqual([row['id'] for row in self.read(self.csv_dir, 'out_cited.csv')], ['doi:10.1/b'])
+        self.assertEqual([(row['citing'], row['cited']) for row in self.read(self.citations_dir, 'out.csv')],
+                         [('doi:10.1/a', 'doi:10.1/b'), ('doi:10.1/c', 'doi:10.1/b'), ('doi:10.1/c', 'doi:10.1/a')])
+        queue.close()
+
+    def test_validator(self):
+        validator = StubValidator()
+        adapter = StubAdapter()
+        engine = PipelineEngine(adapter, self.csv_dir, self.citations_dir, os.path.join(BASE, 'storage.db'),
+                                cache=self.cache, validator=validator)
+        for is_first_iteration in (True, False):
+            engine.process(self.records, 'input', 'out', is_first_iteration)
+        # the unknown DOIs of the input are validated with a single call, before producing the rows
+        self.assertEqual(validator.batches, [['doi:10.1/b', 'doi:10.1/x']])
+        self.assertEqual([row['id'] for row in self.read(self.csv_dir, 'out_cited.csv')], ['doi:10.1/b'])
+        self.assertEqual(len(self.read(self.citations_dir, 'out.csv')), 3)
+
+    def test_cache(self):
+        cache = ProcessingCache(self.cache)
+        other_worker = ProcessingCache(self.cache)
+        cache.task_done('a', True)
+        other_worker.task_done('b', True)
+        self.assertEqual(ProcessingCache(self.cache).cache_dict, {'first_iteration': ['a', 'b']})
+        self.assertTrue(other_worker.is_done('a', True))
+        self.assertFalse(other_worker.is_done('a', False))
+        cache.delete()
+        self.assertFalse(os.path.exists(self.cache))
+
+
+class TestParallelParts(unittest.TestCase):
+    def tearDown(self):
+        shutil.rmtree(BASE, ignore_errors=True)
+
+    def test_read_line_batches(self):
+        os.makedirs(BASE, exist_ok=True)
+        filepath = os.path.join(BASE, 'lines.json.gz')
+        with gzip.open(filepath, 'wb') as f:
+            f.write(b''.join(f'{i}\n'.encode('utf-8') for i in range(7)))
+        self.assertEqual([len(batch) for batch in read_line_batches(filepath, 3)], [3, 3, 1])
+        # the lines of the parts already processed are skipped
+        self.assertEqual(list(read_line_batches(filepath, 3, skip_lines=6)), [[b'6\n']])
+        self.assertEqual(list(read_line_batches(filepath, 3, skip_lines=9)), [])
+
+    def test_map_batches_in_order(self):
+        batches = [list(range(i)) for i in range(20)]
+        results = list(map_batches_in_order(iter(batches), sum_batch, 3, init_offset, (1000,)))
+        self.assertEqual(results, [sum(batch) + 1000 for batch in batches])
+
+    def test_map_batches_reader_error(self):
+        def batches():
+            yield [1]
+            raise ValueError('corrupted input')
+        with self.assertRaises(ValueError):
+            list(map_batches_in_order(batches(), sum_batch, 2))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,31 @@
+import unittest
+
+from oc_ds_converter.lib.prefetch_index import PrefetchIndex
+
+
+class TestPrefetchIndex(unittest.TestCase):
+    def test_lookups_and_hits(self):
+        index = PrefetchIndex()
+        index.update(["doi:10.1/a", "doi:10.1/b", "doi:10.1/a"], ["orcid:0000-0002-1825-0097"])
+        self.assertEqual(index.br, {"doi:10.1/a", "doi:10.1/b"})
+        self.assertTrue(index.has_br("doi:10.1/a"))
+        self.assertFalse(index.has_br("doi:10.1/c"))
+        self.assertTrue(index.has_ra("orcid:0000-0002-1825-0097"))
+        self.assertFalse(index.has_ra("doi:10.1/a"))
+        self.assertEqual(index.stats(), {'br': {'ids': 2, 'lookups': 2, 'hits': 1},
+                                         'ra': {'ids': 1, 'lookups': 2, 'hits': 1}})
+
+    def test_update_replaces(self):
+        index = PrefetchIndex()
+        index.update(["doi:10.1/a"], ["orcid:0000-0002-1825-0097"])
+        # the IDs of a new part replace the ones of the previous part, the counters are kept
+        index.has_br("doi:10.1/a")
+        index.update(["doi:10.1/b"])
+        self.assertFalse(index.has_br("doi:10.1/a"))
+        self.assertEqual(index.ra, set())
+        self.assertEqual(index.hits['br'], 1)
+        self.assertEqual(index.lookups['br'], 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,107 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+# Copyright (c) 2026 The OpenCitations Index Authors.
+#
+# Permission to use, copy, modify, and/or distribute this software for any purpose
+# with or without fee is hereby granted, provided that the above copyright notice
+# and this permission notice appear in all copies.
+#
+# THE SOFTWARE IS PROVIDED "AS IS" AND THE AUTHOR DISCLAIMS ALL WARRANTIES WITH
+# REGARD TO THIS SOFTWARE INCLUDING ALL IMPLIED WARRANTIES OF MERCHANTABILITY AND
+# FITNESS. IN NO EVENT SHALL THE AUTHOR BE LIABLE FOR ANY SPECIAL, DIRECT, INDIRECT,
+# OR CONSEQUENTIAL DAMAGES OR ANY DAMAGES WHATSOEVER RESULTING FROM LOSS OF USE,
+# DATA OR PROFITS, WHETHER IN AN ACTION OF CONTRACT, NEGLIGENCE OR OTHER TORTIOUS
+# ACTION, ARISING OUT OF OR IN CONNECTION WITH THE USE OR PERFORMANCE OF THIS
+# SOFTWARE.
+
+import os
+import shutil
+import unittest
+from unittest.mock import patch
+
+from oc_ds_converter.oc_idmanager.prefix_ra_index import (BATCH_SIZE, INVALID_RA, PrefixRAIndex, get_prefix)
+from oc_ds_converter.oc_idmanager.validation_pipeline import PrefixRegistry
+from oc_ds_converter.pubmed.get_publishers import ExtractPublisherDOI
+
+BASE = os.path.join('test', 'prefix_ra_index')
+
+
+def fake_ra_api(url, headers, r_format='json'):
+    # the RA API answers with a list, in the order of the prefixes requested
+    answers = list()
+    for prefix in url.rsplit('/', 1)[1].split(','):
+        if prefix == '10.9999':
+            answers.append({'DOI': prefix, 'status': 'DOI does not exist'})
+        elif prefix == '10.8888':
+            answers.append({'DOI': prefix, 'status': 'Unknown'})
+        else:
+            answers.append({'DOI': prefix, 'RA': 'DataCite' if prefix.startswith('10.5') else 'Crossref'})
+    return answers
+
+
+class PrefixRAIndexTest(unittest.TestCase):
+    def setUp(self):
+        os.makedirs(BASE, exist_ok=True)
+        self.filepath = os.path.join(BASE, 'prefix_ra.csv')
+
+    def tearDown(self):
+        shutil.rmtree(BASE, ignore_errors=True)
+
+    def test_get_prefix(self):
+        self.assertEqual(get_prefix('doi:10.1007/s11192-022-04367-w'), '10.1007')
+        self.assertEqual(get_prefix('10.5281'), '10.5281')
+        self.assertEqual(get_prefix('10.1007/10.5281.abc'), '10.1007')
+        self.assertIsNone(get_prefix('not a doi'))
+        self.assertIsNone(get_prefix(None))
+
+    def test_dumps_and_file(self):
+        index = PrefixRAIndex(self.filepath)
+        index.add_dois(['doi:10.1007/a', 'doi:10.1007/b', 'doi:10.1016/c'], 'crossref')
+        self.assertEqual(index.get('10.1016/j.joi.2021.101161'), 'crossref')
+        self.assertIsNone(index.get('10.5281/zenodo.1'))
+        self.assertEqual(index.stats(), {'size': 2, 'hits': 1, 'misses': 1})
+        # another process shares the same file
+        other_index = PrefixRAIndex(self.filepath)
+        self.assertEqual(len(other_index), 2)
+        other_index.add({'10.5281': 'datacite'})
+        with patch('oc_ds_converter.oc_idmanager.prefix_ra_index.call_api') as call_api:
+            self.assertEqual(index.resolve(['doi:10.5281/zenodo.1']), {'doi:10.5281/zenodo.1': 'datacite'})
+            call_api.assert_not_called()
+
+    def test_resolve(self):
+        index = PrefixRAIndex(self.filepath, max_workers=4)
+        index.add({'10.1007': 'crossref'})
+        dois = ['doi:10.1007/a', 'doi:10.5281/b', 'doi:10.9999/c', 'doi:10.8888/d', 'not a doi'] + \
+            [f'doi:10.{1100 + i}/x' for i in range(2 * BATCH_SIZE)]
+        with patch('oc_ds_converter.oc_idmanager.prefix_ra_index.call_api', side_effect=fake_ra_api) as call_api:
+            ras = index.resolve(dois)
+            # the 2 * BATCH_SIZE + 3 unknown prefixes are resolved with 3 requests
+            self.assertEqual(call_api.call_count, 3)
+            self.assertEqual(ras['doi:10.1007/a'], 'crossref')
+            self.assertEqual(ras['doi:10.5281/b'], 'datacite')
+            self.assertEqual(ras['doi:10.9999/c'], INVALID_RA)
+            self.assertIsNone(ras['doi:10.8888/d'])
+            self.assertIsNone(ras['not a doi'])
+            self.assertEqual(ras['doi:10.1120/x'], 'crossref')
+            # the resolved prefixes are not requested again, unlike the ones whose RA is unknown
+            index.resolve(['doi:10.5281/other', 'doi:10.8888/other'])
+            self.assertEqual(call_api.call_count, 4)
+            self.assertEqual(call_api.call_args.kwargs['url'], 'https://doi.org/ra/10.8888')
+        self.assertEqual(PrefixRAIndex(self.filepath).get('10.9999'), INVALID_RA)
+        registry = PrefixRegistry('doi:' + prefix for prefix in index.known_prefixes())
+        self.assertFalse(registry.is_known('doi:10.9999/c'))
+        self.assertTrue(registry.is_known('doi:10.5281/b'))
+
+    def test_publisher_extractor(self):
+        index = PrefixRAIndex()
+        extractor = ExtractPublisherDOI({}, index)
+        self.assertEqual(index.get('10.5281'), 'datacite')
+        with patch('oc_ds_converter.oc_idmanager.prefix_ra_index.call_api', side_effect=fake_ra_api) as call_api:
+            self.assertEqual(extractor.get_registration_agency('10.1007'), 'crossref')
+            self.assertEqual(extractor.get_registration_agency('10.1007'), 'crossref')
+            self.assertEqual(extractor.get_registration_agency('10.9999'), '')
+            self.assertEqual(call_api.call_count, 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1558,8 +1558,8 @@ class TestOpenaireProcessing(unittest.TestCase):
         ra = ["orcid:0000-0003-0530-4305"]
         op = OpenaireProcessing(storage_manager=RedisStorageManager(testing=True))
         op.update_redis_values(br,ra)
-        self.assertEqual(op._redis_values_br, br)
-        self.assertEqual(op._redis_values_ra, ra)
+        self.assertEqual(op.prefetch_index.br, set(br))
+        self.assertEqual(op.prefetch_index.ra, set(ra))
 
 
     #### REAL REDIS TESTS (SKIPPED IF REDIS IS NOT CONNECTED // REDIS DB 14 IS NOT EMPTY)
@@ -1610,8 +1610,8 @@ class TestOpenaireProcessing(unittest.TestCase):
         ra = ["orcid:0000-0003-0530-4305"]
         op = OpenaireProcessing(storage_manager=RedisStorageManager(testing=False))
         op.update_redis_values(br,ra)
-        self.assertEqual(op._redis_values_br, br)
-        self.assertEqual(op._redis_values_ra, ra)
+        self.assertEqual(op.prefetch_index.br, set(br))
+        self.assertEqual(op.prefetch_index.ra, set(ra))
 
     def test_update_redis_values_real_redis(self):
         self.real_redis_test_case(self.update_redis_values_real_redis)
@@ -0,0 +1,95 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+# Copyright (c) 2026 The OpenCitations Index Authors.
+#
+# Permission to use, copy, modify, and/or distribute this software for any purpose
+# with or without fee is hereby granted, provided that the above copyright notice
+# and this permission notice appear in all copies.
+#
+# THE SOFTWARE IS PROVIDED "AS IS" AND THE AUTHOR DISCLAIMS ALL WARRANTIES WITH
+# REGARD TO THIS SOFTWARE INCLUDING ALL IMPLIED WARRANTIES OF MERCHANTABILITY AND
+# FITNESS. IN NO EVENT SHALL THE AUTHOR BE LIABLE FOR ANY SPECIAL, DIRECT, INDIRECT,
+# OR CONSEQUENTIAL DAMAGES OR ANY DAMAGES WHATSOEVER RESULTING FROM LOSS OF USE,
+# DATA OR PROFITS, WHETHER IN AN ACTION OF CONTRACT, NEGLIGENCE OR OTHER TORTIOUS
+# ACTION, ARISING OUT OF OR IN CONNECTION WITH THE USE OR PERFORMANCE OF THIS
+# SOFTWARE.
+
+import gzip
+import os
+import shutil
+import unittest
+from unittest.mock import patch
+
+from oc_ds_converter.lib.doi_oracle import IDOracle
+from oc_ds_converter.lib.pubmed_crosswalk import (create_pubmed_crosswalk, get_pubmed_crosswalk, read_pmc_ids,
+                                                  read_pmid_lists)
+from oc_ds_converter.oc_idmanager.doi import DOIManager
+from oc_ds_converter.oc_idmanager.pmid import PMIDManager
+
+BASE = os.path.join('test', 'pubmed_crosswalk')
+
+
+class PubmedCrosswalkTest(unittest.TestCase):
+    def setUp(self):
+        os.makedirs(BASE, exist_ok=True)
+        self.pmc_ids = os.path.join(BASE, 'PMC-ids.csv.gz')
+        with gzip.open(self.pmc_ids, 'wt', encoding='utf-8') as f:
+            f.write('Journal Title,ISSN,eISSN,Year,Volume,Issue,Page,DOI,PMCID,PMID,Manuscript Id,Release Date\n'
+                    'Scientometrics,0138-9130,1588-2861,2022,127,,,10.1007/S11192-022-04367-W,PMC9186279,35702426,,live\n'
+                    'Breast Cancer Res,1465-5411,1465-542X,2000,1,1,1,,PMC13900,11250746,,live\n')
+        self.baseline = os.path.join(BASE, 'pubmed24n0001.xml.gz')
+        with gzip.open(self.baseline, 'wt', encoding='utf-8') as f:
+            f.write('<PubmedArticleSet>\n<PubmedArticle><MedlineCitation Status="MEDLINE">'
+                    '<PMID Version="1">1</PMID>\n</MedlineCitation></PubmedArticle>\n'
+                    '<PubmedArticle><MedlineCitation><PMID Version="1">2</PMID><PMID Version="1">35702426</PMID>'
+                    '</MedlineCitation></PubmedArticle>\n</PubmedArticleSet>\n')
+        self.pmid_list = os.path.join(BASE, 'pmids.txt')
+        with open(self.pmid_list, 'w', encoding='utf-8') as f:
+            f.write('33293597\n\nnot a pmid\n')
+
+    def tearDown(self):
+        shutil.rmtree(BASE, ignore_errors=True)
+
+    def test_create_pubmed_crosswalk(self):
+        self.assertEqual(list(read_pmc_ids([self.pmc_ids])),
+                         ['pmid:35702426', 'pmcid:PMC9186279', 'doi:10.1007/s11192-022-04367-w',
+                          'pmid:11250746', 'pmcid:PMC13900'])
+        self.assertEqual(list(read_pmid_lists([self.baseline, self.pmid_list])),
+                         ['pmid:1', 'pmid:2', 'pmid:35702426', 'pmid:33293597'])
+        filepath = os.path.join(BASE, 'pubmed.snapshot')
+        self.assertEqual(create_pubmed_crosswalk([self.pmc_ids], [self.baseline, self.pmid_list], filepath,
+                                                 chunk_size=3), 8)
+        config_filepath = os.path.join(BASE, 'config.ini')
+        with open(config_filepath, 'w', encoding='utf-8') as f:
+            f.write(f'[pubmed_crosswalk]\nfilepath={filepath}\n')
+        crosswalk = get_pubmed_crosswalk(config_filepath)
+        self.assertIn('pmcid:PMC13900', crosswalk)
+        self.assertIn('pmid:33293597', crosswalk)
+        self.assertNotIn('pmid:3', crosswalk)
+        crosswalk.close()
+        open(config_filepath, 'w').close()
+        self.assertIsNone(get_pubmed_crosswalk(config_filepath))
+
+    def test_managers(self):
+        filepath = os.path.join(BASE, 'pubmed.snapshot')
+        create_pubmed_crosswalk([self.pmc_ids], [self.baseline], filepath)
+        crosswalk = IDOracle([filepath])
+        pmid_manager = PMIDManager(oracle=crosswalk)
+        doi_manager = DOIManager(oracle=crosswalk)
+        with patch.object(pmid_manager, 'exists', return_value=False) as pmid_exists, \
+                patch.object(doi_manager, 'exists', return_value=False) as doi_exists:
+            self.assertTrue(pmid_manager.is_valid('11250746'))
+            self.assertEqual(pmid_manager.is_valid('pmid:2', get_extra_info=True),
+                             (True, {'id': 'pmid:2', 'valid': True}))
+            self.assertFalse(pmid_manager.is_valid('pmid:3'))
+            self.assertTrue(doi_manager.is_valid('https://doi.org/10.1007/S11192-022-04367-W'))
+            self.assertFalse(doi_manager.is_valid('10.1007/not-in-pubmed'))
+            pmid_exists.assert_called_once_with('pmid:3')
+            doi_exists.assert_called_once_with('doi:10.1007/not-in-pubmed')
+        self.assertTrue(pmid_manager.storage_manager.get_value('pmid:11250746'))
+        self.assertTrue(doi_manager.storage_manager.get_value('doi:10.1007/s11192-022-04367-w'))
+        crosswalk.close()
+
+
+if __name__ == '__main__':
+    unittest.main()
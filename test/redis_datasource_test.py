@@ -0,0 +1,56 @@
+import os
+import shutil
+import unittest
+
+import fakeredis
+import redis
+
+from oc_ds_converter.datasource.redis import RedisDataSource, get_connection_pool
+
+BASE = os.path.join('test', 'redis_datasource')
+
+
+class TestRedisDataSource(unittest.TestCase):
+    def setUp(self):
+        os.makedirs(BASE, exist_ok=True)
+        self.config = os.path.join(BASE, 'config.ini')
+
+    def tearDown(self):
+        shutil.rmtree(BASE, ignore_errors=True)
+
+    def write_config(self, redis_section):
+        with open(self.config, 'w', encoding='utf-8') as f:
+            f.write('[redis]\n' + redis_section + '\n[database 0]\ndb=11\n[database 1]\ndb=10\n[database 2]\ndb=13\n')
+
+    def test_config(self):
+        self.write_config('host=10.0.0.5\nport=6380\nbatch_size=2\n')
+        br = RedisDataSource('DB-META-BR', self.config)
+        self.assertEqual(br.batch_size, 2)
+        kwargs = br._r.connection_pool.connection_kwargs
+        self.assertEqual((kwargs['host'], kwargs['port'], kwargs['db']), ('10.0.0.5', 6380, 10))
+        # the data sources of the same database share the same pool
+        self.assertIs(RedisDataSource('DB-META-BR', self.config)._r.connection_pool, br._r.connection_pool)
+        self.assertIsNot(RedisDataSource('DB-META-RA', self.config)._r.connection_pool, br._r.connection_pool)
+        self.assertRaises(ValueError, RedisDataSource, 'DB-UNKNOWN', self.config)
+
+    def test_unix_socket(self):
+        self.write_config('unix_socket_path=/tmp/redis.sock\n')
+        process = RedisDataSource('PROCESS-DB', self.config)
+        pool = process._r.connection_pool
+        self.assertIs(pool.connection_class, redis.UnixDomainSocketConnection)
+        self.assertEqual((pool.connection_kwargs['path'], pool.connection_kwargs['db']), ('/tmp/redis.sock', 13))
+        self.assertIs(get_connection_pool(db=13, unix_socket_path='/tmp/redis.sock'), pool)
+
+    def test_batches(self):
+        self.write_config('batch_size=2\n')
+        br = RedisDataSource('DB-META-BR', self.config)
+        br._r = fakeredis.FakeRedis(decode_responses=True)
+        self.assertTrue(br.mset({f'doi:10.1/{i}': i for i in range(5)}))
+        ids = [f'doi:10.1/{i}' for i in range(6)]
+        self.assertEqual(br.mget(ids), ['0', '1', '2', '3', '4', None])
+        self.assertEqual(br.mget(ids[:1]), ['0'])
+        self.assertEqual(br.mget([]), [])
+
+
+if __name__ == '__main__':
+    unittest.main()
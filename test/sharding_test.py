@@ -0,0 +1,96 @@
+import os
+import shutil
+import unittest
+
+from oc_ds_converter.lib.sharding import Shard, get_shard_key, load_progress, parse_shard, verify_progress
+from oc_ds_converter.oc_idmanager.oc_data_storage.sqlite_manager import SqliteStorageManager
+from oc_ds_converter.run.shard_coordinator import coordinate
+
+BASE = os.path.join('test', 'sharding')
+
+
+class TestSharding(unittest.TestCase):
+    def setUp(self):
+        self.input_dir = os.path.join(BASE, 'input')
+        self.progress_dir = os.path.join(BASE, 'progress')
+        self.files = [os.path.join(self.input_dir, f'part_{i}.json.gz') for i in range(20)]
+
+    def tearDown(self):
+        shutil.rmtree(BASE, ignore_errors=True)
+
+    def test_parse_shard(self):
+        self.assertEqual(parse_shard('1/4'), (1, 4))
+        self.assertEqual(parse_shard(None), (0, 1))
+        self.assertRaises(ValueError, parse_shard, '4/4')
+        self.assertRaises(ValueError, parse_shard, '1-4')
+
+    def test_partition(self):
+        selected = [Shard(f'{i}/3', base_dir=self.input_dir).select(self.files) for i in range(3)]
+        self.assertCountEqual([f for s in selected for f in s], self.files)
+        self.assertEqual(selected[1], Shard('1/3', base_dir=self.input_dir).select(self.files))
+        # the assignment does not depend on where the input directory is mounted
+        moved = [os.path.join('elsewhere', os.path.basename(f)) for f in self.files]
+        self.assertEqual([os.path.basename(f) for f in Shard('1/3', base_dir='elsewhere').select(moved)],
+                         [os.path.basename(f) for f in selected[1]])
+        self.assertEqual(get_shard_key(self.files[0], self.input_dir), 'part_0.json.gz')
+        self.assertEqual(Shard().select(self.files), self.files)
+
+    def test_paths(self):
+        shard = Shard('0/2')
+        self.assertEqual(shard.output_dir('out'), os.path.join('out', 'shard_0_of_2'))
+        self.assertEqual(shard.local_path(os.path.join('st', 'any_db.db')), os.path.join('st', 'any_db_shard_0_of_2.db'))
+        self.assertEqual(Shard().local_path('any_db.db'), 'any_db.db')
+
+    def test_progress_and_verify(self):
+        expected = [os.path.basename(f) for f in self.files]
+        for i in range(2):
+            shard = Shard(f'{i}/2', self.progress_dir, self.input_dir)
+            selected = shard.select(self.files)
+            # the second shard stops before its last input
+            shard.mark_done(selected[:-1] if i == 1 else selected)
+        merged = verify_progress(load_progress(self.progress_dir), expected)
+        self.assertFalse(merged['complete'])
+        self.assertEqual(list(merged['pending']), ['shard_1_of_2'])
+        self.assertEqual(len(merged['pending']['shard_1_of_2']), 1)
+
+        # a re-run of the shard resumes where the previous one stopped
+        shard = Shard('1/2', self.progress_dir, self.input_dir)
+        selected = shard.select(self.files)
+        self.assertEqual(len(selected), 1)
+        shard.mark_done(selected)
+        merged = verify_progress(load_progress(self.progress_dir), expected)
+        self.assertTrue(merged['complete'])
+        self.assertEqual(merged['done'], 20)
+
+        os.remove(os.path.join(self.progress_dir, 'shard_0_of_2.json'))
+        merged = verify_progress(load_progress(self.progress_dir), expected)
+        self.assertEqual(merged['missing_shards'], [0])
+        self.assertFalse(merged['complete'])
+
+    def test_apply(self):
+        csv_dir = os.path.join(BASE, 'out')
+        shard = Shard('1/2', base_dir=self.input_dir)
+        self.assertEqual(shard.apply(csv_dir, 'cache.json', 'any_db.db', False),
+                         (os.path.join(csv_dir, 'shard_1_of_2'), 'cache_shard_1_of_2.json', 'any_db_shard_1_of_2.db'))
+        self.assertEqual(shard.apply(csv_dir, None, 'any_db.db', True)[2], 'any_db.db')
+        self.assertEqual(shard.progress_dir, csv_dir + '_progress')
+        self.assertEqual(Shard().apply(csv_dir, 'cache.json', 'any_db.db', False), (csv_dir, 'cache.json', 'any_db.db'))
+
+    def test_coordinate_merges_storages(self):
+        storage_path = os.path.join(BASE, 'storage', 'any_db.db')
+        values = [[('doi:10.1/a', True), ('doi:10.1/b', False)], [('doi:10.1/b', True), ('doi:10.1/c', False)]]
+        for i in range(2):
+            shard = Shard(f'{i}/2', self.progress_dir, self.input_dir)
+            shard.mark_done(shard.select(self.files))
+            SqliteStorageManager(shard.local_path(storage_path)).set_multi_value(values[i])
+        merged = coordinate(self.progress_dir, storage_path=storage_path)
+        self.assertTrue(merged['complete'])
+        self.assertEqual(merged['merged_ids'], 3)
+        storage_manager = SqliteStorageManager(storage_path)
+        self.assertEqual([storage_manager.get_value(id) for id in ('doi:10.1/a', 'doi:10.1/b', 'doi:10.1/c')],
+                         [True, True, False])
+        self.assertTrue(os.path.exists(os.path.join(self.progress_dir, 'merged_progress.json')))
+
+
+if __name__ == '__main__':
+    unittest.main()
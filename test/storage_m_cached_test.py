@@ -0,0 +1,69 @@
+import os
+import shutil
+import unittest
+
+from oc_ds_converter.lib.pipeline import get_storage_cache_size, get_storage_manager
+from oc_ds_converter.oc_idmanager.oc_data_storage.cached_manager import CachedStorageManager
+from oc_ds_converter.oc_idmanager.oc_data_storage.in_memory_manager import InMemoryStorageManager
+from oc_ds_converter.oc_idmanager.oc_data_storage.sqlite_manager import SqliteStorageManager
+
+BASE = os.path.join('test', 'storage_m_cached')
+
+
+class CountingStorageManager(InMemoryStorageManager):
+    def __init__(self, json_file_path):
+        super().__init__(json_file_path)
+        self.reads = 0
+
+    def get_value(self, id):
+        self.reads += 1
+        return super().get_value(id)
+
+
+class TestCachedStorageManager(unittest.TestCase):
+    def tearDown(self):
+        shutil.rmtree(BASE, ignore_errors=True)
+
+    def test_read_through(self):
+        backend = CountingStorageManager(os.path.join(BASE, 'id_valid.json'))
+        backend.set_value('orcid:0000-0002-6227-4053', True)
+        storage = CachedStorageManager(backend, max_size=2)
+        for _ in range(3):
+            self.assertTrue(storage.get_value('orcid:0000-0002-6227-4053'))
+            self.assertIsNone(storage.get_value('issn:0000-0000'))
+        self.assertEqual(backend.reads, 2)
+        self.assertEqual(storage.stats(), {'size': 2, 'hits': 4, 'misses': 2})
+        # the least recently used id is evicted
+        storage.get_value('orcid:0000-0002-6227-4053')
+        storage.get_value('doi:10.1/a')
+        self.assertEqual(list(storage.cache), ['orcid:0000-0002-6227-4053', 'doi:10.1/a'])
+
+    def test_write_through(self):
+        backend = SqliteStorageManager(os.path.join(BASE, 'id_valid.db'))
+        storage = CachedStorageManager(backend, max_size=10)
+        self.assertIsNone(storage.get_value('doi:10.1/a'))
+        storage.set_multi_value([('doi:10.1/a', True), ('doi:10.1/b', False)])
+        storage.set_value('doi:10.1/c', True)
+        self.assertEqual((storage.get_value('doi:10.1/a'), storage.get_value('doi:10.1/b')), (True, False))
+        self.assertEqual(storage.stats()['misses'], 1)
+        self.assertEqual(backend.get_value('doi:10.1/c'), True)
+        self.assertCountEqual(storage.get_all_keys(), ['doi:10.1/a', 'doi:10.1/b', 'doi:10.1/c'])
+        self.assertRaises(ValueError, storage.set_value, 'doi:10.1/d', 1)
+        storage.delete_storage()
+        self.assertEqual(storage.cache, {})
+
+    def test_configuration(self):
+        config = os.path.join(BASE, 'config.ini')
+        os.makedirs(BASE, exist_ok=True)
+        with open(config, 'w', encoding='utf-8') as f:
+            f.write('[storage]\ncache_size=500\n')
+        self.assertEqual(get_storage_cache_size(config), 500)
+        storage = get_storage_manager(os.path.join(BASE, 'id_valid.db'), False, testing=True, cache_size=500)
+        self.assertIsInstance(storage, CachedStorageManager)
+        self.assertIsInstance(storage.backend, SqliteStorageManager)
+        self.assertIsInstance(get_storage_manager(os.path.join(BASE, 'id_valid.db'), False, testing=True),
+                              SqliteStorageManager)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,77 @@
+import os
+import shutil
+import unittest
+
+from oc_ds_converter.lib.pipeline import get_storage_manager
+from oc_ds_converter.oc_idmanager.oc_data_storage.compact_manager import CompactStorageManager
+
+BASE = os.path.join('test', 'storage_m_compact')
+
+
+class TestCompactStorageManager(unittest.TestCase):
+    def setUp(self):
+        self.storage_filepath = os.path.join(BASE, 'id_valid.bin')
+
+    def tearDown(self):
+        shutil.rmtree(BASE, ignore_errors=True)
+
+    def test_values(self):
+        storage = get_storage_manager(self.storage_filepath, False, testing=True)
+        self.assertIsInstance(storage, CompactStorageManager)
+        storage.set_value('doi:10.1/a', True)
+        storage.set_multi_value([('doi:10.1/b', False), ('doi:10.1/c', True)])
+        storage.set_value('doi:10.1/c', False)
+        storage.set_full_value('doi:10.1/a', {'valid': False})
+        storage.set_full_value('doi:10.1/d', {'valid': True})
+        self.assertEqual(storage.get_validity_dict(),
+                         {'doi:10.1/a': True, 'doi:10.1/b': False, 'doi:10.1/c': False, 'doi:10.1/d': True})
+        self.assertIsNone(storage.get_value('doi:10.1/e'))
+        self.assertRaises(ValueError, storage.set_value, 'doi:10.1/e', 1)
+        self.assertEqual(storage.get_all_keys(), {'doi:10.1/a', 'doi:10.1/b', 'doi:10.1/c', 'doi:10.1/d'})
+        storage.delete_storage()
+        self.assertEqual(sorted(os.listdir(BASE)), ['id_valid.bin.journal.0', 'id_valid.bin.lock'])
+        self.assertEqual(storage.get_all_keys(), set())
+
+    def test_journal_and_snapshot(self):
+        storage = CompactStorageManager(self.storage_filepath)
+        storage.set_multi_value([(f'doi:10.1/{i}', i % 2 == 0) for i in range(100)])
+        # the changes are in the journal only: a new instance replays it
+        self.assertFalse(os.path.exists(self.storage_filepath))
+        self.assertEqual(CompactStorageManager(self.storage_filepath).get_validity_dict(), storage.get_validity_dict())
+        storage.store_file()
+        storage.set_value('doi:10.1/0', False)
+        # the snapshot holds the first changes, the new journal the last one
+        self.assertEqual(sorted(os.listdir(BASE)), ['id_valid.bin', 'id_valid.bin.journal.1', 'id_valid.bin.lock'])
+        reloaded = CompactStorageManager(self.storage_filepath)
+        self.assertFalse(reloaded.get_value('doi:10.1/0'))
+        self.assertTrue(reloaded.get_value('doi:10.1/2'))
+        self.assertEqual(len(reloaded.get_all_keys()), 100)
+
+    def test_background_compaction(self):
+        storage = CompactStorageManager(self.storage_filepath, compaction_threshold=10)
+        for i in range(25):
+            storage.set_value(f'doi:10.1/{i}', True)
+        storage.compact(wait=True)
+        self.assertEqual(len(CompactStorageManager(self.storage_filepath).get_all_keys()), 25)
+        self.assertEqual([f for f in os.listdir(BASE) if 'journal' in f], [f'id_valid.bin.journal.{storage.generation}'])
+
+    def test_shared_storage(self):
+        # two processes share the storage: a compaction includes the journal of the other one
+        first = CompactStorageManager(self.storage_filepath)
+        second = CompactStorageManager(self.storage_filepath)
+        first.set_value('doi:10.1/a', True)
+        second.set_value('doi:10.1/b', False)
+        first.store_file()
+        second.set_value('doi:10.1/c', True)
+        first.set_value('doi:10.1/d', True)
+        self.assertEqual(second.generation, first.generation)
+        second.store_file()
+        first.set_value('doi:10.1/e', False)
+        self.assertEqual(CompactStorageManager(self.storage_filepath).get_validity_dict(),
+                         {'doi:10.1/a': True, 'doi:10.1/b': False, 'doi:10.1/c': True, 'doi:10.1/d': True,
+                          'doi:10.1/e': False})
+        self.assertEqual([f for f in os.listdir(BASE) if 'journal' in f], [f'id_valid.bin.journal.{second.generation}'])
+
+
+if __name__ == '__main__':
+    unittest.main()
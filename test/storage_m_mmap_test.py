@@ -0,0 +1,75 @@
+import os
+import shutil
+import unittest
+from concurrent.futures import ProcessPoolExecutor
+
+from oc_ds_converter.lib.pipeline import get_storage_manager
+from oc_ds_converter.oc_idmanager.oc_data_storage.mmap_manager import MmapStorageManager
+
+BASE = os.path.join('test', 'storage_m_mmap')
+STORAGE = os.path.join(BASE, 'id_valid.mmap')
+
+
+def read_values(ids):
+    storage = MmapStorageManager(STORAGE)
+    return [storage.get_value(id) for id in ids]
+
+
+class BrokenTransaction(Exception):
+    pass
+
+
+class TestMmapStorageManager(unittest.TestCase):
+    def tearDown(self):
+        shutil.rmtree(BASE, ignore_errors=True)
+
+    def test_values(self):
+        storage = get_storage_manager(STORAGE, False, testing=True)
+        self.assertIsInstance(storage, MmapStorageManager)
+        storage.set_value('doi:10.1/a', True)
+        storage.set_multi_value([('doi:10.1/b', False), ('doi:10.1/c', True), ('doi:10.1/c', False)])
+        storage.set_full_value('doi:10.1/a', {'valid': False})
+        storage.set_full_value('doi:10.1/d', {'valid': True})
+        expected = {'doi:10.1/a': True, 'doi:10.1/b': False, 'doi:10.1/c': False, 'doi:10.1/d': True}
+        self.assertEqual(storage.get_validity_dict(), expected)
+        self.assertIsNone(storage.get_value('doi:10.1/e'))
+        self.assertRaises(ValueError, storage.set_value, 'doi:10.1/e', 1)
+        self.assertEqual(MmapStorageManager(STORAGE).get_validity_dict(), expected)
+        storage.delete_storage()
+        self.assertFalse(os.path.exists(STORAGE))
+
+    def test_growth_and_readers(self):
+        writer = MmapStorageManager(STORAGE, sync=False)
+        reader = MmapStorageManager(STORAGE)
+        values = [(f'doi:10.1/{i}', i % 3 != 0) for i in range(5000)]
+        writer.set_multi_value(values[:100])
+        self.assertTrue(reader.get_value('doi:10.1/1'))
+        # the table is replaced by bigger ones: the reader follows
+        for start in range(100, 5000, 700):
+            writer.set_multi_value(values[start:start + 700])
+        self.assertGreater(writer.slots, 5000)
+        self.assertEqual(reader.get_validity_dict(), dict(values))
+        with ProcessPoolExecutor(2) as executor:
+            results = list(executor.map(read_values, [[id for id, _ in values[:2500]], [id for id, _ in values[2500:]]]))
+        self.assertEqual(results[0] + results[1], [value for _, value in values])
+
+    def test_broken_transaction(self):
+        storage = MmapStorageManager(STORAGE)
+        storage.set_multi_value([('doi:10.1/a', True), ('doi:10.1/b', False)])
+        broken = MmapStorageManager(STORAGE)
+
+        def crash(table, meta):
+            raise BrokenTransaction
+        broken._pack_meta = crash
+        with self.assertRaises(BrokenTransaction):
+            broken.set_multi_value([('doi:10.1/a', False), ('doi:10.1/c', True)])
+        # the records and the slots were written, but the transaction was not committed
+        reader = MmapStorageManager(STORAGE)
+        self.assertEqual(reader.get_validity_dict(), {'doi:10.1/a': True, 'doi:10.1/b': False})
+        self.assertIsNone(reader.get_value('doi:10.1/c'))
+        storage.set_multi_value([('doi:10.1/b', True), ('doi:10.1/c', False)])
+        self.assertEqual(reader.get_validity_dict(), {'doi:10.1/a': True, 'doi:10.1/b': True, 'doi:10.1/c': False})
+
+
+if __name__ == '__main__':
+    unittest.main()
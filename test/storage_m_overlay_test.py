@@ -0,0 +1,77 @@
+import os
+import shutil
+import unittest
+
+from oc_ds_converter.oc_idmanager.oc_data_storage.in_memory_manager import InMemoryStorageManager
+from oc_ds_converter.oc_idmanager.oc_data_storage.overlay_manager import OverlayStorageManager
+from oc_ds_converter.oc_idmanager.oc_data_storage.redis_manager import RedisStorageManager
+from oc_ds_converter.oc_idmanager.oc_data_storage.sqlite_manager import SqliteStorageManager
+
+BASE = os.path.join('test', 'storage_m_overlay')
+
+
+class CountingStorageManager(InMemoryStorageManager):
+    def __init__(self, json_file_path):
+        super().__init__(json_file_path)
+        self.bulk_writes = 0
+
+    def set_multi_value(self, list_of_tuples):
+        self.bulk_writes += 1
+        super().set_multi_value(list_of_tuples)
+
+
+class TestOverlayStorageManager(unittest.TestCase):
+    def tearDown(self):
+        shutil.rmtree(BASE, ignore_errors=True)
+
+    def test_overlay_first(self):
+        backend = RedisStorageManager(testing=True)
+        backend.set_value("doi:10.1/a", True)
+        overlay = OverlayStorageManager(backend)
+        overlay.set_value("doi:10.1/a", False)
+        overlay.set_value("doi:10.1/b", True)
+        self.assertFalse(overlay.get_value("doi:10.1/a"))
+        self.assertTrue(overlay.get_value("doi:10.1/b"))
+        self.assertIsNone(overlay.get_value("doi:10.1/c"))
+        # the backend is not modified until the commit
+        self.assertTrue(backend.get_value("doi:10.1/a"))
+        self.assertIsNone(backend.get_value("doi:10.1/b"))
+        self.assertCountEqual(overlay.get_all_keys(), {"doi:10.1/a", "doi:10.1/b"})
+        backend.delete_storage()
+
+    def test_commit(self):
+        backend = CountingStorageManager(os.path.join(BASE, 'storage.json'))
+        files = os.listdir(BASE)
+        overlay = OverlayStorageManager(backend)
+        overlay.set_value("doi:10.1/a", True)
+        overlay.set_multi_value([("doi:10.1/b", False), ("orcid:0000-0002-1825-0097", True)])
+        overlay.set_full_value("doi:10.1/c", {"valid": True, "extra": "info"})
+        self.assertEqual(overlay.get_validity_list_of_tuples(), [
+            ("doi:10.1/a", True), ("doi:10.1/b", False), ("orcid:0000-0002-1825-0097", True), ("doi:10.1/c", True)])
+        overlay.commit()
+        self.assertEqual(backend.bulk_writes, 1)
+        self.assertEqual(backend.get_validity_dict(), {
+            "doi:10.1/a": True, "doi:10.1/b": False, "orcid:0000-0002-1825-0097": True, "doi:10.1/c": True})
+        self.assertEqual(overlay.get_validity_list_of_tuples(), [])
+        self.assertFalse(overlay.get_value("doi:10.1/b"))
+        # an empty overlay does not write to the backend
+        overlay.commit()
+        self.assertEqual(backend.bulk_writes, 1)
+        # nothing is saved on the filesystem by the overlay
+        self.assertEqual(os.listdir(BASE), files)
+
+    def test_rollback(self):
+        backend = SqliteStorageManager(os.path.join(BASE, 'storage.db'))
+        overlay = OverlayStorageManager(backend)
+        overlay.set_value("doi:10.1/a", True)
+        overlay.rollback()
+        self.assertIsNone(overlay.get_value("doi:10.1/a"))
+        overlay.set_value("doi:10.1/b", True)
+        overlay.delete_storage()
+        overlay.commit()
+        self.assertEqual(backend.get_all_keys(), [])
+        self.assertRaises(ValueError, overlay.set_value, "doi:10.1/c", 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,72 @@
+import os
+import shutil
+import unittest
+
+from oc_ds_converter.lib.pipeline import get_storage_manager
+from oc_ds_converter.oc_idmanager.oc_data_storage.in_memory_manager import InMemoryStorageManager
+from oc_ds_converter.oc_idmanager.oc_data_storage.redis_manager import RedisStorageManager
+from oc_ds_converter.oc_idmanager.oc_data_storage.sharded_manager import (ShardedStorageManager,
+                                                                          create_sharded_storage, reshard)
+from oc_ds_converter.oc_idmanager.oc_data_storage.sqlite_manager import SqliteStorageManager
+from oc_ds_converter.run.reshard_storage import reshard_storage
+
+BASE = os.path.join('test', 'storage_m_sharded')
+
+
+class CountingStorageManager(InMemoryStorageManager):
+    def __init__(self, json_file_path):
+        super().__init__(json_file_path)
+        self.bulk_writes = 0
+
+    def set_multi_value(self, list_of_tuples):
+        self.bulk_writes += 1
+        super().set_multi_value(list_of_tuples)
+
+
+class TestShardedStorageManager(unittest.TestCase):
+    def tearDown(self):
+        shutil.rmtree(BASE, ignore_errors=True)
+
+    def test_routing(self):
+        shards = [CountingStorageManager(os.path.join(BASE, f'{i}.json')) for i in range(3)]
+        storage = ShardedStorageManager(shards)
+        values = [(f'doi:10.1/{i}', i % 2 == 0) for i in range(30)]
+        storage.set_multi_value(values)
+        # a single bulk write for each shard, and each ID in one shard only
+        self.assertEqual([shard.bulk_writes for shard in shards], [1, 1, 1])
+        self.assertEqual(sum(len(shard.get_all_keys()) for shard in shards), 30)
+        for id, value in values:
+            self.assertEqual(storage.get_value(id), value)
+            self.assertIs(storage.get_shard(id), ShardedStorageManager(shards).get_shard(id))
+        storage.set_value('doi:10.1/0', False)
+        self.assertFalse(storage.get_value('doi:10.1/0'))
+        self.assertIsNone(storage.get_value('doi:10.1/30'))
+        self.assertEqual(len(storage.get_all_keys()), 30)
+        self.assertRaises(ValueError, storage.set_value, 'doi:10.1/31', 1)
+
+    def test_redis_shards(self):
+        shards = [RedisStorageManager(testing=True) for _ in range(2)]
+        storage = ShardedStorageManager(shards)
+        storage.set_multi_value([('doi:10.1/a', True), ('doi:10.1/b', False)])
+        self.assertCountEqual(storage.get_validity_list_of_tuples(), [('doi:10.1/a', True), ('doi:10.1/b', False)])
+        storage.delete_storage()
+
+    def test_reshard(self):
+        source = SqliteStorageManager(os.path.join(BASE, 'id_valid_dict.db'))
+        source.set_multi_value([(f'doi:10.1/{i}', i % 3 != 0) for i in range(50)])
+        self.assertEqual(reshard_storage(os.path.join(BASE, 'id_valid_dict.db'), os.path.join(BASE, 'two'), 2), 50)
+        two = get_storage_manager(os.path.join(BASE, 'two'), False, testing=True)
+        self.assertIsInstance(two, ShardedStorageManager)
+        self.assertEqual(len(two.shards), 2)
+        four = create_sharded_storage(os.path.join(BASE, 'four'), 4, 'json')
+        self.assertEqual(reshard(two, four, batch_size=7), 50)
+        four = get_storage_manager(os.path.join(BASE, 'four'), False, testing=True)
+        self.assertEqual(four.get_validity_dict(), dict(source.get_validity_list_of_tuples()))
+        self.assertRaises(ValueError, create_sharded_storage, os.path.join(BASE, 'four'), 4)
+        four.delete_storage()
+        self.assertNotIsInstance(get_storage_manager(os.path.join(BASE, 'four.db'), False, testing=True),
+                                 ShardedStorageManager)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,162 @@
+import csv
+import io
+import json
+import os
+import shutil
+import time
+import unittest
+from contextlib import redirect_stdout
+
+from pebble import ProcessPool
+
+from oc_ds_converter.lib.task_scheduler import (FailedTasksError, SizeAwareScheduler, check_failed_tasks, estimate_cost,
+                                                load_manifest)
+
+BASE = os.path.join('test', 'task_scheduler')
+
+
+def count_records(name, records):
+    return name, len(records)
+
+
+def fail_until(counter_path, failures):
+    with open(counter_path, 'a', encoding='utf-8') as f:
+        f.write('x')
+    with open(counter_path, 'r', encoding='utf-8') as f:
+        attempts = len(f.read())
+    if attempts <= failures:
+        raise ValueError(f'attempt {attempts}')
+    return attempts
+
+
+def sleep_for(seconds):
+    time.sleep(seconds)
+
+
+class TestSizeAwareScheduler(unittest.TestCase):
+    def setUp(self):
+        os.makedirs(BASE, exist_ok=True)
+        self.small = os.path.join(BASE, 'small.txt')
+        self.big = os.path.join(BASE, 'big.txt')
+        with open(self.small, 'w', encoding='utf-8') as f:
+            f.write('a')
+        with open(self.big, 'w', encoding='utf-8') as f:
+            f.write('a' * 100)
+
+    def tearDown(self):
+        shutil.rmtree(BASE, ignore_errors=True)
+
+    def test_estimate_cost(self):
+        self.assertEqual(estimate_cost(self.big), 100)
+        self.assertEqual(estimate_cost([1, 2, 3]), 3)
+        self.assertEqual(estimate_cost(os.path.join(BASE, 'missing.txt')), 0)
+        manifest_path = os.path.join(BASE, 'manifest.json')
+        with open(manifest_path, 'w', encoding='utf-8') as f:
+            json.dump({'small.txt': 1000}, f)
+        manifest = load_manifest(manifest_path)
+        self.assertEqual(estimate_cost(self.small, manifest), 1000)
+        self.assertEqual(estimate_cost(self.big, manifest, records_per_byte=0.5), 50)
+        self.assertEqual(load_manifest(None), dict())
+
+    def test_partial_manifest(self):
+        # the size of the input missing from the manifest is converted into records through the ratio of the others
+        scheduler = SizeAwareScheduler(manifest={'small.txt': 10})
+        scheduler.add(self.small, count_records, args=('small', [1]))
+        scheduler.add(self.big, count_records, args=('big', [1, 2]))
+        self.assertEqual(scheduler.get_records_per_byte(), 10)
+        self.assertEqual([(task.name, task.cost) for task in scheduler.ordered_tasks()],
+                         [(self.big, 1000), (self.small, 10)])
+
+    def test_largest_first(self):
+        scheduler = SizeAwareScheduler()
+        scheduler.add(self.small, count_records, args=('small', [1]))
+        scheduler.add(self.big, count_records, args=('big', [1, 2]))
+        results = scheduler.run()
+        self.assertEqual([task.name for task, _ in results], [self.big, self.small])
+        self.assertEqual([result for _, result in results], [('big', 2), ('small', 1)])
+        self.assertEqual(len(scheduler.report()), 2)
+
+    def test_split(self):
+        scheduler = SizeAwareScheduler(max_task_cost=2)
+        scheduler.add([1, 2, 3, 4, 5], count_records, args=('chunk_1', [1, 2, 3, 4, 5]), records_arg=1, name_arg=0)
+        results = scheduler.run()
+        self.assertEqual([result for _, result in results], [('chunk_1_part1', 2), ('chunk_1_part2', 2), ('chunk_1_part3', 1)])
+
+    def test_executor_and_report(self):
+        report_path = os.path.join(BASE, 'report.csv')
+        with ProcessPool(max_workers=2) as executor:
+            scheduler = SizeAwareScheduler(executor)
+            scheduler.add(self.small, count_records, args=('small', [1]))
+            scheduler.add(self.big, count_records, args=('big', [1, 2]))
+            futures = scheduler.run()
+        self.assertEqual([future.result()[0] for _, future in futures], [('big', 2), ('small', 1)])
+        scheduler.save_report(report_path)
+        with open(report_path, 'r', encoding='utf-8') as f:
+            rows = list(csv.DictReader(f))
+        self.assertEqual([row['task'] for row in rows], [self.big, self.small])
+        self.assertEqual([row['cost'] for row in rows], ['100', '1'])
+
+    def test_retries(self):
+        counter_path = os.path.join(BASE, 'counter.txt')
+        with ProcessPool(max_workers=1) as executor:
+            scheduler = SizeAwareScheduler(executor, max_retries=2, backoff=0.01)
+            scheduler.add(self.small, fail_until, args=(counter_path, 2))
+            scheduler.run()
+            results = scheduler.wait()
+        self.assertEqual([result for _, result in results], [3])
+        self.assertEqual(scheduler.dead_letter, [])
+        self.assertEqual(len(scheduler.report()), 1)
+
+    def test_on_source_done(self):
+        counter_path = os.path.join(BASE, 'counter.txt')
+        done = list()
+        with ProcessPool(max_workers=2) as executor:
+            scheduler = SizeAwareScheduler(executor, max_task_cost=2)
+            scheduler.add([1, 2, 3], count_records, args=('a', [1, 2, 3]), records_arg=1, name_arg=0, source='a.ndjson')
+            scheduler.add(self.small, fail_until, args=(counter_path, 1))
+            scheduler.run()
+            scheduler.wait(on_source_done=done.append)
+        self.assertEqual(done, ['a.ndjson'])
+        self.assertEqual(scheduler.failed_sources(), {self.small})
+
+    def test_retries_sequential(self):
+        counter_path = os.path.join(BASE, 'counter.txt')
+        scheduler = SizeAwareScheduler(max_retries=1, backoff=0.01)
+        scheduler.add(self.small, fail_until, args=(counter_path, 1))
+        self.assertEqual([result for _, result in scheduler.run()], [2])
+
+    def test_dead_letter(self):
+        counter_path = os.path.join(BASE, 'counter.txt')
+        dead_letter_path = os.path.join(BASE, 'dead_letter.csv')
+        with ProcessPool(max_workers=2) as executor:
+            scheduler = SizeAwareScheduler(executor, timeout=0.5, max_retries=1, backoff=0.01)
+            scheduler.add(self.big, sleep_for, args=(10,))
+            scheduler.add(self.small, fail_until, args=(counter_path, 5))
+            scheduler.run()
+            results = scheduler.wait()
+        self.assertEqual(results, [])
+        self.assertEqual(scheduler.report(), [])
+        scheduler.save_dead_letter(dead_letter_path)
+        with open(dead_letter_path, 'r', encoding='utf-8') as f:
+            rows = sorted(csv.DictReader(f), key=lambda row: row['task'])
+        self.assertEqual([(row['task'], row['attempts']) for row in rows], [(self.big, '2'), (self.small, '2')])
+        self.assertTrue(rows[0]['error'].startswith('TimeoutError'))
+        self.assertEqual(rows[1]['error'], 'ValueError: attempt 2')
+
+    def test_failed_tasks(self):
+        counter_path = os.path.join(BASE, 'counter.txt')
+        scheduler = SizeAwareScheduler(max_retries=0, timeout=0)
+        self.assertIsNone(scheduler.timeout)
+        scheduler.add(self.small, fail_until, args=(counter_path, 5))
+        scheduler.add(self.big, count_records, args=('big', [1]))
+        scheduler.run()
+        # without a dead-letter file, the warning lists the failed tasks
+        with redirect_stdout(io.StringIO()) as output:
+            scheduler.log_dead_letter('test_process')
+        self.assertEqual(output.getvalue().strip(), f'[WARNING: test_process] 1 tasks failed after 0 retries: {self.small}')
+        self.assertRaises(FailedTasksError, check_failed_tasks, 'test_process', scheduler.failed)
+        check_failed_tasks('test_process', [])
+
+
+if __name__ == '__main__':
+    unittest.main()
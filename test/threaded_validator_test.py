@@ -0,0 +1,140 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+# Copyright (c) 2026 The OpenCitations Index Authors.
+#
+# Permission to use, copy, modify, and/or distribute this software for any purpose
+# with or without fee is hereby granted, provided that the above copyright notice
+# and this permission notice appear in all copies.
+#
+# THE SOFTWARE IS PROVIDED "AS IS" AND THE AUTHOR DISCLAIMS ALL WARRANTIES WITH
+# REGARD TO THIS SOFTWARE INCLUDING ALL IMPLIED WARRANTIES OF MERCHANTABILITY AND
+# FITNESS. IN NO EVENT SHALL THE AUTHOR BE LIABLE FOR ANY SPECIAL, DIRECT, INDIRECT,
+# OR CONSEQUENTIAL DAMAGES OR ANY DAMAGES WHATSOEVER RESULTING FROM LOSS OF USE,
+# DATA OR PROFITS, WHETHER IN AN ACTION OF CONTRACT, NEGLIGENCE OR OTHER TORTIOUS
+# ACTION, ARISING OUT OF OR IN CONNECTION WITH THE USE OR PERFORMANCE OF THIS
+# SOFTWARE.
+
+import os
+import shutil
+import threading
+import time
+import unittest
+from collections import Counter
+from unittest.mock import patch
+
+from oc_ds_converter.crossref.crossref_processing import CrossrefProcessing
+from oc_ds_converter.lib.pipeline import PipelineEngine
+from oc_ds_converter.lib.threaded_validator import (ThreadedValidator, get_threaded_validation_config,
+                                                    get_threaded_validator, validate_ids)
+from oc_ds_converter.oc_idmanager.doi import DOIManager
+from oc_ds_converter.oc_idmanager.negative_cache import NOT_FOUND, NegativeCache
+from oc_ds_converter.oc_idmanager.oc_data_storage.in_memory_manager import InMemoryStorageManager
+from oc_ds_converter.pubmed.pubmed_processing import PubmedProcessing
+from oc_ds_converter.run.crossref_process import CrossrefAdapter
+
+BASE = os.path.join('test', 'threaded_validator')
+
+
+class StubValidator(object):
+    # the IDs ending with "x" do not exist, while the validation of those ending with "t" fails
+    def __init__(self):
+        self.batches = list()
+
+    def validate(self, ids):
+        ids = list(ids)
+        self.batches.append(ids)
+        return {id: None if id.endswith('t') else not id.endswith('x') for id in ids}
+
+
+class ThreadedValidatorTest(unittest.TestCase):
+    def tearDown(self):
+        shutil.rmtree(BASE, ignore_errors=True)
+
+    def test_host_limits(self):
+        lock = threading.Lock()
+        running, highest = Counter(), Counter()
+
+        def check_exists(id_manager, id):
+            host = id.split(':')[0]
+            with lock:
+                running[host] += 1
+                highest[host] = max(highest[host], running[host])
+            time.sleep(0.05)
+            with lock:
+                running[host] -= 1
+            return not id.endswith('x')
+
+        validator = ThreadedValidator(max_workers=8, host_limits={'doi.org': 2})
+        ids = [f'doi:10.1/{i}' for i in range(6)] + ['doi:10.1/x', 'orcid:0000-0003-0530-4305', 'isbn:9788808182159']
+        with patch('oc_ds_converter.lib.threaded_validator.check_exists', side_effect=check_exists):
+            results = validator.validate(ids + ['doi:10.1/0'])
+        validator.close()
+        self.assertEqual(list(results), ids)
+        self.assertEqual([results[id] for id in ids], [True] * 6 + [False, True, None])
+        # at most two concurrent requests are sent to doi.org, while the other hosts are not limited by it
+        self.assertEqual(highest['doi'], 2)
+        self.assertEqual(highest['orcid'], 1)
+
+    def test_validate_ids(self):
+        storage_manager = InMemoryStorageManager()
+        storage_manager.set_value('doi:10.1/stored', True)
+        doi_manager = DOIManager(storage_manager=storage_manager)
+        doi_manager.negative_cache = NegativeCache()
+        validator = StubValidator()
+        validated = validate_ids(validator, doi_manager, ['doi:10.1/a', 'doi:10.1/x', 'doi:10.1/t', 'doi:10.1/stored',
+                                                          'doi:10.1/a', None])
+        # the IDs already known are not validated, while those whose validation failed are not saved
+        self.assertEqual(validator.batches, [['doi:10.1/a', 'doi:10.1/x', 'doi:10.1/t']])
+        self.assertEqual(validated, {'doi:10.1/a': True, 'doi:10.1/x': False})
+        self.assertEqual((storage_manager.get_value('doi:10.1/a'), storage_manager.get_value('doi:10.1/x')), (True, False))
+        self.assertIsNone(storage_manager.get_value('doi:10.1/t'))
+        self.assertEqual(doi_manager.negative_cache.get('doi:10.1/x'), NOT_FOUND)
+        self.assertEqual(validate_ids(validator, doi_manager, ['doi:10.1/a', 'doi:10.1/x']), {})
+        doi_manager.negative_cache.close()
+
+    def test_crossref_orcids(self):
+        validator = StubValidator()
+        adapter = CrossrefAdapter(testing=True)
+        engine = PipelineEngine(adapter, os.path.join(BASE, 'csv'), os.path.join(BASE, 'citations'),
+                                os.path.join(BASE, 'storage.json'), validator=validator)
+        processing = adapter.get_processing(engine.storage_manager, citing=True)
+        records = [{'DOI': '10.1/a', 'author': [{'family': 'Doe', 'ORCID': 'http://orcid.org/0000-0003-0530-4305'},
+                                                {'family': 'Roe', 'ORCID': ['0000-0002-8420-0696']}]},
+                   {'DOI': '10.1/b', 'editor': [{'family': 'Poe'}]}]
+        engine.validate_agent_ids(processing, records)
+        self.assertEqual(validator.batches, [['orcid:0000-0003-0530-4305', 'orcid:0000-0002-8420-0696']])
+        # the ORCIDs validated at once are not validated again while producing the rows
+        with patch.object(processing.tmp_orcid_m, 'exists') as api:
+            self.assertEqual(processing.find_crossref_orcid('0000-0003-0530-4305'), 'orcid:0000-0003-0530-4305')
+            api.assert_not_called()
+        engine.storage_manager.delete_storage()
+
+    def test_pubmed_dois(self):
+        validator = StubValidator()
+        processing = PubmedProcessing(testing=True)
+        processing.doi_m.negative_cache = None
+        # the DOIs in META are not validated
+        processing.BR_redis.set('doi:10.1007/def', 1)
+        processing.validate_dois([{'pmid': '1', 'doi': '10.1007/ABC'}, {'pmid': '2', 'doi': '10.1007/def'},
+                                  {'pmid': '3', 'doi': ''}], validator)
+        self.assertEqual(validator.batches, [['doi:10.1007/abc']])
+        with patch.object(processing.doi_m, 'exists') as api:
+            self.assertTrue(processing.doi_m.is_valid('10.1007/ABC'))
+            api.assert_not_called()
+
+    def test_config(self):
+        os.makedirs(BASE, exist_ok=True)
+        config_filepath = os.path.join(BASE, 'config.ini')
+        with open(config_filepath, 'w', encoding='utf-8') as f:
+            f.write('[threaded_validation]\nworkers=0\n')
+        self.assertIsNone(get_threaded_validator(config_filepath))
+        with open(config_filepath, 'w', encoding='utf-8') as f:
+            f.write('[threaded_validation]\nworkers=4\nhost_limits=doi.org:3, pub.orcid.org:2\ndefault_host_limit=1\n')
+        self.assertEqual(get_threaded_validation_config(config_filepath),
+                         {'workers': 4, 'host_limits': {'doi.org': 3, 'pub.orcid.org': 2}, 'default_host_limit': 1})
+        validator = get_threaded_validator(config_filepath)
+        self.assertEqual((validator.max_workers, validator.default_host_limit), (4, 1))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,118 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+# Copyright (c) 2026 The OpenCitations Index Authors.
+#
+# Permission to use, copy, modify, and/or distribute this software for any purpose
+# with or without fee is hereby granted, provided that the above copyright notice
+# and this permission notice appear in all copies.
+#
+# THE SOFTWARE IS PROVIDED "AS IS" AND THE AUTHOR DISCLAIMS ALL WARRANTIES WITH
+# REGARD TO THIS SOFTWARE INCLUDING ALL IMPLIED WARRANTIES OF MERCHANTABILITY AND
+# FITNESS. IN NO EVENT SHALL THE AUTHOR BE LIABLE FOR ANY SPECIAL, DIRECT, INDIRECT,
+# OR CONSEQUENTIAL DAMAGES OR ANY DAMAGES WHATSOEVER RESULTING FROM LOSS OF USE,
+# DATA OR PROFITS, WHETHER IN AN ACTION OF CONTRACT, NEGLIGENCE OR OTHER TORTIOUS
+# ACTION, ARISING OUT OF OR IN CONNECTION WITH THE USE OR PERFORMANCE OF THIS
+# SOFTWARE.
+
+import os
+import shutil
+import stat
+import tempfile
+import threading
+import time
+import unittest
+from multiprocessing import AuthenticationError
+from unittest.mock import patch
+
+from oc_ds_converter.lib.validation_broker import (ValidationBroker, connect_validation_broker,
+                                                   get_validation_broker_config, start_validation_broker)
+
+
+class ValidationBrokerTest(unittest.TestCase):
+    def test_validate(self):
+        released = threading.Event()
+
+        def check_exists(id_manager, id):
+            released.wait(5)
+            # the DOIs ending with "x" do not exist, while the request of those ending with "t" times out
+            return None if id.endswith('t') else not id.endswith('x')
+
+        broker = ValidationBroker(max_workers=4)
+        results = list()
+        with patch('oc_ds_converter.lib.threaded_validator.check_exists', side_effect=check_exists) as api:
+            workers = [threading.Thread(target=lambda: results.append(broker.validate(['doi:10.1/a', 'doi:10.1/x'])))
+                       for _ in range(3)]
+            for worker in workers:
+                worker.start()
+            # the requests are answered once all the workers wait for them
+            deadline = time.monotonic() + 5
+            while broker.stats()['joined'] < 4 and time.monotonic() < deadline:
+                time.sleep(0.01)
+            released.set()
+            for worker in workers:
+                worker.join()
+            # the IDs requested by several workers at the same time are requested once
+            self.assertEqual(api.call_count, 2)
+            self.assertEqual(results, [{'doi:10.1/a': True, 'doi:10.1/x': False}] * 3)
+            self.assertEqual(broker.validate(['doi:10.1/a', 'doi:10.1/t', 'isbn:9788808182159']),
+                             {'doi:10.1/a': True, 'doi:10.1/t': None, 'isbn:9788808182159': None})
+            # the results are cached, except the failed ones
+            self.assertEqual(broker.validate(['doi:10.1/t'])['doi:10.1/t'], None)
+            self.assertEqual(api.call_count, 4)
+        stats = broker.stats()
+        self.assertEqual(stats, {'size': 2, 'in_flight': 0, 'hits': 1, 'joined': 4, 'requests': 4})
+
+    def test_cache_size(self):
+        broker = ValidationBroker(max_workers=1, cache_size=2)
+        with patch('oc_ds_converter.lib.threaded_validator.check_exists', return_value=True) as api:
+            broker.validate(['doi:10.1/a', 'doi:10.1/b', 'doi:10.1/c'])
+            broker.validate(['doi:10.1/c', 'doi:10.1/a'])
+            self.assertEqual(api.call_count, 4)
+
+    def test_broker_process(self):
+        base = tempfile.mkdtemp()
+        address = os.path.join(base, 'broker.sock')
+        manager = start_validation_broker(address, b'test', max_workers=2)
+        try:
+            broker = connect_validation_broker(address, b'test')
+            # the schemas not supported by the broker are not validated
+            self.assertEqual(broker.validate(['isbn:9788808182159']), {'isbn:9788808182159': None})
+            self.assertEqual(broker.stats()['requests'], 0)
+        finally:
+            manager.shutdown()
+            shutil.rmtree(base, ignore_errors=True)
+
+    def test_authkey(self):
+        base = tempfile.mkdtemp()
+        address = os.path.join(base, 'broker.sock')
+        # without a key, a random one is saved beside the socket, and both are accessible by their owner only
+        manager = start_validation_broker(address, max_workers=1)
+        try:
+            self.assertEqual(stat.S_IMODE(os.stat(address).st_mode), 0o600)
+            self.assertEqual(stat.S_IMODE(os.stat(address + '.key').st_mode), 0o600)
+            broker = connect_validation_broker(address)
+            self.assertEqual(broker.stats()['requests'], 0)
+            self.assertRaises(AuthenticationError, connect_validation_broker, address, b'oc_ds_converter')
+        finally:
+            manager.shutdown()
+            shutil.rmtree(base, ignore_errors=True)
+        # a broker on a host and port requires an explicit key
+        self.assertRaises(ValueError, start_validation_broker, ('127.0.0.1', 0))
+        self.assertRaises(ValueError, connect_validation_broker, ('127.0.0.1', 50000))
+
+    def test_config(self):
+        base = tempfile.mkdtemp()
+        config_filepath = os.path.join(base, 'config.ini')
+        with open(config_filepath, 'w', encoding='utf-8') as f:
+            f.write('[validation_broker]\naddress=/tmp/broker.sock\nauthkey=secret\nworkers=4\n')
+        config = get_validation_broker_config(config_filepath)
+        self.assertEqual((config['address'], config['authkey'], config['workers'], config['cache_size']),
+                         ('/tmp/broker.sock', b'secret', 4, 1000000))
+        with open(config_filepath, 'w', encoding='utf-8') as f:
+            f.write('[validation_broker]\naddress=/tmp/broker.sock\nauthkey=\n')
+        self.assertIsNone(get_validation_broker_config(config_filepath)['authkey'])
+        shutil.rmtree(base, ignore_errors=True)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,113 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+# Copyright (c) 2026 The OpenCitations Index Authors.
+#
+# Permission to use, copy, modify, and/or distribute this software for any purpose
+# with or without fee is hereby granted, provided that the above copyright notice
+# and this permission notice appear in all copies.
+#
+# THE SOFTWARE IS PROVIDED "AS IS" AND THE AUTHOR DISCLAIMS ALL WARRANTIES WITH
+# REGARD TO THIS SOFTWARE INCLUDING ALL IMPLIED WARRANTIES OF MERCHANTABILITY AND
+# FITNESS. IN NO EVENT SHALL THE AUTHOR BE LIABLE FOR ANY SPECIAL, DIRECT, INDIRECT,
+# OR CONSEQUENTIAL DAMAGES OR ANY DAMAGES WHATSOEVER RESULTING FROM LOSS OF USE,
+# DATA OR PROFITS, WHETHER IN AN ACTION OF CONTRACT, NEGLIGENCE OR OTHER TORTIOUS
+# ACTION, ARISING OUT OF OR IN CONNECTION WITH THE USE OR PERFORMANCE OF THIS
+# SOFTWARE.
+
+import csv
+import os
+import shutil
+import time
+import unittest
+from unittest.mock import patch
+
+from oc_ds_converter.lib.validation_queue import (RateLimiter, ValidationQueue, drain_validation_queue,
+                                                  filter_rows, get_validation_queue)
+from oc_ds_converter.oc_idmanager.doi import DOIManager
+from oc_ds_converter.oc_idmanager.negative_cache import NOT_FOUND, NegativeCache
+from oc_ds_converter.oc_idmanager.oc_data_storage.in_memory_manager import InMemoryStorageManager
+from oc_ds_converter.oc_idmanager.support import set_api_failed
+
+BASE = os.path.join('test', 'validation_queue')
+
+
+def exists(doi, get_extra_info=False, allow_extra_api=None):
+    # the DOIs ending with "x" do not exist, while the request of those ending with "t" times out
+    if doi.endswith('t'):
+        set_api_failed(True)
+        return False
+    return not doi.endswith('x')
+
+
+class ValidationQueueTest(unittest.TestCase):
+    def setUp(self):
+        self.queue = ValidationQueue(os.path.join(BASE, 'queue.db'))
+
+    def tearDown(self):
+        self.queue.close()
+        shutil.rmtree(BASE, ignore_errors=True)
+
+    def test_push(self):
+        self.assertEqual(self.queue.push(['doi:10.1/a', 'doi:10.1/b', 'doi:10.1/a'], 'first'), {'doi:10.1/a', 'doi:10.1/b'})
+        # the IDs are pushed once: only the input which pushed them first produces their rows, also if run again
+        self.assertEqual(self.queue.push(['doi:10.1/b', 'doi:10.1/c'], 'second'), {'doi:10.1/c'})
+        self.assertEqual(self.queue.push(['doi:10.1/b'], 'first'), {'doi:10.1/b'})
+        self.assertEqual(len(self.queue), 3)
+        self.assertEqual(self.queue.stats(), {'pending': 3, 'valid': 0, 'invalid': 0})
+
+    def test_drain(self):
+        self.queue.push(['doi:10.1/a', 'doi:10.1/x', 'doi:10.1/t', 'doi:10.1/stored'], 'input')
+        storage_manager = InMemoryStorageManager(os.path.join(BASE, 'storage.json'))
+        storage_manager.set_value('doi:10.1/stored', False)
+        doi_manager = DOIManager(storage_manager=storage_manager)
+        doi_manager.negative_cache = NegativeCache()
+        with patch.object(DOIManager, 'exists', side_effect=exists) as api:
+            counts = drain_validation_queue(self.queue, doi_manager, rate=None, workers=4, max_attempts=2)
+        # the DOI already in the storage is not requested, while the one which timed out is requested twice
+        self.assertEqual(sorted(call.args[0] for call in api.call_args_list),
+                         ['doi:10.1/a', 'doi:10.1/t', 'doi:10.1/t', 'doi:10.1/x'])
+        self.assertEqual(counts, {'valid': 1, 'invalid': 2, 'failed': 2})
+        self.assertEqual(self.queue.stats(), {'pending': 1, 'valid': 1, 'invalid': 2})
+        self.assertEqual(self.queue.rejected_ids(), {'doi:10.1/x', 'doi:10.1/t', 'doi:10.1/stored'})
+        self.assertTrue(storage_manager.get_value('doi:10.1/a'))
+        self.assertFalse(storage_manager.get_value('doi:10.1/x'))
+        self.assertIsNone(storage_manager.get_value('doi:10.1/t'))
+        self.assertEqual(doi_manager.negative_cache.get('doi:10.1/x'), NOT_FOUND)
+        self.assertIsNone(doi_manager.negative_cache.get('doi:10.1/t'))
+        doi_manager.negative_cache.close()
+
+    def test_rate_limiter(self):
+        limiter = RateLimiter(20)
+        start = time.monotonic()
+        for _ in range(5):
+            limiter.acquire()
+        self.assertGreaterEqual(time.monotonic() - start, 0.19)
+
+    def test_filter_rows(self):
+        os.makedirs(os.path.join(BASE, 'citations'))
+        with open(os.path.join(BASE, 'out_cited.csv'), 'w', encoding='utf-8', newline='') as f:
+            f.write('"id","title"\n"doi:10.1/a pmid:1","A"\n"doi:10.1/x","X"\n')
+        with open(os.path.join(BASE, 'citations', 'out.csv'), 'w', encoding='utf-8', newline='') as f:
+            f.write('"citing","cited"\n"doi:10.1/c","doi:10.1/a"\n"doi:10.1/c","doi:10.1/x"\n')
+        self.queue.push(['doi:10.1/a', 'doi:10.1/x'], 'out')
+        self.queue.set_results({'doi:10.1/a': True, 'doi:10.1/x': False})
+        self.assertEqual(filter_rows(self.queue, [BASE]), 2)
+        with open(os.path.join(BASE, 'out_cited.csv'), 'r', encoding='utf-8') as f:
+            self.assertEqual([row['id'] for row in csv.DictReader(f)], ['doi:10.1/a pmid:1'])
+        with open(os.path.join(BASE, 'citations', 'out.csv'), 'r', encoding='utf-8') as f:
+            self.assertEqual([row['cited'] for row in csv.DictReader(f)], ['doi:10.1/a'])
+
+    def test_get_validation_queue(self):
+        config_filepath = os.path.join(BASE, 'config.ini')
+        with open(config_filepath, 'w', encoding='utf-8') as f:
+            f.write('[validation_queue]\nfilepath=\n')
+        self.assertIsNone(get_validation_queue(config_filepath))
+        with open(config_filepath, 'w', encoding='utf-8') as f:
+            f.write(f'[validation_queue]\nfilepath={os.path.join(BASE, "queue.db")}\n')
+        queue = get_validation_queue(config_filepath)
+        self.assertIsInstance(queue, ValidationQueue)
+        queue.close()
+
+
+if __name__ == '__main__':
+    unittest.main()
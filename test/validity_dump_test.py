@@ -0,0 +1,51 @@
+import os
+import shutil
+import unittest
+
+from oc_ds_converter.lib.validity_dump import (export_storage, import_dumps, merge_dumps, read_dump,
+                                               write_dump)
+from oc_ds_converter.oc_idmanager.oc_data_storage.in_memory_manager import InMemoryStorageManager
+from oc_ds_converter.oc_idmanager.oc_data_storage.redis_manager import RedisStorageManager
+from oc_ds_converter.oc_idmanager.oc_data_storage.sqlite_manager import SqliteStorageManager
+from oc_ds_converter.run.storage_dump import export_validity
+
+BASE = os.path.join('test', 'validity_dump')
+
+
+class TestValidityDump(unittest.TestCase):
+    def tearDown(self):
+        shutil.rmtree(BASE, ignore_errors=True)
+
+    def test_dump(self):
+        dump = os.path.join(BASE, 'ids.dump')
+        id_values = [(f'doi:10.{i % 7}/abc.{i}', i % 3 == 0) for i in range(50000)] + [('orcid:0000-0002-6227-405X', True),
+                                                                                      ('doi:10.1/ü', False)]
+        id_values.sort()
+        self.assertEqual(write_dump(id_values, dump), len(id_values))
+        self.assertEqual(list(read_dump(dump)), id_values)
+        self.assertRaises(ValueError, write_dump, [('doi:10.1/b', True), ('doi:10.1/a', True)], dump)
+        with open(dump, 'rb') as f:
+            data = f.read()
+        with open(dump, 'wb') as f:
+            f.write(data[:len(data) // 2])
+        self.assertRaises(Exception, list, read_dump(dump))
+
+    def test_export_merge_import(self):
+        sqlite = SqliteStorageManager(os.path.join(BASE, 'id_valid.db'))
+        sqlite.set_multi_value([('doi:10.1/a', True), ('doi:10.1/b', False), ('doi:10.1/c', False)])
+        redis = RedisStorageManager(testing=True)
+        redis.set_multi_value([('doi:10.1/c', True), ('doi:10.1/d', False)])
+        self.assertEqual(export_validity(os.path.join(BASE, 'id_valid.db'), False, os.path.join(BASE, 'host1.dump')), 3)
+        self.assertEqual(export_storage(redis, os.path.join(BASE, 'host2.dump'), chunk_size=1), 2)
+        self.assertEqual(merge_dumps([os.path.join(BASE, 'host1.dump'), os.path.join(BASE, 'host2.dump')],
+                                     os.path.join(BASE, 'merged.dump')), 4)
+        expected = {'doi:10.1/a': True, 'doi:10.1/b': False, 'doi:10.1/c': True, 'doi:10.1/d': False}
+        self.assertEqual(dict(read_dump(os.path.join(BASE, 'merged.dump'))), expected)
+        in_memory = InMemoryStorageManager(os.path.join(BASE, 'id_valid.json'))
+        self.assertEqual(import_dumps([os.path.join(BASE, 'merged.dump')], in_memory, batch_size=3), 4)
+        self.assertEqual(InMemoryStorageManager(os.path.join(BASE, 'id_valid.json')).get_validity_dict(), expected)
+        redis.delete_storage()
+
+
+if __name__ == '__main__':
+    unittest.main()